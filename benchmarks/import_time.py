@@ -0,0 +1,59 @@
+"""Measure the cold import time of gov.operations.
+
+Each sample imports the module in a fresh interpreter. The algosdk modules
+that gov.operations needs are timed the same way, and the difference is the
+cost added by this package. The script exits with status 1 if that overhead
+exceeds --max-overhead-ms.
+
+Usage: python benchmarks/import_time.py [--samples N] [--max-overhead-ms MS]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BASELINE = "import algosdk.v2client.algod, algosdk.future.transaction, algosdk.logic"
+TARGET = "import gov.operations"
+
+
+def importTime(statement: str) -> float:
+    """Time a statement in a fresh interpreter, in milliseconds."""
+    code = (
+        "import time; t = time.perf_counter(); {}; "
+        "print((time.perf_counter() - t) * 1000)".format(statement)
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return float(out)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=15)
+    parser.add_argument("--max-overhead-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    baseline = statistics.median(importTime(BASELINE) for _ in range(args.samples))
+    target = statistics.median(importTime(TARGET) for _ in range(args.samples))
+    overhead = target - baseline
+
+    print("algosdk modules:   {:8.1f} ms".format(baseline))
+    print("gov.operations:    {:8.1f} ms".format(target))
+    print("gov overhead:      {:8.1f} ms".format(overhead))
+
+    if overhead > args.max_overhead_ms:
+        print("FAIL: overhead above {} ms".format(args.max_overhead_ms))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Profile the opcode cost of each contract method and check it against a baseline.
+
+Runs two governance cycles on a local ledger. Four voters stake, one of them
+by joining in a single group reported as "opt_in [join]", then delegate,
+register forty proposals and vote on them; the proposals are executed or
+cancelled and the governor begins a new cycle. Tallies live in the proposal
+apps, so a vote costs the same however many proposals the cycle has. In the second
+cycle the same voters act again. The first call of each voter in that cycle
+runs the rollover of its powers and is reported as "method [rollover]", with
+the proposal call of its group: a delegation, two proposal registrations and a
+vote. Then they claim. A third cycle has no
+proposals; its turnover, reported as "begin_new_governance_cycle [no proposals]",
+costs as much as the turnovers after full cycles because registrations expire
+with their cycle.
+The maximum cost of each method is printed next to its cost in the baseline.
+Exits with status 1 if the maximum cost of any method grew past the threshold.
+
+Usage: python benchmarks/opcode_costs.py [--baseline PATH] [--threshold F] [--update]
+"""
+import argparse
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from algosdk import account
+
+from gov.account import Account
+from gov.ledger import LocalAlgodClient, LocalLedger
+from gov.operations import (
+    beginNewGovernanceCycle,
+    cancelProposal,
+    claim,
+    createGovernor,
+    createProposal,
+    delegateVotingPower,
+    executeProposal,
+    joinGovernor,
+    optInToApp,
+    registerProposal,
+    sendToken,
+    setupGovernor,
+    stake,
+    vote,
+)
+from gov.profiler import OpcodeProfiler, readBaseline, writeBaseline
+from gov.testing.clock import GovernanceClock
+from gov.testing.resources import createDummyAsset, optInToAsset, payAccount
+
+BASELINE = Path(__file__).resolve().parent / "opcode_costs.json"
+NUM_PROPOSALS = 40
+
+
+def runCycles(profiler: OpcodeProfiler) -> None:
+    client = LocalAlgodClient(LocalLedger(devMode=True, tracer=profiler))
+    accounts = [Account(account.generate_account()[0]) for _ in range(5)]
+    for a in accounts:
+        payAccount(client, client.ledger.genesisAccounts[0], a.getAddress(), 10 ** 9)
+    creator, voters = accounts[0], accounts[1:]
+
+    govToken = createDummyAsset(client, 10 ** 9, creator)
+    for voter in voters:
+        optInToAsset(client, govToken, voter)
+        sendToken(client, creator, govToken, 1000, voter)
+    appID = createGovernor(
+        client=client,
+        creator=creator,
+        govTokenId=govToken,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        # each group is a block of its own, four seconds after the last
+        stakeDurationSeconds=600,
+        proposeDurationSeconds=300,
+        voteDurationSeconds=600,
+        executeDelaySeconds=50,
+        claimDurationSeconds=300,
+    )
+    setupGovernor(client, appID, creator, govToken)
+    clock = GovernanceClock(client, appID)
+
+    for cycle in range(2):
+        # the voters but the first take turns proposing, so in the second cycle
+        # the first voter's first call is a vote
+        proposers = [voters[1 + i % (len(voters) - 1)] for i in range(NUM_PROPOSALS)]
+        proposals = [
+            createProposal(client, proposer, appID, creator) for proposer in proposers
+        ]
+        rolledOver = set()
+
+        def firstCall(voter: Account):
+            # a voter's first call of a cycle after the first rolls over its powers
+            if cycle == 0 or voter in rolledOver:
+                return nullcontext()
+            rolledOver.add(voter)
+            return profiler.scope("rollover")
+
+        if cycle == 0:
+            for voter in voters[:-1]:
+                optInToApp(client, appID, voter)
+                stake(client, appID, 100, voter)
+            with profiler.scope("join"):
+                joinGovernor(client, appID, 100, voters[-1])
+        with firstCall(voters[-1]):
+            delegateVotingPower(client, appID, voters[-1], voters[0])
+
+        clock.toPhase("propose")
+        for proposer, proposalID in zip(proposers, proposals):
+            with firstCall(proposer):
+                registerProposal(client, appID, proposalID, proposer)
+
+        clock.toPhase("vote")
+        for voter in voters[:-1]:
+            for proposalID in proposals:
+                with firstCall(voter):
+                    vote(client, appID, proposalID, 1, voter)
+        cancelProposal(client, appID, proposals[-1], creator)
+
+        clock.toPhase("claim", offset=1)
+        for proposalID in proposals[:-1]:
+            executeProposal(client, appID, proposalID, creator)
+        if cycle == 1:
+            for voter in voters:
+                claim(client, appID, voter)
+
+        clock.toPhase("next_cycle")
+        beginNewGovernanceCycle(client, appID, creator)
+
+    clock.toPhase("next_cycle")
+    with profiler.scope("no proposals"):
+        beginNewGovernanceCycle(client, appID, creator)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="fraction a method's cost may grow by before failing",
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="write the baseline instead of checking"
+    )
+    args = parser.parse_args()
+
+    profiler = OpcodeProfiler()
+    runCycles(profiler)
+    print(profiler.report())
+
+    if args.update:
+        writeBaseline(args.baseline, profiler.baseline())
+        print("\nWrote", args.baseline)
+        return
+    baseline = readBaseline(args.baseline)
+    print()
+    print(profiler.comparison(baseline))
+    regressions = profiler.regressions(baseline, args.threshold)
+    if regressions:
+        print("\nOpcode cost regressions:")
+        for regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+    print("\nNo method costs more than {:.0%} over the baseline".format(args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Measure the signatures per second of gov.signing.TransactionSigner.
+
+Builds vote groups, a governor call and a proposal call each, for a number of
+voters and signs them three ways: with Transaction.sign as gov.operations used
+to, with the cached keys of a signer in this process, and across a process
+pool. The signatures of the three are checked to be the same.
+
+Usage: python benchmarks/signing.py [--txns N] [--voters N] [--processes N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from algosdk import account
+from algosdk.future import transaction
+
+from gov.account import Account
+from gov.contracts.methods import SELECTORS
+from gov.signing import TransactionSigner
+
+SP = transaction.SuggestedParams(1000, 1, 1001, "A" * 43 + "=", flat_fee=True)
+
+
+def makeVotes(txns: int, voters: int):
+    accounts = [Account(account.generate_account()[0]) for _ in range(voters)]
+    batch, signers = [], []
+    for i in range(txns // 2):
+        voter = accounts[i % voters]
+        group = [
+            transaction.ApplicationCallTxn(
+                voter.getAddress(),
+                SP,
+                1,
+                transaction.OnComplete.NoOpOC,
+                app_args=[SELECTORS["vote"], (i % 2).to_bytes(8, "big")],
+                foreign_apps=[2 + i % 1000],
+            ),
+            transaction.ApplicationCallTxn(
+                voter.getAddress(),
+                SP,
+                2 + i % 1000,
+                transaction.OnComplete.NoOpOC,
+                app_args=[b"tally"],
+                foreign_apps=[1],
+            ),
+        ]
+        transaction.assign_group_id(group)
+        batch.extend(group)
+        signers.extend([voter, voter])
+    return batch, signers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--txns", type=int, default=100_000)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument(
+        "--processes", type=int, default=None, help="defaults to the number of CPUs"
+    )
+    args = parser.parse_args()
+
+    txns, signers = makeVotes(args.txns, args.voters)
+    print("{} vote transactions of {} voters:".format(len(txns), args.voters))
+
+    # Transaction.sign is slow enough that a sample shows its rate
+    sample = min(len(txns), 10_000)
+    start = time.perf_counter()
+    expected = [
+        txn.sign(voter.getPrivateKey()).signature
+        for txn, voter in zip(txns[:sample], signers[:sample])
+    ]
+    seconds = time.perf_counter() - start
+    print("  {:28s} {:10.0f} signatures/s".format("Transaction.sign", sample / seconds))
+
+    for name, signer in (
+        ("cached keys", TransactionSigner(processes=1)),
+        ("process pool", TransactionSigner(args.processes)),
+    ):
+        with signer:
+            signed = signer.signBatch(txns, signers)
+        assert [s.signature for s in signed[:sample]] == expected
+        print(
+            "  {:28s} {:10.0f} signatures/s  {:6.2f} s".format(
+                name, signer.signaturesPerSecond, signer.seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare gov.util.decodeState with the slotted views in gov.state.
+
+Decodes a batch of account local states, each with the voter keys of a governor
+and has-voted flags for five proposal slots, reading the voting power of each
+account. Reports the time per batch and the peak memory allocated.
+
+Usage: python benchmarks/state_decode.py [--accounts N] [--repeat N]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from base64 import b64encode
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gov.state import VoterState
+from gov.util import decodeState, stateKey
+
+
+def makePayloads(accounts: int):
+    def uint(key: bytes, value: int):
+        return {"key": b64encode(key).decode(), "value": {"type": 2, "uint": value}}
+
+    payloads = []
+    for i in range(accounts):
+        payloads.append(
+            [
+                uint(stateKey("address_amount_staked"), i),
+                uint(stateKey("address_voting_power"), i),
+                uint(stateKey("address_proposition_power"), i),
+                uint(stateKey("gov_cycle_id"), 3),
+                {
+                    "key": b64encode(stateKey("address_voted")).decode(),
+                    "value": {
+                        "type": 1,
+                        "bytes": b64encode((3).to_bytes(8, "big") + b"\xf8").decode(),
+                    },
+                },
+            ]
+        )
+    return payloads
+
+
+def withDecodeState(payloads):
+    return [decodeState(p)[stateKey("address_voting_power")] for p in payloads]
+
+
+def withViews(payloads):
+    return [VoterState.decode(p).votingPower for p in payloads]
+
+
+def withPartialViews(payloads):
+    return [VoterState.decode(p, ["votingPower"]).votingPower for p in payloads]
+
+
+def measure(fn, payloads, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(payloads)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    # keep every decoded state alive, as a caller holding the batch would
+    if fn is withDecodeState:
+        kept = [decodeState(p) for p in payloads]
+    elif fn is withViews:
+        kept = [VoterState.decode(p) for p in payloads]
+    else:
+        kept = [VoterState.decode(p, ["votingPower"]) for p in payloads]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del kept
+
+    return result, best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = makePayloads(args.accounts)
+    expected = None
+    print("{} account payloads:".format(args.accounts))
+    for name, fn in (
+        ("decodeState", withDecodeState),
+        ("VoterState.decode", withViews),
+        ("VoterState.decode, 1 field", withPartialViews),
+    ):
+        result, seconds, peak = measure(fn, payloads, args.repeat)
+        if expected is None:
+            expected = result
+        assert result == expected
+        print(
+            "  {:28s} {:8.1f} ms  {:7.1f} MiB peak".format(
+                name, seconds * 1000, peak / 2 ** 20
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare algod request throughput with and without connection pooling.
+
+Both clients call /v2/status against a local stub HTTP server, first from a
+single thread and then from a pool of threads.
+
+Usage: python benchmarks/transport.py [--requests N] [--threads N] [--pool-size N]
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from algosdk.v2client.algod import AlgodClient
+
+from gov.transport import PooledAlgodClient
+from gov.testing.stub import StubAlgodServer
+
+TOKEN = "a" * 64
+
+
+def run(client, requests: int, threads: int) -> float:
+    """Return requests per second."""
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(requests):
+            client.status()
+    else:
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(lambda _: client.status(), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    for threads in (1, args.threads):
+        with StubAlgodServer() as server:
+            plain = run(AlgodClient(TOKEN, server.address), args.requests, threads)
+            plainConnections = server.connections
+
+        with StubAlgodServer() as server:
+            client = PooledAlgodClient(TOKEN, server.address, poolSize=args.pool_size)
+            pooled = run(client, args.requests, threads)
+            client.close()
+
+        print("{} thread(s), {} requests:".format(threads, args.requests))
+        print(
+            "  AlgodClient        {:9.0f} req/s  {:5d} connections".format(
+                plain, plainConnections
+            )
+        )
+        print(
+            "  PooledAlgodClient  {:9.0f} req/s  {:5d} connections  {:.1f}% reused".format(
+                pooled,
+                client.pool.connectionsOpened,
+                100 * client.pool.reused / client.pool.requests,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
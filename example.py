@@ -11,7 +11,6 @@ from gov.operations import (
     delegateVotingPower,
     createProposal,
     registerProposal,
-    activateProposal,
     vote,
     executeProposal,
     claim,
@@ -22,6 +21,7 @@ from gov.util import (
     getUserLocalState,
     getAppGlobalState,
     getLastBlockTimestamp,
+    stateKey,
 )
 from gov.testing.setup import getAlgodClient
 from gov.testing.resources import (
@@ -89,17 +89,15 @@ def simple_gov():
     print("Charlie's voting info:", getUserLocalState(client, acct1))
     print("t+", getLastBlockTimestamp(client)[1] - t0)
 
-    # point governor to proposal
+    # register the proposal with the governor, which enables voting on it
     registerProposal(client, governorAppId, proposalAppId, creator)
     print("t+", getLastBlockTimestamp(client)[1] - t0)
     print(getAppGlobalState(client, governorAppId))
-    # point proposal to governor and enable voting
-    activateProposal(client, proposalAppId, governorAppId, 0, acct4)
-    print("t+", getLastBlockTimestamp(client)[1] - t0)
     print(getAppGlobalState(client, proposalAppId))
 
     vote(client, governorAppId, proposalAppId, 1, creator)
-    print(getAppGlobalState(client, governorAppId))
+    # the proposal app keeps the tallies
+    print(getAppGlobalState(client, proposalAppId))
     print("t+", getLastBlockTimestamp(client)[1] - t0)
 
     for _ in range(2):  # hack to tick time faster
@@ -108,7 +106,7 @@ def simple_gov():
     print("t+", getLastBlockTimestamp(client)[1] - t0)
 
     target = encoding.encode_address(
-        getAppGlobalState(client, proposalAppId)[b"target_id_key"]
+        getAppGlobalState(client, proposalAppId)[stateKey("target_id")]
     )
     targetBalance = getBalances(client, target)
     proposalBalance = getBalances(client, get_application_address(proposalAppId))
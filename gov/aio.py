@@ -0,0 +1,608 @@
+"""Asyncio equivalents of the operations in gov/operations.py.
+
+Every operation here is a coroutine taking an AsyncAlgodClient in place of an
+AlgodClient, so many governance operations can be in flight at once on a
+single event loop, e.g. with asyncio.gather.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from algosdk.v2client.algod import AlgodClient
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from algosdk import encoding
+
+from .account import Account
+from .contracts import keys
+from .contracts.methods import SELECTORS
+from .signing import signTransactions
+from .state import GovernorState, ProposalState
+from .util import PendingTxnResponse, decodeState, getLastBlockTimestamp
+from . import operations
+
+
+class AsyncAlgodClient:
+    """Awaitable transport for algod requests.
+
+    Blocking calls are made on a private thread pool, so the backing client can
+    be a regular AlgodClient or any local stand-in with the same interface.
+    Concurrent waits for the same round share a single status_after_block call,
+    and a backing gov.confirmation.ConfirmationTracker is used for all waits.
+    """
+
+    def __init__(self, client: AlgodClient, maxWorkers: int = 64) -> None:
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers)
+        self.roundWaiters: Dict[int, "asyncio.Future[Dict[str, Any]]"] = dict()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking function on the client's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def status(self) -> Dict[str, Any]:
+        return await self.run(self.client.status)
+
+    async def status_after_block(self, round: int) -> Dict[str, Any]:
+        waiter = self.roundWaiters.get(round)
+        if waiter is None:
+            waiter = asyncio.ensure_future(
+                self.run(self.client.status_after_block, round)
+            )
+            self.roundWaiters[round] = waiter
+            waiter.add_done_callback(lambda _: self.roundWaiters.pop(round, None))
+        return await asyncio.shield(waiter)
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        return await self.run(self.client.suggested_params)
+
+    async def send_transaction(self, txn: transaction.SignedTransaction) -> str:
+        return await self.run(self.client.send_transaction, txn)
+
+    async def send_transactions(self, txns: List[transaction.SignedTransaction]) -> str:
+        return await self.run(self.client.send_transactions, txns)
+
+    async def pending_transaction_info(self, txID: str) -> Dict[str, Any]:
+        return await self.run(self.client.pending_transaction_info, txID)
+
+    async def application_info(self, appID: int) -> Dict[str, Any]:
+        return await self.run(self.client.application_info, appID)
+
+    async def account_info(self, address: str) -> Dict[str, Any]:
+        return await self.run(self.client.account_info, address)
+
+    async def block_info(self, round: int) -> Dict[str, Any]:
+        return await self.run(self.client.block_info, round)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncAlgodClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+async def waitForTransaction(
+    client: AsyncAlgodClient, txID: str, timeout: int = 10
+) -> PendingTxnResponse:
+    tracker = getattr(client.client, "confirmationTracker", None)
+    if tracker is not None:
+        return await asyncio.wrap_future(tracker.track(txID, timeout))
+
+    lastStatus = await client.status()
+    lastRound = lastStatus["last-round"]
+    startRound = lastRound
+
+    while lastRound < startRound + timeout:
+        pending_txn = await client.pending_transaction_info(txID)
+
+        if pending_txn.get("confirmed-round", 0) > 0:
+            return PendingTxnResponse(pending_txn)
+
+        if pending_txn["pool-error"]:
+            raise Exception("Pool error: {}".format(pending_txn["pool-error"]))
+
+        lastStatus = await client.status_after_block(lastRound + 1)
+
+        lastRound += 1
+
+    raise Exception(
+        "Transaction {} not confirmed after {} rounds".format(txID, timeout)
+    )
+
+
+async def getAppGlobalState(client: AsyncAlgodClient, appID: int) -> Dict[bytes, Any]:
+    appInfo = await client.application_info(appID)
+    return decodeState(appInfo["params"]["global-state"])
+
+
+async def getGovernorContracts(client: AsyncAlgodClient) -> Tuple[bytes, bytes]:
+    return await client.run(operations.getGovernorContracts, client.client)
+
+
+async def getProposalContracts(client: AsyncAlgodClient) -> Tuple[bytes, bytes]:
+    return await client.run(operations.getProposalContracts, client.client)
+
+
+async def createGovernor(
+    client: AsyncAlgodClient,
+    creator: Account,
+    govTokenId: int,
+    proposeThreshold: int,
+    voteThreshold: int,
+    quorumThreshold: int,
+    stakeDurationSeconds: int,
+    proposeDurationSeconds: int,
+    voteDurationSeconds: int,
+    executeDelaySeconds: int,
+    claimDurationSeconds: int,
+) -> int:
+    """Create a new governor. See gov.operations.createGovernor."""
+    programs, proposalPrograms, suggestedParams = await asyncio.gather(
+        getGovernorContracts(client),
+        getProposalContracts(client),
+        client.suggested_params(),
+    )
+    signedTxn = operations._createGovernorTxn(
+        creator,
+        govTokenId,
+        proposeThreshold,
+        voteThreshold,
+        quorumThreshold,
+        stakeDurationSeconds,
+        proposeDurationSeconds,
+        voteDurationSeconds,
+        executeDelaySeconds,
+        claimDurationSeconds,
+        programs,
+        proposalPrograms[0],
+        suggestedParams,
+    )
+
+    await client.send_transaction(signedTxn)
+
+    response = await waitForTransaction(client, signedTxn.get_txid())
+    assert response.applicationIndex is not None and response.applicationIndex > 0
+    return response.applicationIndex
+
+
+async def setupGovernor(
+    client: AsyncAlgodClient, appID: int, funder: Account, govTokenId: int
+) -> None:
+    """Fund a governor and opt it into its governance token."""
+    signedTxns = operations._setupGroup(
+        appID, funder, govTokenId, await client.suggested_params()
+    )
+
+    await client.send_transactions(signedTxns)
+
+    await waitForTransaction(client, signedTxns[0].get_txid())
+
+
+async def optInToApp(client: AsyncAlgodClient, appID: int, account: Account) -> None:
+    signedOptInTxn = operations._optInTxn(
+        appID, account, await client.suggested_params()
+    )
+    await client.send_transaction(signedOptInTxn)
+    await waitForTransaction(client, signedOptInTxn.get_txid())
+
+
+async def stake(
+    client: AsyncAlgodClient, appID: int, amount: int, account: Account
+) -> None:
+    suggestedParams, appGlobalState = await asyncio.gather(
+        client.suggested_params(), getAppGlobalState(client, appID)
+    )
+    signedTxns = operations._stakeGroup(
+        appID, operations._govToken(appGlobalState), amount, account, suggestedParams
+    )
+
+    await client.send_transactions(signedTxns)
+    await waitForTransaction(client, signedTxns[-1].get_txid())
+
+
+async def _sendGroups(
+    client: AsyncAlgodClient,
+    groups: List[List[transaction.SignedTransaction]],
+    responses: Optional[Dict[int, PendingTxnResponse]] = None,
+) -> List[Optional[Exception]]:
+    """Send and wait on the groups concurrently.
+
+    Args:
+        client: An async algod client.
+        groups: The signed transactions of each group.
+        responses: If given, updated with the response of the last transaction
+            of each group that confirmed, by the index of the group.
+
+    Returns:
+        For each group, the error it was rejected with or None if it confirmed.
+    """
+
+    async def send(
+        signedTxns: List[transaction.SignedTransaction],
+    ) -> PendingTxnResponse:
+        await client.send_transactions(signedTxns)
+        return await waitForTransaction(client, signedTxns[-1].get_txid())
+
+    results = await asyncio.gather(
+        *(send(signedTxns) for signedTxns in groups), return_exceptions=True
+    )
+    errors: List[Optional[Exception]] = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            errors.append(result)
+            continue
+        errors.append(None)
+        if responses is not None:
+            responses[i] = result
+    return errors
+
+
+async def joinGovernor(
+    client: AsyncAlgodClient, appID: int, amount: int, account: Account
+) -> None:
+    """Opt in to the governor and stake in one group. See
+    gov.operations.joinGovernor."""
+    suggestedParams, appGlobalState = await asyncio.gather(
+        client.suggested_params(), getAppGlobalState(client, appID)
+    )
+    signedTxns = operations._joinGroup(
+        appID,
+        operations._govToken(appGlobalState),
+        amount,
+        account,
+        suggestedParams,
+    )
+
+    await client.send_transactions(signedTxns)
+    await waitForTransaction(client, signedTxns[-1].get_txid())
+
+
+async def joinGovernorBulk(
+    client: AsyncAlgodClient,
+    appID: int,
+    stakes: Sequence[Tuple[Account, int]],
+) -> Dict[str, Exception]:
+    """Join the governor with many accounts at once. See
+    gov.operations.joinGovernorBulk."""
+    suggestedParams, appGlobalState = await asyncio.gather(
+        client.suggested_params(), getAppGlobalState(client, appID)
+    )
+    govToken = operations._govToken(appGlobalState)
+
+    errors = await _sendGroups(
+        client,
+        [
+            operations._joinGroup(appID, govToken, amount, account, suggestedParams)
+            for account, amount in stakes
+        ],
+    )
+    return {
+        account.getAddress(): error
+        for (account, _), error in zip(stakes, errors)
+        if error is not None
+    }
+
+
+async def _callGovernor(
+    client: AsyncAlgodClient,
+    appID: int,
+    account: Account,
+    appArgs: List[bytes],
+    accounts: Optional[List[str]] = None,
+    foreignApps: Optional[List[int]] = None,
+) -> PendingTxnResponse:
+    appCallTxn = transaction.ApplicationCallTxn(
+        sender=account.getAddress(),
+        index=appID,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=appArgs,
+        accounts=accounts,
+        foreign_apps=foreignApps,
+        sp=await client.suggested_params(),
+    )
+
+    signedAppCallTxn = signTransactions([appCallTxn], account)[0]
+    await client.send_transaction(signedAppCallTxn)
+    return await waitForTransaction(client, signedAppCallTxn.get_txid())
+
+
+async def _callGovernorAndProposal(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    proposalAppId: int,
+    account: Account,
+    governorArgs: List[bytes],
+    proposalMethod: bytes,
+    accounts: Optional[List[str]] = None,
+    funding: int = 0,
+) -> PendingTxnResponse:
+    """Call the governor and then the proposal app it authorizes in one group.
+
+    Args:
+        funding: If not zero, the group starts with a payment of this amount
+            from the account to the proposal app.
+    """
+    suggestedParams = await client.suggested_params()
+
+    txns = []
+    if funding:
+        txns.append(
+            transaction.PaymentTxn(
+                sender=account.getAddress(),
+                receiver=get_application_address(proposalAppId),
+                amt=funding,
+                sp=suggestedParams,
+            )
+        )
+    txns.append(
+        transaction.ApplicationCallTxn(
+            sender=account.getAddress(),
+            index=governorAppId,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=governorArgs,
+            foreign_apps=[proposalAppId],
+            sp=suggestedParams,
+        )
+    )
+    txns.append(
+        transaction.ApplicationCallTxn(
+            sender=account.getAddress(),
+            index=proposalAppId,
+            on_complete=transaction.OnComplete.NoOpOC,
+            app_args=[proposalMethod],
+            accounts=accounts,
+            foreign_apps=[governorAppId],
+            sp=suggestedParams,
+        )
+    )
+    transaction.assign_group_id(txns)
+
+    signedTxns = signTransactions(txns, account)
+    await client.send_transactions(signedTxns)
+    return await waitForTransaction(client, signedTxns[-1].get_txid())
+
+
+async def delegateVotingPower(
+    client: AsyncAlgodClient, appID: int, account: Account, delegateTo: Account
+) -> None:
+    await _callGovernor(
+        client,
+        appID,
+        account,
+        [SELECTORS["delegate_voting_power"]],
+        accounts=[delegateTo.getAddress()],
+    )
+
+
+async def delegatePropositionPower(
+    client: AsyncAlgodClient, appID: int, account: Account, delegateTo: Account
+) -> None:
+    await _callGovernor(
+        client,
+        appID,
+        account,
+        [SELECTORS["delegate_proposition_power"]],
+        accounts=[delegateTo.getAddress()],
+    )
+
+
+async def createProposal(
+    client: AsyncAlgodClient,
+    creator: Account,
+    governorId: int,
+    targetId: Account,
+) -> int:
+    programs, suggestedParams = await asyncio.gather(
+        getProposalContracts(client), client.suggested_params()
+    )
+    signedTxn = operations._createProposalTxn(
+        creator, governorId, targetId, programs, suggestedParams
+    )
+
+    await client.send_transaction(signedTxn)
+
+    response = await waitForTransaction(client, signedTxn.get_txid())
+    assert response.applicationIndex is not None and response.applicationIndex > 0
+    return response.applicationIndex
+
+
+async def registerProposal(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    proposalAppId: int,
+    account: Account,
+) -> None:
+    """Register and fund a proposal. See gov.operations.registerProposal."""
+    await _callGovernorAndProposal(
+        client,
+        governorAppId,
+        proposalAppId,
+        account,
+        [SELECTORS["register_proposal"]],
+        b"register",
+        funding=100000 + 1000 * 2,
+    )
+
+
+async def vote(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    proposalAppId: int,
+    proposalVote: int,
+    account: Account,
+) -> None:
+    await _callGovernorAndProposal(
+        client,
+        governorAppId,
+        proposalAppId,
+        account,
+        [SELECTORS["vote"], proposalVote.to_bytes(8, "big")],
+        b"tally",
+    )
+
+
+async def castBallot(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    votes: Dict[int, int],
+    account: Account,
+) -> Dict[int, Optional[Exception]]:
+    """Vote on several proposals at once. See gov.operations.castBallot."""
+    suggestedParams = await client.suggested_params()
+
+    results: Dict[int, Optional[Exception]] = dict()
+    chunks = operations._chunks(list(votes.items()))
+    while chunks:
+        errors = await _sendGroups(
+            client,
+            [
+                operations._ballotGroup(governorAppId, chunk, account, suggestedParams)
+                for chunk in chunks
+            ],
+        )
+        chunks = operations._groupResults(chunks, errors, results)
+    return {proposalAppId: results[proposalAppId] for proposalAppId in votes}
+
+
+async def executeProposal(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    proposalAppId: int,
+    account: Account,
+) -> None:
+    proposalState = await getAppGlobalState(client, proposalAppId)
+    target = encoding.encode_address(proposalState[keys.TARGET_ID_KEY.encode()])
+
+    await _callGovernorAndProposal(
+        client,
+        governorAppId,
+        proposalAppId,
+        account,
+        [SELECTORS["execute_proposal"]],
+        b"execute",
+        accounts=[target],
+    )
+
+
+async def executeAllPassed(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    proposalAppIds: Sequence[int],
+    account: Account,
+) -> Dict[int, Optional[Exception]]:
+    """Execute every proposal of the current cycle that passed, reading the
+    states concurrently. See gov.operations.executeAllPassed."""
+    governorState, lastBlock, *proposalStates = await asyncio.gather(
+        getAppGlobalState(client, governorAppId),
+        client.run(getLastBlockTimestamp, client.client),
+        *(getAppGlobalState(client, appID) for appID in proposalAppIds),
+    )
+    governor = GovernorState.fromState(governorState)
+    if lastBlock[1] <= (governor.executeDelayTimeEnd or 0):
+        return dict()
+
+    executions = []
+    for proposalAppId, state in zip(proposalAppIds, proposalStates):
+        proposal = ProposalState.fromState(state)
+        if proposal.canBeExecuted(governorAppId, governor):
+            executions.append((proposalAppId, proposal.targetId))
+
+    suggestedParams = await client.suggested_params()
+    results: Dict[int, Optional[Exception]] = dict()
+    chunks = operations._chunks(executions)
+    while chunks:
+        errors = await _sendGroups(
+            client,
+            [
+                operations._executeGroup(governorAppId, chunk, account, suggestedParams)
+                for chunk in chunks
+            ],
+        )
+        chunks = operations._groupResults(chunks, errors, results)
+    return {proposalAppId: results[proposalAppId] for proposalAppId, _ in executions}
+
+
+async def cancelProposal(
+    client: AsyncAlgodClient,
+    governorAppId: int,
+    proposalAppId: int,
+    account: Account,
+) -> None:
+    await _callGovernorAndProposal(
+        client,
+        governorAppId,
+        proposalAppId,
+        account,
+        [SELECTORS["cancel_proposal"]],
+        b"cancel",
+    )
+
+
+async def claim(client: AsyncAlgodClient, appID: int, account: Account) -> None:
+    suggestedParams, appGlobalState = await asyncio.gather(
+        client.suggested_params(), getAppGlobalState(client, appID)
+    )
+    signedCloseOutTxn = operations._claimTxn(
+        appID, operations._govToken(appGlobalState), account, suggestedParams
+    )
+
+    await client.send_transaction(signedCloseOutTxn)
+    await waitForTransaction(client, signedCloseOutTxn.get_txid())
+
+
+async def claimBulk(
+    client: AsyncAlgodClient, appID: int, accounts: Sequence[Account]
+) -> Dict[str, operations.ClaimResult]:
+    """Claim for many stakers at once. See gov.operations.claimBulk."""
+    suggestedParams, appGlobalState = await asyncio.gather(
+        client.suggested_params(), getAppGlobalState(client, appID)
+    )
+    govToken = operations._govToken(appGlobalState)
+
+    responses: Dict[int, PendingTxnResponse] = dict()
+    errors = await _sendGroups(
+        client,
+        [
+            [operations._claimTxn(appID, govToken, account, suggestedParams)]
+            for account in accounts
+        ],
+        responses,
+    )
+    return {
+        account.getAddress(): operations._claimResult(responses.get(i), errors[i])
+        for i, account in enumerate(accounts)
+    }
+
+
+async def beginNewGovernanceCycle(
+    client: AsyncAlgodClient, appID: int, account: Account
+) -> None:
+    await _callGovernor(
+        client, appID, account, [SELECTORS["begin_new_governance_cycle"]]
+    )
+
+
+async def sendToken(
+    client: AsyncAlgodClient,
+    sender: Account,
+    tokenId: int,
+    amount: int,
+    receiver: Account,
+) -> None:
+    transferTxn = transaction.AssetTransferTxn(
+        sender=sender.getAddress(),
+        receiver=receiver.getAddress(),
+        index=tokenId,
+        amt=amount,
+        sp=await client.suggested_params(),
+    )
+
+    signedTransferTxn = signTransactions([transferTxn], sender)[0]
+
+    await client.send_transaction(signedTransferTxn)
+    await waitForTransaction(client, signedTransferTxn.get_txid())
@@ -0,0 +1,86 @@
+"""Prebuilt contract programs shipped with the package.
+
+The .teal and .bin files in this directory are built from gov/contracts by
+`python -m gov.artifacts`, which must be re-run whenever the contracts change.
+They are only used while the fingerprint in manifest.json matches the current
+contract sources, so loading them never needs PyTeal and an edited contract is
+never silently replaced by a stale build.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ARTIFACTS_DIR = Path(__file__).parent
+CONTRACTS_DIR = ARTIFACTS_DIR.parent / "contracts"
+
+PROGRAMS = (
+    "Governor.approval_program",
+    "Governor.clear_state_program",
+    "Proposal.approval_program",
+    "Proposal.clear_state_program",
+)
+
+_manifest: Optional[Dict[str, Any]] = None
+
+
+def contractsFingerprint() -> str:
+    """Hash the contract sources that every program is built from."""
+    h = hashlib.sha256()
+    for path in sorted(CONTRACTS_DIR.glob("*.py")):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def readManifest() -> Optional[Dict[str, Any]]:
+    global _manifest
+
+    if _manifest is None:
+        try:
+            _manifest = json.loads((ARTIFACTS_DIR / "manifest.json").read_text())
+        except FileNotFoundError:
+            return None
+    return _manifest
+
+
+def load(name: str) -> Optional[bytes]:
+    """Get the prebuilt program `name`, or None if it is missing or stale."""
+    manifest = readManifest()
+    if (
+        manifest is None
+        or name not in manifest["programs"]
+        or manifest["fingerprint"] != contractsFingerprint()
+    ):
+        return None
+    return (ARTIFACTS_DIR / (name + ".bin")).read_bytes()
+
+
+def build() -> None:
+    """Rebuild every program from the contract sources."""
+    global _manifest
+
+    import importlib
+    from pyteal import compileTeal, Mode
+    from ..assembler import assemble
+    from ..cache import TEAL_VERSION, pytealVersion
+
+    programs: Dict[str, str] = dict()
+    for name in PROGRAMS:
+        module, function = name.split(".")
+        contract = getattr(importlib.import_module("gov.contracts." + module), function)
+        teal = compileTeal(contract(), mode=Mode.Application, version=TEAL_VERSION)
+        program = assemble(teal)
+        (ARTIFACTS_DIR / (name + ".teal")).write_text(teal)
+        (ARTIFACTS_DIR / (name + ".bin")).write_bytes(program)
+        programs[name] = hashlib.sha256(program).hexdigest()
+
+    _manifest = {
+        "fingerprint": contractsFingerprint(),
+        "pyteal": pytealVersion(),
+        "tealVersion": TEAL_VERSION,
+        "programs": programs,
+    }
+    (ARTIFACTS_DIR / "manifest.json").write_text(
+        json.dumps(_manifest, indent=2, sort_keys=True) + "\n"
+    )
@@ -0,0 +1,4 @@
+from . import ARTIFACTS_DIR, build
+
+build()
+print("Rebuilt contract artifacts in", ARTIFACTS_DIR)
@@ -0,0 +1,483 @@
+"""Pure-Python TEAL assembler.
+
+Assembles the TEAL emitted by PyTeal for the governance contracts, so programs
+can be built without a node. It follows the rules of algod's compile endpoint;
+assembler_test.test_matches_algod compares the two when run against a node.
+Opcodes and field names come from the language spec shipped with algosdk.
+
+Like algod, constants loaded with int, byte and addr are collected into
+intcblock/bytecblock. From TEAL v4 on they are ordered by number of uses, and
+constants used only once are emitted as pushint/pushbytes instead.
+"""
+import base64
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import algosdk
+
+with open(
+    os.path.join(os.path.dirname(algosdk.__file__), "data", "langspec.json"), "rt"
+) as _specFile:
+    LANGSPEC: Dict[str, Any] = json.load(_specFile)
+
+MAX_VERSION: int = LANGSPEC["EvalMaxVersion"]
+DEFAULT_VERSION = 1
+OPTIMIZE_CONSTANTS_VERSION = 4
+
+OPS_BY_NAME: Dict[str, Dict[str, Any]] = {op["Name"]: op for op in LANGSPEC["Ops"]}
+OPS_BY_CODE: Dict[int, Dict[str, Any]] = {op["Opcode"]: op for op in LANGSPEC["Ops"]}
+
+TXN_FIELDS: List[str] = OPS_BY_NAME["txn"]["ArgEnum"]
+GLOBAL_FIELDS: List[str] = OPS_BY_NAME["global"]["ArgEnum"]
+
+# named constants accepted by the int pseudo-op
+NAMED_INTS = {
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+}
+
+# immediate arguments of each opcode that takes any, in order:
+#   u8: a uint8, txnField/globalField/enum: a named field encoded as a uint8,
+#   label: an int16 branch offset
+IMMEDIATES: Dict[str, Tuple[str, ...]] = {
+    "intc": ("u8",),
+    "bytec": ("u8",),
+    "arg": ("u8",),
+    "txn": ("txnField",),
+    "global": ("globalField",),
+    "gtxn": ("u8", "txnField"),
+    "load": ("u8",),
+    "store": ("u8",),
+    "txna": ("txnField", "u8"),
+    "gtxna": ("u8", "txnField", "u8"),
+    "gtxns": ("txnField",),
+    "gtxnsa": ("txnField", "u8"),
+    "gload": ("u8", "u8"),
+    "gloads": ("u8",),
+    "gaid": ("u8",),
+    "bnz": ("label",),
+    "bz": ("label",),
+    "b": ("label",),
+    "dig": ("u8",),
+    "cover": ("u8",),
+    "uncover": ("u8",),
+    "substring": ("u8", "u8"),
+    "extract": ("u8", "u8"),
+    "asset_holding_get": ("enum",),
+    "asset_params_get": ("enum",),
+    "app_params_get": ("enum",),
+    "callsub": ("label",),
+    "itxn_field": ("txnField",),
+    "itxn": ("txnField",),
+    "itxna": ("txnField", "u8"),
+    "txnas": ("txnField",),
+    "gtxnas": ("u8", "txnField"),
+    "gtxnsas": ("txnField",),
+    "ecdsa_verify": ("enum",),
+    "ecdsa_pk_decompress": ("enum",),
+    "ecdsa_pk_recover": ("enum",),
+}
+
+# opcodes that take one more immediate than their base form assemble as the
+# array form instead, e.g. "txn Accounts 1" is "txna Accounts 1"
+ARRAY_FORMS = {"txn": "txna", "gtxn": "gtxna", "gtxns": "gtxnsa", "itxn": "itxna"}
+
+
+class TealAssemblyError(Exception):
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__("{}: {}".format(line, message))
+        self.line = line
+
+
+def encodeUvarint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+class _Const(NamedTuple):
+    kind: str  # "int" or "byte"
+    value: Union[int, bytes]
+
+
+class _Branch(NamedTuple):
+    opcode: int
+    label: str
+    line: int
+
+
+def _tokenize(line: str) -> List[str]:
+    """Split a line into fields, keeping quoted strings whole and dropping comments."""
+    fields: List[str] = []
+    i = 0
+    n = len(line)
+    while i < n:
+        c = line[i]
+        if c.isspace():
+            i += 1
+        elif line.startswith("//", i):
+            break
+        elif c == '"':
+            j = i + 1
+            while j < n and line[j] != '"':
+                j += 2 if line[j] == "\\" else 1
+            fields.append(line[i : j + 1])
+            i = j + 1
+        else:
+            j = i
+            while j < n and not line[j].isspace() and not line.startswith("//", j):
+                j += 1
+            fields.append(line[i:j])
+            i = j
+    return fields
+
+
+def _parseString(token: str, line: int) -> bytes:
+    if len(token) < 2 or not token.endswith('"'):
+        raise TealAssemblyError(line, "unterminated string {}".format(token))
+    body = token[1:-1]
+    out = bytearray()
+    i = 0
+    escapes = {"n": b"\n", "r": b"\r", "t": b"\t", "\\": b"\\", '"': b'"'}
+    while i < len(body):
+        c = body[i]
+        if c != "\\":
+            out += c.encode()
+            i += 1
+            continue
+        nxt = body[i + 1 : i + 2]
+        if nxt in escapes:
+            out += escapes[nxt]
+            i += 2
+        elif nxt == "x":
+            out.append(int(body[i + 2 : i + 4], 16))
+            i += 4
+        else:
+            raise TealAssemblyError(line, "invalid escape \\{}".format(nxt))
+    return bytes(out)
+
+
+def _parseBytes(args: List[str], line: int) -> bytes:
+    if len(args) == 0:
+        raise TealAssemblyError(line, "byte constant needs an argument")
+    arg = args[0]
+    if arg.startswith('"'):
+        return _parseString(arg, line)
+    if arg.startswith("0x"):
+        return bytes.fromhex(arg[2:])
+    if arg in ("base64", "b64") and len(args) == 2:
+        return base64.b64decode(args[1])
+    if arg in ("base32", "b32") and len(args) == 2:
+        return base64.b32decode(args[1] + "=" * (-len(args[1]) % 8))
+    match = re.fullmatch(r"(base64|b64|base32|b32)\((.*)\)", arg)
+    if match:
+        if match.group(1).endswith("64"):
+            return base64.b64decode(match.group(2))
+        data = match.group(2)
+        return base64.b32decode(data + "=" * (-len(data) % 8))
+    raise TealAssemblyError(line, "unknown byte constant {}".format(arg))
+
+
+def _parseInt(arg: str, line: int) -> int:
+    if arg in NAMED_INTS:
+        return NAMED_INTS[arg]
+    try:
+        if arg.startswith(("0x", "0X")):
+            value = int(arg, 16)
+        elif arg.startswith(("0b", "0B")):
+            value = int(arg, 2)
+        elif arg.startswith(("0o", "0O")):
+            value = int(arg[2:], 8)
+        elif len(arg) > 1 and arg.startswith("0"):
+            value = int(arg, 8)
+        else:
+            value = int(arg, 10)
+    except ValueError:
+        raise TealAssemblyError(line, "unable to parse {} as integer".format(arg))
+    if not 0 <= value < 2 ** 64:
+        raise TealAssemblyError(line, "{} is out of uint64 range".format(arg))
+    return value
+
+
+def _fieldIndex(kind: str, opName: str, arg: str, line: int) -> int:
+    if kind == "txnField":
+        names = TXN_FIELDS
+    elif kind == "globalField":
+        names = GLOBAL_FIELDS
+    else:
+        names = OPS_BY_NAME[opName].get("ArgEnum", [])
+    try:
+        return names.index(arg)
+    except ValueError:
+        raise TealAssemblyError(line, "{} unknown field: {}".format(opName, arg))
+
+
+def assemble(source: str) -> bytes:
+    """Assemble TEAL source into program bytes."""
+    return assembleWithLabels(source)[0]
+
+
+def assembleWithLabels(source: str) -> Tuple[bytes, Dict[str, int]]:
+    """Assemble TEAL source into program bytes.
+
+    Returns:
+        The program and the program counter of each label in it.
+    """
+    version = DEFAULT_VERSION
+    # program items: bytes for fixed code, _Const for constant loads, _Branch for jumps
+    items: List[Any] = []
+    labels: Dict[str, int] = dict()
+    explicitIntc: Optional[List[int]] = None
+    explicitBytec: Optional[List[bytes]] = None
+
+    for lineNumber, text in enumerate(source.splitlines(), start=1):
+        fields = _tokenize(text)
+        if not fields:
+            continue
+
+        if fields[0] == "#pragma":
+            if len(fields) != 3 or fields[1] != "version":
+                raise TealAssemblyError(lineNumber, "unknown pragma")
+            if items or labels:
+                raise TealAssemblyError(
+                    lineNumber, "#pragma version is only allowed before instructions"
+                )
+            version = _parseInt(fields[2], lineNumber)
+            if not 1 <= version <= MAX_VERSION:
+                raise TealAssemblyError(
+                    lineNumber, "unsupported version {}".format(version)
+                )
+            continue
+
+        if fields[0].endswith(":"):
+            label = fields[0][:-1]
+            if label in labels:
+                raise TealAssemblyError(lineNumber, "duplicate label {}".format(label))
+            labels[label] = len(items)
+            fields = fields[1:]
+            if not fields:
+                continue
+
+        name, args = fields[0], fields[1:]
+
+        if name == "int":
+            if len(args) != 1:
+                raise TealAssemblyError(lineNumber, "int needs one argument")
+            items.append(_Const("int", _parseInt(args[0], lineNumber)))
+            continue
+        if name == "byte":
+            items.append(_Const("byte", _parseBytes(args, lineNumber)))
+            continue
+        if name == "addr":
+            if len(args) != 1:
+                raise TealAssemblyError(lineNumber, "addr needs one argument")
+            items.append(_Const("byte", algosdk.encoding.decode_address(args[0])))
+            continue
+
+        if name in ARRAY_FORMS and len(args) == len(IMMEDIATES[name]) + 1:
+            name = ARRAY_FORMS[name]
+
+        spec = OPS_BY_NAME.get(name)
+        if spec is None:
+            raise TealAssemblyError(lineNumber, "unknown opcode: {}".format(name))
+        opcode = spec["Opcode"]
+
+        if name == "intcblock":
+            explicitIntc = [_parseInt(a, lineNumber) for a in args]
+            items.append(
+                bytes([opcode])
+                + encodeUvarint(len(explicitIntc))
+                + b"".join(encodeUvarint(v) for v in explicitIntc)
+            )
+        elif name == "bytecblock":
+            explicitBytec = [_parseBytes([a], lineNumber) for a in args]
+            items.append(
+                bytes([opcode])
+                + encodeUvarint(len(explicitBytec))
+                + b"".join(encodeUvarint(len(b)) + b for b in explicitBytec)
+            )
+        elif name == "pushint":
+            if len(args) != 1:
+                raise TealAssemblyError(lineNumber, "pushint needs one argument")
+            items.append(
+                bytes([opcode]) + encodeUvarint(_parseInt(args[0], lineNumber))
+            )
+        elif name == "pushbytes":
+            value = _parseBytes(args, lineNumber)
+            items.append(bytes([opcode]) + encodeUvarint(len(value)) + value)
+        else:
+            kinds = IMMEDIATES.get(name, ())
+            if len(args) != len(kinds):
+                raise TealAssemblyError(
+                    lineNumber,
+                    "{} expects {} immediate arguments".format(name, len(kinds)),
+                )
+            if kinds == ("label",):
+                items.append(_Branch(opcode, args[0], lineNumber))
+                continue
+            encoded = bytearray([opcode])
+            for kind, arg in zip(kinds, args):
+                if kind == "u8":
+                    value = _parseInt(arg, lineNumber)
+                    if value > 255:
+                        raise TealAssemblyError(
+                            lineNumber, "{} immediate out of range".format(name)
+                        )
+                    encoded.append(value)
+                else:
+                    encoded.append(_fieldIndex(kind, name, arg, lineNumber))
+            items.append(bytes(encoded))
+
+    intc, bytec, constCode = _layoutConstants(
+        items, version, explicitIntc, explicitBytec
+    )
+
+    # lay out the code, then resolve branches now that every size is known
+    offsets: List[int] = []
+    pc = 0
+    for item in items:
+        offsets.append(pc)
+        if isinstance(item, _Const):
+            pc += len(constCode[id(item)])
+        elif isinstance(item, _Branch):
+            pc += 3
+        else:
+            pc += len(item)
+    offsets.append(pc)
+
+    code = bytearray()
+    for i, item in enumerate(items):
+        if isinstance(item, _Const):
+            code += constCode[id(item)]
+        elif isinstance(item, _Branch):
+            if item.label not in labels:
+                raise TealAssemblyError(
+                    item.line, "reference to undefined label {}".format(item.label)
+                )
+            offset = offsets[labels[item.label]] - (offsets[i] + 3)
+            if version < 2 and offset < 0:
+                raise TealAssemblyError(
+                    item.line,
+                    "label {} is before reference but only forward jumps are allowed".format(
+                        item.label
+                    ),
+                )
+            if not -0x8000 <= offset <= 0x7FFF:
+                raise TealAssemblyError(
+                    item.line, "label {} is too far away".format(item.label)
+                )
+            code.append(item.opcode)
+            code += offset.to_bytes(2, "big", signed=True)
+        else:
+            code += item
+
+    program = bytearray(encodeUvarint(version))
+    if intc:
+        program.append(OPS_BY_NAME["intcblock"]["Opcode"])
+        program += encodeUvarint(len(intc))
+        for value in intc:
+            program += encodeUvarint(value)
+    if bytec:
+        program.append(OPS_BY_NAME["bytecblock"]["Opcode"])
+        program += encodeUvarint(len(bytec))
+        for value in bytec:
+            program += encodeUvarint(len(value)) + value
+    header = len(program)
+    program += code
+    return bytes(program), {
+        label: header + offsets[index] for label, index in labels.items()
+    }
+
+
+def _layoutConstants(
+    items: List[Any],
+    version: int,
+    explicitIntc: Optional[List[int]],
+    explicitBytec: Optional[List[bytes]],
+) -> Tuple[List[int], List[bytes], Dict[int, bytes]]:
+    """Build the constant blocks and the code for every constant load."""
+    refs = [item for item in items if isinstance(item, _Const)]
+    code: Dict[int, bytes] = dict()
+    blocks: Dict[str, List[Any]] = dict()
+
+    for kind, explicit, push, base in (
+        ("int", explicitIntc, "pushint", "intc"),
+        ("byte", explicitBytec, "pushbytes", "bytec"),
+    ):
+        kindRefs = [r for r in refs if r.kind == kind]
+
+        # constants in order of first use, with their use counts
+        counts: Dict[Any, int] = dict()
+        for ref in kindRefs:
+            counts[ref.value] = counts.get(ref.value, 0) + 1
+
+        if explicit is not None:
+            block = list(explicit)
+            singletons: set = set()
+            missing = [v for v in counts if v not in block]
+            if missing:
+                raise TealAssemblyError(
+                    0, "value not in {}block: {!r}".format(base, missing[0])
+                )
+            blocks[kind] = []
+        elif version >= OPTIMIZE_CONSTANTS_VERSION:
+            # sorted is stable, so ties keep first-use order
+            ordered = sorted(counts, key=lambda v: -counts[v])
+            block = [v for v in ordered if counts[v] > 1]
+            singletons = {v for v in ordered if counts[v] == 1}
+            blocks[kind] = block
+        else:
+            block = list(counts)
+            singletons = set()
+            blocks[kind] = block
+
+        indexes = {v: i for i, v in enumerate(block)}
+        for ref in kindRefs:
+            if ref.value in singletons:
+                if kind == "int":
+                    encoded = bytes([OPS_BY_NAME[push]["Opcode"]]) + encodeUvarint(
+                        ref.value
+                    )
+                else:
+                    encoded = (
+                        bytes([OPS_BY_NAME[push]["Opcode"]])
+                        + encodeUvarint(len(ref.value))
+                        + ref.value
+                    )
+            else:
+                index = indexes[ref.value]
+                if index < 4:
+                    encoded = bytes(
+                        [OPS_BY_NAME["{}_{}".format(base, index)]["Opcode"]]
+                    )
+                else:
+                    encoded = bytes([OPS_BY_NAME[base]["Opcode"], index])
+            code[id(ref)] = encoded
+
+    return blocks["int"], blocks["byte"], code
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m gov.assembler <input.teal> <output.bin>")
+        sys.exit(2)
+    with open(sys.argv[1], "rt") as fin:
+        assembled = assemble(fin.read())
+    with open(sys.argv[2], "wb") as fout:
+        fout.write(assembled)
@@ -0,0 +1,181 @@
+"""Persistent on-disk cache for compiled contract programs.
+
+Programs are stored content-addressed by a hash of their TEAL source, the TEAL
+version and the PyTeal version, as a .teal/.bin pair. A second index maps a
+fingerprint of the contract sources in gov/contracts to the TEAL hash, so a
+warm cache skips both PyTeal compilation and assembly.
+
+The cache lives in $ALGO_GOV_CACHE_DIR, or ~/.cache/algo-gov by default. Run
+`python -m gov.cache clear` to invalidate it.
+"""
+import argparse
+import hashlib
+import importlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+from . import artifacts
+
+if TYPE_CHECKING:
+    from pyteal import Expr
+
+TEAL_VERSION = 5
+
+
+def defaultCacheDir() -> Path:
+    directory = os.environ.get("ALGO_GOV_CACHE_DIR")
+    if directory:
+        return Path(directory)
+    return Path.home() / ".cache" / "algo-gov"
+
+
+def pytealVersion() -> str:
+    try:
+        from importlib.metadata import version
+    except ImportError:  # python < 3.8
+        from pkg_resources import get_distribution
+
+        return get_distribution("pyteal").version
+    return version("pyteal")
+
+
+class ProgramCache:
+    """Content-addressed store of TEAL sources and their assembled bytes.
+
+    Writes go to a temporary file that is atomically renamed into place, so
+    concurrent writers and readers never see a partial entry.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = Path(directory) if directory else defaultCacheDir()
+        self.programsDir = self.directory / "programs"
+        self.indexDir = self.directory / "index"
+
+    def tealKey(self, teal: str) -> str:
+        h = hashlib.sha256()
+        h.update("teal-v{};pyteal-{};".format(TEAL_VERSION, pytealVersion()).encode())
+        h.update(teal.encode())
+        return h.hexdigest()
+
+    def sourceKey(self, name: str) -> str:
+        """Fingerprint the contract sources that program `name` is built from."""
+        h = hashlib.sha256()
+        h.update(
+            "{};teal-v{};pyteal-{};".format(
+                name, TEAL_VERSION, pytealVersion()
+            ).encode()
+        )
+        h.update(artifacts.contractsFingerprint().encode())
+        return h.hexdigest()
+
+    def get(self, teal: str) -> Optional[bytes]:
+        """Get the assembled program for a TEAL source, if cached."""
+        try:
+            return (self.programsDir / (self.tealKey(teal) + ".bin")).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, teal: str, program: bytes) -> str:
+        key = self.tealKey(teal)
+        self._write(self.programsDir / (key + ".teal"), teal.encode())
+        self._write(self.programsDir / (key + ".bin"), program)
+        return key
+
+    def lookup(self, name: str) -> Optional[Tuple[str, bytes]]:
+        """Get the TEAL source and program last built for `name` from the current sources."""
+        try:
+            key = (self.indexDir / self.sourceKey(name)).read_text()
+            teal = (self.programsDir / (key + ".teal")).read_text()
+            program = (self.programsDir / (key + ".bin")).read_bytes()
+        except FileNotFoundError:
+            return None
+        return teal, program
+
+    def record(self, name: str, teal: str, program: bytes) -> None:
+        key = self.put(teal, program)
+        self._write(self.indexDir / self.sourceKey(name), key.encode())
+
+    def clear(self) -> None:
+        shutil.rmtree(self.programsDir, ignore_errors=True)
+        shutil.rmtree(self.indexDir, ignore_errors=True)
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def compileContract(
+    name: str,
+    contract: Callable[[], "Expr"],
+    cache: Optional[ProgramCache] = None,
+) -> bytes:
+    """Compile and assemble a contract locally, going through the program cache.
+
+    Args:
+        name: A unique name for the program, e.g. "Governor.approval_program".
+        contract: Builds the PyTeal expression of the program. Only called on
+            a cache miss.
+        cache: The cache to use. Defaults to a ProgramCache in defaultCacheDir().
+
+    Returns:
+        The assembled program.
+    """
+    from pyteal import compileTeal, Mode
+    from .assembler import assemble
+
+    if cache is None:
+        cache = ProgramCache()
+
+    cached = cache.lookup(name)
+    if cached is not None:
+        return cached[1]
+
+    teal = compileTeal(contract(), mode=Mode.Application, version=TEAL_VERSION)
+    program = cache.get(teal)
+    if program is None:
+        program = assemble(teal)
+
+    cache.record(name, teal, program)
+    return program
+
+
+def loadProgram(name: str, cache: Optional[ProgramCache] = None) -> bytes:
+    """Get a contract program by name, e.g. "Governor.approval_program".
+
+    Prebuilt artifacts are used when they match the contract sources; otherwise
+    the program is compiled through the cache. PyTeal and the contract modules
+    are only imported in the latter case.
+    """
+    program = artifacts.load(name)
+    if program is not None:
+        return program
+
+    module, function = name.split(".")
+    contract = getattr(importlib.import_module("gov.contracts." + module), function)
+    return compileContract(name, contract, cache)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m gov.cache", description="Manage the compiled program cache."
+    )
+    parser.add_argument("command", choices=["clear", "path"])
+    parser.add_argument("--dir", help="cache directory", default=None)
+    args = parser.parse_args()
+
+    programCache = ProgramCache(args.dir)
+    if args.command == "clear":
+        programCache.clear()
+        print("Cleared", programCache.directory)
+    else:
+        print(programCache.directory)
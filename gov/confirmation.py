@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from algosdk.v2client.algod import AlgodClient
+
+from .util import PendingTxnResponse
+
+
+class ConfirmationLatency(NamedTuple):
+    seconds: float
+    rounds: int
+
+
+class _Outstanding:
+    def __init__(self, future: Future, timeout: int, round: Optional[int]) -> None:
+        self.future = future
+        self.timeout = timeout
+        self.trackedAt = time.monotonic()
+        # if the follower is idle this is set on the first round it checks
+        self.startRound = round
+
+
+class ConfirmationTracker:
+    """Resolves transaction confirmations for many callers from one round follower.
+
+    A single daemon thread wakes once per block and checks every outstanding
+    transaction in one pass, instead of each caller polling status on its own.
+    The tracker wraps a client and can be passed to any operation in its place;
+    gov.util.waitForTransaction and gov.aio.waitForTransaction then wait on the
+    tracker. Every other call is forwarded to the wrapped client, so a
+    SuggestedParamsCache should be wrapped by the tracker rather than around it
+    in order to observe the rounds the follower sees.
+
+    Args:
+        client: The algod client to wrap.
+        timeout: The default number of rounds to wait for a confirmation.
+        lookupWorkers: The number of threads used to look up outstanding
+            transactions within a round.
+    """
+
+    def __init__(
+        self, client: AlgodClient, timeout: int = 10, lookupWorkers: int = 8
+    ) -> None:
+        self.client = client
+        self.timeout = timeout
+        self.confirmationTracker = self
+
+        self.latencies: Dict[str, ConfirmationLatency] = dict()
+        self.rounds = 0
+        self.lastRound: Optional[int] = None
+
+        self.outstanding: Dict[str, _Outstanding] = dict()
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=lookupWorkers)
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+
+    def track(self, txID: str, timeout: Optional[int] = None) -> Future:
+        """Start tracking a sent transaction.
+
+        Returns:
+            A future that resolves to the transaction's PendingTxnResponse, or
+            fails if the transaction is rejected by the pool or is not
+            confirmed within timeout rounds.
+        """
+        with self.condition:
+            entry = self.outstanding.get(txID)
+            if entry is None:
+                entry = _Outstanding(
+                    Future(),
+                    self.timeout if timeout is None else timeout,
+                    self.lastRound,
+                )
+                self.outstanding[txID] = entry
+            self._start()
+            self.condition.notify()
+        return entry.future
+
+    def waitForTransaction(
+        self, txID: str, timeout: Optional[int] = None
+    ) -> PendingTxnResponse:
+        return self.track(txID, timeout).result()
+
+    def _start(self) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self.thread = threading.Thread(
+                target=self._follow, name="ConfirmationTracker", daemon=True
+            )
+            self.thread.start()
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> "ConfirmationTracker":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _follow(self) -> None:
+        while True:
+            with self.condition:
+                while self.running and not self.outstanding:
+                    # the node keeps producing blocks while we are idle
+                    self.lastRound = None
+                    self.condition.wait()
+                if not self.running:
+                    break
+                batch = list(self.outstanding.items())
+
+            try:
+                if self.lastRound is None:
+                    self.lastRound = self.client.status()["last-round"]
+                self._checkBatch(batch, self.lastRound)
+                with self.condition:
+                    waiting = bool(self.outstanding)
+                if waiting:
+                    status = self.client.status_after_block(self.lastRound + 1)
+                    self.lastRound = max(self.lastRound + 1, status["last-round"])
+                    self.rounds += 1
+            except Exception as e:
+                self._failAll(e)
+                self.lastRound = None
+
+        self._failAll(Exception("Confirmation tracker stopped"))
+
+    def _checkBatch(self, batch: List[Any], lastRound: int) -> None:
+        lookups = self.executor.map(self._lookup, [txID for txID, _ in batch])
+        for (txID, entry), (pending_txn, error) in zip(batch, lookups):
+            if entry.startRound is None:
+                entry.startRound = lastRound
+
+            if error is not None:
+                self._resolve(txID, exception=error)
+            elif pending_txn.get("confirmed-round", 0) > 0:
+                response = PendingTxnResponse(pending_txn)
+                self.latencies[txID] = ConfirmationLatency(
+                    time.monotonic() - entry.trackedAt,
+                    max(0, response.confirmedRound - entry.startRound),
+                )
+                self._resolve(txID, result=response)
+            elif pending_txn["pool-error"]:
+                self._resolve(
+                    txID,
+                    exception=Exception(
+                        "Pool error: {}".format(pending_txn["pool-error"])
+                    ),
+                )
+            elif lastRound + 1 >= entry.startRound + entry.timeout:
+                self._resolve(
+                    txID,
+                    exception=Exception(
+                        "Transaction {} not confirmed after {} rounds".format(
+                            txID, entry.timeout
+                        )
+                    ),
+                )
+
+    def _lookup(self, txID: str):
+        try:
+            return self.client.pending_transaction_info(txID), None
+        except Exception as e:
+            return None, e
+
+    def _resolve(
+        self,
+        txID: str,
+        result: Optional[PendingTxnResponse] = None,
+        exception: Optional[BaseException] = None,
+    ) -> None:
+        with self.condition:
+            entry = self.outstanding.pop(txID)
+        if exception is not None:
+            entry.future.set_exception(exception)
+        else:
+            entry.future.set_result(result)
+
+    def _failAll(self, exception: BaseException) -> None:
+        with self.condition:
+            entries = list(self.outstanding.values())
+            self.outstanding.clear()
+        for entry in entries:
+            entry.future.set_exception(exception)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
@@ -1,26 +1,48 @@
 from gov.contracts.helpers import *
 from gov.contracts.config import *
+from gov.contracts.methods import DISPATCH_ORDER
 
 algo_holding = AssetHolding.balance(Global.current_application_address(), Int(0))
 
 start_time_exists = App.globalGetEx(Global.current_application_id(), START_TIME_KEY)
 
+# the period boundaries of the current cycle are stored by store_period_ends
 stake_time_start = App.globalGet(START_TIME_KEY)
-stake_time_end = stake_time_start + App.globalGet(STAKE_PERIOD_DURATION_KEY)
+stake_time_end = App.globalGet(STAKE_TIME_END_KEY)
 
 propose_time_start = stake_time_end
-propose_time_end = propose_time_start + App.globalGet(PROPOSE_PERIOD_DURATION_KEY)
+propose_time_end = App.globalGet(PROPOSE_TIME_END_KEY)
 
 vote_time_start = propose_time_end
-vote_time_end = vote_time_start + App.globalGet(VOTE_PERIOD_DURATION_KEY)
+vote_time_end = App.globalGet(VOTE_TIME_END_KEY)
 
 execute_delay_time_start = vote_time_end
-execute_delay_time_end = execute_delay_time_start + App.globalGet(
-    EXECUTE_DELAY_DURATION_KEY
-)
+execute_delay_time_end = App.globalGet(EXECUTE_DELAY_TIME_END_KEY)
 
 claim_time_start = execute_delay_time_end
-claim_time_end = claim_time_start + App.globalGet(CLAIM_PERIOD_DURATION_KEY)
+claim_time_end = App.globalGet(CLAIM_TIME_END_KEY)
+
+
+@Subroutine(TealType.none)
+def store_period_ends():
+    """
+    Start a governance cycle at the latest timestamp and store the end of each of
+    its periods, so that the methods read them instead of summing the durations
+    """
+    period_end = ScratchVar(TealType.uint64)
+    steps = [App.globalPut(START_TIME_KEY, Global.latest_timestamp())]
+    period_end_expr = Global.latest_timestamp()
+    for end_key, duration_key in (
+        (STAKE_TIME_END_KEY, STAKE_PERIOD_DURATION_KEY),
+        (PROPOSE_TIME_END_KEY, PROPOSE_PERIOD_DURATION_KEY),
+        (VOTE_TIME_END_KEY, VOTE_PERIOD_DURATION_KEY),
+        (EXECUTE_DELAY_TIME_END_KEY, EXECUTE_DELAY_DURATION_KEY),
+        (CLAIM_TIME_END_KEY, CLAIM_PERIOD_DURATION_KEY),
+    ):
+        steps.append(period_end.store(period_end_expr + App.globalGet(duration_key)))
+        steps.append(App.globalPut(end_key, period_end.load()))
+        period_end_expr = period_end.load()
+    return Seq(steps)
 
 
 def stake_program():
@@ -69,7 +91,6 @@ def rollover():
     Update user governance powers if the user has staked in the previous cycle and
     has not claimed during previous claim period
     """
-    i = ScratchVar(TealType.uint64)
     return Seq(
         If(
             App.localGet(Txn.sender(), GOV_CYCLE_ID_KEY)
@@ -87,12 +108,7 @@ def rollover():
                     ADDRESS_PROPOSITION_POWER_KEY,
                     App.localGet(Txn.sender(), ADDRESS_AMOUNT_STAKED_KEY),
                 ),
-                # remove has_voted flags for each proposal
-                For(
-                    i.store(Int(0)),
-                    i.load() < App.globalGet(MAX_NUM_PROPOSALS_KEY),
-                    i.store(i.load() + Int(1)),
-                ).Do(App.localDel(Txn.sender(), Itob(i.load()))),
+                # the has_voted flags of the previous cycle are ignored by voted_flags
                 # update user's cycle
                 App.localPut(
                     Txn.sender(), GOV_CYCLE_ID_KEY, App.globalGet(GOV_CYCLE_ID_KEY)
@@ -102,6 +118,31 @@ def rollover():
     )
 
 
+@Subroutine(TealType.bytes)
+def voted_flags(slot: TealType.uint64):
+    """
+    The sender's bitmask of the proposal slots voted on in the current cycle, padded
+    with zero bytes up to the byte of slot. Flags stored in an earlier cycle read as
+    empty
+    """
+    voted = App.localGetEx(Txn.sender(), Int(0), ADDRESS_VOTED_KEY)
+    flags = ScratchVar(TealType.bytes)
+    return Seq(
+        voted,
+        flags.store(Bytes("")),
+        If(voted.hasValue()).Then(
+            If(
+                ExtractUint64(voted.value(), Int(0)) == App.globalGet(GOV_CYCLE_ID_KEY)
+            ).Then(flags.store(Substring(voted.value(), Int(8), Len(voted.value()))))
+        ),
+        If(
+            slot / Int(8) < Len(flags.load()),
+            flags.load(),
+            Concat(flags.load(), BytesZero(slot / Int(8) + Int(1) - Len(flags.load()))),
+        ),
+    )
+
+
 @Subroutine(TealType.uint64)
 def try_delegate_by_type(power_type_key: TealType.bytes):
     address_voting_power = App.localGetEx(
@@ -165,8 +206,12 @@ def register_proposal_program():
         ),
         Assert(proposal_governor_id.hasValue()),
         Assert(proposal_governor_id.value() == Global.current_application_id()),
+        Assert(is_proposal_program()),
+        Assert(Not(registered_this_cycle())),
         Assert(num_registered_proposals < App.globalGet(MAX_NUM_PROPOSALS_KEY)),
-        register_proposal(num_registered_proposals),
+        # the proposal stores the cycle and its registration ID, and resets its
+        # tallies
+        Assert(calls_proposal("register")),
         App.globalPut(NUM_REGISTERED_PROPOSALS_KEY, num_registered_proposals + Int(1)),
         # consume proposition power
         App.localPut(
@@ -184,7 +229,6 @@ def begin_new_governance_cycle_program():
     """
     Reset after the previous governance cycle has completed
     """
-    i = ScratchVar(TealType.uint64)
     return Seq(
         start_time_exists,
         If(
@@ -197,13 +241,9 @@ def begin_new_governance_cycle_program():
                 App.globalPut(
                     GOV_CYCLE_ID_KEY, App.globalGet(GOV_CYCLE_ID_KEY) + Int(1)
                 ),
-                For(
-                    i.store(Int(0)),
-                    i.load() < App.globalGet(NUM_REGISTERED_PROPOSALS_KEY),
-                    i.store(i.load() + Int(1)),
-                ).Do(unregister_proposal(i.load())),
+                # registrations of the last cycle are stale, see registered_this_cycle
                 App.globalPut(NUM_REGISTERED_PROPOSALS_KEY, Int(0)),
-                App.globalPut(START_TIME_KEY, Global.latest_timestamp()),
+                store_period_ends(),
                 Approve(),
             )
         ),
@@ -212,70 +252,44 @@ def begin_new_governance_cycle_program():
 
 
 def vote_program():
-    proposal_app_id = Txn.applications[1]
-    proposal_registration_key = App.globalGetEx(Int(1), REGISTRATION_ID_KEY)
+    registration_id = App.globalGetEx(Int(1), REGISTRATION_ID_KEY)
 
-    registered_proposal_app_id = App.globalGetEx(
-        Global.current_application_id(), proposal_registration_key.value()
-    )
-
-    has_voted = App.localGetEx(
-        Txn.sender(), Global.current_application_id(), proposal_registration_key.value()
-    )
+    slot = ScratchVar(TealType.uint64)
+    flags = ScratchVar(TealType.bytes)
 
     address_voting_power = App.localGetEx(
         Txn.sender(), Int(0), ADDRESS_VOTING_POWER_KEY
     )
 
-    vote_value = Btoi(Txn.application_args[1])
-
-    proposal_for_votes_key = Concat(
-        proposal_registration_key.value(),
-        Bytes("_"),
-        FOR_VOTES_KEY,
-    )
-
-    proposal_against_votes_key = Concat(
-        proposal_registration_key.value(),
-        Bytes("_"),
-        AGAINST_VOTES_KEY,
-    )
-
     return Seq(
         rollover(),
-        proposal_registration_key,
-        registered_proposal_app_id,
-        has_voted,
+        registration_id,
+        slot.store(registration_id.value()),
+        flags.store(voted_flags(slot.load())),
         address_voting_power,
         If(
             And(
                 # proposal is registered
-                registered_proposal_app_id.value() == proposal_app_id,
+                registered_this_cycle(),
                 # user has not voted yet
-                Not(has_voted.hasValue()),
+                Not(GetBit(flags.load(), slot.load())),
                 # enough voting power to participate
                 address_voting_power.value() >= App.globalGet(VOTE_THRESHOLD_KEY),
                 # in voting period
                 validateInTimePeriod(vote_time_start, vote_time_end),
+                # the proposal adds the sender's voting power to its tally
+                calls_proposal("tally"),
             )
         ).Then(
             Seq(
-                If(vote_value > Int(0))
-                .Then(
-                    App.globalPut(
-                        proposal_for_votes_key,
-                        App.globalGet(proposal_against_votes_key)
-                        + address_voting_power.value(),
-                    )
-                )
-                .Else(
-                    App.globalPut(
-                        proposal_against_votes_key,
-                        App.globalGet(proposal_against_votes_key)
-                        + address_voting_power.value(),
-                    )
+                App.localPut(
+                    Txn.sender(),
+                    ADDRESS_VOTED_KEY,
+                    Concat(
+                        Itob(App.globalGet(GOV_CYCLE_ID_KEY)),
+                        SetBit(flags.load(), slot.load(), Int(1)),
+                    ),
                 ),
-                App.localPut(Txn.sender(), proposal_registration_key.value(), Int(1)),
                 Approve(),
             )
         ),
@@ -284,80 +298,40 @@ def vote_program():
 
 
 def execute_proposal_program():
-    proposal_app_id = Txn.applications[1]
-    proposal_registration_key = App.globalGetEx(Int(1), REGISTRATION_ID_KEY)
-    registered_proposal_app_id = App.globalGetEx(
-        Global.current_application_id(), proposal_registration_key.value()
-    )
-
-    proposal_for_votes_key = Concat(
-        proposal_registration_key.value(),
-        Bytes("_"),
-        FOR_VOTES_KEY,
-    )
-
-    proposal_against_votes_key = Concat(
-        proposal_registration_key.value(),
-        Bytes("_"),
-        AGAINST_VOTES_KEY,
-    )
-
-    for_votes = App.globalGet(proposal_for_votes_key)
-    against_votes = App.globalGet(proposal_against_votes_key)
-
-    proposal_can_execute_key = Concat(
-        proposal_registration_key.value(),
-        Bytes("_"),
-        CAN_EXECUTE_KEY,
-    )
-
-    can_execute = App.globalGet(proposal_can_execute_key)
+    for_votes = App.globalGetEx(Int(1), FOR_VOTES_KEY)
+    against_votes = App.globalGetEx(Int(1), AGAINST_VOTES_KEY)
+    can_execute = App.globalGetEx(Int(1), CAN_EXECUTE_KEY)
 
     return Seq(
-        proposal_registration_key,
-        registered_proposal_app_id,
+        for_votes,
+        against_votes,
+        can_execute,
         If(
             And(
-                registered_proposal_app_id.value() == proposal_app_id,
-                for_votes + against_votes >= App.globalGet(QUORUM_THRESHOLD_KEY),
-                for_votes > against_votes,
-                can_execute,
+                registered_this_cycle(),
+                # the tallies are only trusted from the proposal program
+                is_proposal_program(),
+                for_votes.value() + against_votes.value()
+                >= App.globalGet(QUORUM_THRESHOLD_KEY),
+                for_votes.value() > against_votes.value(),
+                can_execute.value(),
                 Global.latest_timestamp() > execute_delay_time_end,
+                # the proposal clears can_execute and runs
+                calls_proposal("execute"),
             )
-        ).Then(
-            Seq(
-                # app call to proposal target to authorize proposal execution
-                # app call to proposal contract to execute
-                # app call to proposal target to remove authorization
-                App.globalPut(proposal_can_execute_key, Int(0)),
-                Approve(),
-            )
-        ),
+        ).Then(Approve()),
         Reject(),
     )
 
 
 def cancel_proposal_program():
-    proposal_app_id = Txn.applications[1]
-    proposal_registration_key = App.globalGetEx(Int(1), REGISTRATION_ID_KEY)
     proposal_creator = App.globalGetEx(Int(1), CREATOR_KEY)
-    registered_proposal_app_id = App.globalGetEx(
-        Global.current_application_id(), proposal_registration_key.value()
-    )
-
-    proposal_can_execute_key = Concat(
-        proposal_registration_key.value(),
-        Bytes("_"),
-        CAN_EXECUTE_KEY,
-    )
 
     return Seq(
-        proposal_registration_key,
-        registered_proposal_app_id,
         proposal_creator,
         If(
             And(
-                registered_proposal_app_id.value() == proposal_app_id,
+                registered_this_cycle(),
                 Or(
                     # governor creator can cancel until the end of execution grace period
                     And(
@@ -370,13 +344,10 @@ def cancel_proposal_program():
                         Global.latest_timestamp() < vote_time_end,
                     ),
                 ),
+                # the proposal clears can_execute
+                calls_proposal("cancel"),
             )
-        ).Then(
-            Seq(
-                App.globalPut(proposal_can_execute_key, Int(0)),
-                Approve(),
-            )
-        ),
+        ).Then(Approve()),
         Reject(),
     )
 
@@ -418,8 +389,9 @@ def approval_program():
         App.globalPut(VOTE_PERIOD_DURATION_KEY, Btoi(Txn.application_args[7])),
         App.globalPut(EXECUTE_DELAY_DURATION_KEY, Btoi(Txn.application_args[8])),
         App.globalPut(CLAIM_PERIOD_DURATION_KEY, Btoi(Txn.application_args[9])),
+        App.globalPut(PROPOSAL_PROGRAM_HASH_KEY, Txn.application_args[10]),
         App.globalPut(NUM_REGISTERED_PROPOSALS_KEY, Int(0)),
-        App.globalPut(MAX_NUM_PROPOSALS_KEY, Int(5)),
+        App.globalPut(MAX_NUM_PROPOSALS_KEY, MAX_NUM_PROPOSALS),
         Approve(),
     )
 
@@ -431,14 +403,21 @@ def approval_program():
         Assert(Not(start_time_exists.hasValue())),
         optIn(GOV_TOKEN_KEY),
         # kick off the first governance cycle
-        App.globalPut(START_TIME_KEY, Global.latest_timestamp()),
+        store_period_ends(),
         App.globalPut(GOV_CYCLE_ID_KEY, Int(0)),
         Approve(),
     )
 
-    # TODO: potentially unify opt in and stake
-    on_opt_in = Return(validateInTimePeriod(stake_time_start, stake_time_end))
     on_stake = stake_program()
+    # an opt in that passes the stake selector stakes the token transfer before
+    # it as well, so a new voter joins with a single group
+    on_opt_in = (
+        If(Txn.application_args.length() == Int(0))
+        .Then(Return(validateInTimePeriod(stake_time_start, stake_time_end)))
+        .Else(
+            Seq(Assert(Txn.application_args[0] == SELECTORS["stake"]), stake_program())
+        )
+    )
 
     on_delegate_voting_power = (
         If(try_delegate_by_type(ADDRESS_VOTING_POWER_KEY))
@@ -458,28 +437,21 @@ def approval_program():
     on_begin_new_governance_cycle = begin_new_governance_cycle_program()
 
     on_call_method = Txn.application_args[0]
+    methods = {
+        "setup": on_setup,
+        "stake": on_stake,
+        "delegate_voting_power": on_delegate_voting_power,
+        "delegate_proposition_power": on_delegate_proposition_power,
+        "register_proposal": on_register_proposal,
+        "vote": on_vote,
+        "execute_proposal": on_execute_proposal,
+        "cancel_proposal": on_cancel_proposal,
+        "begin_new_governance_cycle": on_begin_new_governance_cycle,
+    }
+    # each call pays for the comparisons before its own, so the most frequent
+    # methods are checked first
     on_call = Cond(
-        [on_call_method == Bytes("setup"), on_setup],
-        [on_call_method == Bytes("stake"), on_stake],
-        [on_call_method == Bytes("delegate_voting_power"), on_delegate_voting_power],
-        [
-            on_call_method == Bytes("delegate_proposition_power"),
-            on_delegate_proposition_power,
-        ],
-        [on_call_method == Bytes("register_proposal"), on_register_proposal],
-        [
-            on_call_method == Bytes("vote"),
-            on_vote,
-        ],
-        [
-            on_call_method == Bytes("execute_proposal"),
-            on_execute_proposal,
-        ],
-        [on_call_method == Bytes("cancel_proposal"), on_cancel_proposal],
-        [
-            on_call_method == Bytes("begin_new_governance_cycle"),
-            on_begin_new_governance_cycle,
-        ],
+        *[[on_call_method == SELECTORS[name], methods[name]] for name in DISPATCH_ORDER]
     )
 
     on_close_out = close_out_program()
@@ -489,8 +461,8 @@ def approval_program():
 
     program = Cond(
         [Txn.application_id() == Int(0), on_create],
-        [Txn.on_completion() == OnComplete.OptIn, on_opt_in],
         [Txn.on_completion() == OnComplete.NoOp, on_call],
+        [Txn.on_completion() == OnComplete.OptIn, on_opt_in],
         [Txn.on_completion() == OnComplete.CloseOut, on_close_out],
         [Txn.on_completion() == OnComplete.UpdateApplication, Reject()],
         [Txn.on_completion() == OnComplete.DeleteApplication, on_delete],
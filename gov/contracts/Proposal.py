@@ -4,31 +4,85 @@ from gov.contracts.config import *
 governor_id = Int(1)
 
 
-def activate_proposal_program():
-    # in the future this is where the contract may need to opt into the governor
-    # for now it just checks that proposal has been successfully registered with the governor,
-    # and writes registration id to the state to simplify future opps
-    # proposal index
-    external_registration_id_key = Txn.application_args[1]
-    # the app id stored at the governor's proposal index
-    external_registration_id_value = App.globalGetEx(
-        governor_id, external_registration_id_key
+def authorized_by_governor(method: str) -> Expr:
+    """
+    The previous transaction of the group, sent by the same account, calls a
+    method of the governor on this proposal. The governor checks the call, so the
+    proposal only writes its registration, tallies and status when the governor
+    allows it
+    """
+    governor_call = Gtxn[Txn.group_index() - Int(1)]
+    return And(
+        Txn.applications[1] == App.globalGet(GOVERNOR_ID_KEY),
+        governor_call.type_enum() == TxnType.ApplicationCall,
+        governor_call.application_id() == App.globalGet(GOVERNOR_ID_KEY),
+        governor_call.application_args[0] == SELECTORS[method],
+        governor_call.applications[1] == Global.current_application_id(),
+        governor_call.sender() == Txn.sender(),
     )
 
-    on_setup = Seq(
-        external_registration_id_value,
-        Assert(external_registration_id_value.hasValue()),
-        Assert(
-            external_registration_id_value.value() == Global.current_application_id()
+
+def register_program():
+    # the governor has counted this proposal already
+    governor_cycle = App.globalGetEx(governor_id, GOV_CYCLE_ID_KEY)
+    num_registered_proposals = App.globalGetEx(
+        governor_id, NUM_REGISTERED_PROPOSALS_KEY
+    )
+
+    on_register = Seq(
+        Assert(authorized_by_governor("register_proposal")),
+        governor_cycle,
+        num_registered_proposals,
+        App.globalPut(REGISTRATION_CYCLE_KEY, governor_cycle.value()),
+        App.globalPut(REGISTRATION_ID_KEY, num_registered_proposals.value() - Int(1)),
+        App.globalPut(FOR_VOTES_KEY, Int(0)),
+        App.globalPut(AGAINST_VOTES_KEY, Int(0)),
+        App.globalPut(CAN_EXECUTE_KEY, Int(1)),
+        Approve(),
+    )
+    return on_register
+
+
+def tally_program():
+    # the voting power of the sender after the governor's vote call rolled it over
+    address_voting_power = App.localGetEx(
+        Txn.sender(), governor_id, ADDRESS_VOTING_POWER_KEY
+    )
+    vote_value = Btoi(Gtxn[Txn.group_index() - Int(1)].application_args[1])
+
+    on_tally = Seq(
+        Assert(authorized_by_governor("vote")),
+        address_voting_power,
+        If(vote_value > Int(0))
+        .Then(
+            App.globalPut(
+                FOR_VOTES_KEY,
+                App.globalGet(FOR_VOTES_KEY) + address_voting_power.value(),
+            )
+        )
+        .Else(
+            App.globalPut(
+                AGAINST_VOTES_KEY,
+                App.globalGet(AGAINST_VOTES_KEY) + address_voting_power.value(),
+            )
         ),
-        App.globalPut(REGISTRATION_ID_KEY, external_registration_id_key),
         Approve(),
     )
-    return on_setup
+    return on_tally
+
+
+def cancel_program():
+    return Seq(
+        Assert(authorized_by_governor("cancel_proposal")),
+        App.globalPut(CAN_EXECUTE_KEY, Int(0)),
+        Approve(),
+    )
 
 
 def execute_program():
     on_execute = Seq(
+        Assert(authorized_by_governor("execute_proposal")),
+        App.globalPut(CAN_EXECUTE_KEY, Int(0)),
         InnerTxnBuilder.Begin(),
         InnerTxnBuilder.SetFields(
             {
@@ -55,14 +109,18 @@ def approval_program():
         Approve(),
     )
 
-    on_activate = activate_proposal_program()
+    on_register = register_program()
+    on_tally = tally_program()
     on_execute = execute_program()
+    on_cancel = cancel_program()
 
     on_call_method = Txn.application_args[0]
     on_call = Seq(
         Cond(
-            [on_call_method == Bytes("activate"), on_activate],
+            [on_call_method == Bytes("tally"), on_tally],
+            [on_call_method == Bytes("register"), on_register],
             [on_call_method == Bytes("execute"), on_execute],
+            [on_call_method == Bytes("cancel"), on_cancel],
         ),
     )
 
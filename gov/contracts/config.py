@@ -1,28 +1,43 @@
 from pyteal import Bytes, Int
 
-CREATOR_KEY = Bytes("creator_key")
-GOV_TOKEN_KEY = Bytes("gov_token_key")
-PROPOSE_THRESHOLD_KEY = Bytes("propose_threshold_key")
-VOTE_THRESHOLD_KEY = Bytes("vote_threshold_key")
-QUORUM_THRESHOLD_KEY = Bytes("quorum_threshold_key")
-STAKE_PERIOD_DURATION_KEY = Bytes("stake_period_duration_key")
-PROPOSE_PERIOD_DURATION_KEY = Bytes("propose_period_duration_key")
-VOTE_PERIOD_DURATION_KEY = Bytes("vote_period_duration_key")
-EXECUTE_DELAY_DURATION_KEY = Bytes("execute_delay_duration_key")
-CLAIM_PERIOD_DURATION_KEY = Bytes("claim_period_duration_key")
-START_TIME_KEY = Bytes("start_time_key")
-GOV_CYCLE_ID_KEY = Bytes("gov_cycle_id_key")
+from gov.contracts import keys, methods
 
-NUM_REGISTERED_PROPOSALS_KEY = Bytes("num_active_proposals_key")
-MAX_NUM_PROPOSALS_KEY = Bytes("max_num_proposals_key")
+CREATOR_KEY = Bytes(keys.CREATOR_KEY)
+GOV_TOKEN_KEY = Bytes(keys.GOV_TOKEN_KEY)
+PROPOSE_THRESHOLD_KEY = Bytes(keys.PROPOSE_THRESHOLD_KEY)
+VOTE_THRESHOLD_KEY = Bytes(keys.VOTE_THRESHOLD_KEY)
+QUORUM_THRESHOLD_KEY = Bytes(keys.QUORUM_THRESHOLD_KEY)
+STAKE_PERIOD_DURATION_KEY = Bytes(keys.STAKE_PERIOD_DURATION_KEY)
+PROPOSE_PERIOD_DURATION_KEY = Bytes(keys.PROPOSE_PERIOD_DURATION_KEY)
+VOTE_PERIOD_DURATION_KEY = Bytes(keys.VOTE_PERIOD_DURATION_KEY)
+EXECUTE_DELAY_DURATION_KEY = Bytes(keys.EXECUTE_DELAY_DURATION_KEY)
+CLAIM_PERIOD_DURATION_KEY = Bytes(keys.CLAIM_PERIOD_DURATION_KEY)
+START_TIME_KEY = Bytes(keys.START_TIME_KEY)
+GOV_CYCLE_ID_KEY = Bytes(keys.GOV_CYCLE_ID_KEY)
+STAKE_TIME_END_KEY = Bytes(keys.STAKE_TIME_END_KEY)
+PROPOSE_TIME_END_KEY = Bytes(keys.PROPOSE_TIME_END_KEY)
+VOTE_TIME_END_KEY = Bytes(keys.VOTE_TIME_END_KEY)
+EXECUTE_DELAY_TIME_END_KEY = Bytes(keys.EXECUTE_DELAY_TIME_END_KEY)
+CLAIM_TIME_END_KEY = Bytes(keys.CLAIM_TIME_END_KEY)
 
-ADDRESS_AMOUNT_STAKED_KEY = Bytes("address_amount_staked_key")
-ADDRESS_VOTING_POWER_KEY = Bytes("address_voting_power_key")
-ADDRESS_PROPOSITION_POWER_KEY = Bytes("address_proposition_power_key")
+NUM_REGISTERED_PROPOSALS_KEY = Bytes(keys.NUM_REGISTERED_PROPOSALS_KEY)
+MAX_NUM_PROPOSALS_KEY = Bytes(keys.MAX_NUM_PROPOSALS_KEY)
+PROPOSAL_PROGRAM_HASH_KEY = Bytes(keys.PROPOSAL_PROGRAM_HASH_KEY)
 
-GOVERNOR_ID_KEY = Bytes("governor_id_key")
-TARGET_ID_KEY = Bytes("target_id_key")
-REGISTRATION_ID_KEY = Bytes("registration_id_key")
-FOR_VOTES_KEY = Bytes("for_votes_key")
-AGAINST_VOTES_KEY = Bytes("against_votes_key")
-CAN_EXECUTE_KEY = Bytes("can_execute_key")
+ADDRESS_AMOUNT_STAKED_KEY = Bytes(keys.ADDRESS_AMOUNT_STAKED_KEY)
+ADDRESS_VOTING_POWER_KEY = Bytes(keys.ADDRESS_VOTING_POWER_KEY)
+ADDRESS_PROPOSITION_POWER_KEY = Bytes(keys.ADDRESS_PROPOSITION_POWER_KEY)
+ADDRESS_VOTED_KEY = Bytes(keys.ADDRESS_VOTED_KEY)
+
+GOVERNOR_ID_KEY = Bytes(keys.GOVERNOR_ID_KEY)
+TARGET_ID_KEY = Bytes(keys.TARGET_ID_KEY)
+REGISTRATION_CYCLE_KEY = Bytes(keys.REGISTRATION_CYCLE_KEY)
+REGISTRATION_ID_KEY = Bytes(keys.REGISTRATION_ID_KEY)
+FOR_VOTES_KEY = Bytes(keys.FOR_VOTES_KEY)
+AGAINST_VOTES_KEY = Bytes(keys.AGAINST_VOTES_KEY)
+CAN_EXECUTE_KEY = Bytes(keys.CAN_EXECUTE_KEY)
+
+MAX_NUM_PROPOSALS = Int(keys.MAX_NUM_PROPOSALS)
+
+# method selectors by name
+SELECTORS = {name: Bytes(selector) for name, selector in methods.SELECTORS.items()}
@@ -1,6 +1,11 @@
 from pyteal import *
 
-from gov.contracts.config import FOR_VOTES_KEY, AGAINST_VOTES_KEY, CAN_EXECUTE_KEY
+from gov.contracts.config import (
+    GOV_CYCLE_ID_KEY,
+    GOVERNOR_ID_KEY,
+    PROPOSAL_PROGRAM_HASH_KEY,
+    REGISTRATION_CYCLE_KEY,
+)
 
 
 @Subroutine(TealType.uint64)
@@ -28,38 +33,57 @@ def validateInTimePeriod(
     )
 
 
-@Subroutine(TealType.none)
-def register_proposal(registration_slot: TealType.uint64):
+@Subroutine(TealType.uint64)
+def registered_this_cycle():
+    """
+    Whether the proposal in Txn.applications[1] was registered with this governor
+    in the current cycle. Registrations of earlier cycles are stale
+    """
+    proposal_governor_id = App.globalGetEx(Int(1), GOVERNOR_ID_KEY)
+    registration_cycle = App.globalGetEx(Int(1), REGISTRATION_CYCLE_KEY)
     return Seq(
-        App.globalPut(Itob(registration_slot), Txn.applications[1]),
-        App.globalPut(
-            Concat(Itob(registration_slot), Bytes("_"), FOR_VOTES_KEY), Int(0)
-        ),
-        App.globalPut(
-            Concat(Itob(registration_slot), Bytes("_"), AGAINST_VOTES_KEY),
-            Int(0),
-        ),
-        App.globalPut(
-            Concat(Itob(registration_slot), Bytes("_"), CAN_EXECUTE_KEY),
-            Int(1),
+        proposal_governor_id,
+        registration_cycle,
+        And(
+            proposal_governor_id.value() == Global.current_application_id(),
+            registration_cycle.hasValue(),
+            registration_cycle.value() == App.globalGet(GOV_CYCLE_ID_KEY),
         ),
     )
 
 
-@Subroutine(TealType.none)
-def unregister_proposal(registration_slot: TealType.uint64):
+@Subroutine(TealType.uint64)
+def is_proposal_program():
+    """
+    Whether the app in Txn.applications[1] runs the proposal program the governor
+    was created with, so that its tallies can be trusted
+    """
+    approval_program = AppParam.approvalProgram(Int(1))
     return Seq(
-        App.globalDel(Itob(registration_slot)),
-        App.globalDel(Concat(Itob(registration_slot), Bytes("_"), FOR_VOTES_KEY)),
-        App.globalDel(
-            Concat(Itob(registration_slot), Bytes("_"), AGAINST_VOTES_KEY),
-        ),
-        App.globalDel(
-            Concat(Itob(registration_slot), Bytes("_"), CAN_EXECUTE_KEY),
+        approval_program,
+        And(
+            approval_program.hasValue(),
+            Sha256(approval_program.value())
+            == App.globalGet(PROPOSAL_PROGRAM_HASH_KEY),
         ),
     )
 
 
+def calls_proposal(method: str) -> Expr:
+    """
+    The next transaction of the group, sent by the same account, calls a method of
+    the proposal in Txn.applications[1]. The proposal method only runs along with
+    the governor method that authorizes it
+    """
+    proposal_call = Gtxn[Txn.group_index() + Int(1)]
+    return And(
+        proposal_call.type_enum() == TxnType.ApplicationCall,
+        proposal_call.application_id() == Txn.applications[1],
+        proposal_call.application_args[0] == Bytes(method),
+        proposal_call.sender() == Txn.sender(),
+    )
+
+
 @Subroutine(TealType.none)
 def sendToken(
     token_key: TealType.bytes, receiver: TealType.bytes, amount: TealType.uint64
@@ -72,6 +96,9 @@ def sendToken(
                 TxnField.xfer_asset: App.globalGet(token_key),
                 TxnField.asset_receiver: receiver,
                 TxnField.asset_amount: amount,
+                # paid by the outer transaction overpaying its fee, so the
+                # governor's balance never goes to fees
+                TxnField.fee: Int(0),
             }
         ),
         InnerTxnBuilder.Submit(),
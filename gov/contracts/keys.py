@@ -0,0 +1,64 @@
+"""State key names and schemas of the contracts, importable without PyTeal.
+
+gov/contracts/config.py wraps each of these in a pyteal Bytes for the contracts,
+and gov/state.py uses them to decode state read from algod. Keys are short tags
+to keep state reads small; gov.util.readableKey and readableState name each key
+after its constant here, e.g. "propose_threshold" for "pt".
+"""
+
+CREATOR_KEY = "cr"
+GOV_TOKEN_KEY = "tk"
+PROPOSE_THRESHOLD_KEY = "pt"
+VOTE_THRESHOLD_KEY = "vt"
+QUORUM_THRESHOLD_KEY = "qt"
+STAKE_PERIOD_DURATION_KEY = "sd"
+PROPOSE_PERIOD_DURATION_KEY = "pd"
+VOTE_PERIOD_DURATION_KEY = "vd"
+EXECUTE_DELAY_DURATION_KEY = "ed"
+CLAIM_PERIOD_DURATION_KEY = "cd"
+START_TIME_KEY = "st"
+GOV_CYCLE_ID_KEY = "gc"
+# the end of each period of the current cycle, stored when the cycle starts
+STAKE_TIME_END_KEY = "se"
+PROPOSE_TIME_END_KEY = "pe"
+VOTE_TIME_END_KEY = "ve"
+EXECUTE_DELAY_TIME_END_KEY = "ee"
+CLAIM_TIME_END_KEY = "ce"
+
+NUM_REGISTERED_PROPOSALS_KEY = "np"
+MAX_NUM_PROPOSALS_KEY = "mp"
+# sha256 of the approval program of the proposal apps the governor accepts
+PROPOSAL_PROGRAM_HASH_KEY = "ph"
+
+ADDRESS_AMOUNT_STAKED_KEY = "as"
+ADDRESS_VOTING_POWER_KEY = "av"
+ADDRESS_PROPOSITION_POWER_KEY = "ap"
+# the cycle ID as 8 bytes followed by a bitmask of the proposal slots voted on
+ADDRESS_VOTED_KEY = "ah"
+
+GOVERNOR_ID_KEY = "gi"
+TARGET_ID_KEY = "ti"
+# the cycle a proposal was last registered in and its number among the proposals
+# registered in that cycle, which is also its bit in address_voted
+REGISTRATION_CYCLE_KEY = "rc"
+REGISTRATION_ID_KEY = "ri"
+# the tallies and status of a proposal, written when the governor authorizes it
+FOR_VOTES_KEY = "fv"
+AGAINST_VOTES_KEY = "ag"
+CAN_EXECUTE_KEY = "cx"
+
+# an account's address_voted value, with its key, fits in the 128 bytes of a
+# state entry, and it has a bit for each proposal registered in a cycle
+MAX_NUM_PROPOSALS = (128 - len(ADDRESS_VOTED_KEY) - 8) * 8
+
+# the (uints, byte slices) of state allocated when the apps are created
+# 9 params + creation time + cycle counter + num registered and max proposals +
+# 5 period ends; creator and proposal program hash. The tallies of each proposal
+# are kept in its own app
+GOVERNOR_GLOBAL_SCHEMA = (9 + 4 + 5, 2)
+# tokens committed, voting power, proposal power, session counter; voted flags
+GOVERNOR_LOCAL_SCHEMA = (4, 1)
+# governor, registration cycle and id, for and against votes, can execute;
+# creator and target
+PROPOSAL_GLOBAL_SCHEMA = (6, 2)
+PROPOSAL_LOCAL_SCHEMA = (0, 0)
@@ -0,0 +1,36 @@
+"""Method selectors of the Governor contract, importable without PyTeal.
+
+A NoOp call to the governor passes the one byte selector of its method as the
+first app argument. gov/contracts/config.py wraps each selector in a pyteal
+Bytes for the contract, gov/operations.py and gov/aio.py send them, and
+gov/events.py decodes them back to method names.
+"""
+
+SELECTORS = {
+    "setup": b"\x00",
+    "stake": b"\x01",
+    "delegate_voting_power": b"\x02",
+    "delegate_proposition_power": b"\x03",
+    "register_proposal": b"\x04",
+    "vote": b"\x05",
+    "execute_proposal": b"\x06",
+    "cancel_proposal": b"\x07",
+    "begin_new_governance_cycle": b"\x08",
+}
+
+METHOD_NAMES = {selector: name for name, selector in SELECTORS.items()}
+
+# the order Governor.approval_program compares the selectors in, most frequent
+# calls first: each voter votes on every proposal of a cycle, while setup runs
+# once in the life of the governor
+DISPATCH_ORDER = (
+    "vote",
+    "delegate_voting_power",
+    "register_proposal",
+    "execute_proposal",
+    "stake",
+    "delegate_proposition_power",
+    "cancel_proposal",
+    "begin_new_governance_cycle",
+    "setup",
+)
@@ -0,0 +1,1685 @@
+"""TEAL v5 interpreter for application programs.
+
+Runs compiled approval and clear state programs the way algod evaluates them,
+so the contracts can be executed without a node; gov.ledger builds a local
+network on top of it. Programs are decoded once into instructions using the
+language spec shipped with algosdk, and every value on the stack is either an
+int (uint64) or bytes. Ledger state is read and written through the Ledger
+protocol below.
+
+LogicSig-only opcodes and the ecdsa opcodes are not supported.
+"""
+import hashlib
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+)
+
+from algosdk import encoding
+from algosdk.logic import get_application_address
+
+from .assembler import GLOBAL_FIELDS, IMMEDIATES, OPS_BY_CODE, OPS_BY_NAME, TXN_FIELDS
+
+StackValue = Union[int, bytes]
+# called before each instruction with the context, program counter and instruction
+Tracer = Callable[["EvalContext", int, "Instruction"], None]
+
+MAX_UINT64 = 2 ** 64 - 1
+MAX_VERSION = 5
+MAX_STACK_DEPTH = 1000
+MAX_BYTES_LENGTH = 4096
+MAX_BYTE_MATH_LENGTH = 64
+MAX_KEY_LENGTH = 64
+MAX_KEY_VALUE_LENGTH = 128
+MAX_LOGS = 32
+MAX_LOG_SIZE = 1024
+MAX_INNER_TXNS = 16
+APP_CALL_BUDGET = 700
+MIN_TXN_FEE = 1000
+MIN_BALANCE = 100_000
+MAX_TXN_LIFE = 1000
+ZERO_ADDRESS = bytes(32)
+
+TXN_TYPES = {"pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6}
+TXN_TYPES_BY_ENUM = {enum: name for name, enum in TXN_TYPES.items()}
+# the only transaction types an app can submit in TEAL v5
+INNER_TXN_TYPES = ("pay", "axfer", "acfg", "afrz")
+
+
+class TealEvalError(Exception):
+    """A program failed: it hit an error, rather than returning zero."""
+
+    def __init__(self, message: str, pc: int = 0) -> None:
+        super().__init__(message)
+        self.message = message
+        self.pc = pc
+
+    def __str__(self) -> str:
+        return "{} pc={}".format(self.message, self.pc)
+
+
+class Ledger(Protocol):
+    """The ledger state a program can read and write.
+
+    Addresses are 32 byte public keys. Writes go through the ledger so it can
+    journal them and roll back the transaction group if it fails.
+    """
+
+    def balance(self, address: bytes) -> int:
+        ...
+
+    def minBalance(self, address: bytes) -> int:
+        ...
+
+    def getApp(self, appID: int) -> Any:
+        """Return the app with appID, or None if it does not exist."""
+
+    def getAsset(self, assetID: int) -> Any:
+        """Return the asset with assetID, or None if it does not exist."""
+
+    def getAssetHolding(self, address: bytes, assetID: int) -> Any:
+        """Return the account's holding of assetID, or None if not opted in."""
+
+    def getLocalState(
+        self, address: bytes, appID: int
+    ) -> Optional[Dict[bytes, StackValue]]:
+        """Return the account's local state in appID, or None if not opted in."""
+
+    def setGlobal(self, appID: int, key: bytes, value: StackValue) -> None:
+        ...
+
+    def deleteGlobal(self, appID: int, key: bytes) -> None:
+        ...
+
+    def setLocal(
+        self, address: bytes, appID: int, key: bytes, value: StackValue
+    ) -> None:
+        ...
+
+    def deleteLocal(self, address: bytes, appID: int, key: bytes) -> None:
+        ...
+
+    def applyInner(self, txn: Dict[str, Any], params: "EvalParams") -> Dict[str, Any]:
+        """Apply an inner transaction and return its apply data."""
+
+
+class EvalParams:
+    """The transaction group an app call belongs to, shared by its app calls.
+
+    Args:
+        group: The transactions of the group, as msgpack decoded dicts.
+        txIDs: The raw 32 byte IDs of the transactions.
+        groupID: The group ID, or 32 zero bytes for a lone transaction.
+        round: The round the group is evaluated in.
+        timestamp: The timestamp of the previous block.
+        feeCredit: The amount the group paid over the minimum fee.
+        tracer: Called before each instruction of the group's programs, e.g.
+            to profile their costs.
+    """
+
+    def __init__(
+        self,
+        group: List[Dict[str, Any]],
+        txIDs: List[bytes],
+        groupID: bytes,
+        round: int,
+        timestamp: int,
+        feeCredit: int = 0,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
+        self.group = group
+        self.txIDs = txIDs
+        self.groupID = groupID
+        self.round = round
+        self.timestamp = timestamp
+        self.feeCredit = feeCredit
+        self.tracer = tracer
+
+        # app calls pool their budget across the group
+        self.budget = APP_CALL_BUDGET * sum(1 for t in group if t.get("type") == "appl")
+        self.scratches: List[Optional[List[StackValue]]] = [None] * len(group)
+        self.createdIDs: List[Optional[int]] = [None] * len(group)
+
+
+class EvalResult(NamedTuple):
+    approved: bool
+    logs: List[bytes]
+    # (txn, apply data) of each inner transaction that was submitted
+    innerTxns: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    cost: int
+
+
+class Instruction(NamedTuple):
+    name: str
+    handler: Callable[["EvalContext", Any], Optional[int]]
+    immediates: Any
+    nextPc: int
+    cost: int
+
+
+class Program:
+    """A program decoded into its instructions.
+
+    Raises:
+        TealEvalError: If the bytecode is malformed.
+    """
+
+    def __init__(self, bytecode: bytes) -> None:
+        self.bytecode = bytecode
+        self.version, pc = _readUvarint(bytecode, 0)
+        if not 1 <= self.version <= MAX_VERSION:
+            raise TealEvalError("program version {} not supported".format(self.version))
+
+        self.instructions: Dict[int, Instruction] = dict()
+        branches: List[Tuple[int, int]] = []
+        while pc < len(bytecode):
+            spec = OPS_BY_CODE.get(bytecode[pc])
+            if spec is None or spec["Name"] not in HANDLERS:
+                raise TealEvalError("illegal opcode 0x{:02x}".format(bytecode[pc]), pc)
+            name = spec["Name"]
+            immediates, nextPc = _readImmediates(name, bytecode, pc)
+            if IMMEDIATES.get(name) == ("label",):
+                branches.append((pc, immediates))
+                if name == "callsub":
+                    # callsub also needs its return address
+                    immediates = (immediates, nextPc)
+            self.instructions[pc] = Instruction(
+                name, HANDLERS[name], immediates, nextPc, spec.get("Cost", 1)
+            )
+            pc = nextPc
+
+        for pc, target in branches:
+            if target != len(bytecode) and target not in self.instructions:
+                raise TealEvalError(
+                    "branch target {} is not an opcode".format(target), pc
+                )
+            if target < pc and self.version < 2:
+                raise TealEvalError("backward branches need version 2", pc)
+
+    def hash(self) -> bytes:
+        return encoding.checksum(b"Program" + self.bytecode)
+
+
+def _readUvarint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data) or shift > 63:
+            raise TealEvalError("could not decode varint", pos)
+        b = data[pos]
+        value |= (b & 0x7F) << shift
+        pos += 1
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _readImmediates(name: str, code: bytes, pc: int) -> Tuple[Any, int]:
+    pos = pc + 1
+    if name in ("intcblock", "bytecblock"):
+        count, pos = _readUvarint(code, pos)
+        values: List[Any] = []
+        for _ in range(count):
+            value, pos = _readUvarint(code, pos)
+            if name == "bytecblock":
+                if pos + value > len(code):
+                    raise TealEvalError("bytecblock ran past end of program", pc)
+                value, pos = code[pos : pos + value], pos + value
+            values.append(value)
+        return tuple(values), pos
+    if name == "pushint":
+        return _readUvarint(code, pos)
+    if name == "pushbytes":
+        length, pos = _readUvarint(code, pos)
+        if pos + length > len(code):
+            raise TealEvalError("pushbytes ran past end of program", pc)
+        return code[pos : pos + length], pos + length
+
+    kinds = IMMEDIATES.get(name, ())
+    if kinds == ("label",):
+        if pos + 2 > len(code):
+            raise TealEvalError("{} ran past end of program".format(name), pc)
+        offset = int.from_bytes(code[pos : pos + 2], "big", signed=True)
+        return pos + 2 + offset, pos + 2
+    if pos + len(kinds) > len(code):
+        raise TealEvalError("{} ran past end of program".format(name), pc)
+    immediates = tuple(code[pos : pos + len(kinds)])
+    for kind, value in zip(kinds, immediates):
+        if kind == "txnField" and value >= len(TXN_FIELDS):
+            raise TealEvalError("invalid txn field {}".format(value), pc)
+        if kind == "globalField" and value >= len(GLOBAL_FIELDS):
+            raise TealEvalError("invalid global field {}".format(value), pc)
+        if kind == "enum" and value >= len(OPS_BY_NAME[name].get("ArgEnum", ())):
+            raise TealEvalError("invalid {} field {}".format(name, value), pc)
+    return immediates, pos + len(kinds)
+
+
+class EvalContext:
+    """The state of one running program."""
+
+    def __init__(
+        self,
+        program: Program,
+        ledger: Ledger,
+        params: EvalParams,
+        groupIndex: int,
+        appID: int,
+    ) -> None:
+        self.program = program
+        self.ledger = ledger
+        self.params = params
+        self.groupIndex = groupIndex
+        self.txn = params.group[groupIndex]
+        self.appID = appID
+        self.appAddress = encoding.decode_address(get_application_address(appID))
+
+        self.stack: List[StackValue] = []
+        self.scratch: List[StackValue] = [0] * 256
+        self.intc: Tuple[int, ...] = ()
+        self.bytec: Tuple[bytes, ...] = ()
+        self.callstack: List[int] = []
+        self.logs: List[bytes] = []
+        self.innerTxns: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        self.building: Optional[Dict[str, Any]] = None
+
+    def run(self) -> EvalResult:
+        instructions = self.program.instructions
+        end = len(self.program.bytecode)
+        stack = self.stack
+        params = self.params
+        startBudget = params.budget
+        tracer = params.tracer
+        pc = _readUvarint(self.program.bytecode, 0)[1]
+        try:
+            while pc != end:
+                instruction = instructions[pc]
+                if tracer is not None:
+                    tracer(self, pc, instruction)
+                name, handler, immediates, nextPc, cost = instruction
+                params.budget -= cost
+                if params.budget < 0:
+                    raise TealEvalError(
+                        "dynamic cost budget exceeded, executing {}".format(name)
+                    )
+                target = handler(self, immediates)
+                pc = nextPc if target is None else target
+                if len(stack) > MAX_STACK_DEPTH:
+                    raise TealEvalError("stack overflow")
+        except TealEvalError as e:
+            e.pc = pc
+            raise
+        except IndexError:
+            raise TealEvalError("stack underflow in {}".format(name), pc)
+
+        if len(stack) != 1:
+            raise TealEvalError("stack len is {} instead of 1".format(len(stack)), pc)
+        if type(stack[0]) is not int:
+            raise TealEvalError("stack finished with bytes not int", pc)
+
+        params.scratches[self.groupIndex] = self.scratch
+        return EvalResult(
+            stack[0] != 0, self.logs, self.innerTxns, startBudget - params.budget
+        )
+
+    # stack helpers
+
+    def popUint(self) -> int:
+        value = self.stack.pop()
+        if type(value) is not int:
+            raise TealEvalError("expected uint64 but got []byte")
+        return value
+
+    def popBytes(self) -> bytes:
+        value = self.stack.pop()
+        if type(value) is not bytes:
+            raise TealEvalError("expected []byte but got uint64")
+        return value
+
+    def pushBytes(self, value: bytes) -> None:
+        if len(value) > MAX_BYTES_LENGTH:
+            raise TealEvalError("byte string longer than {}".format(MAX_BYTES_LENGTH))
+        self.stack.append(value)
+
+    # references to accounts, apps and assets outside of the program
+
+    def accountReference(self, ref: StackValue) -> bytes:
+        txn = self.txn
+        if type(ref) is int:
+            if ref == 0:
+                return txn["snd"]
+            accounts = txn.get("apat", ())
+            if ref > len(accounts):
+                raise TealEvalError("invalid Accounts index {}".format(ref))
+            return accounts[ref - 1]
+        if ref == txn["snd"] or ref == self.appAddress or ref in txn.get("apat", ()):
+            return ref  # type: ignore
+        raise TealEvalError("invalid Account reference {}".format(_address(ref)))
+
+    def appReference(self, ref: int) -> int:
+        foreignApps = self.txn.get("apfa", ())
+        if ref == 0 or ref == self.appID:
+            return self.appID
+        if ref in foreignApps:
+            return ref
+        if ref <= len(foreignApps):
+            return foreignApps[ref - 1]
+        raise TealEvalError("invalid App reference {}".format(ref))
+
+    def assetReference(self, ref: int) -> int:
+        foreignAssets = self.txn.get("apas", ())
+        if ref in foreignAssets:
+            return ref
+        if ref < len(foreignAssets):
+            return foreignAssets[ref]
+        raise TealEvalError("invalid Asset reference {}".format(ref))
+
+    def localState(self, address: bytes, appID: int) -> Dict[bytes, StackValue]:
+        state = self.ledger.getLocalState(address, appID)
+        if state is None:
+            raise TealEvalError(
+                "account {} is not opted in to app {}".format(_address(address), appID)
+            )
+        return state
+
+    def globalState(self, appID: int) -> Dict[bytes, StackValue]:
+        app = self.ledger.getApp(appID)
+        if app is None:
+            raise TealEvalError("app {} does not exist".format(appID))
+        return app.globalState
+
+
+def evaluate(
+    program: Program, ledger: Ledger, params: EvalParams, groupIndex: int, appID: int
+) -> EvalResult:
+    """Run a program for the app call at groupIndex.
+
+    Raises:
+        TealEvalError: If the program fails.
+    """
+    return EvalContext(program, ledger, params, groupIndex, appID).run()
+
+
+def _address(address: Any) -> str:
+    if type(address) is bytes and len(address) == 32:
+        return encoding.encode_address(address)
+    return repr(address)
+
+
+def _checkKeyValue(key: bytes, value: StackValue) -> None:
+    if len(key) > MAX_KEY_LENGTH:
+        raise TealEvalError("key too long: length was {}".format(len(key)))
+    if type(value) is bytes and len(key) + len(value) > MAX_KEY_VALUE_LENGTH:
+        raise TealEvalError(
+            "key/value total too long: length was {}".format(len(key) + len(value))
+        )
+
+
+# transaction fields: name -> (msgpack path, kind). The kind decides the type
+# the field has in TEAL and its default when it is absent from the transaction.
+_FIELD_PATHS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "Sender": (("snd",), "address"),
+    "Fee": (("fee",), "uint"),
+    "FirstValid": (("fv",), "uint"),
+    "LastValid": (("lv",), "uint"),
+    "Note": (("note",), "bytes"),
+    "Lease": (("lx",), "hash"),
+    "Receiver": (("rcv",), "address"),
+    "Amount": (("amt",), "uint"),
+    "CloseRemainderTo": (("close",), "address"),
+    "VotePK": (("votekey",), "hash"),
+    "SelectionPK": (("selkey",), "hash"),
+    "VoteFirst": (("votefst",), "uint"),
+    "VoteLast": (("votelst",), "uint"),
+    "VoteKeyDilution": (("votekd",), "uint"),
+    "Type": (("type",), "string"),
+    "XferAsset": (("xaid",), "uint"),
+    "AssetAmount": (("aamt",), "uint"),
+    "AssetSender": (("asnd",), "address"),
+    "AssetReceiver": (("arcv",), "address"),
+    "AssetCloseTo": (("aclose",), "address"),
+    "ApplicationID": (("apid",), "uint"),
+    "OnCompletion": (("apan",), "uint"),
+    "ApprovalProgram": (("apap",), "bytes"),
+    "ClearStateProgram": (("apsu",), "bytes"),
+    "RekeyTo": (("rekey",), "address"),
+    "ConfigAsset": (("caid",), "uint"),
+    "ConfigAssetTotal": (("apar", "t"), "uint"),
+    "ConfigAssetDecimals": (("apar", "dc"), "uint"),
+    "ConfigAssetDefaultFrozen": (("apar", "df"), "bool"),
+    "ConfigAssetUnitName": (("apar", "un"), "string"),
+    "ConfigAssetName": (("apar", "an"), "string"),
+    "ConfigAssetURL": (("apar", "au"), "string"),
+    "ConfigAssetMetadataHash": (("apar", "am"), "hash"),
+    "ConfigAssetManager": (("apar", "m"), "address"),
+    "ConfigAssetReserve": (("apar", "r"), "address"),
+    "ConfigAssetFreeze": (("apar", "f"), "address"),
+    "ConfigAssetClawback": (("apar", "c"), "address"),
+    "FreezeAsset": (("faid",), "uint"),
+    "FreezeAssetAccount": (("fadd",), "address"),
+    "FreezeAssetFrozen": (("afrz",), "bool"),
+    "GlobalNumUint": (("apgs", "nui"), "uint"),
+    "GlobalNumByteSlice": (("apgs", "nbs"), "uint"),
+    "LocalNumUint": (("apls", "nui"), "uint"),
+    "LocalNumByteSlice": (("apls", "nbs"), "uint"),
+    "ExtraProgramPages": (("apep",), "uint"),
+    "Nonparticipation": (("nonpart",), "bool"),
+}
+
+# fields an app can set on an inner transaction in TEAL v5
+_INNER_FIELDS = {
+    "Sender",
+    "Fee",
+    "Receiver",
+    "Amount",
+    "CloseRemainderTo",
+    "Type",
+    "TypeEnum",
+    "XferAsset",
+    "AssetAmount",
+    "AssetSender",
+    "AssetReceiver",
+    "AssetCloseTo",
+    "ConfigAsset",
+    "ConfigAssetTotal",
+    "ConfigAssetDecimals",
+    "ConfigAssetDefaultFrozen",
+    "ConfigAssetUnitName",
+    "ConfigAssetName",
+    "ConfigAssetURL",
+    "ConfigAssetMetadataHash",
+    "ConfigAssetManager",
+    "ConfigAssetReserve",
+    "ConfigAssetFreeze",
+    "ConfigAssetClawback",
+    "FreezeAsset",
+    "FreezeAssetAccount",
+    "FreezeAssetFrozen",
+}
+
+_DEFAULTS = {"uint": 0, "bool": 0, "bytes": b"", "string": b"", "address": ZERO_ADDRESS}
+
+
+def _makeGetter(path: Tuple[str, ...], kind: str) -> Callable[[Dict[str, Any]], Any]:
+    default = _DEFAULTS.get(kind, ZERO_ADDRESS)
+    if len(path) == 1:
+        (key,) = path
+        if kind == "string":
+            return lambda txn: txn[key].encode() if key in txn else default
+        if kind == "bool":
+            return lambda txn: int(txn.get(key, 0))
+        return lambda txn: txn.get(key, default)
+
+    outer, inner = path
+
+    def get(txn: Dict[str, Any]) -> Any:
+        value = txn.get(outer, {}).get(inner)
+        if value is None:
+            return default
+        if kind == "string":
+            return value.encode()
+        if kind == "bool":
+            return int(value)
+        return value
+
+    return get
+
+
+_GETTERS = {name: _makeGetter(*spec) for name, spec in _FIELD_PATHS.items()}
+
+
+def _txnField(
+    ctx: EvalContext,
+    groupIndex: int,
+    field: int,
+    arrayIndex: Optional[int] = None,
+    txn: Optional[Dict[str, Any]] = None,
+    applyData: Optional[Dict[str, Any]] = None,
+) -> StackValue:
+    """Read a field of a transaction in the group, or of an inner transaction."""
+    if txn is None:
+        if groupIndex >= len(ctx.params.group):
+            raise TealEvalError(
+                "txn index {}, len(group) is {}".format(
+                    groupIndex, len(ctx.params.group)
+                )
+            )
+        txn = ctx.params.group[groupIndex]
+    name = TXN_FIELDS[field]
+
+    getter = _GETTERS.get(name)
+    if getter is not None:
+        if arrayIndex is not None:
+            raise TealEvalError("{} is not an array field".format(name))
+        return getter(txn)
+
+    if name in ("ApplicationArgs", "Accounts", "Assets", "Applications", "Logs"):
+        if name == "Logs":
+            if applyData is None:
+                raise TealEvalError("Logs is only available for inner transactions")
+            values = list(applyData.get("lg", ()))
+        elif name == "ApplicationArgs":
+            values = list(txn.get("apaa", ()))
+        elif name == "Accounts":
+            values = [txn["snd"]] + list(txn.get("apat", ()))
+        elif name == "Assets":
+            values = list(txn.get("apas", ()))
+        else:
+            values = [txn.get("apid", 0)] + list(txn.get("apfa", ()))
+        if arrayIndex is None:
+            raise TealEvalError("{} is an array field".format(name))
+        if arrayIndex >= len(values):
+            raise TealEvalError(
+                "invalid {} index {}".format(name, arrayIndex),
+            )
+        return values[arrayIndex]
+
+    if arrayIndex is not None:
+        raise TealEvalError("{} is not an array field".format(name))
+    if name == "TypeEnum":
+        return TXN_TYPES.get(txn.get("type", ""), 0)
+    if name == "GroupIndex":
+        return groupIndex
+    if name == "TxID":
+        if applyData is not None:
+            raise TealEvalError("TxID is not available for inner transactions")
+        return ctx.params.txIDs[groupIndex]
+    if name == "NumAppArgs":
+        return len(txn.get("apaa", ()))
+    if name == "NumAccounts":
+        return len(txn.get("apat", ()))
+    if name == "NumAssets":
+        return len(txn.get("apas", ()))
+    if name == "NumApplications":
+        return len(txn.get("apfa", ()))
+    if name in ("NumLogs", "CreatedAssetID", "CreatedApplicationID"):
+        if applyData is None:
+            raise TealEvalError(
+                "{} is only available for inner transactions".format(name)
+            )
+        if name == "NumLogs":
+            return len(applyData.get("lg", ()))
+        return applyData.get("caid" if name == "CreatedAssetID" else "apid", 0)
+    raise TealEvalError("txn field {} is not supported".format(name))
+
+
+# opcode handlers. Each takes the context and the decoded immediates, and
+# returns the next pc when it branches.
+
+
+def _err(ctx: EvalContext, imm: Any) -> None:
+    raise TealEvalError("err opcode executed")
+
+
+def _hasher(name: str) -> Callable[[EvalContext, Any], None]:
+    def hashOp(ctx: EvalContext, imm: Any) -> None:
+        data = ctx.popBytes()
+        if name == "sha256":
+            digest = hashlib.sha256(data).digest()
+        elif name == "sha512_256":
+            digest = encoding.checksum(data)
+        else:
+            from Cryptodome.Hash import keccak
+
+            digest = keccak.new(data=data, digest_bits=256).digest()
+        ctx.stack.append(digest)
+
+    return hashOp
+
+
+def _ed25519verify(ctx: EvalContext, imm: Any) -> None:
+    from nacl.exceptions import BadSignatureError
+    from nacl.signing import VerifyKey
+
+    publicKey = ctx.popBytes()
+    signature = ctx.popBytes()
+    data = ctx.popBytes()
+    if len(publicKey) != 32 or len(signature) != 64:
+        ctx.stack.append(0)
+        return
+    message = b"ProgData" + ctx.program.hash() + data
+    try:
+        VerifyKey(publicKey).verify(message, signature)
+        ctx.stack.append(1)
+    except BadSignatureError:
+        ctx.stack.append(0)
+
+
+def _unsupported(name: str) -> Callable[[EvalContext, Any], None]:
+    def unsupported(ctx: EvalContext, imm: Any) -> None:
+        raise TealEvalError("{} is not supported".format(name))
+
+    return unsupported
+
+
+def _notInApplications(name: str) -> Callable[[EvalContext, Any], None]:
+    def notInApplications(ctx: EvalContext, imm: Any) -> None:
+        raise TealEvalError("{} not allowed in current mode".format(name))
+
+    return notInApplications
+
+
+def _uintOp(
+    name: str, fn: Callable[[int, int], int]
+) -> Callable[[EvalContext, Any], None]:
+    def uintOp(ctx: EvalContext, imm: Any) -> None:
+        b = ctx.popUint()
+        a = ctx.popUint()
+        ctx.stack.append(fn(a, b))
+
+    return uintOp
+
+
+def _add(a: int, b: int) -> int:
+    result = a + b
+    if result > MAX_UINT64:
+        raise TealEvalError("+ overflowed")
+    return result
+
+
+def _sub(a: int, b: int) -> int:
+    if b > a:
+        raise TealEvalError("- would result negative")
+    return a - b
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise TealEvalError("/ 0")
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if b == 0:
+        raise TealEvalError("% 0")
+    return a % b
+
+
+def _mul(a: int, b: int) -> int:
+    result = a * b
+    if result > MAX_UINT64:
+        raise TealEvalError("* overflowed")
+    return result
+
+
+def _shl(a: int, b: int) -> int:
+    if b > 63:
+        raise TealEvalError("shl arg too big, ({} > 63)".format(b))
+    return (a << b) & MAX_UINT64
+
+
+def _shr(a: int, b: int) -> int:
+    if b > 63:
+        raise TealEvalError("shr arg too big, ({} > 63)".format(b))
+    return a >> b
+
+
+def _exp(a: int, b: int) -> int:
+    if a == 0 and b == 0:
+        raise TealEvalError("0^0 is undefined")
+    if a > 1 and b > 64:
+        raise TealEvalError("{}^{} overflow".format(a, b))
+    result = a ** b
+    if result > MAX_UINT64:
+        raise TealEvalError("{}^{} overflow".format(a, b))
+    return result
+
+
+def _equal(ctx: EvalContext, imm: Any) -> None:
+    b = ctx.stack.pop()
+    a = ctx.stack.pop()
+    if type(a) is not type(b):
+        raise TealEvalError("cannot compare ({} to {})".format(type(a), type(b)))
+    ctx.stack.append(int(a == b))
+
+
+def _notEqual(ctx: EvalContext, imm: Any) -> None:
+    _equal(ctx, imm)
+    ctx.stack[-1] = 1 - ctx.stack[-1]  # type: ignore
+
+
+def _not(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(int(ctx.popUint() == 0))
+
+
+def _len(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(len(ctx.popBytes()))
+
+
+def _itob(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(ctx.popUint().to_bytes(8, "big"))
+
+
+def _btoi(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.popBytes()
+    if len(value) > 8:
+        raise TealEvalError("btoi arg too long, got [{}]bytes".format(len(value)))
+    ctx.stack.append(int.from_bytes(value, "big"))
+
+
+def _bitNot(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(ctx.popUint() ^ MAX_UINT64)
+
+
+def _mulw(ctx: EvalContext, imm: Any) -> None:
+    b = ctx.popUint()
+    a = ctx.popUint()
+    result = a * b
+    ctx.stack.extend((result >> 64, result & MAX_UINT64))
+
+
+def _addw(ctx: EvalContext, imm: Any) -> None:
+    b = ctx.popUint()
+    a = ctx.popUint()
+    result = a + b
+    ctx.stack.extend((result >> 64, result & MAX_UINT64))
+
+
+def _divmodw(ctx: EvalContext, imm: Any) -> None:
+    dLow = ctx.popUint()
+    dHigh = ctx.popUint()
+    nLow = ctx.popUint()
+    nHigh = ctx.popUint()
+    divisor = (dHigh << 64) | dLow
+    if divisor == 0:
+        raise TealEvalError("/ 0")
+    quotient, remainder = divmod((nHigh << 64) | nLow, divisor)
+    ctx.stack.extend(
+        (quotient >> 64, quotient & MAX_UINT64, remainder >> 64, remainder & MAX_UINT64)
+    )
+
+
+def _expw(ctx: EvalContext, imm: Any) -> None:
+    b = ctx.popUint()
+    a = ctx.popUint()
+    if a == 0 and b == 0:
+        raise TealEvalError("0^0 is undefined")
+    if a > 1 and b > 128:
+        raise TealEvalError("{}^{} overflow".format(a, b))
+    result = a ** b
+    if result >= 2 ** 128:
+        raise TealEvalError("{}^{} overflow".format(a, b))
+    ctx.stack.extend((result >> 64, result & MAX_UINT64))
+
+
+def _sqrt(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.popUint()
+    root = int(value ** 0.5)
+    while root * root > value:
+        root -= 1
+    while (root + 1) * (root + 1) <= value:
+        root += 1
+    ctx.stack.append(root)
+
+
+def _bitlen(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.stack.pop()
+    if type(value) is bytes:
+        if len(value) > 8 * 1024:
+            raise TealEvalError("bitlen arg too long")
+        value = int.from_bytes(value, "big")
+    ctx.stack.append(value.bit_length())
+
+
+# constants
+
+
+def _intcblock(ctx: EvalContext, imm: Tuple[int, ...]) -> None:
+    ctx.intc = imm
+
+
+def _intc(ctx: EvalContext, imm: Tuple[int]) -> None:
+    _pushIntc(ctx, imm[0])
+
+
+def _pushIntc(ctx: EvalContext, index: int) -> None:
+    if index >= len(ctx.intc):
+        raise TealEvalError("intc {} beyond {} constants".format(index, len(ctx.intc)))
+    ctx.stack.append(ctx.intc[index])
+
+
+def _intcN(index: int) -> Callable[[EvalContext, Any], None]:
+    return lambda ctx, imm: _pushIntc(ctx, index)
+
+
+def _bytecblock(ctx: EvalContext, imm: Tuple[bytes, ...]) -> None:
+    ctx.bytec = imm
+
+
+def _bytec(ctx: EvalContext, imm: Tuple[int]) -> None:
+    _pushBytec(ctx, imm[0])
+
+
+def _pushBytec(ctx: EvalContext, index: int) -> None:
+    if index >= len(ctx.bytec):
+        raise TealEvalError(
+            "bytec {} beyond {} constants".format(index, len(ctx.bytec))
+        )
+    ctx.stack.append(ctx.bytec[index])
+
+
+def _bytecN(index: int) -> Callable[[EvalContext, Any], None]:
+    return lambda ctx, imm: _pushBytec(ctx, index)
+
+
+def _pushint(ctx: EvalContext, imm: int) -> None:
+    ctx.stack.append(imm)
+
+
+def _pushbytes(ctx: EvalContext, imm: bytes) -> None:
+    ctx.stack.append(imm)
+
+
+# transaction and global fields
+
+
+def _txn(ctx: EvalContext, imm: Tuple[int]) -> None:
+    ctx.stack.append(_txnField(ctx, ctx.groupIndex, imm[0]))
+
+
+def _txna(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    ctx.stack.append(_txnField(ctx, ctx.groupIndex, imm[0], imm[1]))
+
+
+def _txnas(ctx: EvalContext, imm: Tuple[int]) -> None:
+    index = ctx.popUint()
+    ctx.stack.append(_txnField(ctx, ctx.groupIndex, imm[0], index))
+
+
+def _gtxn(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    ctx.stack.append(_txnField(ctx, imm[0], imm[1]))
+
+
+def _gtxna(ctx: EvalContext, imm: Tuple[int, int, int]) -> None:
+    ctx.stack.append(_txnField(ctx, imm[0], imm[1], imm[2]))
+
+
+def _gtxnas(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    index = ctx.popUint()
+    ctx.stack.append(_txnField(ctx, imm[0], imm[1], index))
+
+
+def _gtxns(ctx: EvalContext, imm: Tuple[int]) -> None:
+    groupIndex = ctx.popUint()
+    ctx.stack.append(_txnField(ctx, groupIndex, imm[0]))
+
+
+def _gtxnsa(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    groupIndex = ctx.popUint()
+    ctx.stack.append(_txnField(ctx, groupIndex, imm[0], imm[1]))
+
+
+def _gtxnsas(ctx: EvalContext, imm: Tuple[int]) -> None:
+    index = ctx.popUint()
+    groupIndex = ctx.popUint()
+    ctx.stack.append(_txnField(ctx, groupIndex, imm[0], index))
+
+
+def _global(ctx: EvalContext, imm: Tuple[int]) -> None:
+    name = GLOBAL_FIELDS[imm[0]]
+    params = ctx.params
+    if name == "MinTxnFee":
+        value: StackValue = MIN_TXN_FEE
+    elif name == "MinBalance":
+        value = MIN_BALANCE
+    elif name == "MaxTxnLife":
+        value = MAX_TXN_LIFE
+    elif name == "ZeroAddress":
+        value = ZERO_ADDRESS
+    elif name == "GroupSize":
+        value = len(params.group)
+    elif name == "LogicSigVersion":
+        value = MAX_VERSION
+    elif name == "Round":
+        value = params.round
+    elif name == "LatestTimestamp":
+        value = params.timestamp
+    elif name == "CurrentApplicationID":
+        value = ctx.appID
+    elif name == "CreatorAddress":
+        value = ctx.ledger.getApp(ctx.appID).creator
+    elif name == "CurrentApplicationAddress":
+        value = ctx.appAddress
+    else:
+        value = params.groupID
+    ctx.stack.append(value)
+
+
+# scratch space
+
+
+def _load(ctx: EvalContext, imm: Tuple[int]) -> None:
+    ctx.stack.append(ctx.scratch[imm[0]])
+
+
+def _store(ctx: EvalContext, imm: Tuple[int]) -> None:
+    ctx.scratch[imm[0]] = ctx.stack.pop()
+
+
+def _loads(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(ctx.scratch[_scratchIndex(ctx.popUint())])
+
+
+def _stores(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.stack.pop()
+    ctx.scratch[_scratchIndex(ctx.popUint())] = value
+
+
+def _scratchIndex(index: int) -> int:
+    if index >= 256:
+        raise TealEvalError("invalid Scratch index {}".format(index))
+    return index
+
+
+def _groupScratch(ctx: EvalContext, groupIndex: int, index: int) -> StackValue:
+    if groupIndex >= ctx.groupIndex:
+        raise TealEvalError(
+            "can't use gload on a later or the current transaction {}".format(
+                groupIndex
+            )
+        )
+    scratch = ctx.params.scratches[groupIndex]
+    if scratch is None:
+        raise TealEvalError("txn {} is not an app call".format(groupIndex))
+    return scratch[_scratchIndex(index)]
+
+
+def _gload(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    ctx.stack.append(_groupScratch(ctx, imm[0], imm[1]))
+
+
+def _gloads(ctx: EvalContext, imm: Tuple[int]) -> None:
+    ctx.stack.append(_groupScratch(ctx, ctx.popUint(), imm[0]))
+
+
+def _createdID(ctx: EvalContext, groupIndex: int) -> int:
+    if groupIndex >= ctx.groupIndex:
+        raise TealEvalError(
+            "gaid can't get creatable ID of txn ahead of the current one"
+        )
+    createdID = ctx.params.createdIDs[groupIndex]
+    if createdID is None:
+        raise TealEvalError("txn {} did not create an asset or app".format(groupIndex))
+    return createdID
+
+
+def _gaid(ctx: EvalContext, imm: Tuple[int]) -> None:
+    ctx.stack.append(_createdID(ctx, imm[0]))
+
+
+def _gaids(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(_createdID(ctx, ctx.popUint()))
+
+
+# flow control
+
+
+def _bnz(ctx: EvalContext, imm: int) -> Optional[int]:
+    return imm if ctx.popUint() != 0 else None
+
+
+def _bz(ctx: EvalContext, imm: int) -> Optional[int]:
+    return imm if ctx.popUint() == 0 else None
+
+
+def _b(ctx: EvalContext, imm: int) -> int:
+    return imm
+
+
+def _return(ctx: EvalContext, imm: Any) -> int:
+    value = ctx.popUint()
+    ctx.stack.clear()
+    ctx.stack.append(value)
+    return len(ctx.program.bytecode)
+
+
+def _assert(ctx: EvalContext, imm: Any) -> None:
+    if ctx.popUint() == 0:
+        raise TealEvalError("assert failed")
+
+
+def _callsub(ctx: EvalContext, imm: Tuple[int, int]) -> int:
+    target, returnPc = imm
+    if len(ctx.callstack) >= MAX_STACK_DEPTH:
+        raise TealEvalError("callsub stack overflow")
+    ctx.callstack.append(returnPc)
+    return target
+
+
+def _retsub(ctx: EvalContext, imm: Any) -> int:
+    if not ctx.callstack:
+        raise TealEvalError("retsub with empty callstack")
+    return ctx.callstack.pop()
+
+
+# stack manipulation
+
+
+def _pop(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.pop()
+
+
+def _dup(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(ctx.stack[-1])
+
+
+def _dup2(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.extend((ctx.stack[-2], ctx.stack[-1]))
+
+
+def _dig(ctx: EvalContext, imm: Tuple[int]) -> None:
+    depth = imm[0]
+    if depth >= len(ctx.stack):
+        raise TealEvalError("dig {} with stack size = {}".format(depth, len(ctx.stack)))
+    ctx.stack.append(ctx.stack[-1 - depth])
+
+
+def _swap(ctx: EvalContext, imm: Any) -> None:
+    stack = ctx.stack
+    stack[-1], stack[-2] = stack[-2], stack[-1]
+
+
+def _select(ctx: EvalContext, imm: Any) -> None:
+    condition = ctx.popUint()
+    b = ctx.stack.pop()
+    a = ctx.stack.pop()
+    ctx.stack.append(b if condition != 0 else a)
+
+
+def _cover(ctx: EvalContext, imm: Tuple[int]) -> None:
+    depth = imm[0]
+    if depth >= len(ctx.stack):
+        raise TealEvalError(
+            "cover {} with stack size = {}".format(depth, len(ctx.stack))
+        )
+    value = ctx.stack.pop()
+    ctx.stack.insert(len(ctx.stack) - depth, value)
+
+
+def _uncover(ctx: EvalContext, imm: Tuple[int]) -> None:
+    depth = imm[0]
+    if depth >= len(ctx.stack):
+        raise TealEvalError(
+            "uncover {} with stack size = {}".format(depth, len(ctx.stack))
+        )
+    ctx.stack.append(ctx.stack.pop(-1 - depth))
+
+
+# byte strings
+
+
+def _concat(ctx: EvalContext, imm: Any) -> None:
+    b = ctx.popBytes()
+    a = ctx.popBytes()
+    ctx.pushBytes(a + b)
+
+
+def _substring(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    _pushSubstring(ctx, ctx.popBytes(), imm[0], imm[1])
+
+
+def _substring3(ctx: EvalContext, imm: Any) -> None:
+    end = ctx.popUint()
+    start = ctx.popUint()
+    _pushSubstring(ctx, ctx.popBytes(), start, end)
+
+
+def _pushSubstring(ctx: EvalContext, value: bytes, start: int, end: int) -> None:
+    if end < start:
+        raise TealEvalError("substring end before start")
+    if end > len(value):
+        raise TealEvalError("substring range beyond length of string")
+    ctx.stack.append(value[start:end])
+
+
+def _extract(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    value = ctx.popBytes()
+    start, length = imm
+    # a length of 0 extracts to the end of the string
+    _pushExtract(ctx, value, start, length if length else len(value) - start)
+
+
+def _extract3(ctx: EvalContext, imm: Any) -> None:
+    length = ctx.popUint()
+    start = ctx.popUint()
+    _pushExtract(ctx, ctx.popBytes(), start, length)
+
+
+def _pushExtract(ctx: EvalContext, value: bytes, start: int, length: int) -> None:
+    if start > len(value) or length < 0 or start + length > len(value):
+        raise TealEvalError("extract range beyond length of string")
+    ctx.stack.append(value[start : start + length])
+
+
+def _extractUint(size: int) -> Callable[[EvalContext, Any], None]:
+    def extractUint(ctx: EvalContext, imm: Any) -> None:
+        start = ctx.popUint()
+        value = ctx.popBytes()
+        if start + size > len(value):
+            raise TealEvalError("extract range beyond length of string")
+        ctx.stack.append(int.from_bytes(value[start : start + size], "big"))
+
+    return extractUint
+
+
+def _getbit(ctx: EvalContext, imm: Any) -> None:
+    index = ctx.popUint()
+    target = ctx.stack.pop()
+    if type(target) is int:
+        if index > 63:
+            raise TealEvalError("getbit index > 63 with with Uint")
+        ctx.stack.append((target >> index) & 1)
+        return
+    if index >= len(target) * 8:  # type: ignore
+        raise TealEvalError("getbit index beyond byteslice")
+    ctx.stack.append((target[index // 8] >> (7 - index % 8)) & 1)  # type: ignore
+
+
+def _setbit(ctx: EvalContext, imm: Any) -> None:
+    bit = ctx.popUint()
+    index = ctx.popUint()
+    target = ctx.stack.pop()
+    if bit > 1:
+        raise TealEvalError("setbit value > 1")
+    if type(target) is int:
+        if index > 63:
+            raise TealEvalError("setbit index > 63 with Uint")
+        mask = 1 << index
+        ctx.stack.append(target | mask if bit else target & ~mask)
+        return
+    if index >= len(target) * 8:  # type: ignore
+        raise TealEvalError("setbit index beyond byteslice")
+    updated = bytearray(target)  # type: ignore
+    mask = 1 << (7 - index % 8)
+    if bit:
+        updated[index // 8] |= mask
+    else:
+        updated[index // 8] &= ~mask & 0xFF
+    ctx.stack.append(bytes(updated))
+
+
+def _getbyte(ctx: EvalContext, imm: Any) -> None:
+    index = ctx.popUint()
+    value = ctx.popBytes()
+    if index >= len(value):
+        raise TealEvalError("getbyte index beyond array length")
+    ctx.stack.append(value[index])
+
+
+def _setbyte(ctx: EvalContext, imm: Any) -> None:
+    byte = ctx.popUint()
+    index = ctx.popUint()
+    value = ctx.popBytes()
+    if index >= len(value):
+        raise TealEvalError("setbyte index beyond array length")
+    if byte > 255:
+        raise TealEvalError("setbyte value > 255")
+    ctx.stack.append(value[:index] + bytes([byte]) + value[index + 1 :])
+
+
+# byte math
+
+
+def _bigInt(value: bytes) -> int:
+    if len(value) > MAX_BYTE_MATH_LENGTH:
+        raise TealEvalError("math attempted on large byte-array")
+    return int.from_bytes(value, "big")
+
+
+def _intBytes(value: int) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def _byteMath(fn: Callable[[int, int], int]) -> Callable[[EvalContext, Any], None]:
+    def byteMath(ctx: EvalContext, imm: Any) -> None:
+        b = _bigInt(ctx.popBytes())
+        a = _bigInt(ctx.popBytes())
+        ctx.stack.append(_intBytes(fn(a, b)))
+
+    return byteMath
+
+
+def _byteCompare(fn: Callable[[int, int], bool]) -> Callable[[EvalContext, Any], None]:
+    def byteCompare(ctx: EvalContext, imm: Any) -> None:
+        b = _bigInt(ctx.popBytes())
+        a = _bigInt(ctx.popBytes())
+        ctx.stack.append(int(fn(a, b)))
+
+    return byteCompare
+
+
+def _byteSub(a: int, b: int) -> int:
+    if b > a:
+        raise TealEvalError("byte math would have negative result")
+    return a - b
+
+
+def _byteDiv(a: int, b: int) -> int:
+    if b == 0:
+        raise TealEvalError("division by zero")
+    return a // b
+
+
+def _byteMod(a: int, b: int) -> int:
+    if b == 0:
+        raise TealEvalError("modulo by zero")
+    return a % b
+
+
+def _byteLogic(fn: Callable[[int, int], int]) -> Callable[[EvalContext, Any], None]:
+    def byteLogic(ctx: EvalContext, imm: Any) -> None:
+        b = ctx.popBytes()
+        a = ctx.popBytes()
+        # the shorter operand is zero-padded on the left
+        length = max(len(a), len(b))
+        result = fn(int.from_bytes(a, "big"), int.from_bytes(b, "big"))
+        ctx.stack.append(result.to_bytes(length, "big"))
+
+    return byteLogic
+
+
+def _byteNot(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.popBytes()
+    ctx.stack.append(bytes(b ^ 0xFF for b in value))
+
+
+def _bzero(ctx: EvalContext, imm: Any) -> None:
+    length = ctx.popUint()
+    if length > MAX_BYTES_LENGTH:
+        raise TealEvalError("bzero attempted to create a too large string")
+    ctx.stack.append(bytes(length))
+
+
+# ledger state
+
+
+def _balance(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(ctx.ledger.balance(ctx.accountReference(ctx.stack.pop())))
+
+
+def _minBalance(ctx: EvalContext, imm: Any) -> None:
+    ctx.stack.append(ctx.ledger.minBalance(ctx.accountReference(ctx.stack.pop())))
+
+
+def _appOptedIn(ctx: EvalContext, imm: Any) -> None:
+    appID = ctx.appReference(ctx.popUint())
+    address = ctx.accountReference(ctx.stack.pop())
+    ctx.stack.append(int(ctx.ledger.getLocalState(address, appID) is not None))
+
+
+def _appLocalGet(ctx: EvalContext, imm: Any) -> None:
+    key = ctx.popBytes()
+    address = ctx.accountReference(ctx.stack.pop())
+    ctx.stack.append(ctx.localState(address, ctx.appID).get(key, 0))
+
+
+def _appLocalGetEx(ctx: EvalContext, imm: Any) -> None:
+    key = ctx.popBytes()
+    appID = ctx.appReference(ctx.popUint())
+    address = ctx.accountReference(ctx.stack.pop())
+    value = ctx.localState(address, appID).get(key)
+    ctx.stack.extend((0, 0) if value is None else (value, 1))
+
+
+def _appGlobalGet(ctx: EvalContext, imm: Any) -> None:
+    key = ctx.popBytes()
+    ctx.stack.append(ctx.globalState(ctx.appID).get(key, 0))
+
+
+def _appGlobalGetEx(ctx: EvalContext, imm: Any) -> None:
+    key = ctx.popBytes()
+    appID = ctx.appReference(ctx.popUint())
+    value = ctx.globalState(appID).get(key)
+    ctx.stack.extend((0, 0) if value is None else (value, 1))
+
+
+def _appLocalPut(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.stack.pop()
+    key = ctx.popBytes()
+    address = ctx.accountReference(ctx.stack.pop())
+    _checkKeyValue(key, value)
+    ctx.localState(address, ctx.appID)
+    ctx.ledger.setLocal(address, ctx.appID, key, value)
+
+
+def _appGlobalPut(ctx: EvalContext, imm: Any) -> None:
+    value = ctx.stack.pop()
+    key = ctx.popBytes()
+    _checkKeyValue(key, value)
+    ctx.ledger.setGlobal(ctx.appID, key, value)
+
+
+def _appLocalDel(ctx: EvalContext, imm: Any) -> None:
+    key = ctx.popBytes()
+    address = ctx.accountReference(ctx.stack.pop())
+    ctx.localState(address, ctx.appID)
+    ctx.ledger.deleteLocal(address, ctx.appID, key)
+
+
+def _appGlobalDel(ctx: EvalContext, imm: Any) -> None:
+    ctx.ledger.deleteGlobal(ctx.appID, ctx.popBytes())
+
+
+def _assetHoldingGet(ctx: EvalContext, imm: Tuple[int]) -> None:
+    assetID = ctx.assetReference(ctx.popUint())
+    address = ctx.accountReference(ctx.stack.pop())
+    holding = ctx.ledger.getAssetHolding(address, assetID)
+    if holding is None:
+        ctx.stack.extend((0, 0))
+    elif imm[0] == 0:
+        ctx.stack.extend((holding.amount, 1))
+    else:
+        ctx.stack.extend((int(holding.frozen), 1))
+
+
+_ASSET_PARAMS = OPS_BY_NAME["asset_params_get"]["ArgEnum"]
+_APP_PARAMS = OPS_BY_NAME["app_params_get"]["ArgEnum"]
+
+
+def _assetParamsGet(ctx: EvalContext, imm: Tuple[int]) -> None:
+    asset = ctx.ledger.getAsset(ctx.assetReference(ctx.popUint()))
+    if asset is None:
+        ctx.stack.extend((0, 0))
+        return
+    name = _ASSET_PARAMS[imm[0]]
+    if name == "AssetCreator":
+        value: StackValue = asset.creator
+    else:
+        # the asset params are kept in the same encoding as a txn's "apar"
+        value = _GETTERS["ConfigAsset" + name[len("Asset") :]]({"apar": asset.params})
+    ctx.stack.extend((value, 1))
+
+
+def _appParamsGet(ctx: EvalContext, imm: Tuple[int]) -> None:
+    appID = ctx.appReference(ctx.popUint())
+    app = ctx.ledger.getApp(appID)
+    if app is None:
+        ctx.stack.extend((0, 0))
+        return
+    name = _APP_PARAMS[imm[0]]
+    if name == "AppApprovalProgram":
+        value: StackValue = app.approvalProgram
+    elif name == "AppClearStateProgram":
+        value = app.clearProgram
+    elif name == "AppGlobalNumUint":
+        value = app.globalSchema[0]
+    elif name == "AppGlobalNumByteSlice":
+        value = app.globalSchema[1]
+    elif name == "AppLocalNumUint":
+        value = app.localSchema[0]
+    elif name == "AppLocalNumByteSlice":
+        value = app.localSchema[1]
+    elif name == "AppExtraProgramPages":
+        value = app.extraPages
+    elif name == "AppCreator":
+        value = app.creator
+    else:
+        value = encoding.decode_address(get_application_address(appID))
+    ctx.stack.extend((value, 1))
+
+
+# logs and inner transactions
+
+
+def _log(ctx: EvalContext, imm: Any) -> None:
+    message = ctx.popBytes()
+    if len(ctx.logs) >= MAX_LOGS:
+        raise TealEvalError(
+            "too many log calls in program. up to {} is allowed".format(MAX_LOGS)
+        )
+    if sum(len(l) for l in ctx.logs) + len(message) > MAX_LOG_SIZE:
+        raise TealEvalError(
+            "program logs too large. {} bytes > {} bytes limit".format(
+                sum(len(l) for l in ctx.logs) + len(message), MAX_LOG_SIZE
+            )
+        )
+    ctx.logs.append(message)
+
+
+def _itxnBegin(ctx: EvalContext, imm: Any) -> None:
+    if ctx.building is not None:
+        raise TealEvalError("itxn_begin without itxn_submit")
+    if len(ctx.innerTxns) >= MAX_INNER_TXNS:
+        raise TealEvalError("itxn_begin with too many inner transactions")
+    # the fee defaults to the minimum, less what the group overpaid so far
+    fee = max(MIN_TXN_FEE - ctx.params.feeCredit, 0)
+    ctx.building = {"snd": ctx.appAddress}
+    if fee:
+        ctx.building["fee"] = fee
+
+
+def _itxnField(ctx: EvalContext, imm: Tuple[int]) -> None:
+    if ctx.building is None:
+        raise TealEvalError("itxn_field without itxn_begin")
+    name = TXN_FIELDS[imm[0]]
+    if name not in _INNER_FIELDS:
+        raise TealEvalError("invalid itxn_field {}".format(name))
+    value = ctx.stack.pop()
+    txn = ctx.building
+
+    if name in ("Type", "TypeEnum"):
+        if name == "Type":
+            if type(value) is not bytes:
+                raise TealEvalError("Type must be []byte")
+            txnType = value.decode(errors="replace")
+        else:
+            if type(value) is not int:
+                raise TealEvalError("TypeEnum must be uint64")
+            txnType = TXN_TYPES_BY_ENUM.get(value, str(value))
+        if txnType not in INNER_TXN_TYPES:
+            raise TealEvalError("{} is not a valid type for itxn_field".format(txnType))
+        txn["type"] = txnType
+        return
+
+    path, kind = _FIELD_PATHS[name]
+    if kind in ("uint", "bool"):
+        if type(value) is not int:
+            raise TealEvalError("{} must be uint64".format(name))
+        if kind == "bool":
+            if value > 1:
+                raise TealEvalError("boolean is not 0 or 1")
+            value = bool(value)
+    else:
+        if type(value) is not bytes:
+            raise TealEvalError("{} must be []byte".format(name))
+        if kind in ("address", "hash") and len(value) != 32:
+            raise TealEvalError("{} must be 32 bytes".format(name))
+        if kind == "string":
+            try:
+                value = value.decode()
+            except UnicodeDecodeError:
+                raise TealEvalError("{} must be valid UTF-8".format(name))
+    if name == "Sender" and value != ctx.appAddress:
+        raise TealEvalError("unauthorized Sender {}".format(_address(value)))
+
+    container = txn
+    for key in path[:-1]:
+        container = container.setdefault(key, {})
+    # keep the transaction in canonical form: empty values are omitted
+    if value or value is True:
+        container[path[-1]] = value
+    else:
+        container.pop(path[-1], None)
+
+
+def _itxnSubmit(ctx: EvalContext, imm: Any) -> None:
+    txn = ctx.building
+    if txn is None:
+        raise TealEvalError("itxn_submit without itxn_begin")
+    if "type" not in txn:
+        raise TealEvalError("inner transaction has no Type")
+    ctx.building = None
+
+    # an inner transaction paying less than the minimum fee draws on the credit
+    # of the group, one paying more adds to it
+    params = ctx.params
+    params.feeCredit += txn.get("fee", 0) - MIN_TXN_FEE
+    if params.feeCredit < 0:
+        raise TealEvalError("fee too small")
+    txn["fv"] = ctx.txn.get("fv", 0)
+    txn["lv"] = ctx.txn.get("lv", 0)
+    applyData = ctx.ledger.applyInner(dict(sorted(txn.items())), params)
+    ctx.innerTxns.append((txn, applyData))
+
+
+def _itxn(ctx: EvalContext, imm: Tuple[int]) -> None:
+    ctx.stack.append(_innerField(ctx, imm[0]))
+
+
+def _itxna(ctx: EvalContext, imm: Tuple[int, int]) -> None:
+    ctx.stack.append(_innerField(ctx, imm[0], imm[1]))
+
+
+def _innerField(
+    ctx: EvalContext, field: int, index: Optional[int] = None
+) -> StackValue:
+    if not ctx.innerTxns:
+        raise TealEvalError("no inner transaction available")
+    txn, applyData = ctx.innerTxns[-1]
+    return _txnField(ctx, 0, field, index, txn, applyData)
+
+
+HANDLERS: Dict[str, Callable[[EvalContext, Any], Optional[int]]] = {
+    "err": _err,
+    "sha256": _hasher("sha256"),
+    "keccak256": _hasher("keccak256"),
+    "sha512_256": _hasher("sha512_256"),
+    "ed25519verify": _ed25519verify,
+    "ecdsa_verify": _unsupported("ecdsa_verify"),
+    "ecdsa_pk_decompress": _unsupported("ecdsa_pk_decompress"),
+    "ecdsa_pk_recover": _unsupported("ecdsa_pk_recover"),
+    "+": _uintOp("+", _add),
+    "-": _uintOp("-", _sub),
+    "/": _uintOp("/", _div),
+    "*": _uintOp("*", _mul),
+    "<": _uintOp("<", lambda a, b: int(a < b)),
+    ">": _uintOp(">", lambda a, b: int(a > b)),
+    "<=": _uintOp("<=", lambda a, b: int(a <= b)),
+    ">=": _uintOp(">=", lambda a, b: int(a >= b)),
+    "&&": _uintOp("&&", lambda a, b: int(a != 0 and b != 0)),
+    "||": _uintOp("||", lambda a, b: int(a != 0 or b != 0)),
+    "==": _equal,
+    "!=": _notEqual,
+    "!": _not,
+    "len": _len,
+    "itob": _itob,
+    "btoi": _btoi,
+    "%": _uintOp("%", _mod),
+    "|": _uintOp("|", lambda a, b: a | b),
+    "&": _uintOp("&", lambda a, b: a & b),
+    "^": _uintOp("^", lambda a, b: a ^ b),
+    "~": _bitNot,
+    "mulw": _mulw,
+    "addw": _addw,
+    "divmodw": _divmodw,
+    "intcblock": _intcblock,
+    "intc": _intc,
+    "intc_0": _intcN(0),
+    "intc_1": _intcN(1),
+    "intc_2": _intcN(2),
+    "intc_3": _intcN(3),
+    "bytecblock": _bytecblock,
+    "bytec": _bytec,
+    "bytec_0": _bytecN(0),
+    "bytec_1": _bytecN(1),
+    "bytec_2": _bytecN(2),
+    "bytec_3": _bytecN(3),
+    "arg": _notInApplications("arg"),
+    "arg_0": _notInApplications("arg_0"),
+    "arg_1": _notInApplications("arg_1"),
+    "arg_2": _notInApplications("arg_2"),
+    "arg_3": _notInApplications("arg_3"),
+    "args": _notInApplications("args"),
+    "txn": _txn,
+    "global": _global,
+    "gtxn": _gtxn,
+    "load": _load,
+    "store": _store,
+    "txna": _txna,
+    "gtxna": _gtxna,
+    "gtxns": _gtxns,
+    "gtxnsa": _gtxnsa,
+    "gload": _gload,
+    "gloads": _gloads,
+    "gaid": _gaid,
+    "gaids": _gaids,
+    "loads": _loads,
+    "stores": _stores,
+    "bnz": _bnz,
+    "bz": _bz,
+    "b": _b,
+    "return": _return,
+    "assert": _assert,
+    "pop": _pop,
+    "dup": _dup,
+    "dup2": _dup2,
+    "dig": _dig,
+    "swap": _swap,
+    "select": _select,
+    "cover": _cover,
+    "uncover": _uncover,
+    "concat": _concat,
+    "substring": _substring,
+    "substring3": _substring3,
+    "getbit": _getbit,
+    "setbit": _setbit,
+    "getbyte": _getbyte,
+    "setbyte": _setbyte,
+    "extract": _extract,
+    "extract3": _extract3,
+    "extract_uint16": _extractUint(2),
+    "extract_uint32": _extractUint(4),
+    "extract_uint64": _extractUint(8),
+    "balance": _balance,
+    "app_opted_in": _appOptedIn,
+    "app_local_get": _appLocalGet,
+    "app_local_get_ex": _appLocalGetEx,
+    "app_global_get": _appGlobalGet,
+    "app_global_get_ex": _appGlobalGetEx,
+    "app_local_put": _appLocalPut,
+    "app_global_put": _appGlobalPut,
+    "app_local_del": _appLocalDel,
+    "app_global_del": _appGlobalDel,
+    "asset_holding_get": _assetHoldingGet,
+    "asset_params_get": _assetParamsGet,
+    "app_params_get": _appParamsGet,
+    "min_balance": _minBalance,
+    "pushbytes": _pushbytes,
+    "pushint": _pushint,
+    "callsub": _callsub,
+    "retsub": _retsub,
+    "shl": _uintOp("shl", _shl),
+    "shr": _uintOp("shr", _shr),
+    "sqrt": _sqrt,
+    "bitlen": _bitlen,
+    "exp": _uintOp("exp", _exp),
+    "expw": _expw,
+    "b+": _byteMath(lambda a, b: a + b),
+    "b-": _byteMath(_byteSub),
+    "b/": _byteMath(_byteDiv),
+    "b*": _byteMath(lambda a, b: a * b),
+    "b<": _byteCompare(lambda a, b: a < b),
+    "b>": _byteCompare(lambda a, b: a > b),
+    "b<=": _byteCompare(lambda a, b: a <= b),
+    "b>=": _byteCompare(lambda a, b: a >= b),
+    "b==": _byteCompare(lambda a, b: a == b),
+    "b!=": _byteCompare(lambda a, b: a != b),
+    "b%": _byteMath(_byteMod),
+    "b|": _byteLogic(lambda a, b: a | b),
+    "b&": _byteLogic(lambda a, b: a & b),
+    "b^": _byteLogic(lambda a, b: a ^ b),
+    "b~": _byteNot,
+    "bzero": _bzero,
+    "log": _log,
+    "itxn_begin": _itxnBegin,
+    "itxn_field": _itxnField,
+    "itxn_submit": _itxnSubmit,
+    "itxn": _itxn,
+    "itxna": _itxna,
+}
@@ -0,0 +1,227 @@
+"""Stream of decoded governor events read from the blocks of the chain.
+
+GovernorEventStream follows blocks with status_after_block/block_info and
+yields a GovernorEvent for every transaction that calls the governor app, with
+its method name and the global and local state deltas it applied. It reads
+blocks in msgpack format and fetches several blocks concurrently while it is
+behind the tip of the chain, so replaying history is much faster than real
+time. Progress can be checkpointed to a file and resumed from.
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+import msgpack
+from algosdk import encoding
+from algosdk.v2client.algod import AlgodClient
+
+from .contracts.methods import METHOD_NAMES, SELECTORS
+
+StateValue = Union[int, bytes]
+# a state delta maps each changed key to its new value, or None if it was deleted
+StateDelta = Dict[bytes, Optional[StateValue]]
+
+# methods dispatched on by Governor.approval_program
+GOVERNOR_METHODS = tuple(SELECTORS)
+
+# event kinds of application calls that are not NoOp method calls
+ON_COMPLETION_KINDS = {
+    1: "opt_in",
+    2: "claim",  # close out
+    3: "clear_state",
+    4: "update",
+    5: "delete",
+}
+
+SET_BYTES_ACTION = 1
+SET_UINT_ACTION = 2
+DELETE_ACTION = 3
+
+
+class GovernorEvent(NamedTuple):
+    round: int
+    index: int  # position of the transaction in its block
+    timestamp: int
+    kind: str  # a GOVERNOR_METHODS name, an ON_COMPLETION_KINDS value, "create" or "unknown"
+    sender: str
+    appArgs: List[bytes]
+    accounts: List[str]
+    foreignApps: List[int]
+    globalDelta: StateDelta
+    localDelta: Dict[str, StateDelta]
+
+
+def decodeEvalDelta(delta: Dict[bytes, Any]) -> StateDelta:
+    """Decode a msgpack state delta from a block."""
+    decoded: StateDelta = dict()
+    for key, value in delta.items():
+        action = value.get(b"at")
+        if action == SET_UINT_ACTION:
+            decoded[key] = value.get(b"ui", 0)
+        elif action == SET_BYTES_ACTION:
+            decoded[key] = value.get(b"bs", b"")
+        elif action == DELETE_ACTION:
+            decoded[key] = None
+        else:
+            raise Exception(f"Unexpected delta action: {action}")
+    return decoded
+
+
+def decodeGovernorEvents(block: Dict[bytes, Any], appID: int) -> List[GovernorEvent]:
+    """Decode the governor events of one msgpack-decoded block."""
+    header = block[b"block"]
+    round = header.get(b"rnd", 0)
+    timestamp = header.get(b"ts", 0)
+
+    events: List[GovernorEvent] = []
+    for index, stib in enumerate(header.get(b"txns", [])):
+        txn = stib[b"txn"]
+        if txn.get(b"type") != b"appl":
+            continue
+
+        calledID = txn.get(b"apid", 0)
+        if calledID != appID and not (calledID == 0 and stib.get(b"apid") == appID):
+            continue
+
+        sender = encoding.encode_address(txn[b"snd"])
+        appArgs: List[bytes] = txn.get(b"apaa", [])
+        accounts = [encoding.encode_address(a) for a in txn.get(b"apat", [])]
+        onCompletion = txn.get(b"apan", 0)
+
+        if calledID == 0:
+            kind = "create"
+        elif onCompletion != 0:
+            kind = ON_COMPLETION_KINDS.get(onCompletion, "unknown")
+        elif appArgs:
+            kind = METHOD_NAMES.get(appArgs[0], "unknown")
+        else:
+            kind = "unknown"
+
+        evalDelta = stib.get(b"dt", {})
+        localDelta: Dict[str, StateDelta] = dict()
+        for accountIndex, delta in evalDelta.get(b"ld", {}).items():
+            # index 0 is the sender, i is Accounts[i - 1]
+            address = sender if accountIndex == 0 else accounts[accountIndex - 1]
+            localDelta[address] = decodeEvalDelta(delta)
+
+        events.append(
+            GovernorEvent(
+                round=round,
+                index=index,
+                timestamp=timestamp,
+                kind=kind,
+                sender=sender,
+                appArgs=appArgs,
+                accounts=accounts,
+                foreignApps=txn.get(b"apfa", []),
+                globalDelta=decodeEvalDelta(evalDelta.get(b"gd", {})),
+                localDelta=localDelta,
+            )
+        )
+
+    return events
+
+
+class GovernorEventStream:
+    """Follows the chain and yields the events of one governor app.
+
+    Args:
+        client: An algod client.
+        appID: The governor app ID.
+        startRound: The first round to read. Defaults to the round after the
+            checkpoint, or the next round to be produced if there is none.
+        checkpointPath: A file recording the last fully processed round.
+        prefetch: The number of blocks fetched concurrently while catching up.
+        checkpointEvery: How many rounds to process between checkpoint writes
+            while catching up. The checkpoint is always written once caught up.
+    """
+
+    def __init__(
+        self,
+        client: AlgodClient,
+        appID: int,
+        startRound: Optional[int] = None,
+        checkpointPath: Optional[Union[str, Path]] = None,
+        prefetch: int = 16,
+        checkpointEvery: int = 100,
+    ) -> None:
+        self.client = client
+        self.appID = appID
+        self.checkpointPath = Path(checkpointPath) if checkpointPath else None
+        self.prefetch = prefetch
+        self.checkpointEvery = checkpointEvery
+
+        if startRound is None:
+            checkpoint = self.readCheckpoint()
+            if checkpoint is not None:
+                startRound = checkpoint + 1
+        # the next round to process, resolved lazily if still unknown
+        self.nextRound = startRound
+        self.blocksRead = 0
+
+    def readCheckpoint(self) -> Optional[int]:
+        if self.checkpointPath is None:
+            return None
+        try:
+            return int(self.checkpointPath.read_text())
+        except FileNotFoundError:
+            return None
+
+    def writeCheckpoint(self, round: int) -> None:
+        if self.checkpointPath is None:
+            return
+        fd, tmp = tempfile.mkstemp(
+            dir=self.checkpointPath.parent, prefix=self.checkpointPath.name
+        )
+        with os.fdopen(fd, "w") as f:
+            f.write(str(round))
+        os.replace(tmp, self.checkpointPath)
+
+    def getBlock(self, round: int) -> Dict[bytes, Any]:
+        raw = self.client.block_info(round, response_format="msgpack")
+        return msgpack.unpackb(raw, raw=True, strict_map_key=False)
+
+    def __iter__(self) -> Iterator[GovernorEvent]:
+        return self.events()
+
+    def events(self, untilRound: Optional[int] = None) -> Iterator[GovernorEvent]:
+        """Yield events in chain order, waiting for new blocks as they are made.
+
+        Args:
+            untilRound: Stop after this round instead of following forever.
+        """
+        tip = self.client.status()["last-round"]
+        if self.nextRound is None:
+            self.nextRound = tip + 1
+        sinceCheckpoint = 0
+
+        with ThreadPoolExecutor(max_workers=self.prefetch) as executor:
+            while untilRound is None or self.nextRound <= untilRound:
+                if self.nextRound > tip:
+                    # caught up: checkpoint, then wait for the next block
+                    if sinceCheckpoint:
+                        self.writeCheckpoint(self.nextRound - 1)
+                        sinceCheckpoint = 0
+                    tip = self.client.status_after_block(self.nextRound - 1)[
+                        "last-round"
+                    ]
+                    continue
+
+                last = min(tip, self.nextRound + self.prefetch - 1)
+                if untilRound is not None:
+                    last = min(last, untilRound)
+                rounds = range(self.nextRound, last + 1)
+                for round, block in zip(rounds, executor.map(self.getBlock, rounds)):
+                    self.blocksRead += 1
+                    for event in decodeGovernorEvents(block, self.appID):
+                        yield event
+                    self.nextRound = round + 1
+                    sinceCheckpoint += 1
+                    if sinceCheckpoint >= self.checkpointEvery:
+                        self.writeCheckpoint(round)
+                        sinceCheckpoint = 0
+
+        if sinceCheckpoint:
+            self.writeCheckpoint(self.nextRound - 1)
@@ -0,0 +1,1370 @@
+"""An in-process Algorand network for running the contracts without a node.
+
+LocalLedger keeps accounts, assets and apps in memory and evaluates
+transaction groups with the TEAL interpreter in gov.evaluator, so the real
+compiled Governor and Proposal programs run as they would on algod.
+LocalAlgodClient is an AlgodClient that answers requests from a LocalLedger,
+so gov.operations and the gov.util readers run against it unchanged.
+
+Time is virtual. Blocks are made on demand, each blockTime seconds after the
+previous one, when a client waits for a round while transactions are pending,
+or when makeBlock or advanceTime is called. Like on a live network, a
+transaction sent after round R is confirmed in round R + 2, since the block of
+round R + 1 is already being agreed on. With devMode=True every group is
+confirmed in a block of its own as soon as it is sent, as in the sandbox's dev
+mode.
+
+Only single-signature transactions are supported, and there are no rewards,
+leases or participation keys.
+"""
+import re
+import threading
+import time
+from base64 import b32encode, b64encode
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import msgpack
+from algosdk import account, encoding, error, logic
+from algosdk.v2client.algod import AlgodClient
+
+from .account import Account
+from .evaluator import (
+    MAX_TXN_LIFE,
+    MIN_BALANCE,
+    MIN_TXN_FEE,
+    ZERO_ADDRESS,
+    EvalParams,
+    Program,
+    StackValue,
+    TealEvalError,
+    Tracer,
+    evaluate,
+)
+
+GENESIS_ID = "local-v1"
+GENESIS_BALANCE = 10 ** 15
+CONSENSUS_VERSION = "future"
+
+MAX_GROUP_SIZE = 16
+MAX_NOTE_SIZE = 1024
+MAX_APP_ARGS = 16
+MAX_APP_TOTAL_ARG_LENGTH = 2048
+MAX_APP_ACCOUNTS = 4
+MAX_APP_FOREIGN_APPS = 8
+MAX_APP_FOREIGN_ASSETS = 8
+MAX_APP_TOTAL_REFERENCES = 8
+MAX_APP_PROGRAM_LENGTH = 2048
+MAX_EXTRA_APP_PAGES = 3
+MAX_GLOBAL_SCHEMA_ENTRIES = 64
+MAX_LOCAL_SCHEMA_ENTRIES = 16
+
+ASSET_MIN_BALANCE = 100_000
+APP_FLAT_MIN_BALANCE = 100_000
+SCHEMA_UINT_MIN_BALANCE = 28_500
+SCHEMA_BYTES_MIN_BALANCE = 50_000
+
+NO_OP = 0
+OPT_IN = 1
+CLOSE_OUT = 2
+CLEAR_STATE = 3
+UPDATE_APPLICATION = 4
+DELETE_APPLICATION = 5
+
+# msgpack transaction fields holding addresses, shown as base32 in JSON
+_ADDRESS_FIELDS = {"snd", "rcv", "close", "asnd", "arcv", "aclose", "rekey", "fadd"}
+_ASSET_ADDRESS_FIELDS = {"m", "r", "f", "c"}
+
+_MISSING = object()
+_ATTRIBUTE = object()
+
+
+class Holding(NamedTuple):
+    amount: int
+    frozen: bool
+
+
+class App:
+    __slots__ = (
+        "creator",
+        "approvalProgram",
+        "clearProgram",
+        "globalState",
+        "globalSchema",
+        "localSchema",
+        "extraPages",
+    )
+
+    def __init__(
+        self,
+        creator: bytes,
+        approvalProgram: bytes,
+        clearProgram: bytes,
+        globalSchema: Tuple[int, int],
+        localSchema: Tuple[int, int],
+        extraPages: int,
+    ) -> None:
+        self.creator = creator
+        self.approvalProgram = approvalProgram
+        self.clearProgram = clearProgram
+        self.globalState: Dict[bytes, StackValue] = dict()
+        self.globalSchema = globalSchema
+        self.localSchema = localSchema
+        self.extraPages = extraPages
+
+
+class Asset:
+    __slots__ = ("creator", "params")
+
+    def __init__(self, creator: bytes, params: Dict[str, Any]) -> None:
+        self.creator = creator
+        # in the same encoding as the "apar" field of the creating transaction
+        self.params = params
+
+
+class AccountData:
+    __slots__ = (
+        "amount",
+        "assets",
+        "apps",
+        "appSchemas",
+        "createdApps",
+        "createdAssets",
+        "authAddr",
+    )
+
+    def __init__(self) -> None:
+        self.amount = 0
+        self.assets: Dict[int, Holding] = dict()
+        # app ID -> local state, and the local schema it was opted in with
+        self.apps: Dict[int, Dict[bytes, StackValue]] = dict()
+        self.appSchemas: Dict[int, Tuple[int, int]] = dict()
+        self.createdApps: Dict[int, None] = dict()
+        self.createdAssets: Dict[int, None] = dict()
+        self.authAddr: Optional[bytes] = None
+
+    def isEmpty(self) -> bool:
+        return not (
+            self.amount
+            or self.assets
+            or self.apps
+            or self.createdApps
+            or self.createdAssets
+        )
+
+
+class _Rejected(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+        self.message = message
+
+
+class _Group(NamedTuple):
+    stxns: List[Dict[str, Any]]
+    txns: List[Dict[str, Any]]
+    # "TX" followed by the msgpack encoding of each transaction, which is signed
+    signedBytes: List[bytes]
+    txIDs: List[bytes]
+    ids: List[str]
+    groupID: bytes
+    feeCredit: int
+
+
+class _TxnInfo:
+    __slots__ = ("stxn", "confirmedRound", "applyData", "poolError")
+
+    def __init__(self, stxn: Dict[str, Any]) -> None:
+        self.stxn = stxn
+        self.confirmedRound: Optional[int] = None
+        self.applyData: Dict[str, Any] = dict()
+        self.poolError = ""
+
+
+class LocalLedger:
+    """An in-memory ledger that evaluates transactions like algod.
+
+    Args:
+        numAccounts: The number of funded genesis accounts.
+        blockTime: The seconds between consecutive blocks.
+        devMode: Confirm each group in a block of its own as soon as it is sent.
+        timestamp: The timestamp of the genesis block. Defaults to now.
+        verifySignatures: Check transaction signatures. Turning this off speeds
+            up load tests.
+        waitTimeout: The seconds a wait for a new round lasts when there is
+            nothing to put in a block, as algod's wait-for-block-after.
+        tracer: Passed to the evaluator for every app call, see
+            gov.evaluator.EvalParams. Outside of devMode a group is evaluated
+            both when it is sent and in its block.
+    """
+
+    def __init__(
+        self,
+        numAccounts: int = 3,
+        blockTime: int = 4,
+        devMode: bool = False,
+        timestamp: Optional[int] = None,
+        verifySignatures: bool = True,
+        waitTimeout: float = 60,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
+        self.blockTime = blockTime
+        self.devMode = devMode
+        self.verifySignatures = verifySignatures
+        self.waitTimeout = waitTimeout
+        self.tracer = tracer
+        self.genesisHash = encoding.checksum(GENESIS_ID.encode())
+
+        self.accounts: Dict[bytes, AccountData] = dict()
+        self.apps: Dict[int, App] = dict()
+        self.assets: Dict[int, Asset] = dict()
+        self.txnCounter = 0
+        self.programs: Dict[bytes, Program] = dict()
+
+        self.blocks: List[Dict[str, Any]] = [
+            {
+                "gen": GENESIS_ID,
+                "gh": self.genesisHash,
+                "rnd": 0,
+                "ts": int(time.time()) if timestamp is None else timestamp,
+                "txns": [],
+            }
+        ]
+        self.transactions: Dict[str, _TxnInfo] = dict()
+        # groups waiting for a block, with the last round when they were sent
+        self.pool: List[Tuple[_Group, int]] = []
+
+        # (container, key, previous value) of each write since the last commit
+        self.journal: List[Tuple[Any, Any, Any]] = []
+        self.touched: Set[bytes] = set()
+
+        self.lock = threading.RLock()
+        self.condition = threading.Condition(self.lock)
+
+        self.genesisAccounts: List[Account] = []
+        for _ in range(numAccounts):
+            genesisAccount = Account(account.generate_account()[0])
+            data = AccountData()
+            data.amount = GENESIS_BALANCE
+            self.accounts[encoding.decode_address(genesisAccount.getAddress())] = data
+            self.genesisAccounts.append(genesisAccount)
+
+    @property
+    def round(self) -> int:
+        """The last round."""
+        return self.blocks[-1]["rnd"]
+
+    @property
+    def timestamp(self) -> int:
+        """The timestamp of the last block, the time programs see."""
+        return self.blocks[-1]["ts"]
+
+    # journaled writes
+
+    def _setItem(self, container: Dict[Any, Any], key: Any, value: Any) -> None:
+        self.journal.append((container, key, container.get(key, _MISSING)))
+        container[key] = value
+
+    def _deleteItem(self, container: Dict[Any, Any], key: Any) -> None:
+        if key in container:
+            self.journal.append((container, key, container[key]))
+            del container[key]
+
+    def _setAttr(self, target: Any, name: str, value: Any) -> None:
+        self.journal.append((_ATTRIBUTE, (target, name), getattr(target, name)))
+        setattr(target, name, value)
+
+    def _rollback(self, mark: int) -> None:
+        for container, key, previous in reversed(self.journal[mark:]):
+            if container is _ATTRIBUTE:
+                setattr(key[0], key[1], previous)
+            elif previous is _MISSING:
+                container.pop(key, None)
+            else:
+                container[key] = previous
+        del self.journal[mark:]
+
+    # the Ledger protocol of gov.evaluator
+
+    def balance(self, address: bytes) -> int:
+        data = self.accounts.get(address)
+        return 0 if data is None else data.amount
+
+    def minBalance(self, address: bytes) -> int:
+        data = self.accounts.get(address)
+        if data is None:
+            return MIN_BALANCE
+        total = MIN_BALANCE + ASSET_MIN_BALANCE * len(data.assets)
+        for numUint, numBytes in data.appSchemas.values():
+            total += (
+                APP_FLAT_MIN_BALANCE
+                + SCHEMA_UINT_MIN_BALANCE * numUint
+                + SCHEMA_BYTES_MIN_BALANCE * numBytes
+            )
+        for appID in data.createdApps:
+            app = self.apps[appID]
+            total += (
+                APP_FLAT_MIN_BALANCE * (1 + app.extraPages)
+                + SCHEMA_UINT_MIN_BALANCE * app.globalSchema[0]
+                + SCHEMA_BYTES_MIN_BALANCE * app.globalSchema[1]
+            )
+        return total
+
+    def getApp(self, appID: int) -> Optional[App]:
+        return self.apps.get(appID)
+
+    def getAsset(self, assetID: int) -> Optional[Asset]:
+        return self.assets.get(assetID)
+
+    def getAssetHolding(self, address: bytes, assetID: int) -> Optional[Holding]:
+        data = self.accounts.get(address)
+        return None if data is None else data.assets.get(assetID)
+
+    def getLocalState(
+        self, address: bytes, appID: int
+    ) -> Optional[Dict[bytes, StackValue]]:
+        data = self.accounts.get(address)
+        return None if data is None else data.apps.get(appID)
+
+    def setGlobal(self, appID: int, key: bytes, value: StackValue) -> None:
+        self._setItem(self.apps[appID].globalState, key, value)
+
+    def deleteGlobal(self, appID: int, key: bytes) -> None:
+        self._deleteItem(self.apps[appID].globalState, key)
+
+    def setLocal(
+        self, address: bytes, appID: int, key: bytes, value: StackValue
+    ) -> None:
+        self._setItem(self.accounts[address].apps[appID], key, value)
+
+    def deleteLocal(self, address: bytes, appID: int, key: bytes) -> None:
+        self._deleteItem(self.accounts[address].apps[appID], key)
+
+    def applyInner(self, txn: Dict[str, Any], params: EvalParams) -> Dict[str, Any]:
+        try:
+            return self._applyTxn(txn, params, None)
+        except _Rejected as e:
+            raise TealEvalError("inner transaction failed: {}".format(e.message))
+
+    # blocks
+
+    def makeBlock(self, timestamp: Optional[int] = None) -> int:
+        """Make a block with the pending transactions that are due.
+
+        Args:
+            timestamp: The block's timestamp. Defaults to blockTime seconds
+                after the last block.
+
+        Returns:
+            The round of the new block.
+        """
+        with self.condition:
+            due = [g for g, sentRound in self.pool if sentRound <= self.round - 1]
+            self.pool = [(g, r) for g, r in self.pool if r > self.round - 1]
+            return self._makeBlock(due, timestamp)
+
+    def advanceTime(self, seconds: int) -> int:
+        """Make a block the given number of seconds after the last one."""
+        return self.makeBlock(self.timestamp + seconds)
+
+    def _makeBlock(self, groups: List[_Group], timestamp: Optional[int] = None) -> int:
+        round = self.round + 1
+        applied: List[Tuple[_Group, List[Dict[str, Any]]]] = []
+        for group in groups:
+            try:
+                applied.append((group, self._applyGroup(group, round, self.timestamp)))
+            except _Rejected as e:
+                for txID in group.ids:
+                    self.transactions[txID].poolError = e.message
+        self.journal.clear()
+        return self._appendBlock(applied, timestamp)
+
+    def _appendBlock(
+        self,
+        applied: List[Tuple[_Group, List[Dict[str, Any]]]],
+        timestamp: Optional[int] = None,
+    ) -> int:
+        last = self.blocks[-1]
+        round = last["rnd"] + 1
+        if timestamp is None:
+            timestamp = last["ts"] + self.blockTime
+
+        stibs: List[Dict[str, Any]] = []
+        for group, applyData in applied:
+            for txID, stxn, ad in zip(group.ids, group.stxns, applyData):
+                info = self.transactions[txID]
+                info.confirmedRound = round
+                info.applyData = ad
+                stibs.append(dict(stxn, hgi=True, **ad))
+
+        self.blocks.append(
+            {
+                "gen": GENESIS_ID,
+                "gh": self.genesisHash,
+                "rnd": round,
+                "tc": self.txnCounter,
+                # block timestamps never go back
+                "ts": max(timestamp, last["ts"]),
+                "txns": stibs,
+            }
+        )
+        self.condition.notify_all()
+        return round
+
+    def waitForBlockAfter(self, round: int) -> None:
+        """Wait until a block after round exists, making blocks while any
+        transactions are pending. Returns after waitTimeout seconds otherwise."""
+        deadline = time.monotonic() + self.waitTimeout
+        with self.condition:
+            while self.round <= round:
+                if self.pool:
+                    self.makeBlock()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self.condition.wait(remaining)
+
+    # transactions
+
+    def submit(self, stxns: List[Dict[str, Any]]) -> str:
+        """Send a signed transaction group.
+
+        Args:
+            stxns: The msgpack decoded signed transactions of the group.
+
+        Returns:
+            The ID of the first transaction.
+
+        Raises:
+            AlgodHTTPError: If the group is malformed or fails to evaluate.
+        """
+        with self.condition:
+            try:
+                group = self._decodeGroup(stxns)
+            except _Rejected as e:
+                raise error.AlgodHTTPError(e.message, 400)
+            for txID in group.ids:
+                info = self.transactions.get(txID)
+                if info is not None and not info.poolError:
+                    raise error.AlgodHTTPError(
+                        "transaction already in ledger: {}".format(txID), 400
+                    )
+
+            try:
+                applyData = self._applyGroup(group, self.round + 1, self.timestamp)
+            except _Rejected as e:
+                raise error.AlgodHTTPError(
+                    "TransactionPool.Remember: {}".format(e.message), 400
+                )
+            for stxn, txID in zip(group.stxns, group.ids):
+                self.transactions[txID] = _TxnInfo(stxn)
+
+            if self.devMode:
+                self.journal.clear()
+                self._appendBlock([(group, applyData)])
+            else:
+                # the group was only checked against the current state; it is
+                # evaluated again when its block is made
+                self._rollback(0)
+                self.pool.append((group, self.round))
+                self.condition.notify_all()
+            return group.ids[0]
+
+    def _decodeGroup(self, stxns: List[Dict[str, Any]]) -> _Group:
+        if not 1 <= len(stxns) <= MAX_GROUP_SIZE:
+            raise _Rejected("group size {} is not allowed".format(len(stxns)))
+
+        txns: List[Dict[str, Any]] = []
+        signedBytes: List[bytes] = []
+        txIDs: List[bytes] = []
+        for stxn in stxns:
+            txn = stxn.get("txn")
+            if not isinstance(txn, dict):
+                raise _Rejected("signed transaction has no txn")
+            if "msig" in stxn or "lsig" in stxn or "sig" not in stxn:
+                raise _Rejected("only single-signature transactions are supported")
+            signed = b"TX" + msgpack.packb(txn, use_bin_type=True)
+            txns.append(txn)
+            signedBytes.append(signed)
+            txIDs.append(encoding.checksum(signed))
+        ids = [b32encode(txID).decode().rstrip("=") for txID in txIDs]
+
+        groupID = ZERO_ADDRESS
+        if len(stxns) > 1 or "grp" in txns[0]:
+            # the group ID covers the transactions without their group field
+            ungrouped = [
+                encoding.checksum(
+                    b"TX"
+                    + msgpack.packb(
+                        {k: v for k, v in txn.items() if k != "grp"}, use_bin_type=True
+                    )
+                )
+                for txn in txns
+            ]
+            groupID = encoding.checksum(
+                b"TG" + msgpack.packb({"txlist": ungrouped}, use_bin_type=True)
+            )
+            for txID, txn in zip(ids, txns):
+                if txn.get("grp") != groupID:
+                    raise _Rejected(
+                        "transaction {}: incomplete group or wrong group ID".format(
+                            txID
+                        )
+                    )
+
+        fees = sum(txn.get("fee", 0) for txn in txns)
+        if fees < MIN_TXN_FEE * len(txns):
+            raise _Rejected(
+                "transaction {}: fee too small: group paid {}, needs {}".format(
+                    ids[0], fees, MIN_TXN_FEE * len(txns)
+                )
+            )
+        return _Group(
+            stxns,
+            txns,
+            signedBytes,
+            txIDs,
+            ids,
+            groupID,
+            fees - MIN_TXN_FEE * len(txns),
+        )
+
+    def _applyGroup(
+        self, group: _Group, round: int, timestamp: int
+    ) -> List[Dict[str, Any]]:
+        """Apply a group, or roll it back and raise _Rejected."""
+        mark = len(self.journal)
+        params = EvalParams(
+            group.txns,
+            group.txIDs,
+            group.groupID,
+            round,
+            timestamp,
+            group.feeCredit,
+            self.tracer,
+        )
+        applyData: List[Dict[str, Any]] = []
+        for i, txn in enumerate(group.txns):
+            try:
+                self._checkTxn(group, i, round)
+                self.touched = set()
+                ad = self._applyTxn(txn, params, i)
+                self._checkMinBalances()
+            except TealEvalError as e:
+                self._rollback(mark)
+                raise _Rejected(
+                    "transaction {}: logic eval error: {}".format(group.ids[i], e)
+                )
+            except _Rejected as e:
+                self._rollback(mark)
+                raise _Rejected("transaction {}: {}".format(group.ids[i], e.message))
+            if "apid" in ad or "caid" in ad:
+                params.createdIDs[i] = ad.get("apid", ad.get("caid"))
+            applyData.append(ad)
+        return applyData
+
+    def _checkTxn(self, group: _Group, i: int, round: int) -> None:
+        txn = group.txns[i]
+        if txn.get("gh") != self.genesisHash:
+            raise _Rejected("genesis hash mismatch")
+        if "gen" in txn and txn["gen"] != GENESIS_ID:
+            raise _Rejected("genesis ID mismatch")
+        firstValid, lastValid = txn.get("fv", 0), txn.get("lv", 0)
+        if lastValid - firstValid > MAX_TXN_LIFE:
+            raise _Rejected("transaction window size excessive")
+        if not firstValid <= round <= lastValid:
+            raise _Rejected(
+                "txn dead: round {} outside of {}--{}".format(
+                    round, firstValid, lastValid
+                )
+            )
+        if len(txn.get("note", b"")) > MAX_NOTE_SIZE:
+            raise _Rejected("note too big")
+        info = self.transactions.get(group.ids[i])
+        if info is not None and info.confirmedRound is not None:
+            raise _Rejected("transaction already in ledger")
+
+        if self.verifySignatures:
+            from nacl.exceptions import BadSignatureError
+            from nacl.signing import VerifyKey
+
+            sender = txn.get("snd", ZERO_ADDRESS)
+            data = self.accounts.get(sender)
+            signer = sender if data is None or data.authAddr is None else data.authAddr
+            try:
+                VerifyKey(signer).verify(group.signedBytes[i], group.stxns[i]["sig"])
+            except (BadSignatureError, ValueError, TypeError):
+                raise _Rejected("signature verification failed")
+
+    def _checkMinBalances(self) -> None:
+        for address in self.touched:
+            data = self.accounts.get(address)
+            if data is None or data.isEmpty():
+                continue
+            minBalance = self.minBalance(address)
+            if data.amount < minBalance:
+                raise _Rejected(
+                    "account {} balance {} below min {}".format(
+                        encoding.encode_address(address), data.amount, minBalance
+                    )
+                )
+
+    def _account(self, address: bytes) -> AccountData:
+        """Get an account to write to, creating it if needed."""
+        self.touched.add(address)
+        data = self.accounts.get(address)
+        if data is None:
+            data = AccountData()
+            self._setItem(self.accounts, address, data)
+        return data
+
+    def _program(self, bytecode: bytes) -> Program:
+        program = self.programs.get(bytecode)
+        if program is None:
+            try:
+                program = Program(bytecode)
+            except TealEvalError as e:
+                raise _Rejected("program check failed: {}".format(e))
+            self.programs[bytecode] = program
+        return program
+
+    def _move(self, sender: bytes, receiver: bytes, amount: int) -> None:
+        source = self._account(sender)
+        if source.amount < amount:
+            raise _Rejected(
+                "overspend (account {}, tried to spend {}, balance {})".format(
+                    encoding.encode_address(sender), amount, source.amount
+                )
+            )
+        self._setAttr(source, "amount", source.amount - amount)
+        destination = self._account(receiver)
+        self._setAttr(destination, "amount", destination.amount + amount)
+
+    def _applyTxn(
+        self, txn: Dict[str, Any], params: EvalParams, groupIndex: Optional[int]
+    ) -> Dict[str, Any]:
+        """Apply one transaction, or an inner one when groupIndex is None.
+
+        Returns:
+            The apply data of the transaction, as it is encoded in a block.
+        """
+        txnType = txn.get("type")
+        sender = txn.get("snd", ZERO_ADDRESS)
+        self._setAttr(self, "txnCounter", self.txnCounter + 1)
+
+        # the fee goes to the fee sink, which is not modelled
+        fee = txn.get("fee", 0)
+        data = self._account(sender)
+        if data.amount < fee:
+            raise _Rejected(
+                "overspend (account {}, tried to pay fee {}, balance {})".format(
+                    encoding.encode_address(sender), fee, data.amount
+                )
+            )
+        self._setAttr(data, "amount", data.amount - fee)
+        if "rekey" in txn:
+            rekeyTo = txn["rekey"]
+            self._setAttr(data, "authAddr", None if rekeyTo == sender else rekeyTo)
+
+        applyData: Dict[str, Any] = dict()
+        if txnType == "pay":
+            self._payment(txn, sender, applyData)
+        elif txnType == "axfer":
+            self._assetTransfer(txn, sender, applyData)
+        elif txnType == "acfg":
+            self._assetConfig(txn, sender, applyData)
+        elif txnType == "afrz":
+            self._assetFreeze(txn, sender)
+        elif txnType == "appl":
+            if groupIndex is None:
+                raise _Rejected("inner app calls are not supported in TEAL v5")
+            self._appCall(txn, sender, params, groupIndex, applyData)
+        elif txnType != "keyreg":
+            raise _Rejected("unknown transaction type {}".format(txnType))
+        return applyData
+
+    def _payment(
+        self, txn: Dict[str, Any], sender: bytes, applyData: Dict[str, Any]
+    ) -> None:
+        self._move(sender, txn.get("rcv", ZERO_ADDRESS), txn.get("amt", 0))
+        closeTo = txn.get("close")
+        if closeTo is None:
+            return
+        data = self._account(sender)
+        if data.assets or data.apps or data.createdApps or data.createdAssets:
+            raise _Rejected("cannot close an account that holds assets or apps")
+        remaining = data.amount
+        self._move(sender, closeTo, remaining)
+        self._setAttr(data, "authAddr", None)
+        if remaining:
+            applyData["ca"] = remaining
+
+    def _assetTransfer(
+        self, txn: Dict[str, Any], sender: bytes, applyData: Dict[str, Any]
+    ) -> None:
+        assetID = txn.get("xaid", 0)
+        asset = self.assets.get(assetID)
+        if asset is None:
+            raise _Rejected("asset {} does not exist".format(assetID))
+        amount = txn.get("aamt", 0)
+        receiver = txn.get("arcv", ZERO_ADDRESS)
+
+        clawback = "asnd" in txn
+        if clawback:
+            if sender != asset.params.get("c"):
+                raise _Rejected("clawback not allowed: sender is not the clawback")
+            source = txn["asnd"]
+        else:
+            source = sender
+
+        if not clawback and receiver == sender and amount == 0:
+            data = self._account(sender)
+            if assetID not in data.assets:
+                # opt in
+                self._setItem(
+                    data.assets, assetID, Holding(0, bool(asset.params.get("df")))
+                )
+                return
+
+        sourceData = self._account(source)
+        sourceHolding = sourceData.assets.get(assetID)
+        if sourceHolding is None:
+            raise _Rejected("asset {} missing from {}".format(assetID, base32(source)))
+        receiverData = self._account(receiver)
+        receiverHolding = receiverData.assets.get(assetID)
+        if receiverHolding is None:
+            raise _Rejected(
+                "asset {} missing from {}".format(assetID, base32(receiver))
+            )
+        if not clawback and (sourceHolding.frozen or receiverHolding.frozen):
+            raise _Rejected("asset {} frozen".format(assetID))
+        if sourceHolding.amount < amount:
+            raise _Rejected(
+                "underflow on subtracting {} from sender amount {}".format(
+                    amount, sourceHolding.amount
+                )
+            )
+        self._setItem(
+            sourceData.assets,
+            assetID,
+            sourceHolding._replace(amount=sourceHolding.amount - amount),
+        )
+        receiverHolding = receiverData.assets[assetID]
+        self._setItem(
+            receiverData.assets,
+            assetID,
+            receiverHolding._replace(amount=receiverHolding.amount + amount),
+        )
+
+        closeTo = txn.get("aclose")
+        if closeTo is None:
+            return
+        if source == asset.creator:
+            raise _Rejected("cannot close asset ID in allocating account")
+        remaining = sourceData.assets[assetID].amount
+        closeData = self._account(closeTo)
+        closeHolding = closeData.assets.get(assetID)
+        if closeHolding is None:
+            raise _Rejected("asset {} missing from {}".format(assetID, base32(closeTo)))
+        self._setItem(
+            closeData.assets,
+            assetID,
+            closeHolding._replace(amount=closeHolding.amount + remaining),
+        )
+        self._deleteItem(sourceData.assets, assetID)
+        if remaining:
+            applyData["aca"] = remaining
+
+    def _assetConfig(
+        self, txn: Dict[str, Any], sender: bytes, applyData: Dict[str, Any]
+    ) -> None:
+        assetID = txn.get("caid", 0)
+        params = txn.get("apar", {})
+        if assetID == 0:
+            assetID = self.txnCounter
+            self._setItem(self.assets, assetID, Asset(sender, dict(params)))
+            data = self._account(sender)
+            self._setItem(data.createdAssets, assetID, None)
+            self._setItem(data.assets, assetID, Holding(params.get("t", 0), False))
+            applyData["caid"] = assetID
+            return
+
+        asset = self.assets.get(assetID)
+        if asset is None:
+            raise _Rejected("asset {} does not exist".format(assetID))
+        if sender != asset.params.get("m"):
+            raise _Rejected("this transaction should be issued by the manager")
+        if params:
+            # only the addresses can be reconfigured
+            updated = {k: v for k, v in asset.params.items() if k not in "mrfc"}
+            updated.update({k: v for k, v in params.items() if k in "mrfc"})
+            self._setAttr(asset, "params", updated)
+            return
+
+        creator = self._account(asset.creator)
+        holding = creator.assets.get(assetID)
+        if holding is None or holding.amount != asset.params.get("t", 0):
+            raise _Rejected("cannot destroy asset: creator is holding only part of it")
+        self._deleteItem(creator.assets, assetID)
+        self._deleteItem(creator.createdAssets, assetID)
+        self._deleteItem(self.assets, assetID)
+
+    def _assetFreeze(self, txn: Dict[str, Any], sender: bytes) -> None:
+        assetID = txn.get("faid", 0)
+        asset = self.assets.get(assetID)
+        if asset is None:
+            raise _Rejected("asset {} does not exist".format(assetID))
+        if sender != asset.params.get("f"):
+            raise _Rejected("freeze not allowed: sender is not the freeze address")
+        target = self._account(txn.get("fadd", ZERO_ADDRESS))
+        holding = target.assets.get(assetID)
+        if holding is None:
+            raise _Rejected("asset {} missing from account".format(assetID))
+        self._setItem(
+            target.assets, assetID, holding._replace(frozen=bool(txn.get("afrz")))
+        )
+
+    def _appCall(
+        self,
+        txn: Dict[str, Any],
+        sender: bytes,
+        params: EvalParams,
+        groupIndex: int,
+        applyData: Dict[str, Any],
+    ) -> None:
+        appID = txn.get("apid", 0)
+        onCompletion = txn.get("apan", NO_OP)
+        args = txn.get("apaa", [])
+        accounts = txn.get("apat", [])
+        foreignApps = txn.get("apfa", [])
+        foreignAssets = txn.get("apas", [])
+        if len(args) > MAX_APP_ARGS:
+            raise _Rejected("too many application args")
+        if sum(len(a) for a in args) > MAX_APP_TOTAL_ARG_LENGTH:
+            raise _Rejected("application args total length too long")
+        if len(accounts) > MAX_APP_ACCOUNTS:
+            raise _Rejected("too many accounts")
+        if len(foreignApps) > MAX_APP_FOREIGN_APPS:
+            raise _Rejected("too many foreign apps")
+        if len(foreignAssets) > MAX_APP_FOREIGN_ASSETS:
+            raise _Rejected("too many foreign assets")
+        if (
+            len(accounts) + len(foreignApps) + len(foreignAssets)
+            > MAX_APP_TOTAL_REFERENCES
+        ):
+            raise _Rejected("too many references")
+
+        if appID == 0:
+            appID = self._createApp(txn, sender)
+            applyData["apid"] = appID
+        app = self.apps.get(appID)
+        if app is None:
+            raise _Rejected("application {} does not exist".format(appID))
+
+        # snapshot the state the program can write, to compute its deltas
+        referenced = [sender] + list(accounts)
+        globalBefore = dict(app.globalState)
+        localsBefore = [
+            None if state is None else dict(state)
+            for state in (self.getLocalState(a, appID) for a in referenced)
+        ]
+
+        senderData = self._account(sender)
+        logs: List[bytes] = []
+        innerTxns: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        if onCompletion == CLEAR_STATE:
+            if appID not in senderData.apps:
+                raise _Rejected(
+                    "{} is not currently opted in to app {}".format(
+                        base32(sender), appID
+                    )
+                )
+            # the local state is cleared even if the program fails
+            mark = len(self.journal)
+            try:
+                result = evaluate(
+                    self._program(app.clearProgram), self, params, groupIndex, appID
+                )
+                if not result.approved:
+                    self._rollback(mark)
+                else:
+                    logs, innerTxns = result.logs, result.innerTxns
+            except (TealEvalError, _Rejected):
+                self._rollback(mark)
+            self._closeOut(senderData, appID)
+        else:
+            if onCompletion == OPT_IN:
+                if appID in senderData.apps:
+                    raise _Rejected(
+                        "account {} has already opted in to app {}".format(
+                            base32(sender), appID
+                        )
+                    )
+                self._setItem(senderData.apps, appID, dict())
+                self._setItem(senderData.appSchemas, appID, app.localSchema)
+            elif onCompletion == CLOSE_OUT:
+                if appID not in senderData.apps:
+                    raise _Rejected(
+                        "{} is not currently opted in to app {}".format(
+                            base32(sender), appID
+                        )
+                    )
+            elif onCompletion not in (NO_OP, UPDATE_APPLICATION, DELETE_APPLICATION):
+                raise _Rejected("unknown OnCompletion {}".format(onCompletion))
+
+            result = evaluate(
+                self._program(app.approvalProgram), self, params, groupIndex, appID
+            )
+            if not result.approved:
+                raise _Rejected("transaction rejected by ApprovalProgram")
+            logs, innerTxns = result.logs, result.innerTxns
+
+            if onCompletion == CLOSE_OUT:
+                self._closeOut(senderData, appID)
+            elif onCompletion == UPDATE_APPLICATION:
+                updated = App(
+                    app.creator,
+                    txn.get("apap", b""),
+                    txn.get("apsu", b""),
+                    app.globalSchema,
+                    app.localSchema,
+                    app.extraPages,
+                )
+                updated.globalState = app.globalState
+                self._setItem(self.apps, appID, updated)
+            elif onCompletion == DELETE_APPLICATION:
+                self._deleteItem(self._account(app.creator).createdApps, appID)
+                self._deleteItem(self.apps, appID)
+
+        self._checkSchema(app.globalState, app.globalSchema, "global")
+        delta: Dict[str, Any] = dict()
+        globalDelta = _stateDelta(globalBefore, app.globalState)
+        if globalDelta:
+            delta["gd"] = globalDelta
+        localDeltas: Dict[int, Any] = dict()
+        for index, (address, before) in enumerate(zip(referenced, localsBefore)):
+            if address in referenced[:index]:
+                continue
+            after = self.getLocalState(address, appID)
+            if after is not None:
+                self._checkSchema(after, app.localSchema, "local")
+            if before is not None or after is not None:
+                localDelta = _stateDelta(before or {}, after or {})
+                if localDelta:
+                    localDeltas[index] = localDelta
+        if localDeltas:
+            delta["ld"] = localDeltas
+        if logs:
+            delta["lg"] = logs
+        if innerTxns:
+            delta["itx"] = [dict(ad, txn=inner) for inner, ad in innerTxns]
+        if delta:
+            applyData["dt"] = delta
+
+    def _createApp(self, txn: Dict[str, Any], sender: bytes) -> int:
+        approvalProgram = txn.get("apap", b"")
+        clearProgram = txn.get("apsu", b"")
+        extraPages = txn.get("apep", 0)
+        if not approvalProgram or not clearProgram:
+            raise _Rejected("app creation needs an approval and a clear state program")
+        if extraPages > MAX_EXTRA_APP_PAGES:
+            raise _Rejected("too many extra program pages")
+        maxLength = MAX_APP_PROGRAM_LENGTH * (1 + extraPages)
+        if len(approvalProgram) > maxLength or len(clearProgram) > maxLength:
+            raise _Rejected("app program too long")
+        globalSchema = (
+            txn.get("apgs", {}).get("nui", 0),
+            txn.get("apgs", {}).get("nbs", 0),
+        )
+        localSchema = (
+            txn.get("apls", {}).get("nui", 0),
+            txn.get("apls", {}).get("nbs", 0),
+        )
+        if sum(globalSchema) > MAX_GLOBAL_SCHEMA_ENTRIES:
+            raise _Rejected("global schema too large")
+        if sum(localSchema) > MAX_LOCAL_SCHEMA_ENTRIES:
+            raise _Rejected("local schema too large")
+
+        appID = self.txnCounter
+        self._setItem(
+            self.apps,
+            appID,
+            App(
+                sender,
+                approvalProgram,
+                clearProgram,
+                globalSchema,
+                localSchema,
+                extraPages,
+            ),
+        )
+        self._setItem(self._account(sender).createdApps, appID, None)
+        return appID
+
+    def _closeOut(self, data: AccountData, appID: int) -> None:
+        self._deleteItem(data.apps, appID)
+        self._deleteItem(data.appSchemas, appID)
+
+    def _checkSchema(
+        self, state: Dict[bytes, StackValue], schema: Tuple[int, int], kind: str
+    ) -> None:
+        numUint = sum(1 for value in state.values() if type(value) is int)
+        numBytes = len(state) - numUint
+        if numUint > schema[0] or numBytes > schema[1]:
+            raise _Rejected(
+                "store {} count {} exceeds schema {} count {}".format(
+                    "integer" if numUint > schema[0] else "bytes",
+                    numUint if numUint > schema[0] else numBytes,
+                    kind,
+                    schema[0] if numUint > schema[0] else schema[1],
+                )
+            )
+
+    # algod responses
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "catchup-time": 0,
+            "last-round": self.round,
+            "last-version": CONSENSUS_VERSION,
+            "next-version": CONSENSUS_VERSION,
+            "next-version-round": self.round + 1,
+            "next-version-supported": True,
+            "stopped-at-unsupported-round": False,
+            "time-since-last-round": 0,
+        }
+
+    def suggestedParams(self) -> Dict[str, Any]:
+        return {
+            "consensus-version": CONSENSUS_VERSION,
+            "fee": 0,
+            "genesis-hash": b64(self.genesisHash),
+            "genesis-id": GENESIS_ID,
+            "last-round": self.round,
+            "min-fee": MIN_TXN_FEE,
+        }
+
+    def pendingTransactionInfo(self, txID: str) -> Dict[str, Any]:
+        with self.lock:
+            info = self.transactions.get(txID)
+            if info is None:
+                raise error.AlgodHTTPError("txn does not exist", 404)
+            response = _pendingInfo(info.stxn, info.applyData)
+            response["pool-error"] = info.poolError
+            if info.confirmedRound is not None:
+                response["confirmed-round"] = info.confirmedRound
+            return response
+
+    def accountInfo(self, address: str) -> Dict[str, Any]:
+        with self.lock:
+            key = encoding.decode_address(address)
+            data = self.accounts.get(key) or AccountData()
+            localStates = []
+            for appID, state in sorted(data.apps.items()):
+                numUint, numBytes = data.appSchemas[appID]
+                localState: Dict[str, Any] = {
+                    "id": appID,
+                    "schema": {"num-byte-slice": numBytes, "num-uint": numUint},
+                }
+                if state:
+                    localState["key-value"] = _stateJSON(state)
+                localStates.append(localState)
+            response = {
+                "address": address,
+                "amount": data.amount,
+                "amount-without-pending-rewards": data.amount,
+                "apps-local-state": localStates,
+                "apps-total-schema": {
+                    "num-byte-slice": sum(s[1] for s in data.appSchemas.values()),
+                    "num-uint": sum(s[0] for s in data.appSchemas.values()),
+                },
+                "assets": [
+                    {
+                        "amount": holding.amount,
+                        "asset-id": assetID,
+                        "creator": base32(self.assets[assetID].creator)
+                        if assetID in self.assets
+                        else "",
+                        "is-frozen": holding.frozen,
+                    }
+                    for assetID, holding in sorted(data.assets.items())
+                ],
+                "created-apps": [
+                    self.applicationInfo(appID) for appID in sorted(data.createdApps)
+                ],
+                "created-assets": [
+                    self.assetInfo(assetID) for assetID in sorted(data.createdAssets)
+                ],
+                "min-balance": self.minBalance(key) if not data.isEmpty() else 0,
+                "pending-rewards": 0,
+                "reward-base": 0,
+                "rewards": 0,
+                "round": self.round,
+                "status": "Offline",
+            }
+            if data.authAddr is not None:
+                response["auth-addr"] = base32(data.authAddr)
+            return response
+
+    def applicationInfo(self, appID: int) -> Dict[str, Any]:
+        with self.lock:
+            app = self.apps.get(appID)
+            if app is None:
+                raise error.AlgodHTTPError("application does not exist", 404)
+            return {
+                "id": appID,
+                "params": {
+                    "approval-program": b64(app.approvalProgram),
+                    "clear-state-program": b64(app.clearProgram),
+                    "creator": base32(app.creator),
+                    "extra-program-pages": app.extraPages,
+                    "global-state": _stateJSON(app.globalState),
+                    "global-state-schema": {
+                        "num-byte-slice": app.globalSchema[1],
+                        "num-uint": app.globalSchema[0],
+                    },
+                    "local-state-schema": {
+                        "num-byte-slice": app.localSchema[1],
+                        "num-uint": app.localSchema[0],
+                    },
+                },
+            }
+
+    def assetInfo(self, assetID: int) -> Dict[str, Any]:
+        with self.lock:
+            asset = self.assets.get(assetID)
+            if asset is None:
+                raise error.AlgodHTTPError("asset does not exist", 404)
+            p = asset.params
+            params: Dict[str, Any] = {
+                "creator": base32(asset.creator),
+                "decimals": p.get("dc", 0),
+                "default-frozen": bool(p.get("df", False)),
+                "total": p.get("t", 0),
+            }
+            for key, name in (("un", "unit-name"), ("an", "name"), ("au", "url")):
+                if key in p:
+                    params[name] = p[key]
+            if "am" in p:
+                params["metadata-hash"] = b64(p["am"])
+            for key, name in (
+                ("m", "manager"),
+                ("r", "reserve"),
+                ("f", "freeze"),
+                ("c", "clawback"),
+            ):
+                if key in p:
+                    params[name] = base32(p[key])
+            return {"index": assetID, "params": params}
+
+    def block(self, round: int, msgpackFormat: bool = False) -> Any:
+        with self.lock:
+            if round > self.round:
+                raise error.AlgodHTTPError(
+                    "failed to retrieve information from the ledger", 404
+                )
+            block = self.blocks[round]
+            if msgpackFormat:
+                return msgpack.packb({"block": block, "cert": {}}, use_bin_type=True)
+            header = {k: _toJSON(v) for k, v in block.items() if k != "txns"}
+            header["txns"] = [
+                dict(_toJSON(stib), txn=_txnJSON(stib["txn"])) for stib in block["txns"]
+            ]
+            return {"block": header}
+
+
+class LocalAlgodClient(AlgodClient):
+    """An AlgodClient that answers requests from a LocalLedger instead of a node.
+
+    It can be passed to every operation and gov.util reader in place of a
+    client of a real node.
+
+    Args:
+        ledger: The ledger to use. Defaults to a new LocalLedger.
+    """
+
+    def __init__(self, ledger: Optional[LocalLedger] = None) -> None:
+        super().__init__("", "local")
+        self.ledger = LocalLedger() if ledger is None else ledger
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+    ) -> Any:
+        ledger = self.ledger
+        params = params or {}
+        path = requrl.rstrip("/")
+
+        if method == "POST" and path == "/transactions":
+            try:
+                unpacker = msgpack.Unpacker(raw=False)
+                unpacker.feed(data)
+                stxns = list(unpacker)
+            except Exception:
+                raise error.AlgodHTTPError("could not decode transactions", 400)
+            return {"txId": ledger.submit(stxns)}
+        if method == "POST" and path == "/teal/compile":
+            from .assembler import TealAssemblyError, assemble
+
+            try:
+                program = assemble(data.decode())
+            except TealAssemblyError as e:
+                raise error.AlgodHTTPError(str(e), 400)
+            return {"hash": logic.address(program), "result": b64(program)}
+        if method != "GET":
+            raise error.AlgodHTTPError("{} {} not supported".format(method, path), 404)
+
+        if path == "/health":
+            return None
+        if path == "/versions":
+            return {
+                "build": {"major": 0, "minor": 0, "build_number": 0},
+                "genesis_hash_b64": b64(ledger.genesisHash),
+                "genesis_id": GENESIS_ID,
+                "versions": ["v2"],
+            }
+        if path == "/status":
+            return ledger.status()
+        if path == "/transactions/params":
+            return ledger.suggestedParams()
+
+        match = re.fullmatch(r"/(\w+(?:/[\w-]+)?)/([A-Z2-7]+|\d+)", path)
+        if match is None:
+            raise error.AlgodHTTPError("{} not supported".format(path), 404)
+        endpoint, arg = match.groups()
+        if endpoint == "status/wait-for-block-after":
+            ledger.waitForBlockAfter(int(arg))
+            return ledger.status()
+        if endpoint == "transactions/pending":
+            return ledger.pendingTransactionInfo(arg)
+        if endpoint == "accounts":
+            if not encoding.is_valid_address(arg):
+                raise error.AlgodHTTPError("failed to parse the address", 400)
+            return ledger.accountInfo(arg)
+        if endpoint == "applications":
+            return ledger.applicationInfo(int(arg))
+        if endpoint == "assets":
+            return ledger.assetInfo(int(arg))
+        if endpoint == "blocks":
+            return ledger.block(int(arg), response_format == "msgpack")
+        raise error.AlgodHTTPError("{} not supported".format(path), 404)
+
+
+def base32(address: bytes) -> str:
+    return encoding.encode_address(address)
+
+
+def b64(data: bytes) -> str:
+    return b64encode(data).decode()
+
+
+def _stateDelta(
+    before: Dict[bytes, StackValue], after: Dict[bytes, StackValue]
+) -> Dict[bytes, Dict[str, Any]]:
+    delta: Dict[bytes, Dict[str, Any]] = dict()
+    for key, value in after.items():
+        previous = before.get(key, _MISSING)
+        if type(previous) is not type(value) or previous != value:
+            if type(value) is int:
+                delta[key] = {"at": 2, "ui": value} if value else {"at": 2}
+            else:
+                delta[key] = {"at": 1, "bs": value} if value else {"at": 1}
+    for key in before:
+        if key not in after:
+            delta[key] = {"at": 3}
+    return delta
+
+
+def _stateJSON(state: Dict[bytes, StackValue]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "key": b64(key),
+            "value": {"bytes": "", "type": 2, "uint": value}
+            if type(value) is int
+            else {"bytes": b64(value), "type": 1, "uint": 0},  # type: ignore
+        }
+        for key, value in state.items()
+    ]
+
+
+def _deltaJSON(delta: Dict[bytes, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    entries = []
+    for key, value in delta.items():
+        entry: Dict[str, Any] = {"action": value["at"]}
+        if value["at"] == 1:
+            entry["bytes"] = b64(value.get("bs", b""))
+        elif value["at"] == 2:
+            entry["uint"] = value.get("ui", 0)
+        entries.append({"key": b64(key), "value": entry})
+    return entries
+
+
+def _toJSON(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return b64(value)
+    if isinstance(value, dict):
+        return {str(k): _toJSON(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_toJSON(v) for v in value]
+    return value
+
+
+def _txnJSON(txn: Dict[str, Any]) -> Dict[str, Any]:
+    converted: Dict[str, Any] = dict()
+    for key, value in txn.items():
+        if key in _ADDRESS_FIELDS:
+            converted[key] = base32(value)
+        elif key == "apat":
+            converted[key] = [base32(a) for a in value]
+        elif key == "apar":
+            converted[key] = {
+                k: base32(v) if k in _ASSET_ADDRESS_FIELDS else _toJSON(v)
+                for k, v in value.items()
+            }
+        else:
+            converted[key] = _toJSON(value)
+    return converted
+
+
+def _pendingInfo(stxn: Dict[str, Any], applyData: Dict[str, Any]) -> Dict[str, Any]:
+    """Build algod's pending transaction response from the block encoding."""
+    txn = stxn["txn"]
+    signed = {"txn": _txnJSON(txn)}
+    if "sig" in stxn:
+        signed["sig"] = b64(stxn["sig"])
+    response: Dict[str, Any] = {
+        "close-rewards": 0,
+        "pool-error": "",
+        "receiver-rewards": 0,
+        "sender-rewards": 0,
+        "txn": signed,
+    }
+    if "apid" in applyData:
+        response["application-index"] = applyData["apid"]
+    if "caid" in applyData:
+        response["asset-index"] = applyData["caid"]
+    if "ca" in applyData:
+        response["closing-amount"] = applyData["ca"]
+    if "aca" in applyData:
+        response["asset-closing-amount"] = applyData["aca"]
+
+    delta = applyData.get("dt", {})
+    if "gd" in delta:
+        response["global-state-delta"] = _deltaJSON(delta["gd"])
+    if "ld" in delta:
+        accounts = [txn["snd"]] + list(txn.get("apat", []))
+        response["local-state-delta"] = [
+            {"address": base32(accounts[index]), "delta": _deltaJSON(localDelta)}
+            for index, localDelta in sorted(delta["ld"].items())
+        ]
+    if "lg" in delta:
+        response["logs"] = [b64(message) for message in delta["lg"]]
+    if "itx" in delta:
+        response["inner-txns"] = [
+            _pendingInfo({"txn": inner["txn"]}, inner) for inner in delta["itx"]
+        ]
+    return response
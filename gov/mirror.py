@@ -0,0 +1,214 @@
+"""In-memory mirror of app global state and per-account local state.
+
+The mirror loads an app's state from algod once and then keeps it current by
+applying the state deltas of confirmed transactions, either from the
+PendingTxnResponse of a transaction this client sent or from a
+GovernorEventStream that sees every call to the app. Deltas set absolute
+values, so applying them in round order reproduces the state on chain.
+
+The mirror knows the round its copy of each app is current to: the round it
+was loaded in, or the last round a GovernorEventStream covered in full. Deltas
+of the round after it are applied, but one transaction does not cover its
+round, so applying it leaves the known round as it is. A delta from any later
+round means changes in between may have been missed, and the app is reloaded
+from algod instead. When the client's own transactions are the only ones that
+change an app, a mirror created with soleWriter=True applies them from any
+later round without reloading, since nothing else can have been missed.
+"""
+import threading
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from algosdk.v2client.algod import AlgodClient
+
+from .events import GovernorEvent, GovernorEventStream, StateDelta
+from .util import (
+    PendingTxnResponse,
+    decodeState,
+    decodeStateDelta,
+    getAppGlobalState,
+)
+
+State = Dict[bytes, Union[int, bytes]]
+
+# reads of an app's state while blocks keep coming in before settling for one
+# that may be newer than its recorded round
+REFRESH_ATTEMPTS = 3
+
+OPT_IN = 1
+CLOSE_OUT = 2
+CLEAR_STATE = 3
+
+
+class StateMirror:
+    """Mirrors the state of one or more apps.
+
+    Local state is loaded per account on first read. An account that is not
+    opted in to the app has a local state of None.
+
+    Args:
+        client: The algod client used to load state that is not mirrored yet.
+        soleWriter: Whether the transactions applied to the mirror are the only
+            ones that change its apps, e.g. for a client that owns its
+            governor. Without a GovernorEventStream, the mirror otherwise
+            reloads an app for every transaction that is not in the round
+            after the one it is current to.
+    """
+
+    def __init__(self, client: AlgodClient, soleWriter: bool = False) -> None:
+        self.client = client
+        self.soleWriter = soleWriter
+        self.globalStates: Dict[int, State] = dict()
+        self.localStates: Dict[Tuple[int, str], Optional[State]] = dict()
+        # the round each app's mirrored state is current to
+        self.rounds: Dict[int, int] = dict()
+        self.lock = threading.RLock()
+
+        self.refreshes = 0
+        self.applied = 0
+
+    def getGlobalState(self, appID: int) -> State:
+        with self.lock:
+            if appID not in self.globalStates:
+                self.refresh(appID)
+            return self.globalStates[appID]
+
+    def getLocalState(self, appID: int, address: str) -> Optional[State]:
+        with self.lock:
+            if appID not in self.globalStates:
+                self.refresh(appID)
+            key = (appID, address)
+            if key not in self.localStates:
+                self.localStates[key] = self._loadLocalState(appID, address)
+            return self.localStates[key]
+
+    def refresh(self, appID: int) -> None:
+        """Reload an app's global state and forget its mirrored local states."""
+        with self.lock:
+            self.refreshes += 1
+            # the state is current to the round it was read in; if a block
+            # came in while reading, read it again
+            round = self.client.status()["last-round"]
+            for _ in range(REFRESH_ATTEMPTS):
+                self.globalStates[appID] = getAppGlobalState(self.client, appID)
+                readRound, round = round, self.client.status()["last-round"]
+                if round == readRound:
+                    break
+            for key in [key for key in self.localStates if key[0] == appID]:
+                del self.localStates[key]
+            self.rounds[appID] = round
+
+    def _loadLocalState(self, appID: int, address: str) -> Optional[State]:
+        accountInfo = self.client.account_info(address)
+        for localState in accountInfo.get("apps-local-state", []):
+            if localState["id"] == appID:
+                return decodeState(localState.get("key-value", []))
+        return None
+
+    def apply(self, response: PendingTxnResponse) -> None:
+        """Apply the state deltas of a confirmed app call."""
+        txn = response.txn.get("txn", {})
+        appID = txn.get("apid")
+        if not appID or not response.confirmedRound:
+            return
+
+        localDelta: Dict[str, StateDelta] = {
+            entry["address"]: decodeStateDelta(entry["delta"])
+            for entry in response.localStateDelta or []
+        }
+        self._apply(
+            appID,
+            response.confirmedRound,
+            txn["snd"],
+            txn.get("apan", 0),
+            decodeStateDelta(response.globalStateDelta or []),
+            localDelta,
+        )
+
+    def applyEvent(self, appID: int, event: GovernorEvent) -> None:
+        """Apply the state deltas of an event from a GovernorEventStream."""
+        onCompletion = {
+            "opt_in": OPT_IN,
+            "claim": CLOSE_OUT,
+            "clear_state": CLEAR_STATE,
+        }.get(event.kind, 0)
+        self._apply(
+            appID,
+            event.round,
+            event.sender,
+            onCompletion,
+            event.globalDelta,
+            event.localDelta,
+        )
+
+    def advance(self, appID: int, round: int) -> None:
+        """Record that every change to the app up to and including round was applied."""
+        with self.lock:
+            if appID in self.rounds and round > self.rounds[appID]:
+                self.rounds[appID] = round
+
+    def follow(
+        self, stream: GovernorEventStream, untilRound: Optional[int] = None
+    ) -> Iterator[GovernorEvent]:
+        """Apply every event of a stream, yielding each event once applied.
+
+        Since the stream sees every call to its app, the mirrored state stays
+        current without reloads however far apart this client's own
+        transactions are.
+        """
+        for event in stream.events(untilRound):
+            # every round before the event's has been fully processed
+            self.advance(stream.appID, event.round - 1)
+            self.applyEvent(stream.appID, event)
+            yield event
+        self.advance(stream.appID, stream.nextRound - 1)
+
+    def _apply(
+        self,
+        appID: int,
+        round: int,
+        sender: str,
+        onCompletion: int,
+        globalDelta: StateDelta,
+        localDelta: Dict[str, StateDelta],
+    ) -> None:
+        with self.lock:
+            knownRound = self.rounds.get(appID)
+            if knownRound is None:
+                # not mirrored, it is loaded on its first read
+                return
+            if round <= knownRound:
+                # already reflected in the mirrored state
+                return
+            if round > knownRound + 1 and not self.soleWriter:
+                # changes in the rounds between may have been missed
+                self.refresh(appID)
+                return
+
+            self.applied += 1
+            key = (appID, sender)
+            if onCompletion == OPT_IN and key in self.localStates:
+                if self.localStates[key] is None:
+                    self.localStates[key] = dict()
+
+            applyStateDelta(self.globalStates[appID], globalDelta)
+            for address, delta in localDelta.items():
+                localState = self.localStates.get((appID, address))
+                if localState is not None:
+                    applyStateDelta(localState, delta)
+
+            if onCompletion in (CLOSE_OUT, CLEAR_STATE):
+                self.localStates[key] = None
+            if self.soleWriter:
+                # nothing else changed the app before this round, but more
+                # calls of this round may still be applied
+                self.advance(appID, round - 1)
+            # otherwise other calls in the same round may not have been
+            # applied, only advance() moves the round on
+
+
+def applyStateDelta(state: State, delta: StateDelta) -> None:
+    for key, value in delta.items():
+        if value is None:
+            state.pop(key, None)
+        else:
+            state[key] = value
@@ -0,0 +1,526 @@
+"""Pure-Python reference model of the Governor and Proposal contracts.
+
+GovernorModel keeps the same global and local state as gov/contracts/Governor.py,
+under the same keys, and applies each operation with the contract's semantics,
+quirks included, against a virtual clock that stands in for
+Global.latest_timestamp(). An operation the contract would reject raises
+ModelRejection and leaves the state unchanged, as a rejected transaction would.
+
+The model does not track Algo balances, fees or the governance token balances of
+accounts; it assumes every transaction around the app call is valid. It does
+track the governance tokens held by the app.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from algosdk import encoding
+
+from .contracts import keys
+
+Value = Union[int, bytes]
+State = Dict[bytes, Value]
+
+MAX_UINT64 = 2 ** 64 - 1
+# an arbitrary time of the first block of the virtual chain
+GENESIS_TIMESTAMP = 1_600_000_000
+
+CREATOR_KEY = keys.CREATOR_KEY.encode()
+GOV_TOKEN_KEY = keys.GOV_TOKEN_KEY.encode()
+PROPOSE_THRESHOLD_KEY = keys.PROPOSE_THRESHOLD_KEY.encode()
+VOTE_THRESHOLD_KEY = keys.VOTE_THRESHOLD_KEY.encode()
+QUORUM_THRESHOLD_KEY = keys.QUORUM_THRESHOLD_KEY.encode()
+STAKE_PERIOD_DURATION_KEY = keys.STAKE_PERIOD_DURATION_KEY.encode()
+PROPOSE_PERIOD_DURATION_KEY = keys.PROPOSE_PERIOD_DURATION_KEY.encode()
+VOTE_PERIOD_DURATION_KEY = keys.VOTE_PERIOD_DURATION_KEY.encode()
+EXECUTE_DELAY_DURATION_KEY = keys.EXECUTE_DELAY_DURATION_KEY.encode()
+CLAIM_PERIOD_DURATION_KEY = keys.CLAIM_PERIOD_DURATION_KEY.encode()
+START_TIME_KEY = keys.START_TIME_KEY.encode()
+GOV_CYCLE_ID_KEY = keys.GOV_CYCLE_ID_KEY.encode()
+STAKE_TIME_END_KEY = keys.STAKE_TIME_END_KEY.encode()
+PROPOSE_TIME_END_KEY = keys.PROPOSE_TIME_END_KEY.encode()
+VOTE_TIME_END_KEY = keys.VOTE_TIME_END_KEY.encode()
+EXECUTE_DELAY_TIME_END_KEY = keys.EXECUTE_DELAY_TIME_END_KEY.encode()
+CLAIM_TIME_END_KEY = keys.CLAIM_TIME_END_KEY.encode()
+NUM_REGISTERED_PROPOSALS_KEY = keys.NUM_REGISTERED_PROPOSALS_KEY.encode()
+MAX_NUM_PROPOSALS_KEY = keys.MAX_NUM_PROPOSALS_KEY.encode()
+PROPOSAL_PROGRAM_HASH_KEY = keys.PROPOSAL_PROGRAM_HASH_KEY.encode()
+ADDRESS_AMOUNT_STAKED_KEY = keys.ADDRESS_AMOUNT_STAKED_KEY.encode()
+ADDRESS_VOTING_POWER_KEY = keys.ADDRESS_VOTING_POWER_KEY.encode()
+ADDRESS_PROPOSITION_POWER_KEY = keys.ADDRESS_PROPOSITION_POWER_KEY.encode()
+ADDRESS_VOTED_KEY = keys.ADDRESS_VOTED_KEY.encode()
+GOVERNOR_ID_KEY = keys.GOVERNOR_ID_KEY.encode()
+TARGET_ID_KEY = keys.TARGET_ID_KEY.encode()
+REGISTRATION_CYCLE_KEY = keys.REGISTRATION_CYCLE_KEY.encode()
+REGISTRATION_ID_KEY = keys.REGISTRATION_ID_KEY.encode()
+FOR_VOTES_KEY = keys.FOR_VOTES_KEY.encode()
+AGAINST_VOTES_KEY = keys.AGAINST_VOTES_KEY.encode()
+CAN_EXECUTE_KEY = keys.CAN_EXECUTE_KEY.encode()
+
+_PERIOD_END_KEYS = (
+    STAKE_TIME_END_KEY,
+    PROPOSE_TIME_END_KEY,
+    VOTE_TIME_END_KEY,
+    EXECUTE_DELAY_TIME_END_KEY,
+    CLAIM_TIME_END_KEY,
+)
+_PERIOD_DURATION_KEYS = (
+    STAKE_PERIOD_DURATION_KEY,
+    PROPOSE_PERIOD_DURATION_KEY,
+    VOTE_PERIOD_DURATION_KEY,
+    EXECUTE_DELAY_DURATION_KEY,
+    CLAIM_PERIOD_DURATION_KEY,
+)
+
+_MISSING = object()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class ModelRejection(Exception):
+    """The contract would reject the operation."""
+
+
+def itob(value: int) -> bytes:
+    return value.to_bytes(8, "big")
+
+
+def _atomic(operation: F) -> F:
+    """Undo every state change of an operation that is rejected."""
+
+    def wrapper(self: "GovernorModel", *args: Any, **kwargs: Any) -> Any:
+        journal = self._journal = []
+        try:
+            result = operation(self, *args, **kwargs)
+        except ModelRejection:
+            for state, key, old in reversed(journal):
+                if old is _MISSING:
+                    del state[key]
+                else:
+                    state[key] = old
+            self.rejected += 1
+            raise
+        finally:
+            self._journal = None
+        self.applied += 1
+        return result
+
+    wrapper.__name__ = operation.__name__
+    wrapper.__doc__ = operation.__doc__
+    return wrapper  # type: ignore
+
+
+class GovernorModel:
+    """A governor app and the proposal apps created against the model.
+
+    The arguments are those of gov.operations.createGovernor, with addresses
+    in place of accounts. The model does not run programs, so every proposal
+    app created against it counts as running the proposal program.
+
+    Args:
+        creator: The address of the governor creator.
+        proposalProgramHash: The hash of the proposal approval program the
+            governor is created with.
+        appID: The ID the model uses for the governor app.
+        now: The initial time of the virtual clock.
+    """
+
+    def __init__(
+        self,
+        creator: str,
+        govTokenId: int,
+        proposeThreshold: int,
+        voteThreshold: int,
+        quorumThreshold: int,
+        stakeDurationSeconds: int,
+        proposeDurationSeconds: int,
+        voteDurationSeconds: int,
+        executeDelaySeconds: int,
+        claimDurationSeconds: int,
+        proposalProgramHash: bytes = bytes(32),
+        appID: int = 1,
+        now: int = GENESIS_TIMESTAMP,
+    ) -> None:
+        self.appID = appID
+        self.now = now
+
+        self.globalState: State = {
+            CREATOR_KEY: encoding.decode_address(creator),
+            GOV_TOKEN_KEY: govTokenId,
+            PROPOSE_THRESHOLD_KEY: proposeThreshold,
+            VOTE_THRESHOLD_KEY: voteThreshold,
+            QUORUM_THRESHOLD_KEY: quorumThreshold,
+            STAKE_PERIOD_DURATION_KEY: stakeDurationSeconds,
+            PROPOSE_PERIOD_DURATION_KEY: proposeDurationSeconds,
+            VOTE_PERIOD_DURATION_KEY: voteDurationSeconds,
+            EXECUTE_DELAY_DURATION_KEY: executeDelaySeconds,
+            CLAIM_PERIOD_DURATION_KEY: claimDurationSeconds,
+            PROPOSAL_PROGRAM_HASH_KEY: proposalProgramHash,
+            NUM_REGISTERED_PROPOSALS_KEY: 0,
+            MAX_NUM_PROPOSALS_KEY: keys.MAX_NUM_PROPOSALS,
+        }
+        # local state of each opted in address
+        self.localStates: Dict[str, State] = dict()
+        # global state of each proposal app
+        self.proposals: Dict[int, State] = dict()
+        self.nextAppID = appID + 1
+
+        # governance tokens held by the app, None until it opts in to the token
+        self.tokenBalance: Optional[int] = None
+
+        self.applied = 0
+        self.rejected = 0
+        self._journal: Optional[List[Tuple[Dict, Any, Any]]] = None
+
+    # clock
+
+    def advance(self, seconds: int) -> None:
+        self.now += seconds
+
+    def setTime(self, timestamp: int) -> None:
+        self.now = timestamp
+
+    def periods(self) -> Tuple[int, int, int, int, int, int]:
+        """Return the start of the cycle and the end of each of its periods.
+
+        Returns:
+            (start, stake end, propose end, vote end, execute delay end, claim end).
+        """
+        g = self.globalState
+        return tuple(  # type: ignore
+            g.get(key, 0) for key in (START_TIME_KEY,) + _PERIOD_END_KEYS
+        )
+
+    def _startCycle(self) -> None:
+        # the contract stores the end of each period when a cycle starts
+        g = self.globalState
+        self._put(g, START_TIME_KEY, self.now)
+        end = self.now
+        for endKey, durationKey in zip(_PERIOD_END_KEYS, _PERIOD_DURATION_KEYS):
+            end = _add(end, g.get(durationKey, 0))  # type: ignore
+            self._put(g, endKey, end)
+
+    def _inPeriod(self, begin: int, end: int) -> bool:
+        return begin <= self.now < end
+
+    # state access
+
+    def _put(self, state: State, key: bytes, value: Value) -> None:
+        if isinstance(value, int) and value > MAX_UINT64:
+            raise ModelRejection("integer overflow")
+        old = state.get(key, _MISSING)
+        self._journal.append((state, key, old))
+        state[key] = value
+        if old is _MISSING or type(old) is not type(value):
+            self._checkSchema(state)
+
+    def _checkSchema(self, state: State) -> None:
+        if state is self.globalState:
+            numUints, numByteSlices = keys.GOVERNOR_GLOBAL_SCHEMA
+        elif GOVERNOR_ID_KEY in state:
+            numUints, numByteSlices = keys.PROPOSAL_GLOBAL_SCHEMA
+        else:
+            numUints, numByteSlices = keys.GOVERNOR_LOCAL_SCHEMA
+        uints = sum(1 for value in state.values() if isinstance(value, int))
+        if uints > numUints or len(state) - uints > numByteSlices:
+            raise ModelRejection("store exceeds the state schema")
+
+    def _del(self, state: State, key: bytes) -> None:
+        if key in state:
+            self._journal.append((state, key, state[key]))
+            del state[key]
+
+    def _local(self, address: str) -> State:
+        localState = self.localStates.get(address)
+        if localState is None:
+            raise ModelRejection("{} is not opted in".format(address))
+        return localState
+
+    def _registeredThisCycle(self, proposalAppId: int) -> bool:
+        proposal = self.proposals.get(proposalAppId, {})
+        # registrations of an earlier cycle are stale
+        return proposal.get(GOVERNOR_ID_KEY) == self.appID and proposal.get(
+            REGISTRATION_CYCLE_KEY
+        ) == self.globalState.get(GOV_CYCLE_ID_KEY, 0)
+
+    def _rollover(self, address: str) -> None:
+        g = self.globalState
+        local = self._local(address)
+        if local.get(GOV_CYCLE_ID_KEY, 0) != g.get(GOV_CYCLE_ID_KEY, 0):
+            # undo all delegation
+            staked = local.get(ADDRESS_AMOUNT_STAKED_KEY, 0)
+            self._put(local, ADDRESS_VOTING_POWER_KEY, staked)
+            self._put(local, ADDRESS_PROPOSITION_POWER_KEY, staked)
+            # the has_voted flags of the previous cycle are ignored by _votedFlags
+            self._put(local, GOV_CYCLE_ID_KEY, g.get(GOV_CYCLE_ID_KEY, 0))
+
+    def _votedFlags(self, local: State) -> bytes:
+        voted = local.get(ADDRESS_VOTED_KEY)
+        # flags stored in an earlier cycle read as empty
+        if voted is None or voted[:8] != itob(
+            self.globalState.get(GOV_CYCLE_ID_KEY, 0)  # type: ignore
+        ):
+            return b""
+        return voted[8:]  # type: ignore
+
+    # governor operations
+
+    @_atomic
+    def setup(self, sender: str) -> None:
+        if self.tokenBalance or START_TIME_KEY in self.globalState:
+            raise ModelRejection("already set up")
+        self.tokenBalance = 0
+        self._startCycle()
+        self._put(self.globalState, GOV_CYCLE_ID_KEY, 0)
+
+    @_atomic
+    def optIn(self, sender: str) -> None:
+        self._optIn(sender)
+        start, stakeEnd = self.periods()[:2]
+        if not self._inPeriod(start, stakeEnd):
+            raise ModelRejection("not in the staking period")
+
+    @_atomic
+    def stake(self, sender: str, amount: int) -> None:
+        self._stake(sender, amount)
+
+    @_atomic
+    def joinGovernor(self, sender: str, amount: int) -> None:
+        """Opt in and stake in one group, as gov.operations.joinGovernor."""
+        self._optIn(sender)
+        self._stake(sender, amount)
+
+    def _optIn(self, sender: str) -> None:
+        if sender in self.localStates:
+            raise ModelRejection("{} is already opted in".format(sender))
+        self.localStates[sender] = dict()
+        self._journal.append((self.localStates, sender, _MISSING))
+
+    def _stake(self, sender: str, amount: int) -> None:
+        local = self._local(sender)
+        if amount <= 0 or self.tokenBalance is None:
+            raise ModelRejection("no governance tokens received")
+        start, stakeEnd = self.periods()[:2]
+        if not self._inPeriod(start, stakeEnd):
+            raise ModelRejection("not in the staking period")
+        if ADDRESS_AMOUNT_STAKED_KEY in local:
+            # right now can only stake once
+            raise ModelRejection("{} has already staked".format(sender))
+
+        self._put(local, ADDRESS_AMOUNT_STAKED_KEY, amount)
+        self._put(local, ADDRESS_VOTING_POWER_KEY, amount)
+        self._put(local, ADDRESS_PROPOSITION_POWER_KEY, amount)
+        self._put(local, GOV_CYCLE_ID_KEY, self.globalState.get(GOV_CYCLE_ID_KEY, 0))
+        self.tokenBalance += amount
+
+    def _delegate(self, sender: str, delegateTo: str, powerKey: bytes) -> None:
+        self._rollover(sender)
+        senderPower = self._local(sender).get(powerKey)
+        delegatePower = self._local(delegateTo).get(powerKey)
+
+        start, stakeEnd = self.periods()[:2]
+        if not (
+            self._inPeriod(start, stakeEnd)
+            and senderPower is not None
+            and senderPower > 0
+            # can only delegate to an address that hasn't delegated their votes out
+            and delegatePower is not None
+            and delegatePower > 0
+        ):
+            raise ModelRejection("cannot delegate")
+
+        self._put(self._local(delegateTo), powerKey, delegatePower + senderPower)
+        self._put(self._local(sender), powerKey, 0)
+
+    @_atomic
+    def delegateVotingPower(self, sender: str, delegateTo: str) -> None:
+        self._delegate(sender, delegateTo, ADDRESS_VOTING_POWER_KEY)
+
+    @_atomic
+    def delegatePropositionPower(self, sender: str, delegateTo: str) -> None:
+        self._delegate(sender, delegateTo, ADDRESS_PROPOSITION_POWER_KEY)
+
+    @_atomic
+    def registerProposal(self, sender: str, proposalAppId: int) -> None:
+        g = self.globalState
+        self._rollover(sender)
+        local = self._local(sender)
+        power = local.get(ADDRESS_PROPOSITION_POWER_KEY)
+        governorId = self.proposals.get(proposalAppId, {}).get(GOVERNOR_ID_KEY)
+        numRegistered = g.get(NUM_REGISTERED_PROPOSALS_KEY, 0)
+
+        stakeEnd, proposeEnd = self.periods()[1:3]
+        if not self._inPeriod(stakeEnd, proposeEnd):
+            raise ModelRejection("not in the proposition period")
+        if power is None or power < g.get(PROPOSE_THRESHOLD_KEY, 0):
+            raise ModelRejection("not enough proposition power")
+        if governorId != self.appID:
+            raise ModelRejection("proposal is for another governor")
+        if self._registeredThisCycle(proposalAppId):
+            raise ModelRejection("proposal is already registered")
+        if numRegistered >= g.get(MAX_NUM_PROPOSALS_KEY, 0):
+            raise ModelRejection("the cycle has as many proposals as it can take")
+
+        self._put(g, NUM_REGISTERED_PROPOSALS_KEY, numRegistered + 1)
+        # the proposal app stores its registration and resets its tallies
+        proposal = self.proposals[proposalAppId]
+        self._put(proposal, REGISTRATION_CYCLE_KEY, g.get(GOV_CYCLE_ID_KEY, 0))
+        self._put(proposal, REGISTRATION_ID_KEY, numRegistered)
+        self._put(proposal, FOR_VOTES_KEY, 0)
+        self._put(proposal, AGAINST_VOTES_KEY, 0)
+        self._put(proposal, CAN_EXECUTE_KEY, 1)
+        # consume proposition power
+        self._put(
+            local, ADDRESS_PROPOSITION_POWER_KEY, power - g[PROPOSE_THRESHOLD_KEY]
+        )
+
+    @_atomic
+    def vote(self, sender: str, proposalAppId: int, proposalVote: int) -> None:
+        g = self.globalState
+        self._rollover(sender)
+        proposal = self.proposals.get(proposalAppId, {})
+        local = self._local(sender)
+        power = local.get(ADDRESS_VOTING_POWER_KEY, 0)
+        slot = proposal.get(REGISTRATION_ID_KEY, 0)
+        flags = self._votedFlags(local)
+
+        proposeEnd, voteEnd = self.periods()[2:4]
+        if not (
+            # proposal is registered
+            self._registeredThisCycle(proposalAppId)
+            # user has not voted yet
+            and not _hasVoted(flags, slot)
+            # enough voting power to participate
+            and power >= g.get(VOTE_THRESHOLD_KEY, 0)
+            and self._inPeriod(proposeEnd, voteEnd)
+        ):
+            raise ModelRejection("cannot vote")
+
+        # the proposal app tallies the vote
+        tallyKey = FOR_VOTES_KEY if proposalVote > 0 else AGAINST_VOTES_KEY
+        self._put(proposal, tallyKey, _add(proposal.get(tallyKey, 0), power))
+        self._put(
+            local,
+            ADDRESS_VOTED_KEY,
+            itob(g.get(GOV_CYCLE_ID_KEY, 0)) + _setVoted(flags, slot),  # type: ignore
+        )
+
+    @_atomic
+    def executeProposal(self, sender: str, proposalAppId: int) -> None:
+        g = self.globalState
+        proposal = self.proposals.get(proposalAppId, {})
+        forVotes = proposal.get(FOR_VOTES_KEY, 0)
+        againstVotes = proposal.get(AGAINST_VOTES_KEY, 0)
+
+        if not (
+            self._registeredThisCycle(proposalAppId)
+            and _add(forVotes, againstVotes) >= g.get(QUORUM_THRESHOLD_KEY, 0)
+            and forVotes > againstVotes
+            and proposal.get(CAN_EXECUTE_KEY, 0)
+            and self.now > self.periods()[4]
+        ):
+            raise ModelRejection("cannot execute")
+
+        self._put(proposal, CAN_EXECUTE_KEY, 0)
+
+    @_atomic
+    def cancelProposal(self, sender: str, proposalAppId: int) -> None:
+        g = self.globalState
+        proposal = self.proposals.get(proposalAppId, {})
+        proposalCreator = proposal.get(CREATOR_KEY)
+        senderKey = encoding.decode_address(sender)
+        voteEnd, executeEnd = self.periods()[3:5]
+
+        if not (
+            self._registeredThisCycle(proposalAppId)
+            and (
+                # governor creator can cancel until the end of execution grace period
+                (senderKey == g.get(CREATOR_KEY) and self.now < executeEnd)
+                # proposal creator can cancel until the end of the voting period
+                or (senderKey == proposalCreator and self.now < voteEnd)
+            )
+        ):
+            raise ModelRejection("cannot cancel")
+
+        self._put(proposal, CAN_EXECUTE_KEY, 0)
+
+    @_atomic
+    def beginNewGovernanceCycle(self, sender: str) -> None:
+        g = self.globalState
+        if not (START_TIME_KEY in g and self.now > self.periods()[5]):
+            raise ModelRejection("the governance cycle has not ended")
+
+        self._put(g, GOV_CYCLE_ID_KEY, g.get(GOV_CYCLE_ID_KEY, 0) + 1)
+        # registrations of the last cycle are stale, see _registeredThisCycle
+        self._put(g, NUM_REGISTERED_PROPOSALS_KEY, 0)
+        self._startCycle()
+
+    @_atomic
+    def claim(self, sender: str) -> int:
+        """Close out of the governor.
+
+        Returns:
+            The amount of governance tokens sent back to the sender.
+        """
+        staked = self._local(sender).get(ADDRESS_AMOUNT_STAKED_KEY)
+        amount = 0
+        if staked is not None:
+            # if user has staked, they can close out only at the end
+            executeEnd, claimEnd = self.periods()[4:6]
+            if not self._inPeriod(executeEnd, claimEnd):
+                raise ModelRejection("not in the claim period")
+            if self.tokenBalance is None or self.tokenBalance < staked:
+                raise ModelRejection("not enough governance tokens")
+            self.tokenBalance -= staked
+            amount = staked  # type: ignore
+        del self.localStates[sender]
+        return amount
+
+    @_atomic
+    def clearState(self, sender: str) -> None:
+        """Clear the sender's local state. Staked tokens stay with the app."""
+        self._local(sender)
+        del self.localStates[sender]
+
+    # proposal operations
+
+    @_atomic
+    def createProposal(
+        self, sender: str, targetId: str, proposalAppId: Optional[int] = None
+    ) -> int:
+        """Create a proposal app for this governor.
+
+        Args:
+            sender: The address of the proposal creator.
+            targetId: The address the proposal pays when executed.
+            proposalAppId: The ID to give the proposal app, e.g. the ID of the
+                same proposal on chain. Defaults to the next unused ID.
+
+        Returns:
+            The ID of the new proposal app.
+        """
+        if proposalAppId is None:
+            proposalAppId = self.nextAppID
+        self.nextAppID = max(self.nextAppID, proposalAppId + 1)
+        self.proposals[proposalAppId] = {
+            CREATOR_KEY: encoding.decode_address(sender),
+            GOVERNOR_ID_KEY: self.appID,
+            TARGET_ID_KEY: encoding.decode_address(targetId),
+        }
+        return proposalAppId
+
+
+def _hasVoted(flags: bytes, slot: int) -> bool:
+    # bit 0 is the high bit of the first byte, as with getbit
+    return slot // 8 < len(flags) and bool(flags[slot // 8] & (0x80 >> slot % 8))
+
+
+def _setVoted(flags: bytes, slot: int) -> bytes:
+    padded = bytearray(flags.ljust(slot // 8 + 1, b"\x00"))
+    padded[slot // 8] |= 0x80 >> slot % 8
+    return bytes(padded)
+
+
+def _add(a: int, b: int) -> int:
+    total = a + b
+    if total > MAX_UINT64:
+        raise ModelRejection("integer overflow")
+    return total
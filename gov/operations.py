@@ -1,4 +1,5 @@
-from typing import Tuple
+import hashlib
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from algosdk.v2client.algod import AlgodClient
 from algosdk.future import transaction
@@ -6,11 +7,17 @@ from algosdk.logic import get_application_address
 from algosdk import encoding
 
 from .account import Account
-from gov.contracts import Governor, Proposal
+from .contracts import keys
+from .contracts.methods import SELECTORS
+from .cache import loadProgram
+from .mirror import State, StateMirror
+from .signing import signTransactions
+from .state import getGovernorState, getProposalState
 from .util import (
+    PendingTxnResponse,
     waitForTransaction,
-    fullyCompileContract,
     getAppGlobalState,
+    getLastBlockTimestamp,
 )
 
 GOVERNOR_APPROVAL_PROGRAM = b""
@@ -19,6 +26,10 @@ GOVERNOR_CLEAR_STATE_PROGRAM = b""
 PROPOSAL_APPROVAL_PROGRAM = b""
 PROPOSAL_CLEAR_STATE_PROGRAM = b""
 
+# the governor's inner token transfers pay no fee of their own, the app call
+# that makes one pays it on top of its own fee
+INNER_TXN_FEE = 1000
+
 MIN_BALANCE_REQUIREMENT = (
     # min account balance
     100_000
@@ -27,11 +38,24 @@ MIN_BALANCE_REQUIREMENT = (
 )
 
 
-def getGovernorContracts(client: AlgodClient) -> Tuple[bytes, bytes]:
+def _readGlobalState(
+    client: AlgodClient, appID: int, mirror: Optional[StateMirror]
+) -> State:
+    if mirror is not None:
+        return mirror.getGlobalState(appID)
+    return getAppGlobalState(client, appID)
+
+
+def getGovernorContracts(client: Optional[AlgodClient] = None) -> Tuple[bytes, bytes]:
     """Get the compiled TEAL contracts for the amm.
 
+    Programs come from the prebuilt artifacts in gov/artifacts when those match
+    the contract sources. Otherwise they are assembled locally by gov.assembler
+    and kept in the on-disk cache of gov.cache, so only the first call for a
+    given version of the contract sources compiles them.
+
     Args:q
-        client: An algod client that has the ability to compile TEAL programs.
+        client: Unused, as no algod client is needed to compile programs any more.
 
     Returns:
         A tuple of 2 byte strings. The first is the approval program, and the
@@ -41,22 +65,23 @@ def getGovernorContracts(client: AlgodClient) -> Tuple[bytes, bytes]:
     global GOVERNOR_CLEAR_STATE_PROGRAM
 
     if len(GOVERNOR_APPROVAL_PROGRAM) == 0:
-        GOVERNOR_APPROVAL_PROGRAM = fullyCompileContract(
-            client, Governor.approval_program()
-        )
-        GOVERNOR_CLEAR_STATE_PROGRAM = fullyCompileContract(
-            client, Governor.clear_state_program()
-        )
+        GOVERNOR_APPROVAL_PROGRAM = loadProgram("Governor.approval_program")
+        GOVERNOR_CLEAR_STATE_PROGRAM = loadProgram("Governor.clear_state_program")
 
     return GOVERNOR_APPROVAL_PROGRAM, GOVERNOR_CLEAR_STATE_PROGRAM
 
 
 # this is mainly for testing as it only creates one specific type of proposal defined in Proposal.py
-def getProposalContracts(client: AlgodClient) -> Tuple[bytes, bytes]:
+def getProposalContracts(client: Optional[AlgodClient] = None) -> Tuple[bytes, bytes]:
     """Get the compiled TEAL contracts for the amm.
 
+    Programs come from the prebuilt artifacts in gov/artifacts when those match
+    the contract sources. Otherwise they are assembled locally by gov.assembler
+    and kept in the on-disk cache of gov.cache, so only the first call for a
+    given version of the contract sources compiles them.
+
     Args:q
-        client: An algod client that has the ability to compile TEAL programs.
+        client: Unused, as no algod client is needed to compile programs any more.
 
     Returns:
         A tuple of 2 byte strings. The first is the approval program, and the
@@ -66,18 +91,13 @@ def getProposalContracts(client: AlgodClient) -> Tuple[bytes, bytes]:
     global PROPOSAL_CLEAR_STATE_PROGRAM
 
     if len(PROPOSAL_APPROVAL_PROGRAM) == 0:
-        PROPOSAL_APPROVAL_PROGRAM = fullyCompileContract(
-            client, Proposal.approval_program()
-        )
-        PROPOSAL_CLEAR_STATE_PROGRAM = fullyCompileContract(
-            client, Proposal.clear_state_program()
-        )
+        PROPOSAL_APPROVAL_PROGRAM = loadProgram("Proposal.approval_program")
+        PROPOSAL_CLEAR_STATE_PROGRAM = loadProgram("Proposal.clear_state_program")
 
     return PROPOSAL_APPROVAL_PROGRAM, PROPOSAL_CLEAR_STATE_PROGRAM
 
 
-def createGovernor(
-    client: AlgodClient,
+def _createGovernorTxn(
     creator: Account,
     govTokenId: int,
     proposeThreshold: int,
@@ -88,30 +108,11 @@ def createGovernor(
     voteDurationSeconds: int,
     executeDelaySeconds: int,
     claimDurationSeconds: int,
-) -> int:
-    """Create a new amm.
-
-    Args:
-        client: An algod client.
-        creator: The account that will create the governor application.Governor.py
-        govTokenId: The id of governance token
-        proposeThreshold: minimum voting power required to create a proposal
-        voteThreshold: minimum voting power required to vote on a proposal
-        quorumThreshold: minimum votes cast to pass a proposal
-        stakeDurationSeconds: the time length of staking and delegation period
-        proposeTimeLength: the time length of propose period
-        voteDurationSeconds: the time length of voting period
-        executeDelaySeconds: the time length of the period between proposal approval and execution
-
-    Returns:
-        The ID of the newly created app.
-    """
-    approval, clear = getGovernorContracts(client)
-
-    # 8 params + creation time + cycle counter + num active proposals + 5 proposal slots with for, against, and can_execute
-    globalSchema = transaction.StateSchema(num_uints=8 + 3 + 5 * 4, num_byte_slices=1)
-    # tokens committed, voting power, proposal power, session counter, 5 proposal voted flags
-    localSchema = transaction.StateSchema(num_uints=4 + 5, num_byte_slices=0)
+    programs: Tuple[bytes, bytes],
+    proposalApprovalProgram: bytes,
+    suggestedParams: transaction.SuggestedParams,
+) -> transaction.SignedTransaction:
+    approval, clear = programs
 
     app_args = [
         encoding.decode_address(creator.getAddress()),
@@ -124,6 +125,8 @@ def createGovernor(
         voteDurationSeconds.to_bytes(8, "big"),
         executeDelaySeconds.to_bytes(8, "big"),
         claimDurationSeconds.to_bytes(8, "big"),
+        # the governor only registers proposal apps that run this program
+        hashlib.sha256(proposalApprovalProgram).digest(),
     ]
 
     txn = transaction.ApplicationCreateTxn(
@@ -131,13 +134,59 @@ def createGovernor(
         on_complete=transaction.OnComplete.NoOpOC,
         approval_program=approval,
         clear_program=clear,
-        global_schema=globalSchema,
-        local_schema=localSchema,
+        global_schema=transaction.StateSchema(*keys.GOVERNOR_GLOBAL_SCHEMA),
+        local_schema=transaction.StateSchema(*keys.GOVERNOR_LOCAL_SCHEMA),
         app_args=app_args,
-        sp=client.suggested_params(),
+        sp=suggestedParams,
     )
+    return signTransactions([txn], creator)[0]
+
+
+def createGovernor(
+    client: AlgodClient,
+    creator: Account,
+    govTokenId: int,
+    proposeThreshold: int,
+    voteThreshold: int,
+    quorumThreshold: int,
+    stakeDurationSeconds: int,
+    proposeDurationSeconds: int,
+    voteDurationSeconds: int,
+    executeDelaySeconds: int,
+    claimDurationSeconds: int,
+) -> int:
+    """Create a new amm.
 
-    signedTxn = txn.sign(creator.getPrivateKey())
+    Args:
+        client: An algod client.
+        creator: The account that will create the governor application.Governor.py
+        govTokenId: The id of governance token
+        proposeThreshold: minimum voting power required to create a proposal
+        voteThreshold: minimum voting power required to vote on a proposal
+        quorumThreshold: minimum votes cast to pass a proposal
+        stakeDurationSeconds: the time length of staking and delegation period
+        proposeTimeLength: the time length of propose period
+        voteDurationSeconds: the time length of voting period
+        executeDelaySeconds: the time length of the period between proposal approval and execution
+
+    Returns:
+        The ID of the newly created app.
+    """
+    signedTxn = _createGovernorTxn(
+        creator,
+        govTokenId,
+        proposeThreshold,
+        voteThreshold,
+        quorumThreshold,
+        stakeDurationSeconds,
+        proposeDurationSeconds,
+        voteDurationSeconds,
+        executeDelaySeconds,
+        claimDurationSeconds,
+        getGovernorContracts(client),
+        getProposalContracts(client)[0],
+        client.suggested_params(),
+    )
 
     client.send_transaction(signedTxn)
 
@@ -146,9 +195,38 @@ def createGovernor(
     return response.applicationIndex
 
 
+def _setupGroup(
+    appID: int,
+    funder: Account,
+    govTokenId: int,
+    suggestedParams: transaction.SuggestedParams,
+) -> List[transaction.SignedTransaction]:
+    fundAppTxn = transaction.PaymentTxn(
+        sender=funder.getAddress(),
+        receiver=get_application_address(appID),
+        amt=MIN_BALANCE_REQUIREMENT,
+        sp=suggestedParams,
+    )
+
+    setupTxn = transaction.ApplicationCallTxn(
+        sender=funder.getAddress(),
+        index=appID,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=[SELECTORS["setup"]],
+        foreign_assets=[govTokenId],
+        sp=suggestedParams,
+    )
+    # pays the fee of the governor opting in to the token
+    setupTxn.fee += INNER_TXN_FEE
+
+    txns = [fundAppTxn, setupTxn]
+    transaction.assign_group_id(txns)
+    return signTransactions(txns, funder)
+
+
 def setupGovernor(
     client: AlgodClient, appID: int, funder: Account, govTokenId: int
-) -> int:
+) -> None:
     """Finish setting up a governor contract.
 
     This operation funds the pool account, creates pool token,
@@ -160,84 +238,216 @@ def setupGovernor(
         funder: The account providing the funding for the escrow account.
         govTokenId: governance token id.
     """
-    appAddr = get_application_address(appID)
+    signedTxns = _setupGroup(appID, funder, govTokenId, client.suggested_params())
 
-    suggestedParams = client.suggested_params()
+    client.send_transactions(signedTxns)
+
+    waitForTransaction(client, signedTxns[0].get_txid())
 
-    fundingAmount = (
-        MIN_BALANCE_REQUIREMENT
-        # additional balance to opt into and send governance token
-        + 1_000
+
+def _optInTxn(
+    appID: int, account: Account, suggestedParams: transaction.SuggestedParams
+) -> transaction.SignedTransaction:
+    optInTxn = transaction.ApplicationOptInTxn(
+        sender=account.getAddress(), sp=suggestedParams, index=appID
     )
+    return signTransactions([optInTxn], account)[0]
 
-    fundAppTxn = transaction.PaymentTxn(
-        sender=funder.getAddress(),
-        receiver=appAddr,
-        amt=fundingAmount,
+
+def optInToApp(client: AlgodClient, appID: int, account: Account) -> None:
+    signedOptInTxn = _optInTxn(appID, account, client.suggested_params())
+    client.send_transaction(signedOptInTxn)
+    waitForTransaction(client, signedOptInTxn.get_txid())
+
+
+def _stakeGroup(
+    appID: int,
+    govToken: int,
+    amount: int,
+    account: Account,
+    suggestedParams: transaction.SuggestedParams,
+) -> List[transaction.SignedTransaction]:
+    govTokenTxn = transaction.AssetTransferTxn(
+        sender=account.getAddress(),
+        receiver=get_application_address(appID),
+        index=govToken,
+        amt=amount,
         sp=suggestedParams,
     )
 
-    setupTxn = transaction.ApplicationCallTxn(
-        sender=funder.getAddress(),
+    appCallTxn = transaction.ApplicationCallTxn(
+        sender=account.getAddress(),
         index=appID,
         on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"setup"],
-        foreign_assets=[govTokenId],
+        app_args=[SELECTORS["stake"]],
+        foreign_assets=[govToken],
         sp=suggestedParams,
     )
 
-    transaction.assign_group_id([fundAppTxn, setupTxn])
-
-    signedFundAppTxn = fundAppTxn.sign(funder.getPrivateKey())
-    signedSetupTxn = setupTxn.sign(funder.getPrivateKey())
-
-    client.send_transactions([signedFundAppTxn, signedSetupTxn])
+    txns = [govTokenTxn, appCallTxn]
+    transaction.assign_group_id(txns)
+    return signTransactions(txns, account)
 
-    waitForTransaction(client, signedFundAppTxn.get_txid())
 
+def stake(
+    client: AlgodClient,
+    appID: int,
+    amount: int,
+    account: Account,
+    mirror: Optional[StateMirror] = None,
+) -> None:
+    """Stake governance tokens in the governor.
 
-def optInToApp(client: AlgodClient, appID: int, account: Account) -> None:
+    Args:
+        client: An algod client.
+        appID: The governor app ID.
+        amount: The amount of governance tokens to stake.
+        account: The staking account.
+        mirror: If given, the governor state is read from and updated in this
+            mirror instead of fetched from algod. See gov.mirror for when the
+            mirror has to reload the state anyway.
+    """
     suggestedParams = client.suggested_params()
+    govToken = _govToken(_readGlobalState(client, appID, mirror))
+    signedTxns = _stakeGroup(appID, govToken, amount, account, suggestedParams)
 
-    optInTxn = transaction.ApplicationOptInTxn(
-        sender=account.getAddress(), sp=suggestedParams, index=appID
-    )
+    client.send_transactions(signedTxns)
+    response = waitForTransaction(client, signedTxns[-1].get_txid())
+    if mirror is not None:
+        mirror.apply(response)
 
-    signedOptInTxn = optInTxn.sign(account.getPrivateKey())
-    client.send_transaction(signedOptInTxn)
-    waitForTransaction(client, signedOptInTxn.get_txid())
 
+def _govToken(appGlobalState: State) -> int:
+    govToken = appGlobalState[keys.GOV_TOKEN_KEY.encode()]
+    assert isinstance(govToken, int)
+    return govToken
 
-def stake(client: AlgodClient, appID: int, amount: int, account: Account) -> None:
 
-    appAddr = get_application_address(appID)
-    suggestedParams = client.suggested_params()
-    appGlobalState = getAppGlobalState(client, appID)
-    govToken = appGlobalState[b"gov_token_key"]
+def _sendGroups(
+    client: AlgodClient,
+    groups: List[List[transaction.SignedTransaction]],
+    responses: Optional[Dict[int, PendingTxnResponse]] = None,
+) -> List[Optional[Exception]]:
+    """Send every group before waiting on any, so they confirm in the same rounds.
 
+    Args:
+        client: An algod client.
+        groups: The signed transactions of each group.
+        responses: If given, updated with the response of the last transaction
+            of each group that confirmed, by the index of the group.
+
+    Returns:
+        For each group, the error it was rejected with or None if it confirmed.
+    """
+    errors: List[Optional[Exception]] = []
+    for signedTxns in groups:
+        try:
+            client.send_transactions(signedTxns)
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+
+    for i, signedTxns in enumerate(groups):
+        if errors[i] is None:
+            try:
+                response = waitForTransaction(client, signedTxns[-1].get_txid())
+            except Exception as e:
+                errors[i] = e
+                continue
+            if responses is not None:
+                responses[i] = response
+    return errors
+
+
+def _joinGroup(
+    appID: int,
+    govToken: int,
+    amount: int,
+    account: Account,
+    suggestedParams: transaction.SuggestedParams,
+) -> List[transaction.SignedTransaction]:
     govTokenTxn = transaction.AssetTransferTxn(
         sender=account.getAddress(),
-        receiver=appAddr,
+        receiver=get_application_address(appID),
         index=govToken,
         amt=amount,
         sp=suggestedParams,
     )
 
-    appCallTxn = transaction.ApplicationCallTxn(
+    # the governor stakes the transfer before an opt in that passes the stake selector
+    optInTxn = transaction.ApplicationOptInTxn(
         sender=account.getAddress(),
         index=appID,
-        on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"stake"],
+        app_args=[SELECTORS["stake"]],
         foreign_assets=[govToken],
         sp=suggestedParams,
     )
 
-    transaction.assign_group_id([govTokenTxn, appCallTxn])
-    signedGovTokenTxn = govTokenTxn.sign(account.getPrivateKey())
-    signedAppCallTxn = appCallTxn.sign(account.getPrivateKey())
+    txns = [govTokenTxn, optInTxn]
+    transaction.assign_group_id(txns)
+    return signTransactions(txns, account)
 
-    client.send_transactions([signedGovTokenTxn, signedAppCallTxn])
-    waitForTransaction(client, signedAppCallTxn.get_txid())
+
+def joinGovernor(
+    client: AlgodClient,
+    appID: int,
+    amount: int,
+    account: Account,
+) -> None:
+    """Opt in to the governor and stake, in one group.
+
+    This replaces optInToApp and stake, which each wait for a block of their
+    own, so joining takes one confirmation instead of two. The account must
+    already hold the governance tokens it stakes.
+
+    Args:
+        client: An algod client.
+        appID: The governor app ID.
+        amount: The amount of governance tokens to stake.
+        account: The joining account.
+    """
+    govToken = _govToken(getAppGlobalState(client, appID))
+    signedTxns = _joinGroup(appID, govToken, amount, account, client.suggested_params())
+
+    client.send_transactions(signedTxns)
+    waitForTransaction(client, signedTxns[-1].get_txid())
+
+
+def joinGovernorBulk(
+    client: AlgodClient,
+    appID: int,
+    stakes: Sequence[Tuple[Account, int]],
+) -> Dict[str, Exception]:
+    """Join the governor with many accounts, e.g. to migrate token holders.
+
+    The governor state and suggested params are read once, then the group of
+    every account is sent before waiting on any of them, so they confirm in
+    the same few rounds.
+
+    Args:
+        client: An algod client.
+        appID: The governor app ID.
+        stakes: Each joining account with the amount of tokens it stakes.
+
+    Returns:
+        The error of each account whose group was rejected or not confirmed,
+        by address. The other accounts have joined.
+    """
+    govToken = _govToken(getAppGlobalState(client, appID))
+    suggestedParams = client.suggested_params()
+
+    errors = _sendGroups(
+        client,
+        [
+            _joinGroup(appID, govToken, amount, account, suggestedParams)
+            for account, amount in stakes
+        ],
+    )
+    return {
+        account.getAddress(): error
+        for (account, _), error in zip(stakes, errors)
+        if error is not None
+    }
 
 
 def delegateVotingPower(
@@ -250,11 +460,11 @@ def delegateVotingPower(
         index=appID,
         on_complete=transaction.OnComplete.NoOpOC,
         accounts=[delegateTo.getAddress()],
-        app_args=[b"delegate_voting_power"],
+        app_args=[SELECTORS["delegate_voting_power"]],
         sp=suggestedParams,
     )
 
-    signedAppCallTxn = appCallTxn.sign(account.getPrivateKey())
+    signedAppCallTxn = signTransactions([appCallTxn], account)[0]
 
     client.send_transaction(signedAppCallTxn)
 
@@ -271,43 +481,53 @@ def delegatePropositionPower(
         index=appID,
         on_complete=transaction.OnComplete.NoOpOC,
         accounts=[delegateTo.getAddress()],
-        app_args=[b"delegate_proposal_power"],
+        app_args=[SELECTORS["delegate_proposition_power"]],
         sp=suggestedParams,
     )
 
-    signedAppCallTxn = appCallTxn.sign(account.getPrivateKey())
+    signedAppCallTxn = signTransactions([appCallTxn], account)[0]
 
     client.send_transaction(signedAppCallTxn)
 
     waitForTransaction(client, signedAppCallTxn.get_txid())
 
 
-def createProposal(
-    client: AlgodClient,
+def _createProposalTxn(
     creator: Account,
     governorId: int,
-    targetId: Account,  # account for now, should be application in the future
-) -> None:
-    approval, clear = getProposalContracts(client)
-
-    # bytes: creator, target, registration id; uints: governor
-    globalSchema = transaction.StateSchema(num_uints=1, num_byte_slices=3)
-    # tokens committed, voting power, proposal power, proposals voted
-    localSchema = transaction.StateSchema(num_uints=0, num_byte_slices=0)
+    targetId: Account,
+    programs: Tuple[bytes, bytes],
+    suggestedParams: transaction.SuggestedParams,
+) -> transaction.SignedTransaction:
+    approval, clear = programs
 
     txn = transaction.ApplicationCreateTxn(
         sender=creator.getAddress(),
         on_complete=transaction.OnComplete.NoOpOC,
         approval_program=approval,
         clear_program=clear,
-        global_schema=globalSchema,
-        local_schema=localSchema,
+        global_schema=transaction.StateSchema(*keys.PROPOSAL_GLOBAL_SCHEMA),
+        local_schema=transaction.StateSchema(*keys.PROPOSAL_LOCAL_SCHEMA),
         foreign_apps=[governorId],
         accounts=[targetId.getAddress()],
-        sp=client.suggested_params(),
+        sp=suggestedParams,
     )
+    return signTransactions([txn], creator)[0]
 
-    signedTxn = txn.sign(creator.getPrivateKey())
+
+def createProposal(
+    client: AlgodClient,
+    creator: Account,
+    governorId: int,
+    targetId: Account,  # account for now, should be application in the future
+) -> int:
+    signedTxn = _createProposalTxn(
+        creator,
+        governorId,
+        targetId,
+        getProposalContracts(client),
+        client.suggested_params(),
+    )
 
     client.send_transaction(signedTxn)
 
@@ -322,62 +542,58 @@ def registerProposal(
     proposalAppId: int,
     account: Account,
 ) -> None:
-    suggestedParams = client.suggested_params()
-
-    appCallTxn = transaction.ApplicationCallTxn(
-        sender=account.getAddress(),
-        index=governorAppId,
-        on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"register_proposal"],
-        foreign_apps=[proposalAppId],
-        sp=suggestedParams,
-    )
-
-    signedAppCallTxn = appCallTxn.sign(account.getPrivateKey())
-
-    client.send_transaction(signedAppCallTxn)
-
-    waitForTransaction(client, signedAppCallTxn.get_txid())
+    """Register a proposal with the governor for the current cycle.
 
+    The group funds the proposal app, calls register_proposal on the governor and
+    has the proposal app store its registration and empty tallies.
 
-def activateProposal(
-    client: AlgodClient,
-    proposalAppId: int,
-    governorAppId: int,
-    registrationId: int,
-    account: Account,
-) -> int:
-
-    appAddr = get_application_address(proposalAppId)
-
+    Args:
+        client: An algod client.
+        governorAppId: The governor app ID.
+        proposalAppId: The proposal app ID.
+        account: The account registering the proposal, which spends its
+            proposition power.
+    """
     suggestedParams = client.suggested_params()
 
     fundingAmount = 100000 + 1000 * 2
 
     fundAppTxn = transaction.PaymentTxn(
         sender=account.getAddress(),
-        receiver=appAddr,
+        receiver=get_application_address(proposalAppId),
         amt=fundingAmount,
         sp=suggestedParams,
     )
 
     appCallTxn = transaction.ApplicationCallTxn(
+        sender=account.getAddress(),
+        index=governorAppId,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=[SELECTORS["register_proposal"]],
+        foreign_apps=[proposalAppId],
+        sp=suggestedParams,
+    )
+
+    registerCallTxn = transaction.ApplicationCallTxn(
         sender=account.getAddress(),
         index=proposalAppId,
         on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"activate", registrationId.to_bytes(8, "big")],
+        app_args=[b"register"],
         foreign_apps=[governorAppId],
         sp=suggestedParams,
     )
 
-    transaction.assign_group_id([fundAppTxn, appCallTxn])
+    transaction.assign_group_id([fundAppTxn, appCallTxn, registerCallTxn])
 
-    signedFundAppTxn = fundAppTxn.sign(account.getPrivateKey())
-    signedSetupTxn = appCallTxn.sign(account.getPrivateKey())
+    signedFundAppTxn, signedAppCallTxn, signedRegisterCallTxn = signTransactions(
+        [fundAppTxn, appCallTxn, registerCallTxn], account
+    )
 
-    client.send_transactions([signedFundAppTxn, signedSetupTxn])
+    client.send_transactions(
+        [signedFundAppTxn, signedAppCallTxn, signedRegisterCallTxn]
+    )
 
-    waitForTransaction(client, signedFundAppTxn.get_txid())
+    waitForTransaction(client, signedRegisterCallTxn.get_txid())
 
 
 def vote(
@@ -394,14 +610,145 @@ def vote(
         sender=account.getAddress(),
         index=governorAppId,
         on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"vote", proposalVote.to_bytes(8, "big")],
+        app_args=[SELECTORS["vote"], proposalVote.to_bytes(8, "big")],
         foreign_apps=[proposalAppId],
         sp=suggestedParams,
     )
 
-    signedAuthTxn = authCallTxn.sign(account.getPrivateKey())
-    client.send_transaction(signedAuthTxn)
-    waitForTransaction(client, signedAuthTxn.get_txid())
+    # the proposal app adds the voting power to its own tally
+    tallyCallTxn = transaction.ApplicationCallTxn(
+        sender=account.getAddress(),
+        index=proposalAppId,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=[b"tally"],
+        foreign_apps=[governorAppId],
+        sp=suggestedParams,
+    )
+
+    transaction.assign_group_id([authCallTxn, tallyCallTxn])
+
+    signedAuthTxn, signedTallyTxn = signTransactions(
+        [authCallTxn, tallyCallTxn], account
+    )
+
+    client.send_transactions([signedAuthTxn, signedTallyTxn])
+    waitForTransaction(client, signedTallyTxn.get_txid())
+
+
+# each vote or execution is a governor call and a proposal call, and a group has
+# at most 16 transactions. Every call names only the one app it pairs with, well
+# within the limits on foreign apps and references of an app call
+MAX_CALL_PAIRS_PER_GROUP = 16 // 2
+
+
+def _ballotGroup(
+    governorAppId: int,
+    votes: List[Tuple[int, int]],
+    account: Account,
+    suggestedParams: transaction.SuggestedParams,
+) -> List[transaction.SignedTransaction]:
+    txns = []
+    for proposalAppId, proposalVote in votes:
+        txns.append(
+            transaction.ApplicationCallTxn(
+                sender=account.getAddress(),
+                index=governorAppId,
+                on_complete=transaction.OnComplete.NoOpOC,
+                app_args=[SELECTORS["vote"], proposalVote.to_bytes(8, "big")],
+                foreign_apps=[proposalAppId],
+                sp=suggestedParams,
+            )
+        )
+        txns.append(
+            transaction.ApplicationCallTxn(
+                sender=account.getAddress(),
+                index=proposalAppId,
+                on_complete=transaction.OnComplete.NoOpOC,
+                app_args=[b"tally"],
+                foreign_apps=[governorAppId],
+                sp=suggestedParams,
+            )
+        )
+
+    # the first transaction pays the fees of the whole group
+    totalFee = sum(txn.fee for txn in txns)
+    for txn in txns:
+        txn.fee = 0
+    txns[0].fee = totalFee
+    transaction.assign_group_id(txns)
+    return signTransactions(txns, account)
+
+
+def _chunks(items: List[Tuple[int, Any]]) -> List[List[Tuple[int, Any]]]:
+    return [
+        items[i : i + MAX_CALL_PAIRS_PER_GROUP]
+        for i in range(0, len(items), MAX_CALL_PAIRS_PER_GROUP)
+    ]
+
+
+def _groupResults(
+    chunks: List[List[Tuple[int, Any]]],
+    errors: List[Optional[Exception]],
+    results: Dict[int, Optional[Exception]],
+) -> List[List[Tuple[int, Any]]]:
+    """Record the result for each proposal whose group confirmed or was alone.
+
+    Args:
+        chunks: The (proposal app ID, argument) pairs of each group sent.
+        errors: The error of each group, as returned by _sendGroups.
+        results: Updated with the result of each proposal.
+
+    Returns:
+        The pairs of the rejected groups, one chunk each, to send again.
+    """
+    retries: List[List[Tuple[int, Any]]] = []
+    for chunk, error in zip(chunks, errors):
+        if error is None or len(chunk) == 1:
+            results.update((proposalAppId, error) for proposalAppId, _ in chunk)
+        else:
+            retries.extend([item] for item in chunk)
+    return retries
+
+
+def castBallot(
+    client: AlgodClient,
+    governorAppId: int,
+    votes: Dict[int, int],
+    account: Account,
+) -> Dict[int, Optional[Exception]]:
+    """Vote on several proposals at once.
+
+    The votes are packed into as few groups as fit, MAX_CALL_PAIRS_PER_GROUP
+    each, and all of them are sent before waiting on any, so the ballot
+    confirms in one round trip. A group is atomic: if one of its votes is
+    rejected, its votes are sent again one group each to find out which.
+
+    Args:
+        client: An algod client.
+        governorAppId: The governor app ID.
+        votes: The vote on each proposal by proposal app ID, 0 against and
+            anything else for.
+        account: The voting account.
+
+    Returns:
+        For each proposal app ID, None if the vote was counted or the error it
+        was rejected with.
+    """
+    suggestedParams = client.suggested_params()
+
+    results: Dict[int, Optional[Exception]] = dict()
+    chunks = _chunks(list(votes.items()))
+    while chunks:
+        errors = _sendGroups(
+            client,
+            [
+                _ballotGroup(governorAppId, chunk, account, suggestedParams)
+                for chunk in chunks
+            ],
+        )
+        chunks = _groupResults(chunks, errors, results)
+    # in the order of the ballot
+    return {proposalAppId: results[proposalAppId] for proposalAppId in votes}
 
 
 def executeProposal(
@@ -409,42 +756,146 @@ def executeProposal(
     governorAppId: int,
     proposalAppId: int,
     account: Account,
+    mirror: Optional[StateMirror] = None,
 ) -> None:
+    """Execute a proposal that passed.
 
+    Args:
+        client: An algod client.
+        governorAppId: The governor app ID.
+        proposalAppId: The proposal app ID.
+        account: The account sending the transactions.
+        mirror: If given, the proposal and governor state are read from and
+            updated in this mirror instead of fetched from algod. See
+            gov.mirror for when the mirror has to reload the state anyway.
+    """
     suggestedParams = client.suggested_params()
 
     authCallTxn = transaction.ApplicationCallTxn(
         sender=account.getAddress(),
         index=governorAppId,
         on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"execute_proposal"],
+        app_args=[SELECTORS["execute_proposal"]],
         foreign_apps=[proposalAppId],
         sp=suggestedParams,
     )
 
-    # in the future the below transaction will be deprecated,
-    # as the governor will be able to call execute on the proposal contract directly
     target = encoding.encode_address(
-        getAppGlobalState(client, proposalAppId)[b"target_id_key"]
+        _readGlobalState(client, proposalAppId, mirror)[keys.TARGET_ID_KEY.encode()]
     )
 
-    # print(account.getAddress())
     execCallTxn = transaction.ApplicationCallTxn(
         sender=account.getAddress(),
         index=proposalAppId,
         on_complete=transaction.OnComplete.NoOpOC,
         app_args=[b"execute"],
         accounts=[target],
+        foreign_apps=[governorAppId],
         sp=suggestedParams,
     )
 
     transaction.assign_group_id([authCallTxn, execCallTxn])
 
-    signedAuthTxn = authCallTxn.sign(account.getPrivateKey())
-    signedExecTxn = execCallTxn.sign(account.getPrivateKey())
+    signedAuthTxn, signedExecTxn = signTransactions([authCallTxn, execCallTxn], account)
 
     client.send_transactions([signedAuthTxn, signedExecTxn])
-    waitForTransaction(client, signedExecTxn.get_txid())
+    response = waitForTransaction(client, signedExecTxn.get_txid())
+    if mirror is not None:
+        # both transactions of the group were confirmed in the same round
+        mirror.apply(
+            PendingTxnResponse(
+                client.pending_transaction_info(signedAuthTxn.get_txid())
+            )
+        )
+        mirror.apply(response)
+
+
+def _executeGroup(
+    governorAppId: int,
+    executions: List[Tuple[int, bytes]],
+    account: Account,
+    suggestedParams: transaction.SuggestedParams,
+) -> List[transaction.SignedTransaction]:
+    txns = []
+    for proposalAppId, target in executions:
+        txns.append(
+            transaction.ApplicationCallTxn(
+                sender=account.getAddress(),
+                index=governorAppId,
+                on_complete=transaction.OnComplete.NoOpOC,
+                app_args=[SELECTORS["execute_proposal"]],
+                foreign_apps=[proposalAppId],
+                sp=suggestedParams,
+            )
+        )
+        txns.append(
+            transaction.ApplicationCallTxn(
+                sender=account.getAddress(),
+                index=proposalAppId,
+                on_complete=transaction.OnComplete.NoOpOC,
+                app_args=[b"execute"],
+                accounts=[encoding.encode_address(target)],
+                foreign_apps=[governorAppId],
+                sp=suggestedParams,
+            )
+        )
+    transaction.assign_group_id(txns)
+    return signTransactions(txns, account)
+
+
+def executeAllPassed(
+    client: AlgodClient,
+    governorAppId: int,
+    proposalAppIds: Sequence[int],
+    account: Account,
+) -> Dict[int, Optional[Exception]]:
+    """Execute every proposal of the current cycle that passed.
+
+    The governor does not list its proposals, so the candidates are passed in,
+    e.g. the proposals of the register_proposal events of the cycle. The state
+    of the governor and of each candidate is read once; the tallies, status and
+    target of a proposal are all in its own state. The proposals that pass by
+    ProposalState.canBeExecuted are executed MAX_CALL_PAIRS_PER_GROUP to a
+    group, and all groups are sent before waiting on any.
+
+    Args:
+        client: An algod client.
+        governorAppId: The governor app ID.
+        proposalAppIds: The proposals to consider.
+        account: The account sending the transactions.
+
+    Returns:
+        For each proposal that passed, None if it was executed or the error it
+        was rejected with. Proposals that did not pass are left out.
+    """
+    governor = getGovernorState(
+        client,
+        governorAppId,
+        ["govCycleId", "quorumThreshold", "executeDelayTimeEnd"],
+    )
+    # the contract only executes after the execute delay
+    if getLastBlockTimestamp(client)[1] <= (governor.executeDelayTimeEnd or 0):
+        return dict()
+
+    executions = []
+    for proposalAppId in proposalAppIds:
+        proposal = getProposalState(client, proposalAppId)
+        if proposal.canBeExecuted(governorAppId, governor):
+            executions.append((proposalAppId, proposal.targetId))
+
+    suggestedParams = client.suggested_params()
+    results: Dict[int, Optional[Exception]] = dict()
+    chunks = _chunks(executions)
+    while chunks:
+        errors = _sendGroups(
+            client,
+            [
+                _executeGroup(governorAppId, chunk, account, suggestedParams)
+                for chunk in chunks
+            ],
+        )
+        chunks = _groupResults(chunks, errors, results)
+    return {proposalAppId: results[proposalAppId] for proposalAppId, _ in executions}
 
 
 def cancelProposal(
@@ -459,43 +910,124 @@ def cancelProposal(
         sender=account.getAddress(),
         index=governorAppId,
         on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"cancel_proposal"],
+        app_args=[SELECTORS["cancel_proposal"]],
         foreign_apps=[proposalAppId],
         sp=suggestedParams,
     )
 
-    signedAppCallTxn = appCallTxn.sign(account.getPrivateKey())
+    cancelCallTxn = transaction.ApplicationCallTxn(
+        sender=account.getAddress(),
+        index=proposalAppId,
+        on_complete=transaction.OnComplete.NoOpOC,
+        app_args=[b"cancel"],
+        foreign_apps=[governorAppId],
+        sp=suggestedParams,
+    )
 
-    client.send_transaction(signedAppCallTxn)
-    waitForTransaction(client, signedAppCallTxn.get_txid())
+    transaction.assign_group_id([appCallTxn, cancelCallTxn])
 
+    signedAppCallTxn, signedCancelCallTxn = signTransactions(
+        [appCallTxn, cancelCallTxn], account
+    )
 
-def claim(client: AlgodClient, appID: int, account: Account) -> None:
-    suggestedParams = client.suggested_params()
-    appAddr = get_application_address(appID)
+    client.send_transactions([signedAppCallTxn, signedCancelCallTxn])
+    waitForTransaction(client, signedCancelCallTxn.get_txid())
 
-    feeTxn = transaction.PaymentTxn(
-        sender=account.getAddress(),
-        receiver=appAddr,
-        amt=1000,
-        sp=suggestedParams,
-    )
 
-    govToken = getAppGlobalState(client, appID)[b"gov_token_key"]
+def _claimTxn(
+    appID: int,
+    govToken: int,
+    account: Account,
+    suggestedParams: transaction.SuggestedParams,
+) -> transaction.SignedTransaction:
     closeOutTxn = transaction.ApplicationCloseOutTxn(
         sender=account.getAddress(),
         foreign_assets=[govToken],
         index=appID,
         sp=suggestedParams,
     )
+    # pays the fee of the inner transfer returning the stake
+    closeOutTxn.fee += INNER_TXN_FEE
+    return signTransactions([closeOutTxn], account)[0]
 
-    transaction.assign_group_id([feeTxn, closeOutTxn])
 
-    signedFeeTxn = feeTxn.sign(account.getPrivateKey())
-    signedCloseOutTxn = closeOutTxn.sign(account.getPrivateKey())
+def claim(
+    client: AlgodClient,
+    appID: int,
+    account: Account,
+    mirror: Optional[StateMirror] = None,
+) -> None:
+    """Close out of the governor, returning the account's stake and rewards.
 
-    client.send_transactions([signedFeeTxn, signedCloseOutTxn])
-    waitForTransaction(client, signedCloseOutTxn.get_txid())
+    The close out pays the fee of the inner transfer back to the account, so a
+    claim is a single transaction.
+
+    Args:
+        client: An algod client.
+        appID: The governor app ID.
+        account: The claiming account.
+        mirror: If given, the governor state is read from and updated in this
+            mirror instead of fetched from algod. See gov.mirror for when the
+            mirror has to reload the state anyway.
+    """
+    govToken = _govToken(_readGlobalState(client, appID, mirror))
+    signedCloseOutTxn = _claimTxn(appID, govToken, account, client.suggested_params())
+
+    client.send_transaction(signedCloseOutTxn)
+    response = waitForTransaction(client, signedCloseOutTxn.get_txid())
+    if mirror is not None:
+        mirror.apply(response)
+
+
+class ClaimResult(NamedTuple):
+    # the error the claim was rejected with, or None if it confirmed
+    error: Optional[Exception]
+    # the transactions a confirmed claim took, the close out and its inner
+    # transfers, or 0 if it was rejected
+    transactions: int
+
+
+def _claimResult(
+    response: Optional[PendingTxnResponse], error: Optional[Exception]
+) -> ClaimResult:
+    if response is None:
+        return ClaimResult(error, 0)
+    return ClaimResult(None, 1 + len(response.innerTxns))
+
+
+def claimBulk(
+    client: AlgodClient, appID: int, accounts: Sequence[Account]
+) -> Dict[str, ClaimResult]:
+    """Claim for many stakers at the end of a cycle.
+
+    The governor state and suggested params are read once, then the close out
+    of every account is sent before waiting on any of them, so they confirm in
+    the same few rounds.
+
+    Args:
+        client: An algod client.
+        appID: The governor app ID.
+        accounts: The claiming accounts.
+
+    Returns:
+        The result of each account's claim, by address.
+    """
+    govToken = _govToken(getAppGlobalState(client, appID))
+    suggestedParams = client.suggested_params()
+
+    responses: Dict[int, PendingTxnResponse] = dict()
+    errors = _sendGroups(
+        client,
+        [
+            [_claimTxn(appID, govToken, account, suggestedParams)]
+            for account in accounts
+        ],
+        responses,
+    )
+    return {
+        account.getAddress(): _claimResult(responses.get(i), errors[i])
+        for i, account in enumerate(accounts)
+    }
 
 
 def beginNewGovernanceCycle(client: AlgodClient, appID: int, account: Account):
@@ -505,11 +1037,11 @@ def beginNewGovernanceCycle(client: AlgodClient, appID: int, account: Account):
         sender=account.getAddress(),
         index=appID,
         on_complete=transaction.OnComplete.NoOpOC,
-        app_args=[b"begin_new_governance_cycle"],
+        app_args=[SELECTORS["begin_new_governance_cycle"]],
         sp=suggestedParams,
     )
 
-    signedAppCallTxn = appCallTxn.sign(account.getPrivateKey())
+    signedAppCallTxn = signTransactions([appCallTxn], account)[0]
     client.send_transaction(signedAppCallTxn)
     waitForTransaction(client, signedAppCallTxn.get_txid())
 
@@ -527,7 +1059,7 @@ def sendToken(
         sp=suggestedParams,
     )
 
-    signedTransferTxn = transferTxn.sign(sender.getPrivateKey())
+    signedTransferTxn = signTransactions([transferTxn], sender)[0]
 
     client.send_transaction(signedTransferTxn)
     waitForTransaction(client, signedTransferTxn.get_txid())
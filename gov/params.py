@@ -0,0 +1,74 @@
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from algosdk.v2client.algod import AlgodClient
+from algosdk.future import transaction
+
+
+class SuggestedParamsCache:
+    """Caches the suggested transaction params of an algod client.
+
+    The cache wraps a client and can be passed to any operation in place of it:
+    suggested_params() is answered from the cache and every other call is
+    forwarded to the wrapped client. Cached params are dropped when a status
+    response shows that the round has advanced past the one they were fetched
+    in, or after ttl seconds, whichever comes first.
+
+    Args:
+        client: The algod client to wrap.
+        ttl: The maximum age of cached params in seconds.
+        clock: Monotonic time source, replaceable for tests.
+    """
+
+    def __init__(
+        self,
+        client: AlgodClient,
+        ttl: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+
+        self.params: Optional[transaction.SuggestedParams] = None
+        self.fetchedAt = 0.0
+        self.lock = threading.Lock()
+
+    def suggested_params(self, **kwargs) -> transaction.SuggestedParams:
+        with self.lock:
+            if self.params is not None and self.clock() - self.fetchedAt < self.ttl:
+                self.hits += 1
+                return copy.copy(self.params)
+
+            self.misses += 1
+            self.params = self.client.suggested_params(**kwargs)
+            self.fetchedAt = self.clock()
+            return copy.copy(self.params)
+
+    def observeRound(self, round: int) -> None:
+        """Drop the cached params if they were fetched before the given round."""
+        with self.lock:
+            if self.params is not None and round > self.params.first:
+                self.params = None
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.params = None
+
+    def status(self, **kwargs) -> Dict[str, Any]:
+        status = self.client.status(**kwargs)
+        self.observeRound(status["last-round"])
+        return status
+
+    def status_after_block(self, *args, **kwargs) -> Dict[str, Any]:
+        status = self.client.status_after_block(*args, **kwargs)
+        self.observeRound(status["last-round"])
+        return status
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
@@ -0,0 +1,248 @@
+"""Opcode cost profiles of the contract programs run by gov.evaluator.
+
+An OpcodeProfiler is the tracer of a LocalLedger. It charges the cost of every
+instruction to the method of the app call that ran it, and to each PyTeal
+subroutine on the call stack. Subroutines are named after the comments PyTeal
+writes next to their labels. The costs of the methods can be saved as a
+baseline and later profiles compared against it, see benchmarks/opcode_costs.py.
+"""
+import json
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .artifacts import ARTIFACTS_DIR, PROGRAMS
+from .assembler import assembleWithLabels
+from .contracts.methods import METHOD_NAMES
+from .evaluator import APP_CALL_BUDGET, EvalContext, Instruction
+from .events import ON_COMPLETION_KINDS
+
+# PyTeal labels each subroutine "subN: // name"
+SUBROUTINE_LABEL = re.compile(r"^(sub\d+):\s*//\s*(\w+)", re.MULTILINE)
+
+
+def subroutineNames(teal: str) -> Dict[int, str]:
+    """Map the program counter of each PyTeal subroutine to its name."""
+    labels = assembleWithLabels(teal)[1]
+    return {labels[label]: name for label, name in SUBROUTINE_LABEL.findall(teal)}
+
+
+def methodName(txn: Dict[str, Any]) -> str:
+    """Name the method an app call invokes, as GovernorEvent kinds do."""
+    if not txn.get("apid"):
+        return "create"
+    onCompletion = txn.get("apan", 0)
+    if onCompletion:
+        return ON_COMPLETION_KINDS.get(onCompletion, "unknown")
+    appArgs = txn.get("apaa")
+    if not appArgs:
+        return "no_op"
+    # governor methods are called by selector, proposal methods by name
+    return METHOD_NAMES.get(appArgs[0]) or appArgs[0].decode(errors="replace")
+
+
+class Cost:
+    """Opcode cost accumulated over a number of calls."""
+
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0
+        self.max = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0
+
+
+class OpcodeProfiler:
+    """Collects the opcode costs of the programs a LocalLedger evaluates.
+
+    Pass it as the tracer of a LocalLedger in devMode, so that each group is
+    evaluated once. The costs of rejected app calls are included.
+
+    Args:
+        programs: The TEAL source of each program to profile by name. Defaults
+            to the prebuilt contract programs in gov/artifacts. Other programs
+            are named by the first bytes of their hash.
+    """
+
+    def __init__(self, programs: Optional[Dict[str, str]] = None) -> None:
+        if programs is None:
+            programs = {
+                name: (ARTIFACTS_DIR / (name + ".teal")).read_text()
+                for name in PROGRAMS
+            }
+        # bytecode -> (program name, subroutine names by program counter)
+        self.programs: Dict[bytes, Tuple[str, Dict[int, str]]] = {
+            assembleWithLabels(teal)[0]: (name, subroutineNames(teal))
+            for name, teal in programs.items()
+        }
+        # (program, method) -> cost per call
+        self.methods: Dict[Tuple[str, str], Cost] = dict()
+        # (program, subroutine) -> cost per call, including nested calls
+        self.subroutines: Dict[Tuple[str, str], Cost] = dict()
+
+        self.scopeName: Optional[str] = None
+        self._context: Optional[EvalContext] = None
+        self._names: Dict[int, str] = dict()
+        self._program = ""
+        self._method = Cost()
+        self._callCost = 0
+        self._frames: List[Cost] = []
+
+    @contextmanager
+    def scope(self, name: str) -> Iterator[None]:
+        """Record the methods called inside the block as "method [name]".
+
+        This separates the costs of a path through a method, like the
+        rollover at the start of a new cycle, from its usual cost.
+        """
+        previous = self.scopeName
+        self.scopeName = name
+        try:
+            yield
+        finally:
+            self.scopeName = previous
+
+    def __call__(self, ctx: EvalContext, pc: int, instruction: Instruction) -> None:
+        if ctx is not self._context:
+            self._startCall(ctx)
+
+        cost = instruction.cost
+        self._callCost += cost
+        method = self._method
+        method.total += cost
+        if self._callCost > method.max:
+            method.max = self._callCost
+        for frame in self._frames:
+            frame.total += cost
+
+        if instruction.name == "callsub":
+            target = instruction.immediates[0]
+            name = self._names.get(target, "sub@{}".format(target))
+            frame = self.subroutines.get((self._program, name))
+            if frame is None:
+                frame = self.subroutines[(self._program, name)] = Cost()
+            frame.calls += 1
+            self._frames.append(frame)
+        elif instruction.name == "retsub" and self._frames:
+            self._frames.pop()
+
+    def _startCall(self, ctx: EvalContext) -> None:
+        self._context = ctx
+        bytecode = ctx.program.bytecode
+        known = self.programs.get(bytecode)
+        if known is None:
+            known = self.programs[bytecode] = (ctx.program.hash().hex()[:8], dict())
+        self._program, self._names = known
+
+        method = methodName(ctx.txn)
+        if self.scopeName is not None:
+            method = "{} [{}]".format(method, self.scopeName)
+        cost = self.methods.get((self._program, method))
+        if cost is None:
+            cost = self.methods[(self._program, method)] = Cost()
+        cost.calls += 1
+        self._method = cost
+        self._callCost = 0
+        self._frames = []
+
+    def report(self) -> str:
+        """Format the costs as a table."""
+        lines = [
+            "{:68s} {:>6s} {:>8s} {:>6s} {:>7s}".format(
+                "method", "calls", "mean", "max", "budget"
+            )
+        ]
+        for (program, method), cost in sorted(self.methods.items()):
+            lines.append(
+                "{:68s} {:6d} {:8.1f} {:6d} {:6.1f}%".format(
+                    "{} {}".format(program, method),
+                    cost.calls,
+                    cost.mean,
+                    cost.max,
+                    100 * cost.max / APP_CALL_BUDGET,
+                )
+            )
+        lines.append("")
+        lines.append(
+            "{:68s} {:>6s} {:>8s} {:>6s}".format("subroutine", "calls", "mean", "total")
+        )
+        for (program, name), cost in sorted(self.subroutines.items()):
+            lines.append(
+                "{:68s} {:6d} {:8.1f} {:6d}".format(
+                    "{} {}".format(program, name), cost.calls, cost.mean, cost.total
+                )
+            )
+        return "\n".join(lines)
+
+    def baseline(self) -> Dict[str, Dict[str, int]]:
+        """Get the maximum cost of each method by program."""
+        baseline: Dict[str, Dict[str, int]] = dict()
+        for (program, method), cost in sorted(self.methods.items()):
+            baseline.setdefault(program, dict())[method] = cost.max
+        return baseline
+
+    def comparison(self, baseline: Dict[str, Dict[str, int]]) -> str:
+        """Format the maximum cost of each method next to a baseline as a table.
+
+        Args:
+            baseline: A baseline as returned by baseline().
+        """
+        lines = [
+            "{:68s} {:>6s} {:>6s} {:>7s}".format("method", "before", "after", "change")
+        ]
+        for (program, method), cost in sorted(self.methods.items()):
+            previous = baseline.get(program, dict()).get(method)
+            if previous is None:
+                before, change = "-", "new"
+            else:
+                before = str(previous)
+                change = "{:+.1f}%".format(
+                    100 * (cost.max - previous) / max(previous, 1)
+                )
+            lines.append(
+                "{:68s} {:>6s} {:6d} {:>7s}".format(
+                    "{} {}".format(program, method), before, cost.max, change
+                )
+            )
+        return "\n".join(lines)
+
+    def regressions(
+        self, baseline: Dict[str, Dict[str, int]], threshold: float = 0.05
+    ) -> List[str]:
+        """Compare the maximum cost of each method with a baseline.
+
+        Args:
+            baseline: A baseline as returned by baseline().
+            threshold: The fraction a cost may grow by before it is reported.
+
+        Returns:
+            A description of each method whose cost grew past the threshold.
+            Methods missing from the baseline are not compared.
+        """
+        regressions: List[str] = []
+        for (program, method), cost in sorted(self.methods.items()):
+            previous = baseline.get(program, dict()).get(method)
+            if previous is not None and cost.max > previous * (1 + threshold):
+                regressions.append(
+                    "{} {}: {} opcodes, up from {} (+{:.1f}%)".format(
+                        program,
+                        method,
+                        cost.max,
+                        previous,
+                        100 * (cost.max - previous) / max(previous, 1),
+                    )
+                )
+        return regressions
+
+
+def readBaseline(path: Union[str, Path]) -> Dict[str, Dict[str, int]]:
+    return json.loads(Path(path).read_text())
+
+
+def writeBaseline(path: Union[str, Path], baseline: Dict[str, Dict[str, int]]) -> None:
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
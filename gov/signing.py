@@ -0,0 +1,163 @@
+"""Sign large batches of transactions with decoded keys and a process pool.
+
+Transaction.sign decodes the base64 private key of an Account and derives its
+ed25519 key pair again for every transaction, which costs about as much as the
+signature itself. A TransactionSigner decodes the key of each account once and
+keeps it for as long as the Account object is alive, or until it is closed.
+Large batches are encoded and signed across a pool of worker processes in
+chunks and reassembled in order, so the group IDs and the order of the
+transactions are those of the batch.
+"""
+import base64
+import os
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from algosdk import constants, encoding
+from algosdk.future import transaction
+from nacl.signing import SigningKey
+
+from .account import Account
+
+
+def _signChunk(items: List[Tuple[SigningKey, transaction.Transaction]]) -> List[bytes]:
+    """Sign each transaction with its key. Runs in the pool workers, which also
+    encode the transactions: that costs as much as signing them."""
+    return [
+        key.sign(
+            constants.txid_prefix + base64.b64decode(encoding.msgpack_encode(txn))
+        ).signature
+        for key, txn in items
+    ]
+
+
+class TransactionSigner:
+    """Signs transactions with cached keys, large batches across processes.
+
+    The signatures are those of Transaction.sign. A signer can be shared by any
+    number of operations; close it, or use it as a context manager, to stop the
+    pool. The decoded key of an account is kept by the signer only while the
+    Account object is alive, and close drops every key.
+
+    Args:
+        processes: The number of worker processes. Defaults to the number of
+            CPUs. With 1, every batch is signed in the calling process.
+        chunkSize: The number of transactions sent to a worker at once.
+            Batches no larger than a chunk are signed in the calling process.
+    """
+
+    def __init__(self, processes: Optional[int] = None, chunkSize: int = 2048) -> None:
+        self.processes = processes
+        self.chunkSize = chunkSize
+        # the transactions signed and the seconds spent signing them
+        self.signatures = 0
+        self.seconds = 0.0
+        # account -> its decoded key, released with the account
+        self._keys: "weakref.WeakKeyDictionary[Account, SigningKey]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._pool: Optional[Any] = None
+
+    def __enter__(self) -> "TransactionSigner":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._keys.clear()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    @property
+    def signaturesPerSecond(self) -> float:
+        return self.signatures / self.seconds if self.seconds else 0.0
+
+    def _key(self, account: Account) -> SigningKey:
+        key = self._keys.get(account)
+        if key is None:
+            privateKey = base64.b64decode(account.getPrivateKey())
+            key = self._keys[account] = SigningKey(
+                privateKey[: constants.key_len_bytes]
+            )
+        return key
+
+    def _getPool(self) -> Optional[Any]:
+        if self._pool is None and (self.processes or os.cpu_count() or 1) > 1:
+            # imported here to keep gov.operations quick to import
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(self.processes)
+        return self._pool
+
+    def sign(
+        self, txn: transaction.Transaction, account: Account
+    ) -> transaction.SignedTransaction:
+        """Sign a transaction in the calling process."""
+        return self.signBatch([txn], account)[0]
+
+    def signBatch(
+        self,
+        txns: Sequence[transaction.Transaction],
+        accounts: Union[Account, Sequence[Account]],
+    ) -> List[transaction.SignedTransaction]:
+        """Sign a batch of transactions.
+
+        Args:
+            txns: The transactions, with their group IDs already assigned.
+            accounts: The account signing all of the transactions, or the
+                account signing each of them.
+
+        Returns:
+            The signed transactions, in the order of txns.
+        """
+        start = time.perf_counter()
+        if isinstance(accounts, Account):
+            accounts = [accounts] * len(txns)
+        if len(accounts) != len(txns):
+            raise ValueError(
+                "{} transactions but {} accounts".format(len(txns), len(accounts))
+            )
+
+        items = [(self._key(account), txn) for txn, account in zip(txns, accounts)]
+        pool = self._getPool() if len(items) > self.chunkSize else None
+        if pool is None:
+            signatures = _signChunk(items)
+        else:
+            signatures = []
+            chunks = [
+                items[i : i + self.chunkSize]
+                for i in range(0, len(items), self.chunkSize)
+            ]
+            for chunk in pool.map(_signChunk, chunks):
+                signatures.extend(chunk)
+
+        signedTxns = []
+        for txn, account, signature in zip(txns, accounts, signatures):
+            # a transaction of a rekeyed account names the account that signed it
+            authorizingAddress = None
+            if txn.sender != account.getAddress():
+                authorizingAddress = account.getAddress()
+            signedTxns.append(
+                transaction.SignedTransaction(
+                    txn, base64.b64encode(signature).decode(), authorizingAddress
+                )
+            )
+
+        self.signatures += len(signedTxns)
+        self.seconds += time.perf_counter() - start
+        return signedTxns
+
+
+# signs the groups built by gov.operations and gov.aio in the calling process,
+# keeping the keys of the accounts still in use
+DEFAULT_SIGNER = TransactionSigner(processes=1)
+
+
+def signTransactions(
+    txns: Sequence[transaction.Transaction], account: Account
+) -> List[transaction.SignedTransaction]:
+    """Sign transactions with the cached key of the account, in order."""
+    return DEFAULT_SIGNER.signBatch(txns, account)
@@ -0,0 +1,309 @@
+"""Typed views of the governor and proposal state read from algod.
+
+Each view is a class with __slots__ whose fields map to the state keys in
+gov/contracts/keys.py. Decoding compares the base64 keys of the raw state array
+against precomputed ones and only decodes the values of the fields that were
+asked for, so reading one field out of a large account payload does not decode
+the rest of it. Fields that are absent from the state or were not decoded read
+as None.
+"""
+from base64 import b64decode, b64encode
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from algosdk.v2client.algod import AlgodClient
+
+from .contracts import keys
+from .util import decodeVotedSlots
+
+V = TypeVar("V", bound="StateView")
+
+# the phases of a governance cycle in order; "next_cycle" is when a new cycle
+# can begin
+PHASES = ("stake", "propose", "vote", "execute_delay", "claim", "next_cycle")
+
+
+class StateView:
+    """Base class of the state views. Subclasses define FIELDS and __slots__."""
+
+    __slots__ = ()
+
+    # field name -> state key
+    FIELDS: ClassVar[Dict[str, str]] = {}
+    # base64 state key -> field name
+    _BY_B64_KEY: ClassVar[Dict[str, str]] = {}
+    # the same, restricted to the fields of each partial decode seen so far
+    _PARTIAL_LOOKUPS: ClassVar[Dict[Tuple[str, ...], Dict[str, str]]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._BY_B64_KEY = {
+            b64encode(key.encode()).decode(): field for field, key in cls.FIELDS.items()
+        }
+        cls._PARTIAL_LOOKUPS = dict()
+
+    @classmethod
+    def _partialLookup(cls, fields: Iterable[str]) -> Dict[str, str]:
+        fields = tuple(fields)
+        lookup = cls._PARTIAL_LOOKUPS.get(fields)
+        if lookup is None:
+            unknown = set(fields).difference(cls.FIELDS)
+            if unknown:
+                raise ValueError("Unknown {} fields: {}".format(cls.__name__, unknown))
+            lookup = {k: f for k, f in cls._BY_B64_KEY.items() if f in fields}
+            cls._PARTIAL_LOOKUPS[fields] = lookup
+        return lookup
+
+    def __getattr__(self, name: str) -> Any:
+        # slots that were never assigned
+        if name in self.FIELDS:
+            return None
+        raise AttributeError(name)
+
+    @classmethod
+    def decode(
+        cls: Type[V], stateArray: List[Any], fields: Optional[Iterable[str]] = None
+    ) -> V:
+        """Decode a state array as returned by algod.
+
+        Args:
+            stateArray: The "global-state" or "key-value" array.
+            fields: The fields to decode. Defaults to all of them.
+        """
+        lookup = cls._BY_B64_KEY if fields is None else cls._partialLookup(fields)
+
+        view = cls.__new__(cls)
+        setField = view.__setattr__
+        remaining = len(lookup)
+        for pair in stateArray:
+            field = lookup.get(pair["key"])
+            if field is None:
+                continue
+
+            value = pair["value"]
+            if value["type"] == 2:
+                setField(field, value.get("uint", 0))
+            else:
+                setField(field, b64decode(value.get("bytes", "")))
+
+            remaining -= 1
+            if remaining == 0:
+                break
+        return view
+
+    @classmethod
+    def fromState(cls: Type[V], state: Dict[bytes, Union[int, bytes]]) -> V:
+        """Build a view from an already decoded state, e.g. from a StateMirror."""
+        view = cls.__new__(cls)
+        for field, key in cls.FIELDS.items():
+            value = state.get(key.encode())
+            if value is not None:
+                setattr(view, field, value)
+        return view
+
+    def __repr__(self) -> str:
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join(
+                "{}={!r}".format(field, getattr(self, field)) for field in self.FIELDS
+            ),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+
+class GovernorState(StateView):
+    """Global state of a governor app."""
+
+    FIELDS = {
+        "creator": keys.CREATOR_KEY,
+        "govToken": keys.GOV_TOKEN_KEY,
+        "proposeThreshold": keys.PROPOSE_THRESHOLD_KEY,
+        "voteThreshold": keys.VOTE_THRESHOLD_KEY,
+        "quorumThreshold": keys.QUORUM_THRESHOLD_KEY,
+        "stakePeriodDuration": keys.STAKE_PERIOD_DURATION_KEY,
+        "proposePeriodDuration": keys.PROPOSE_PERIOD_DURATION_KEY,
+        "votePeriodDuration": keys.VOTE_PERIOD_DURATION_KEY,
+        "executeDelayDuration": keys.EXECUTE_DELAY_DURATION_KEY,
+        "claimPeriodDuration": keys.CLAIM_PERIOD_DURATION_KEY,
+        "startTime": keys.START_TIME_KEY,
+        "govCycleId": keys.GOV_CYCLE_ID_KEY,
+        "stakeTimeEnd": keys.STAKE_TIME_END_KEY,
+        "proposeTimeEnd": keys.PROPOSE_TIME_END_KEY,
+        "voteTimeEnd": keys.VOTE_TIME_END_KEY,
+        "executeDelayTimeEnd": keys.EXECUTE_DELAY_TIME_END_KEY,
+        "claimTimeEnd": keys.CLAIM_TIME_END_KEY,
+        "numRegisteredProposals": keys.NUM_REGISTERED_PROPOSALS_KEY,
+        "maxNumProposals": keys.MAX_NUM_PROPOSALS_KEY,
+        "proposalProgramHash": keys.PROPOSAL_PROGRAM_HASH_KEY,
+    }
+    __slots__ = tuple(FIELDS)
+
+    creator: Optional[bytes]
+    govToken: Optional[int]
+    proposeThreshold: Optional[int]
+    voteThreshold: Optional[int]
+    quorumThreshold: Optional[int]
+    stakePeriodDuration: Optional[int]
+    proposePeriodDuration: Optional[int]
+    votePeriodDuration: Optional[int]
+    executeDelayDuration: Optional[int]
+    claimPeriodDuration: Optional[int]
+    startTime: Optional[int]
+    govCycleId: Optional[int]
+    stakeTimeEnd: Optional[int]
+    proposeTimeEnd: Optional[int]
+    voteTimeEnd: Optional[int]
+    executeDelayTimeEnd: Optional[int]
+    claimTimeEnd: Optional[int]
+    numRegisteredProposals: Optional[int]
+    maxNumProposals: Optional[int]
+    proposalProgramHash: Optional[bytes]
+
+    def phaseStart(self, phase: str) -> int:
+        """Get the first timestamp of a phase of the current cycle.
+
+        Args:
+            phase: One of PHASES.
+
+        Returns:
+            The smallest latest_timestamp at which the contract is in the phase.
+        """
+        if phase not in PHASES:
+            raise ValueError("Unknown phase: {}".format(phase))
+        if self.startTime is None:
+            raise ValueError("The governor has not been set up")
+        start = self.startTime
+        for name, duration in zip(
+            PHASES,
+            (
+                self.stakePeriodDuration,
+                self.proposePeriodDuration,
+                self.votePeriodDuration,
+                self.executeDelayDuration,
+                self.claimPeriodDuration,
+            ),
+        ):
+            if name == phase:
+                return start
+            start += duration
+        # a new cycle begins strictly after the end of the claim period
+        return start + 1
+
+
+class ProposalState(StateView):
+    """Global state of a proposal app."""
+
+    FIELDS = {
+        "creator": keys.CREATOR_KEY,
+        "governorId": keys.GOVERNOR_ID_KEY,
+        "targetId": keys.TARGET_ID_KEY,
+        "registrationCycle": keys.REGISTRATION_CYCLE_KEY,
+        "registrationId": keys.REGISTRATION_ID_KEY,
+        "forVotes": keys.FOR_VOTES_KEY,
+        "againstVotes": keys.AGAINST_VOTES_KEY,
+        "canExecute": keys.CAN_EXECUTE_KEY,
+    }
+    __slots__ = tuple(FIELDS)
+
+    creator: Optional[bytes]
+    governorId: Optional[int]
+    targetId: Optional[bytes]
+    registrationCycle: Optional[int]
+    registrationId: Optional[int]
+    forVotes: Optional[int]
+    againstVotes: Optional[int]
+    canExecute: Optional[int]
+
+    def canBeExecuted(self, governorAppId: int, governor: GovernorState) -> bool:
+        """Whether the proposal passed, by the rules of execute_proposal_program.
+
+        The proposal must be registered with the governor in its current cycle,
+        reach the quorum with more votes for than against and not have been
+        executed or cancelled. The time is not checked: execution also needs a
+        timestamp after governor.executeDelayTimeEnd.
+
+        Args:
+            governorAppId: The governor app ID.
+            governor: The governor state, with at least the govCycleId and
+                quorumThreshold fields.
+        """
+        if (
+            self.governorId != governorAppId
+            or self.registrationCycle is None
+            or self.registrationCycle != governor.govCycleId
+        ):
+            return False
+        forVotes = self.forVotes or 0
+        againstVotes = self.againstVotes or 0
+        return (
+            forVotes + againstVotes >= (governor.quorumThreshold or 0)
+            and forVotes > againstVotes
+            and bool(self.canExecute)
+        )
+
+
+class VoterState(StateView):
+    """Local state of an account opted in to a governor app."""
+
+    FIELDS = {
+        "amountStaked": keys.ADDRESS_AMOUNT_STAKED_KEY,
+        "votingPower": keys.ADDRESS_VOTING_POWER_KEY,
+        "propositionPower": keys.ADDRESS_PROPOSITION_POWER_KEY,
+        "govCycleId": keys.GOV_CYCLE_ID_KEY,
+        "voted": keys.ADDRESS_VOTED_KEY,
+    }
+    __slots__ = tuple(FIELDS)
+
+    amountStaked: Optional[int]
+    votingPower: Optional[int]
+    propositionPower: Optional[int]
+    govCycleId: Optional[int]
+    voted: Optional[bytes]
+
+    def votedSlots(self, govCycleId: int) -> Set[int]:
+        """Get the proposal slots voted on in a cycle, usually the governor's
+        current govCycleId."""
+        return set() if self.voted is None else decodeVotedSlots(self.voted, govCycleId)
+
+
+def getGovernorState(
+    client: AlgodClient, appID: int, fields: Optional[Iterable[str]] = None
+) -> GovernorState:
+    appInfo = client.application_info(appID)
+    return GovernorState.decode(appInfo["params"]["global-state"], fields)
+
+
+def getProposalState(
+    client: AlgodClient, appID: int, fields: Optional[Iterable[str]] = None
+) -> ProposalState:
+    appInfo = client.application_info(appID)
+    return ProposalState.decode(appInfo["params"]["global-state"], fields)
+
+
+def getVoterState(
+    client: AlgodClient,
+    appID: int,
+    address: str,
+    fields: Optional[Iterable[str]] = None,
+) -> Optional[VoterState]:
+    """Get an account's local state in a governor, or None if it is not opted in."""
+    accountInfo = client.account_info(address)
+    for localState in accountInfo.get("apps-local-state", []):
+        if localState["id"] == appID:
+            return VoterState.decode(localState.get("key-value", []), fields)
+    return None
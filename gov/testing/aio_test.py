@@ -0,0 +1,59 @@
+import asyncio
+
+from algosdk import account
+from algosdk.future import transaction
+
+from ..account import Account
+from ..aio import AsyncAlgodClient, joinGovernorBulk, waitForTransaction, vote, stake
+from .stub import StubAlgod
+
+
+def test_waitForTransaction():
+    stub = StubAlgod()
+    voter = Account(account.generate_account()[0])
+
+    async def run():
+        async with AsyncAlgodClient(stub) as client:
+            txn = transaction.PaymentTxn(
+                voter.getAddress(),
+                await client.suggested_params(),
+                voter.getAddress(),
+                0,
+            ).sign(voter.getPrivateKey())
+            await client.send_transaction(txn)
+            return await waitForTransaction(client, txn.get_txid())
+
+    response = asyncio.run(run())
+    assert response.confirmedRound == 2
+
+
+def test_concurrent_operations_share_round_waits():
+    stub = StubAlgod()
+    voters = [Account(account.generate_account()[0]) for _ in range(200)]
+
+    async def run():
+        async with AsyncAlgodClient(stub) as client:
+            await asyncio.gather(*(vote(client, 1, 2, 1, v) for v in voters))
+            await asyncio.gather(*(stake(client, 1, 10, v) for v in voters[:50]))
+
+    asyncio.run(run())
+
+    # a vote and a stake are two transactions each
+    assert len(stub.sent) == 200 * 2 + 50 * 2
+    # every in-flight operation waiting on the same round shares one request
+    assert stub.statusAfterBlockCalls < 50
+
+
+def test_bulk_join_reads_the_governor_once():
+    stub = StubAlgod()
+    holders = [Account(account.generate_account()[0]) for _ in range(100)]
+
+    async def run():
+        async with AsyncAlgodClient(stub) as client:
+            return await joinGovernorBulk(client, 1, [(h, 10) for h in holders])
+
+    assert asyncio.run(run()) == dict()
+    assert len(stub.sent) == 100 * 2
+    assert stub.appInfoCalls == 1
+    # every group waits on the same rounds
+    assert stub.statusAfterBlockCalls < 10
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from pyteal import compileTeal, Mode
+
+from .. import artifacts
+from ..assembler import assemble
+from ..contracts import Governor, Proposal
+from ..operations import getGovernorContracts, getProposalContracts
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_artifacts_match_contract_sources():
+    # run `python -m gov.artifacts` after changing the contracts
+    assert artifacts.readManifest()["fingerprint"] == artifacts.contractsFingerprint()
+
+    for module in (Governor, Proposal):
+        for program in (module.approval_program, module.clear_state_program):
+            name = "{}.{}".format(module.__name__.split(".")[-1], program.__name__)
+            teal = compileTeal(program(), mode=Mode.Application, version=5)
+            assert (artifacts.ARTIFACTS_DIR / (name + ".teal")).read_text() == teal
+            assert artifacts.load(name) == assemble(teal)
+
+
+def test_operations_use_artifacts():
+    assert getGovernorContracts() == (
+        artifacts.load("Governor.approval_program"),
+        artifacts.load("Governor.clear_state_program"),
+    )
+    assert getProposalContracts() == (
+        artifacts.load("Proposal.approval_program"),
+        artifacts.load("Proposal.clear_state_program"),
+    )
+
+
+def test_operations_import_without_pyteal():
+    code = (
+        "import sys, gov.operations, gov.aio; "
+        "gov.operations.getGovernorContracts(); "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] == 'pyteal'))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,104 @@
+import pytest
+
+from ..artifacts import ARTIFACTS_DIR, PROGRAMS
+from ..assembler import assemble, TealAssemblyError
+from ..util import fullyCompileTeal
+from . import snapshot
+from .setup import NETWORK, getAlgodClient
+
+
+def test_single_use_constants_are_pushed():
+    assert assemble("#pragma version 5\nint 1\nreturn") == bytes.fromhex("05810143")
+    assert assemble('#pragma version 5\nbyte "ab"\npop') == bytes.fromhex(
+        "058002616248"
+    )
+
+
+def test_constant_blocks_ordered_by_use():
+    source = """#pragma version 5
+int 7
+int 300
+int 300
+byte 0x01
+int 7
+int 300
+byte 0x01
+byte 0x02
+"""
+    assert assemble(source) == bytes.fromhex(
+        "05"
+        + "2002ac0207"  # intcblock 300 7
+        + "26010101"  # bytecblock 0x01
+        + "232222"  # intc_1 intc_0 intc_0
+        + "28"  # bytec_0
+        + "2322"  # intc_1 intc_0
+        + "28"  # bytec_0
+        + "800102"  # pushbytes 0x02
+    )
+
+
+def test_constant_blocks_before_v4():
+    assert assemble("#pragma version 3\nint 1\nint 2\nint 1") == bytes.fromhex(
+        "0320020102" + "222322"
+    )
+
+
+def test_fields_and_branches():
+    source = """#pragma version 5
+txn OnCompletion
+int OptIn
+==
+bnz main_l2
+txna ApplicationArgs 0
+txn Accounts 1
+gtxns AssetReceiver
+main_l2:
+global LatestTimestamp
+callsub sub0
+b main_l2
+sub0:
+retsub
+"""
+    assert assemble(source) == bytes.fromhex(
+        "05"
+        + "3119"  # txn OnCompletion
+        + "8101"  # pushint 1
+        + "12"  # ==
+        + "400008"  # bnz +8
+        + "361a00"  # txna ApplicationArgs 0
+        + "361c01"  # txna Accounts 1
+        + "3814"  # gtxns AssetReceiver
+        + "3207"  # global LatestTimestamp
+        + "880003"  # callsub +3
+        + "42fff8"  # b -8
+        + "89"  # retsub
+    )
+
+
+def test_errors():
+    with pytest.raises(TealAssemblyError, match="unknown opcode"):
+        assemble("#pragma version 5\nfoo")
+    with pytest.raises(TealAssemblyError, match="undefined label"):
+        assemble("#pragma version 5\nb nowhere")
+    with pytest.raises(TealAssemblyError, match="unknown field"):
+        assemble("#pragma version 5\ntxn Bogus")
+
+
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_matches_snapshot(name):
+    # bytecode gov.assembler produced before, not algod: see test_matches_algod
+    teal, bytecode = snapshot.load(name)
+    assert assemble(teal) == bytecode
+
+
+@pytest.mark.skipif(
+    NETWORK == "local", reason="the local ledger compiles with this assembler"
+)
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_matches_algod(name):
+    client = getAlgodClient()
+    teal, bytecode = snapshot.load(name)
+    assert fullyCompileTeal(client, teal) == bytecode
+
+    teal = (ARTIFACTS_DIR / (name + ".teal")).read_text()
+    assert assemble(teal) == fullyCompileTeal(client, teal)
@@ -0,0 +1,61 @@
+import threading
+
+from pyteal import Approve, Reject
+
+from ..cache import ProgramCache, compileContract
+
+
+def test_compile_once_across_processes(tmp_path):
+    builds = []
+
+    def contract():
+        builds.append(1)
+        return Approve()
+
+    first = compileContract("test", contract, ProgramCache(tmp_path))
+    # a fresh cache object stands in for a new process
+    second = compileContract("test", contract, ProgramCache(tmp_path))
+
+    assert first == second == b"\x05\x81\x01\x43"
+    assert len(builds) == 1
+
+
+def test_content_addressed_by_teal_source(tmp_path):
+    cache = ProgramCache(tmp_path)
+
+    compileContract("a", Approve, cache)
+    compileContract("b", Approve, cache)
+    compileContract("c", Reject, cache)
+
+    # "b" has the same TEAL as "a", so they share one stored program
+    assert len(list(cache.programsDir.glob("*.bin"))) == 2
+    assert cache.lookup("b") == cache.lookup("a")
+
+
+def test_clear(tmp_path):
+    cache = ProgramCache(tmp_path)
+
+    compileContract("a", Approve, cache)
+    cache.clear()
+    assert cache.lookup("a") is None
+    assert list(tmp_path.rglob("*.bin")) == []
+
+    compileContract("a", Approve, cache)
+    assert cache.lookup("a") is not None
+
+
+def test_concurrent_writers(tmp_path):
+    results = []
+
+    def compileOnce():
+        results.append(compileContract("a", Approve, ProgramCache(tmp_path)))
+
+    threads = [threading.Thread(target=compileOnce) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results)) == 1
+    assert list(tmp_path.rglob("*.tmp")) == []
+    assert ProgramCache(tmp_path).lookup("a")[1] == results[0]
@@ -0,0 +1,62 @@
+from algosdk.v2client.algod import AlgodClient
+
+from ..state import getGovernorState
+
+
+class GovernanceClock:
+    """Moves the time of a local ledger through the phases of a governor's cycle.
+
+    The target times are computed from the start time and period durations in
+    the governor's global state, so tests do not wait out real durations.
+
+    Args:
+        client: A LocalAlgodClient.
+        appID: The governor app ID.
+    """
+
+    def __init__(self, client: AlgodClient, appID: int) -> None:
+        ledger = getattr(client, "ledger", None)
+        if ledger is None:
+            raise ValueError("Only the time of a local ledger can be controlled")
+        self.client = client
+        self.ledger = ledger
+        self.appID = appID
+
+    @property
+    def now(self) -> int:
+        """The timestamp the contract sees in the next transaction."""
+        return self.ledger.timestamp
+
+    def advance(self, seconds: int) -> int:
+        """Move the time forward by a number of seconds.
+
+        Returns:
+            The new time.
+        """
+        return self.advanceTo(self.now + seconds)
+
+    def advanceTo(self, timestamp: int) -> int:
+        """Move the time forward to a timestamp, if it is in the future.
+
+        Returns:
+            The new time.
+        """
+        if timestamp > self.now:
+            self.ledger.makeBlock(timestamp)
+        return self.now
+
+    def phaseStart(self, phase: str) -> int:
+        """Get the first timestamp of a phase of the governor's current cycle."""
+        return getGovernorState(self.client, self.appID).phaseStart(phase)
+
+    def toPhase(self, phase: str, offset: int = 0) -> int:
+        """Move the time forward to a phase of the governor's current cycle.
+
+        Args:
+            phase: One of gov.state.PHASES.
+            offset: Seconds past the start of the phase.
+
+        Returns:
+            The new time.
+        """
+        return self.advanceTo(self.phaseStart(phase) + offset)
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from algosdk import account
+
+from ..account import Account
+from ..ledger import LocalAlgodClient
+from ..operations import (
+    beginNewGovernanceCycle,
+    claim,
+    createGovernor,
+    createProposal,
+    executeProposal,
+    optInToApp,
+    registerProposal,
+    setupGovernor,
+    stake,
+    vote,
+)
+from ..state import GovernorState, getGovernorState, getProposalState
+from ..util import getBalances, stateKey
+from .clock import GovernanceClock
+from .resources import createDummyAsset, payAccount
+
+
+def test_phase_start():
+    state = GovernorState.fromState(
+        {
+            stateKey("start_time"): 1000,
+            stateKey("stake_period_duration"): 300,
+            stateKey("propose_period_duration"): 100,
+            stateKey("vote_period_duration"): 100,
+            stateKey("execute_delay_duration"): 50,
+            stateKey("claim_period_duration"): 100,
+        }
+    )
+    assert [
+        state.phaseStart(p)
+        for p in ("stake", "propose", "vote", "execute_delay", "claim", "next_cycle")
+    ] == [1000, 1300, 1400, 1500, 1550, 1651]
+
+    with pytest.raises(ValueError):
+        state.phaseStart("lunch")
+    with pytest.raises(ValueError):
+        GovernorState.fromState({}).phaseStart("stake")
+
+
+def test_full_cycle():
+    start = time.perf_counter()
+
+    client = LocalAlgodClient()
+    creator, proposer = (Account(account.generate_account()[0]) for _ in range(2))
+    for a in (creator, proposer):
+        payAccount(client, client.ledger.genesisAccounts[0], a.getAddress(), 10 ** 8)
+    govToken = createDummyAsset(client, 10 ** 6, creator)
+    appID = createGovernor(
+        client=client,
+        creator=creator,
+        govTokenId=govToken,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        # an hour long cycle
+        stakeDurationSeconds=1200,
+        proposeDurationSeconds=600,
+        voteDurationSeconds=600,
+        executeDelaySeconds=600,
+        claimDurationSeconds=600,
+    )
+    setupGovernor(client, appID, creator, govToken)
+    clock = GovernanceClock(client, appID)
+
+    optInToApp(client, appID, creator)
+    stake(client, appID, 100, creator)
+    proposalAppId = createProposal(client, proposer, appID, creator)
+
+    assert clock.toPhase("propose") == clock.phaseStart("propose")
+    registerProposal(client, appID, proposalAppId, creator)
+
+    clock.toPhase("vote")
+    vote(client, appID, proposalAppId, 1, creator)
+
+    # execution needs a timestamp after the end of the execute delay
+    clock.toPhase("claim", offset=1)
+    executeProposal(client, appID, proposalAppId, creator)
+    claim(client, appID, creator)
+    assert getBalances(client, creator.getAddress())[govToken] == 10 ** 6
+
+    clock.toPhase("next_cycle")
+    beginNewGovernanceCycle(client, appID, creator)
+    assert getGovernorState(client, appID).govCycleId == 1
+
+    assert time.perf_counter() - start < 1
+
+
+def test_needs_local_ledger():
+    with pytest.raises(ValueError):
+        GovernanceClock(object(), 1)
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+from algosdk import account
+from algosdk.future import transaction
+
+from ..account import Account
+from ..aio import AsyncAlgodClient, vote as asyncVote
+from ..confirmation import ConfirmationTracker
+from ..operations import vote
+from .stub import StubAlgod
+
+
+def sendPayments(client, count):
+    sender = Account(account.generate_account()[0])
+    sp = client.suggested_params()
+    txIDs = []
+    for i in range(count):
+        txn = transaction.PaymentTxn(
+            sender.getAddress(), sp, sender.getAddress(), i
+        ).sign(sender.getPrivateKey())
+        txIDs.append(client.send_transaction(txn))
+    return txIDs
+
+
+def test_one_status_wait_per_round():
+    stub = StubAlgod()
+
+    with ConfirmationTracker(stub) as tracker:
+        txIDs = sendPayments(stub, 1000)
+        futures = [tracker.track(txID) for txID in txIDs]
+        responses = [f.result(timeout=10) for f in futures]
+
+    assert all(r.confirmedRound == 2 for r in responses)
+    assert stub.statusCalls == 1
+    # one wait per block, not per transaction
+    assert stub.statusAfterBlockCalls == tracker.rounds <= 2
+    assert len(tracker.latencies) == 1000
+    assert all(latency.rounds <= 1 for latency in tracker.latencies.values())
+
+
+def test_timeout_and_pool_error():
+    stub = StubAlgod()
+    stub.stuck["LOST"] = ""
+    stub.stuck["REJECTED"] = "overspend"
+
+    with ConfirmationTracker(stub) as tracker:
+        lost = tracker.track("LOST", timeout=3)
+        rejected = tracker.track("REJECTED")
+
+        with pytest.raises(Exception, match="not confirmed after 3 rounds"):
+            lost.result(timeout=10)
+        with pytest.raises(Exception, match="Pool error: overspend"):
+            rejected.result(timeout=10)
+
+
+def test_operations_wait_on_tracker():
+    # long enough blocks for every vote group to be signed and sent in a round
+    stub = StubAlgod(blockTime=0.05)
+    voters = [Account(account.generate_account()[0]) for _ in range(50)]
+
+    with ConfirmationTracker(stub) as tracker:
+        threads = [
+            threading.Thread(target=vote, args=(tracker, 1, 2, 1, v)) for v in voters
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        async def run():
+            async with AsyncAlgodClient(tracker) as client:
+                await asyncio.gather(*(asyncVote(client, 1, 2, 0, v) for v in voters))
+
+        asyncio.run(run())
+
+    assert len(tracker.latencies) == 100
+    assert stub.statusAfterBlockCalls <= 4
@@ -0,0 +1,138 @@
+import pytest
+from algosdk import account, encoding
+
+from ..assembler import assemble
+from ..evaluator import EvalParams, Program, TealEvalError, evaluate
+from ..ledger import App, LocalLedger
+
+APP_ID = 1
+
+
+def run(source, ledger=None, **txnFields):
+    """Run a program as the approval program of app 1, called by a new account."""
+    if ledger is None:
+        ledger = LocalLedger(numAccounts=0)
+    program = assemble("#pragma version 5\n" + source)
+    ledger.apps[APP_ID] = App(bytes(32), program, program, (4, 4), (0, 0), 0)
+    sender = encoding.decode_address(account.generate_account()[1])
+    txn = dict(type="appl", snd=sender, apid=APP_ID, **txnFields)
+    params = EvalParams([txn], [bytes(32)], bytes(32), 10, 1000)
+    return evaluate(Program(program), ledger, params, 0, APP_ID)
+
+
+def test_arithmetic_and_branches():
+    assert run("int 2\nint 3\n+\nint 5\n==").approved
+    assert not run("int 1\nint 1\n-").approved
+    assert run(
+        """
+int 0
+store 0
+loop:
+load 0
+int 1
++
+dup
+store 0
+int 10
+<
+bnz loop
+load 0
+int 10
+=="""
+    ).approved
+
+
+def test_subroutines():
+    assert run(
+        """
+int 4
+callsub double
+int 8
+==
+return
+double:
+dup
++
+retsub"""
+    ).approved
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        ("err", "err opcode executed"),
+        ("int 0\nassert\nint 1", "assert failed"),
+        ("int 1\nint 0\n/", "/ 0"),
+        ("int 18446744073709551615\nint 1\n+", "+ overflowed"),
+        ('byte "a"\nint 1\n+', "expected uint64"),
+        ("int 1\nint 2", "stack len is 2"),
+        ("pop\nint 1", "stack underflow"),
+        ('byte "a"', "stack finished with bytes"),
+        ("txna ApplicationArgs 0\npop\nint 1", "invalid ApplicationArgs index"),
+        ("retsub", "retsub with empty callstack"),
+    ],
+)
+def test_errors(source, message):
+    with pytest.raises(TealEvalError) as e:
+        run(source)
+    assert message in e.value.message
+
+
+def test_transaction_fields():
+    assert run(
+        """
+txna ApplicationArgs 1
+byte "b"
+==
+txn NumAppArgs
+int 2
+==
+&&
+txna Applications 1
+int 7
+==
+&&
+txn ApplicationID
+global CurrentApplicationID
+==
+&&""",
+        apaa=[b"a", b"b"],
+        apfa=[7],
+    ).approved
+
+
+def test_state():
+    ledger = LocalLedger(numAccounts=0)
+    assert run(
+        """
+byte "k"
+int 5
+app_global_put
+byte "k"
+app_global_get
+int 5
+==""",
+        ledger,
+    ).approved
+    assert ledger.apps[APP_ID].globalState == {b"k": 5}
+
+    # the sender has not opted in
+    with pytest.raises(TealEvalError) as e:
+        run('int 0\nbyte "k"\napp_local_get', ledger)
+    assert "is not opted in" in e.value.message
+
+
+def test_budget():
+    loop = "int 0\nloop:\nint 1\n+\ndup\nint 1000\n<\nbnz loop\n"
+    with pytest.raises(TealEvalError) as e:
+        run(loop)
+    assert "budget exceeded" in e.value.message
+
+
+def test_rejects_malformed_programs():
+    with pytest.raises(TealEvalError):
+        # illegal opcode
+        Program(bytes([5, 0xFF]))
+    with pytest.raises(TealEvalError):
+        # branch into the middle of an instruction
+        Program(bytes([5, 0x42, 0x00, 0x01, 0x81, 0x01]))
@@ -0,0 +1,147 @@
+import time
+
+import msgpack
+from algosdk import account, encoding
+
+from ..contracts.methods import SELECTORS
+from ..events import GovernorEventStream
+from .stub import StubAlgod
+
+APP_ID = 42
+
+
+def appCall(sender, appArgs=(), onCompletion=0, accounts=(), appID=APP_ID, dt=None):
+    txn = {"type": "appl", "snd": encoding.decode_address(sender)}
+    if appID:
+        txn["apid"] = appID
+    if onCompletion:
+        txn["apan"] = onCompletion
+    if appArgs:
+        txn["apaa"] = list(appArgs)
+    if accounts:
+        txn["apat"] = [encoding.decode_address(a) for a in accounts]
+    stib = {"txn": txn}
+    if dt:
+        stib["dt"] = dt
+    return stib
+
+
+def makeBlock(round, txns):
+    return msgpack.packb({"block": {"rnd": round, "ts": 1000 + round, "txns": txns}})
+
+
+def test_decodes_events_and_deltas():
+    voter = account.generate_account()[1]
+    delegate = account.generate_account()[1]
+
+    stub = StubAlgod()
+    stub.round = 10
+    stub.blocks[3] = makeBlock(
+        3,
+        [
+            {"txn": {"type": "pay", "snd": encoding.decode_address(voter)}},
+            appCall(voter, onCompletion=1),
+            appCall(voter, [SELECTORS["stake"]], appID=APP_ID + 1),
+            appCall(
+                voter,
+                [SELECTORS["stake"]],
+                dt={
+                    "gd": {b"total_staked": {"at": 2, "ui": 500}},
+                    "ld": {0: {b"staked": {"at": 2, "ui": 500}}},
+                },
+            ),
+        ],
+    )
+    stub.blocks[7] = makeBlock(
+        7,
+        [
+            appCall(
+                voter,
+                [SELECTORS["delegate_voting_power"]],
+                accounts=[delegate],
+                dt={
+                    "ld": {
+                        0: {
+                            b"voting_power_delegated_to": {"at": 1, "bs": b"\xff" * 32}
+                        },
+                        1: {b"voting_power_delegated_from": {"at": 3}},
+                    }
+                },
+            ),
+            appCall(voter, onCompletion=2),
+            # methods are called by selector, not by name
+            appCall(voter, [b"vote"]),
+        ],
+    )
+
+    events = list(GovernorEventStream(stub, APP_ID, startRound=1).events(untilRound=10))
+
+    assert [(e.round, e.index, e.kind) for e in events] == [
+        (3, 1, "opt_in"),
+        (3, 3, "stake"),
+        (7, 0, "delegate_voting_power"),
+        (7, 1, "claim"),
+        (7, 2, "unknown"),
+    ]
+    stake = events[1]
+    assert stake.timestamp == 1003
+    assert stake.sender == voter
+    assert stake.globalDelta == {b"total_staked": 500}
+    assert stake.localDelta == {voter: {b"staked": 500}}
+
+    delegation = events[2]
+    assert delegation.accounts == [delegate]
+    assert delegation.localDelta == {
+        voter: {b"voting_power_delegated_to": b"\xff" * 32},
+        delegate: {b"voting_power_delegated_from": None},
+    }
+
+
+def test_resumes_from_checkpoint(tmp_path):
+    voter = account.generate_account()[1]
+    checkpoint = tmp_path / "checkpoint"
+
+    stub = StubAlgod()
+    stub.round = 20
+    stub.blocks[5] = makeBlock(5, [appCall(voter, [SELECTORS["vote"]])])
+    stub.blocks[15] = makeBlock(15, [appCall(voter, [SELECTORS["execute_proposal"]])])
+
+    stream = GovernorEventStream(stub, APP_ID, startRound=1, checkpointPath=checkpoint)
+    assert [e.kind for e in stream.events(untilRound=10)] == ["vote"]
+    assert checkpoint.read_text() == "10"
+
+    resumed = GovernorEventStream(stub, APP_ID, checkpointPath=checkpoint)
+    assert resumed.nextRound == 11
+    assert [e.kind for e in resumed.events(untilRound=20)] == ["execute_proposal"]
+    assert checkpoint.read_text() == "20"
+
+
+def test_follows_new_blocks():
+    voter = account.generate_account()[1]
+
+    stub = StubAlgod()
+    stub.round = 5
+    stub.blocks[8] = makeBlock(8, [appCall(voter, [SELECTORS["cancel_proposal"]])])
+
+    stream = GovernorEventStream(stub, APP_ID)
+    events = list(stream.events(untilRound=9))
+
+    assert [(e.round, e.kind) for e in events] == [(8, "cancel_proposal")]
+    # each new round is waited for, not polled
+    assert stub.statusAfterBlockCalls == 4
+
+
+def test_replays_faster_than_real_time():
+    # 4.5 second blocks
+    rounds = 5000
+    stub = StubAlgod()
+    stub.round = rounds
+
+    start = time.perf_counter()
+    stream = GovernorEventStream(stub, APP_ID, startRound=1)
+    list(stream.events(untilRound=rounds))
+    elapsed = time.perf_counter() - start
+
+    assert stream.blocksRead == rounds
+    assert stub.statusAfterBlockCalls == 0
+    assert elapsed < rounds * 4.5 / 1000
@@ -0,0 +1,290 @@
+import time
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+
+from ..account import Account
+from ..events import GovernorEventStream
+from ..ledger import LocalAlgodClient, LocalLedger
+from ..operations import (
+    castBallot,
+    claimBulk,
+    createGovernor,
+    createProposal,
+    executeAllPassed,
+    executeProposal,
+    joinGovernor,
+    joinGovernorBulk,
+    optInToApp,
+    registerProposal,
+    sendToken,
+    setupGovernor,
+    stake,
+    vote,
+)
+from ..state import getProposalState, getVoterState
+from ..util import getBalances, getLastBlockTimestamp, waitForTransaction
+from .clock import GovernanceClock
+from .resources import (
+    createDummyAsset,
+    deployGovernor,
+    newAccount,
+    optInToAsset,
+    payAccount,
+)
+
+
+def test_payments():
+    client = LocalAlgodClient()
+    sender = newAccount(client)
+    receiver = account.generate_account()[1]
+
+    payAccount(client, sender, receiver, 200_000)
+    assert client.account_info(receiver)["amount"] == 200_000
+    assert client.account_info(sender.getAddress())["amount"] == 10 ** 8 - 201_000
+
+    # a new account needs the minimum balance
+    with pytest.raises(AlgodHTTPError) as e:
+        payAccount(client, sender, account.generate_account()[1], 1000)
+    assert "below min" in str(e.value)
+
+
+def test_groups_are_atomic():
+    client = LocalAlgodClient()
+    sender = newAccount(client, 10 ** 6)
+    receiver = account.generate_account()[1]
+
+    sp = client.suggested_params()
+    txns = [
+        transaction.PaymentTxn(sender.getAddress(), sp, receiver, 500_000),
+        transaction.PaymentTxn(sender.getAddress(), sp, receiver, 10 ** 6),
+    ]
+    transaction.assign_group_id(txns)
+    with pytest.raises(AlgodHTTPError):
+        client.send_transactions([t.sign(sender.getPrivateKey()) for t in txns])
+
+    # nothing of the group was applied
+    assert client.account_info(sender.getAddress())["amount"] == 10 ** 6
+    assert client.account_info(receiver)["amount"] == 0
+
+
+def test_confirmation_timing():
+    ledger = LocalLedger(blockTime=4, timestamp=1000)
+    client = LocalAlgodClient(ledger)
+    lastRound = ledger.round
+
+    response = payAccount(
+        client, ledger.genesisAccounts[0], account.generate_account()[1], 10 ** 6
+    )
+    # sent after the last round, confirmed in the one after the next
+    assert response.confirmedRound == lastRound + 2
+    assert getLastBlockTimestamp(client)[1] == 1000 + 2 * 4
+
+    ledger.advanceTime(100)
+    assert ledger.timestamp == 1108
+
+    devLedger = LocalLedger(devMode=True, timestamp=1000)
+    devClient = LocalAlgodClient(devLedger)
+    response = payAccount(
+        devClient, devLedger.genesisAccounts[0], account.generate_account()[1], 10 ** 6
+    )
+    assert response.confirmedRound == 1
+    assert devLedger.timestamp == 1004
+
+
+def test_events_from_local_blocks():
+    client = LocalAlgodClient(LocalLedger(devMode=True))
+    creator = newAccount(client)
+    govToken = createDummyAsset(client, 10 ** 6, creator)
+    appID = createGovernor(
+        client=client,
+        creator=creator,
+        govTokenId=govToken,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        stakeDurationSeconds=100,
+        proposeDurationSeconds=100,
+        voteDurationSeconds=100,
+        executeDelaySeconds=100,
+        claimDurationSeconds=100,
+    )
+    stream = GovernorEventStream(client, appID, startRound=1)
+    setupGovernor(client, appID, creator, govToken)
+    optInToApp(client, appID, creator)
+    stake(client, appID, 10, creator)
+
+    events = list(stream.events(untilRound=client.ledger.round))
+    assert [e.kind for e in events] == ["create", "setup", "opt_in", "stake"]
+    assert all(e.sender == creator.getAddress() for e in events[1:])
+
+
+def test_join_in_one_round_trip():
+    client = LocalAlgodClient()
+    creator = newAccount(client)
+    holders = [newAccount(client) for _ in range(20)]
+    govToken = createDummyAsset(client, 10 ** 6, creator)
+    # the holders hold the tokens they stake
+    for holder in holders:
+        optInToAsset(client, govToken, holder)
+        sendToken(client, creator, govToken, 100, holder)
+    appID = deployGovernor(client, creator, govToken)
+
+    # opting in and staking separately waits on two confirmations
+    firstRound = client.ledger.round
+    optInToApp(client, appID, holders[0])
+    stake(client, appID, 10, holders[0])
+    oneConfirmation = (client.ledger.round - firstRound) // 2
+
+    firstRound = client.ledger.round
+    joinGovernor(client, appID, 10, holders[1])
+    assert client.ledger.round - firstRound == oneConfirmation
+    assert getVoterState(client, appID, holders[1].getAddress()).votingPower == 10
+
+    # the groups of a bulk join confirm together
+    firstRound = client.ledger.round
+    failures = joinGovernorBulk(client, appID, [(holder, 10) for holder in holders[1:]])
+    assert client.ledger.round - firstRound == oneConfirmation
+    # already joined
+    assert list(failures) == [holders[1].getAddress()]
+    for holder in holders[2:]:
+        assert getVoterState(client, appID, holder.getAddress()).amountStaked == 10
+
+
+def registeredProposals(client, count):
+    """Deploy a governor whose creator stakes 100 tokens and registers all but
+    the last of count proposals, then move to the vote period.
+
+    Returns:
+        The creator, the governor app ID, its clock and the proposal app IDs.
+    """
+    creator, proposer = newAccount(client), newAccount(client)
+    govToken = createDummyAsset(client, 10 ** 6, creator)
+    appID = deployGovernor(client, creator, govToken)
+    clock = GovernanceClock(client, appID)
+
+    optInToApp(client, appID, creator)
+    stake(client, appID, 100, creator)
+    proposals = [createProposal(client, proposer, appID, creator) for _ in range(count)]
+    clock.toPhase("propose")
+    for proposalAppId in proposals[:-1]:
+        registerProposal(client, appID, proposalAppId, creator)
+    clock.toPhase("vote")
+    return creator, appID, clock, proposals
+
+
+def test_ballot():
+    client = LocalAlgodClient()
+    creator, appID, clock, proposals = registeredProposals(client, 10)
+    # voted on before the ballot
+    vote(client, appID, proposals[3], 1, creator)
+
+    firstRound = client.ledger.round
+    results = castBallot(
+        client, appID, {p: i % 2 for i, p in enumerate(proposals)}, creator
+    )
+    assert list(results) == proposals
+    # not registered and already voted on
+    rejected = [p for p, error in results.items() if error is not None]
+    assert rejected == [proposals[3], proposals[-1]]
+    # algod refuses the groups with a rejected vote when they are sent, so the
+    # votes sent again one by one still confirm in one round trip
+    assert client.ledger.round - firstRound == 2
+
+    for i, proposalAppId in enumerate(proposals[:-1]):
+        state = getProposalState(client, proposalAppId)
+        assert (state.forVotes, state.againstVotes) == ((100, 0) if i % 2 else (0, 100))
+
+
+def test_execute_all_passed():
+    client = LocalAlgodClient()
+    creator, appID, clock, proposals = registeredProposals(client, 12)
+    # a vote for passes, a vote against does not, the last two get no votes
+    # and the last is not registered
+    castBallot(client, appID, {p: i % 2 for i, p in enumerate(proposals[:-2])}, creator)
+
+    # nothing is executed before the end of the execute delay
+    assert executeAllPassed(client, appID, proposals, creator) == {}
+
+    clock.toPhase("claim", offset=1)
+    passed = proposals[1:-2:2]
+    executeProposal(client, appID, passed[0], creator)
+    firstRound = client.ledger.round
+    results = executeAllPassed(client, appID, proposals, creator)
+    assert results == {p: None for p in passed[1:]}
+    assert client.ledger.round - firstRound == 2
+    for proposalAppId in proposals[:-1]:
+        assert getProposalState(client, proposalAppId).canExecute == (
+            0 if proposalAppId in passed else 1
+        )
+
+    assert executeAllPassed(client, appID, proposals, creator) == {}
+
+
+def test_claim_bulk():
+    client = LocalAlgodClient()
+    creator, idle = newAccount(client), newAccount(client)
+    outsider = newAccount(client)
+    stakers = [newAccount(client) for _ in range(10)]
+    govToken = createDummyAsset(client, 10 ** 6, creator)
+    for staker in stakers:
+        optInToAsset(client, govToken, staker)
+        sendToken(client, creator, govToken, 100, staker)
+    appID = deployGovernor(client, creator, govToken)
+    clock = GovernanceClock(client, appID)
+    assert joinGovernorBulk(client, appID, [(s, 100) for s in stakers]) == {}
+    optInToApp(client, appID, idle)
+
+    clock.toPhase("claim")
+    appAddr = get_application_address(appID)
+    appBalance = getBalances(client, appAddr)[0]
+
+    # the close out has to pay the fee of the transfer back
+    closeOutTxn = transaction.ApplicationCloseOutTxn(
+        stakers[0].getAddress(),
+        client.suggested_params(),
+        appID,
+        foreign_assets=[govToken],
+    )
+    with pytest.raises(Exception):
+        client.send_transaction(closeOutTxn.sign(stakers[0].getPrivateKey()))
+
+    firstRound = client.ledger.round
+    results = claimBulk(client, appID, stakers + [idle, outsider])
+    assert client.ledger.round - firstRound == 2
+    # the close out and the transfer of the stake back
+    assert [results[s.getAddress()] for s in stakers] == [(None, 2)] * len(stakers)
+    assert results[idle.getAddress()] == (None, 1)
+    # not opted in
+    assert results[outsider.getAddress()].error is not None
+    assert results[outsider.getAddress()].transactions == 0
+
+    for staker in stakers:
+        assert getBalances(client, staker.getAddress())[govToken] == 100
+    # the claims paid all their fees
+    assert getBalances(client, appAddr)[0] == appBalance
+
+
+def test_throughput():
+    ledger = LocalLedger(devMode=True, verifySignatures=False)
+    client = LocalAlgodClient(ledger)
+    sender = newAccount(client)
+    receivers = [account.generate_account()[1] for _ in range(10)]
+    sp = client.suggested_params()
+
+    count = 500
+    start = time.perf_counter()
+    for i in range(count):
+        txn = transaction.PaymentTxn(
+            sender.getAddress(), sp, receivers[i % 10], 100_000, note=str(i).encode()
+        )
+        client.send_transaction(txn.sign(sender.getPrivateKey()))
+    waitForTransaction(client, txn.get_txid())
+    elapsed = time.perf_counter() - start
+
+    assert client.account_info(receivers[0])["amount"] == count // 10 * 100_000
+    # at least a thousand transactions per second
+    assert count / elapsed > 1000
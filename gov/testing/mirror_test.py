@@ -0,0 +1,232 @@
+from base64 import b64encode
+
+from algosdk import account
+
+from ..account import Account
+from ..contracts.methods import SELECTORS
+from ..events import GovernorEvent
+from ..mirror import StateMirror
+from ..ledger import LocalAlgodClient
+from ..operations import optInToApp, sendToken, stake
+from ..util import PendingTxnResponse, getAppGlobalState, stateKey
+from .resources import createDummyAsset, deployGovernor, newAccount, optInToAsset
+from .stub import StubAlgod
+
+APP_ID = 42
+
+
+class StubAccounts(StubAlgod):
+    def __init__(self) -> None:
+        super().__init__()
+        self.accountInfoCalls = 0
+
+    def account_info(self, address):
+        self.accountInfoCalls += 1
+        return {
+            "amount": 0,
+            "apps-local-state": [
+                {
+                    "id": APP_ID,
+                    "key-value": [
+                        {
+                            "key": b64encode(b"staked").decode(),
+                            "value": {"type": 2, "uint": 100},
+                        }
+                    ],
+                }
+            ],
+        }
+
+
+def uintDelta(key, value):
+    return {"key": b64encode(key).decode(), "value": {"action": 2, "uint": value}}
+
+
+def response(round, sender, globalDelta=(), localDelta=(), onCompletion=0):
+    txn = {"apid": APP_ID, "snd": sender}
+    if onCompletion:
+        txn["apan"] = onCompletion
+    return PendingTxnResponse(
+        {
+            "pool-error": "",
+            "txn": {"txn": txn},
+            "confirmed-round": round,
+            "global-state-delta": list(globalDelta),
+            "local-state-delta": [{"address": sender, "delta": list(localDelta)}],
+        }
+    )
+
+
+def test_applies_deltas_without_reloading():
+    voter = account.generate_account()[1]
+    stub = StubAccounts()
+    stub.round = 10
+    mirror = StateMirror(stub)
+
+    assert mirror.getGlobalState(APP_ID) == {stateKey("gov_token"): 7}
+    assert mirror.getLocalState(APP_ID, voter) == {b"staked": 100}
+
+    mirror.apply(
+        response(
+            11,
+            voter,
+            [uintDelta(b"total_staked", 150)],
+            [uintDelta(b"staked", 150)],
+        )
+    )
+    mirror.apply(
+        response(
+            11,
+            voter,
+            [{"key": b64encode(b"total_staked").decode(), "value": {"action": 3}}],
+        )
+    )
+
+    assert mirror.getGlobalState(APP_ID) == {stateKey("gov_token"): 7}
+    assert mirror.getLocalState(APP_ID, voter) == {b"staked": 150}
+    assert stub.appInfoCalls == 1
+    assert stub.accountInfoCalls == 1
+
+    mirror.apply(response(11, voter, onCompletion=2))
+    assert mirror.getLocalState(APP_ID, voter) is None
+    assert stub.accountInfoCalls == 1
+
+
+def test_same_round_as_another_sender():
+    voter, other = (account.generate_account()[1] for _ in range(2))
+    stub = StubAccounts()
+    stub.round = 10
+    mirror = StateMirror(stub)
+    mirror.getGlobalState(APP_ID)
+
+    # both stake in round 11, the other account after the voter
+    mirror.apply(response(11, voter, [uintDelta(b"total_staked", 150)]))
+    # the voter's call does not cover its round
+    assert mirror.rounds[APP_ID] == 10
+
+    # the voter's next call is in a later round, which might have missed the
+    # other's call
+    mirror.apply(response(12, voter, [uintDelta(b"total_staked", 170)]))
+    assert mirror.refreshes == 2
+
+    # an event stream covers the whole round
+    mirror = StateMirror(stub)
+    mirror.getGlobalState(APP_ID)
+    mirror.apply(response(11, voter, [uintDelta(b"total_staked", 150)]))
+    mirror.applyEvent(
+        APP_ID,
+        GovernorEvent(
+            11,
+            1,
+            0,
+            "stake",
+            other,
+            [SELECTORS["stake"]],
+            [],
+            [],
+            {b"total_staked": 160},
+            {},
+        ),
+    )
+    mirror.advance(APP_ID, 11)
+    assert mirror.rounds[APP_ID] == 11
+    assert mirror.getGlobalState(APP_ID)[b"total_staked"] == 160
+
+
+def test_refresh_reads_again_after_new_block():
+    class StubNewBlock(StubAccounts):
+        def application_info(self, appID):
+            if self.appInfoCalls == 0:
+                # a block is made while the state is read
+                self.round += 1
+            return super().application_info(appID)
+
+    stub = StubNewBlock()
+    stub.round = 10
+    mirror = StateMirror(stub)
+    mirror.getGlobalState(APP_ID)
+
+    assert stub.appInfoCalls == 2
+    assert mirror.rounds[APP_ID] == 11
+    # a delta of the round the state was read in is already reflected
+    mirror.apply(response(11, account.generate_account()[1], [uintDelta(b"x", 1)]))
+    assert b"x" not in mirror.getGlobalState(APP_ID)
+
+
+def test_reloads_after_gap():
+    voter = account.generate_account()[1]
+    stub = StubAccounts()
+    stub.round = 10
+    mirror = StateMirror(stub)
+    mirror.getGlobalState(APP_ID)
+
+    stub.round = 20
+    mirror.apply(response(15, voter, [uintDelta(b"total_staked", 150)]))
+
+    assert mirror.refreshes == 2
+    assert mirror.rounds[APP_ID] == 20
+    assert mirror.getGlobalState(APP_ID) == {stateKey("gov_token"): 7}
+
+    # older deltas are already reflected
+    mirror.apply(response(19, voter, [uintDelta(b"total_staked", 150)]))
+    assert b"total_staked" not in mirror.getGlobalState(APP_ID)
+
+
+def test_events_keep_mirror_current():
+    voter = account.generate_account()[1]
+    stub = StubAccounts()
+    stub.round = 10
+    mirror = StateMirror(stub)
+    mirror.getGlobalState(APP_ID)
+
+    mirror.advance(APP_ID, 30)
+    mirror.applyEvent(
+        APP_ID,
+        GovernorEvent(
+            31, 0, 0, "vote", voter, [SELECTORS["vote"]], [], [], {b"votes": 3}, {}
+        ),
+    )
+
+    assert mirror.refreshes == 1
+    assert mirror.getGlobalState(APP_ID)[b"votes"] == 3
+
+
+def test_sole_writer_applies_later_rounds():
+    voter = account.generate_account()[1]
+    stub = StubAccounts()
+    stub.round = 10
+    mirror = StateMirror(stub, soleWriter=True)
+    mirror.getGlobalState(APP_ID)
+
+    mirror.apply(response(15, voter, [uintDelta(b"total_staked", 150)]))
+    # another call of the same round
+    mirror.apply(response(15, voter, [uintDelta(b"total_staked", 170)]))
+    assert mirror.refreshes == 1
+    assert mirror.rounds[APP_ID] == 14
+    assert mirror.getGlobalState(APP_ID)[b"total_staked"] == 170
+
+
+def test_stake_reads_mirror():
+    client = LocalAlgodClient()
+    creator = newAccount(client)
+    stakers = [newAccount(client) for _ in range(6)]
+    govToken = createDummyAsset(client, 10 ** 6, creator)
+    appID = deployGovernor(client, creator, govToken)
+    for staker in stakers:
+        optInToAsset(client, govToken, staker)
+        sendToken(client, creator, govToken, 10, staker)
+        optInToApp(client, appID, staker)
+
+    # without a stream, each stake is in a later round that may have missed
+    # other calls, so the app is read again every time
+    mirror = StateMirror(client)
+    for staker in stakers[:3]:
+        stake(client, appID, 10, staker, mirror)
+    assert (mirror.refreshes, mirror.applied) == (4, 0)
+
+    # only these stakers call the governor from here on
+    mirror = StateMirror(client, soleWriter=True)
+    for staker in stakers[3:]:
+        stake(client, appID, 10, staker, mirror)
+    assert (mirror.refreshes, mirror.applied) == (1, 3)
+    assert mirror.getGlobalState(appID) == getAppGlobalState(client, appID)
@@ -0,0 +1,419 @@
+import hashlib
+import time
+
+import pytest
+from algosdk import account, encoding
+
+from ..account import Account
+from ..ledger import LocalAlgodClient, LocalLedger
+from ..model import GovernorModel, ModelRejection, itob
+from ..contracts import keys
+from ..operations import (
+    beginNewGovernanceCycle,
+    cancelProposal,
+    claim,
+    createGovernor,
+    createProposal,
+    delegatePropositionPower,
+    delegateVotingPower,
+    executeProposal,
+    getProposalContracts,
+    joinGovernor,
+    optInToApp,
+    registerProposal,
+    sendToken,
+    setupGovernor,
+    stake,
+    vote,
+)
+from ..util import decodeState, getAppGlobalState, getLastBlockTimestamp, stateKey
+from .resources import createDummyAsset, optInToAsset, payAccount
+
+DURATIONS = dict(
+    stakeDurationSeconds=300,
+    proposeDurationSeconds=100,
+    voteDurationSeconds=100,
+    executeDelaySeconds=50,
+    claimDurationSeconds=100,
+)
+
+
+def newModel(creator, **durations):
+    return GovernorModel(
+        creator=creator,
+        govTokenId=7,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        **(durations or DURATIONS),
+    )
+
+
+def addresses(count):
+    return [account.generate_account()[1] for _ in range(count)]
+
+
+def test_full_cycle():
+    creator, voter, proposer, target = addresses(4)
+    model = newModel(creator)
+    proposal = model.createProposal(proposer, target)
+
+    # nothing works before setup
+    with pytest.raises(ModelRejection):
+        model.optIn(creator)
+
+    model.setup(creator)
+    for address, amount in ((creator, 10), (voter, 15)):
+        model.optIn(address)
+        model.stake(address, amount)
+    model.delegateVotingPower(voter, creator)
+    assert model.localStates[creator][stateKey("address_voting_power")] == 25
+    assert model.localStates[voter][stateKey("address_voting_power")] == 0
+
+    model.advance(300)
+    model.registerProposal(creator, proposal)
+    assert model.localStates[creator][stateKey("address_proposition_power")] == 5
+
+    model.advance(100)
+    model.vote(creator, proposal, 1)
+    # the proposal app keeps its own tally
+    assert model.proposals[proposal][stateKey("for_votes")] == 25
+    with pytest.raises(ModelRejection):
+        model.vote(creator, proposal, 1)
+
+    model.advance(100)
+    with pytest.raises(ModelRejection):
+        # still in the execution delay
+        model.executeProposal(creator, proposal)
+    model.advance(51)
+    model.executeProposal(creator, proposal)
+    assert model.proposals[proposal][stateKey("can_execute")] == 0
+
+    assert model.claim(voter) == 15
+    assert voter not in model.localStates
+    assert model.tokenBalance == 10
+
+    with pytest.raises(ModelRejection):
+        model.beginNewGovernanceCycle(creator)
+    model.advance(100)
+    model.beginNewGovernanceCycle(creator)
+    assert model.globalState[stateKey("gov_cycle_id")] == 1
+    assert model.globalState[stateKey("num_registered_proposals")] == 0
+    # the proposal keeps its registration, but it is stale in the new cycle
+    assert model.proposals[proposal][stateKey("registration_cycle")] == 0
+    with pytest.raises(ModelRejection):
+        model.cancelProposal(creator, proposal)
+
+    # the next operation of an account from the last cycle rolls it over
+    model.delegateVotingPower(creator, creator)
+    assert model.localStates[creator][stateKey("gov_cycle_id")] == 1
+
+
+def test_voted_flags_expire_with_the_cycle():
+    creator, voter = addresses(2)
+    model = newModel(creator)
+    model.setup(creator)
+    model.optIn(voter)
+    model.stake(voter, 10)
+    proposal = model.createProposal(voter, creator)
+
+    for cycle in range(2):
+        model.advance(300)
+        # the same proposal app can be registered again in a new cycle
+        model.registerProposal(voter, proposal)
+        model.advance(100)
+        model.vote(voter, proposal, 1)
+        with pytest.raises(ModelRejection):
+            model.vote(voter, proposal, 1)
+        # one flag per cycle, in a single key
+        voted = model.localStates[voter][stateKey("address_voted")]
+        assert voted == itob(cycle) + b"\x80"
+        model.advance(251)
+        model.beginNewGovernanceCycle(creator)
+
+
+def test_rejection_leaves_state_unchanged():
+    creator, voter = addresses(2)
+    model = newModel(creator)
+    model.setup(creator)
+    model.optIn(voter)
+    model.stake(voter, 10)
+    model.advance(300 + 100 + 100 + 50 + 100 + 1)
+    model.beginNewGovernanceCycle(creator)
+
+    globalBefore = dict(model.globalState)
+    localBefore = dict(model.localStates[voter])
+    with pytest.raises(ModelRejection):
+        # rolls the voter over, then fails outside of the staking period
+        model.advance(400)
+        model.delegateVotingPower(voter, creator)
+
+    assert model.globalState == globalBefore
+    assert model.localStates[voter] == localBefore
+    assert model.rejected == 1
+
+
+def test_hundreds_of_proposals():
+    creator, proposer = addresses(2)
+    model = newModel(creator)
+    model.setup(creator)
+    model.optIn(proposer)
+    model.stake(proposer, 5 * (keys.MAX_NUM_PROPOSALS + 1))
+    proposals = [
+        model.createProposal(proposer, creator)
+        for _ in range(keys.MAX_NUM_PROPOSALS + 1)
+    ]
+    model.advance(300)
+
+    for proposal in proposals[:-1]:
+        model.registerProposal(proposer, proposal)
+    with pytest.raises(ModelRejection):
+        model.registerProposal(proposer, proposals[0])
+    # the voted flags of an account have a bit for each proposal of a cycle
+    with pytest.raises(ModelRejection):
+        model.registerProposal(proposer, proposals[-1])
+    assert model.globalState[stateKey("num_registered_proposals")] == len(
+        proposals[:-1]
+    )
+
+    model.advance(100)
+    for proposal in proposals[:-1]:
+        model.vote(proposer, proposal, 0)
+    voted = model.localStates[proposer][stateKey("address_voted")]
+    assert len(stateKey("address_voted")) + len(voted) == 128
+    power = model.localStates[proposer][stateKey("address_voting_power")]
+    assert all(
+        model.proposals[p][stateKey("against_votes")] == power for p in proposals[:-1]
+    )
+
+
+def test_throughput():
+    creator = addresses(1)[0]
+    voters = addresses(1000)
+    operations = 0
+
+    start = time.perf_counter()
+    model = newModel(creator)
+    model.setup(creator)
+    model.optIn(creator)
+    model.stake(creator, 10)
+    proposal = model.createProposal(creator, creator)
+    for cycle in range(20):
+        for voter in voters:
+            if cycle == 0:
+                model.optIn(voter)
+                model.stake(voter, 10)
+                operations += 2
+            model.delegateVotingPower(voter, creator)
+            operations += 1
+        model.advance(300)
+        model.registerProposal(creator, proposal)
+        model.advance(100)
+        for voter in voters:
+            with pytest.raises(ModelRejection):
+                # delegated all of its voting power
+                model.vote(voter, proposal, 1)
+            operations += 1
+        model.vote(creator, proposal, 1)
+        model.advance(251)
+        model.beginNewGovernanceCycle(creator)
+        operations += 5
+    elapsed = time.perf_counter() - start
+
+    # at least a million operations per minute
+    assert operations / elapsed * 60 > 1_000_000
+
+
+class Conformance:
+    """Runs each operation on chain and on the model and compares the results."""
+
+    def __init__(self, client, model, appID, accounts, proposals):
+        self.client = client
+        self.ledger = client.ledger
+        self.model = model
+        self.appID = appID
+        self.accounts = accounts
+        self.proposals = proposals
+
+    def run(self, chainOp, modelOp):
+        # the time the contract sees is the timestamp of the last block
+        self.model.setTime(getLastBlockTimestamp(self.client)[1])
+
+        try:
+            chainOp()
+            chainApproved = True
+        except Exception:
+            chainApproved = False
+        try:
+            modelOp()
+            modelApproved = True
+        except ModelRejection:
+            modelApproved = False
+
+        assert chainApproved == modelApproved
+        assert getAppGlobalState(self.client, self.appID) == self.model.globalState
+        for proposalAppId in self.proposals:
+            assert (
+                getAppGlobalState(self.client, proposalAppId)
+                == self.model.proposals[proposalAppId]
+            )
+        for a in self.accounts:
+            assert self.localState(a.getAddress()) == self.model.localStates.get(
+                a.getAddress()
+            )
+        return chainApproved
+
+    def localState(self, address):
+        for localState in self.client.account_info(address).get("apps-local-state", []):
+            if localState["id"] == self.appID:
+                return decodeState(localState.get("key-value", []))
+        return None
+
+    def waitUntil(self, timestamp):
+        if self.ledger.timestamp < timestamp:
+            self.ledger.makeBlock(timestamp)
+
+
+def test_conformance():
+    # in dev mode every operation gets a block of its own, so the contract sees
+    # the timestamp of the last block before the operation
+    client = LocalAlgodClient(LocalLedger(devMode=True))
+    creator, voter, proposer, target = (
+        Account(account.generate_account()[0]) for _ in range(4)
+    )
+    for a in (creator, voter, proposer, target):
+        payAccount(client, client.ledger.genesisAccounts[0], a.getAddress(), 10 ** 8)
+    govToken = createDummyAsset(client, 10 ** 13, creator)
+    for a in (voter, proposer):
+        optInToAsset(client, govToken, a)
+        sendToken(client, creator, govToken, 1000, a)
+
+    durations = dict(
+        stakeDurationSeconds=40,
+        proposeDurationSeconds=20,
+        voteDurationSeconds=20,
+        executeDelaySeconds=10,
+        claimDurationSeconds=20,
+    )
+    governorAppId = createGovernor(
+        client=client,
+        creator=creator,
+        govTokenId=govToken,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        **durations,
+    )
+    model = GovernorModel(
+        creator=creator.getAddress(),
+        govTokenId=govToken,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        proposalProgramHash=hashlib.sha256(getProposalContracts(client)[0]).digest(),
+        appID=governorAppId,
+        **durations,
+    )
+    proposalAppId = createProposal(client, proposer, governorAppId, target)
+    model.createProposal(proposer.getAddress(), target.getAddress(), proposalAppId)
+
+    c = Conformance(
+        client, model, governorAppId, [creator, voter, proposer], [proposalAppId]
+    )
+    addr = lambda a: a.getAddress()
+
+    c.run(
+        lambda: setupGovernor(client, governorAppId, creator, govToken),
+        lambda: model.setup(addr(creator)),
+    )
+    for a, amount in ((creator, 10), (voter, 15)):
+        c.run(
+            lambda: optInToApp(client, governorAppId, a),
+            lambda: model.optIn(addr(a)),
+        )
+        c.run(
+            lambda: stake(client, governorAppId, amount, a),
+            lambda: model.stake(addr(a), amount),
+        )
+    assert c.run(
+        lambda: joinGovernor(client, governorAppId, 5, proposer),
+        lambda: model.joinGovernor(addr(proposer), 5),
+    )
+    # already opted in
+    c.run(
+        lambda: joinGovernor(client, governorAppId, 5, voter),
+        lambda: model.joinGovernor(addr(voter), 5),
+    )
+    # can only stake once
+    c.run(
+        lambda: stake(client, governorAppId, 1, voter),
+        lambda: model.stake(addr(voter), 1),
+    )
+    c.run(
+        lambda: delegateVotingPower(client, governorAppId, voter, creator),
+        lambda: model.delegateVotingPower(addr(voter), addr(creator)),
+    )
+    assert c.run(
+        lambda: delegatePropositionPower(client, governorAppId, voter, creator),
+        lambda: model.delegatePropositionPower(addr(voter), addr(creator)),
+    )
+    # too early to propose
+    c.run(
+        lambda: registerProposal(client, governorAppId, proposalAppId, proposer),
+        lambda: model.registerProposal(addr(proposer), proposalAppId),
+    )
+
+    start, stakeEnd, proposeEnd, voteEnd, executeEnd, claimEnd = model.periods()
+    c.waitUntil(stakeEnd)
+    c.run(
+        lambda: registerProposal(client, governorAppId, proposalAppId, proposer),
+        lambda: model.registerProposal(addr(proposer), proposalAppId),
+    )
+    # once per cycle
+    c.run(
+        lambda: registerProposal(client, governorAppId, proposalAppId, proposer),
+        lambda: model.registerProposal(addr(proposer), proposalAppId),
+    )
+
+    c.waitUntil(proposeEnd)
+    c.run(
+        lambda: vote(client, governorAppId, proposalAppId, 0, proposer),
+        lambda: model.vote(addr(proposer), proposalAppId, 0),
+    )
+    c.run(
+        lambda: vote(client, governorAppId, proposalAppId, 1, creator),
+        lambda: model.vote(addr(creator), proposalAppId, 1),
+    )
+    # a vote for adds to the votes for, whatever the votes against
+    tally = model.proposals[proposalAppId]
+    assert (
+        tally[stateKey("for_votes")]
+        == model.localStates[addr(creator)][stateKey("address_voting_power")]
+    )
+    assert tally[stateKey("against_votes")] == 5
+    # too early to execute
+    c.run(
+        lambda: executeProposal(client, governorAppId, proposalAppId, creator),
+        lambda: model.executeProposal(addr(creator), proposalAppId),
+    )
+
+    c.waitUntil(executeEnd + 1)
+    c.run(
+        lambda: executeProposal(client, governorAppId, proposalAppId, creator),
+        lambda: model.executeProposal(addr(creator), proposalAppId),
+    )
+    c.run(
+        lambda: claim(client, governorAppId, voter),
+        lambda: model.claim(addr(voter)),
+    )
+
+    c.waitUntil(claimEnd + 1)
+    c.run(
+        lambda: beginNewGovernanceCycle(client, governorAppId, creator),
+        lambda: model.beginNewGovernanceCycle(addr(creator)),
+    )
+    # the proposal's registration was not cleared, but it belongs to the last cycle
+    c.run(
+        lambda: cancelProposal(client, governorAppId, proposalAppId, creator),
+        lambda: model.cancelProposal(addr(creator), proposalAppId),
+    )
@@ -1,12 +1,14 @@
+import hashlib
+
 import algosdk
 import pytest
 from algosdk import encoding
 
 from gov.operations import createGovernor, setupGovernor, delegateVotingPower, stake, delegatePropositionPower, \
-    registerProposal, vote, beginNewGovernanceCycle, claim, executeProposal
+    registerProposal, vote, beginNewGovernanceCycle, claim, executeProposal, getProposalContracts
 from gov.testing.resources import getTemporaryAccount, createDummyAsset, optInToAsset
 from gov.testing.setup import getAlgodClient
-from gov.util import getAppGlobalState, getLastBlockTimestamp
+from gov.util import getAppGlobalState, getLastBlockTimestamp, readableState
 
 
 def is_close(a, b, e=1):
@@ -38,20 +40,21 @@ def test_create():
         claimDurationSeconds=100,
     )
 
-    actual = getAppGlobalState(client, governorAppId)
+    actual = readableState(getAppGlobalState(client, governorAppId))
     expected = {
-        b'vote_threshold_key': 1,
-        b'creator_key': encoding.decode_address(creator.getAddress()),
-        b'quorum_threshold_key': 20,
-        b'max_num_proposals_key': 5,
-        b'num_active_proposals_key': 0,
-        b'propose_period_duration_key': 100,
-        b'propose_threshold_key': 5,
-        b'stake_period_duration_key': 300,
-        b'gov_token_key': govToken,
-        b'claim_period_duration_key': 100,
-        b'execute_delay_duration_key': 50,
-        b'vote_period_duration_key': 100
+        'vote_threshold': 1,
+        'creator': encoding.decode_address(creator.getAddress()),
+        'quorum_threshold': 20,
+        'max_num_proposals': 944,
+        'num_registered_proposals': 0,
+        'proposal_program_hash': hashlib.sha256(getProposalContracts(client)[0]).digest(),
+        'propose_period_duration': 100,
+        'propose_threshold': 5,
+        'stake_period_duration': 300,
+        'gov_token': govToken,
+        'claim_period_duration': 100,
+        'execute_delay_duration': 50,
+        'vote_period_duration': 100
     }
 
     assert actual == expected
@@ -98,26 +101,32 @@ def test_setup():
     startTime = getLastBlockTimestamp(client)[1] + 4 # add one block time (avg 4.5 s) for fund txn
     setupGovernor(client, governorAppId, creator, govToken)
 
-    actual = getAppGlobalState(client, governorAppId)
+    actual = readableState(getAppGlobalState(client, governorAppId))
     expected = {
-        b'vote_threshold_key': 1,
-        b'creator_key': encoding.decode_address(creator.getAddress()),
-        b'quorum_threshold_key': 20,
-        b'max_num_proposals_key': 5,
-        b'num_active_proposals_key': 0,
-        b'propose_period_duration_key': 100,
-        b'propose_threshold_key': 5,
-        b'stake_period_duration_key': 300,
-        b'gov_token_key': govToken,
-        b'claim_period_duration_key': 100,
-        b'execute_delay_duration_key': 50,
-        b'vote_period_duration_key': 100,
-        b'start_time_key': startTime,
-        b'gov_cycle_id_key': 0
+        'vote_threshold': 1,
+        'creator': encoding.decode_address(creator.getAddress()),
+        'quorum_threshold': 20,
+        'max_num_proposals': 944,
+        'num_registered_proposals': 0,
+        'proposal_program_hash': hashlib.sha256(getProposalContracts(client)[0]).digest(),
+        'propose_period_duration': 100,
+        'propose_threshold': 5,
+        'stake_period_duration': 300,
+        'gov_token': govToken,
+        'claim_period_duration': 100,
+        'execute_delay_duration': 50,
+        'vote_period_duration': 100,
+        'start_time': startTime,
+        'stake_time_end': startTime + 300,
+        'propose_time_end': startTime + 400,
+        'vote_time_end': startTime + 500,
+        'execute_delay_time_end': startTime + 550,
+        'claim_time_end': startTime + 650,
+        'gov_cycle_id': 0
     }
 
-    assert equal_dicts(actual, expected, set(b'start_time_key')) # start time can be +-1
-    assert is_close(actual[b'start_time_key'], expected[b'start_time_key'], e=1)
+    assert equal_dicts(actual, expected, set('start_time')) # start time can be +-1
+    assert is_close(actual['start_time'], expected['start_time'], e=1)
 
     # all of these should fail
     ops = [
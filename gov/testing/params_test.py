@@ -0,0 +1,72 @@
+import asyncio
+
+from algosdk import account
+
+from ..account import Account
+from ..aio import AsyncAlgodClient, vote
+from ..params import SuggestedParamsCache
+from .stub import StubAlgod
+
+
+class CountingStubAlgod(StubAlgod):
+    def __init__(self) -> None:
+        super().__init__()
+        self.suggestedParamsCalls = 0
+
+    def suggested_params(self):
+        self.suggestedParamsCalls += 1
+        return super().suggested_params()
+
+
+def test_cache_hits_within_round():
+    stub = CountingStubAlgod()
+    cache = SuggestedParamsCache(stub)
+
+    first = cache.suggested_params()
+    second = cache.suggested_params()
+
+    assert first.first == second.first == 1
+    assert first is not second
+    assert stub.suggestedParamsCalls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_invalidated_by_round_advance():
+    stub = CountingStubAlgod()
+    cache = SuggestedParamsCache(stub)
+
+    cache.suggested_params()
+    cache.status_after_block(1)
+    params = cache.suggested_params()
+
+    assert params.first == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_cache_invalidated_by_ttl():
+    now = [0.0]
+    stub = CountingStubAlgod()
+    cache = SuggestedParamsCache(stub, ttl=2, clock=lambda: now[0])
+
+    cache.suggested_params()
+    now[0] = 1.5
+    cache.suggested_params()
+    now[0] = 2.5
+    cache.suggested_params()
+
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_bulk_voting_fetches_params_once_per_round():
+    stub = CountingStubAlgod()
+    voters = [Account(account.generate_account()[0]) for _ in range(100)]
+
+    async def run():
+        async with AsyncAlgodClient(SuggestedParamsCache(stub)) as client:
+            await asyncio.gather(*(vote(client, 1, 2, 1, v) for v in voters))
+
+    asyncio.run(run())
+
+    # each vote is a group of two transactions
+    assert len(stub.sent) == 100 * 2
+    assert stub.suggestedParamsCalls == 1
@@ -0,0 +1,102 @@
+from algosdk import account, encoding
+
+from ..assembler import assemble
+from ..contracts.methods import SELECTORS
+from ..evaluator import EvalParams, Program, evaluate
+from ..ledger import App, LocalLedger
+from ..profiler import OpcodeProfiler, methodName, subroutineNames
+
+TEAL = """#pragma version 5
+txn NumAppArgs
+int 0
+==
+bnz main_l2
+int 2
+callsub sub0
+int 1
++
+return
+main_l2:
+int 1
+return
+sub0: // double
+dup
+callsub sub1
+retsub
+sub1: // add
++
+retsub
+"""
+
+
+def call(profiler, *appArgs):
+    ledger = LocalLedger(numAccounts=0)
+    program = assemble(TEAL)
+    ledger.apps[1] = App(bytes(32), program, program, (0, 0), (0, 0), 0)
+    txn = dict(
+        type="appl",
+        snd=encoding.decode_address(account.generate_account()[1]),
+        apid=1,
+        apaa=list(appArgs),
+    )
+    params = EvalParams([txn], [bytes(32)], bytes(32), 1, 1000, tracer=profiler)
+    evaluate(Program(program), ledger, params, 0, 1)
+
+
+def test_subroutine_names():
+    names = subroutineNames(TEAL)
+    program = Program(assemble(TEAL))
+    assert sorted(names.values()) == ["add", "double"]
+    # each name is at the start of its subroutine's first instruction
+    assert [program.instructions[pc].name for pc in sorted(names)] == ["dup", "+"]
+
+
+def test_method_name():
+    assert methodName({"apid": 0}) == "create"
+    assert methodName({"apid": 1, "apan": 2}) == "claim"
+    assert methodName({"apid": 1, "apaa": [SELECTORS["vote"], b"\x01"]}) == "vote"
+    assert methodName({"apid": 1, "apaa": [b"tally"]}) == "tally"
+    assert methodName({"apid": 1}) == "no_op"
+
+
+def test_costs():
+    profiler = OpcodeProfiler({"test": TEAL})
+    call(profiler, b"double")
+    call(profiler, b"double")
+    with profiler.scope("empty"):
+        call(profiler)
+
+    method = profiler.methods[("test", "double")]
+    assert (method.calls, method.total, method.max) == (2, 30, 15)
+    assert profiler.methods[("test", "no_op [empty]")].max == 7
+
+    # double includes the cost of add
+    double = profiler.subroutines[("test", "double")]
+    add = profiler.subroutines[("test", "add")]
+    assert (double.calls, double.total) == (2, 10)
+    assert (add.calls, add.total) == (2, 4)
+    assert "test double" in profiler.report()
+
+
+def test_regressions():
+    profiler = OpcodeProfiler({"test": TEAL})
+    call(profiler, b"double")
+    assert profiler.baseline() == {"test": {"double": 15}}
+
+    assert profiler.regressions({"test": {"double": 15}}) == []
+    assert profiler.regressions({"test": {"double": 14}}, threshold=0.1) == []
+    assert profiler.regressions({"test": {"double": 10}}) == [
+        "test double: 15 opcodes, up from 10 (+50.0%)"
+    ]
+    # new methods are not compared
+    assert profiler.regressions({}) == []
+
+
+def test_comparison():
+    profiler = OpcodeProfiler({"test": TEAL})
+    call(profiler, b"double")
+    call(profiler)
+
+    lines = profiler.comparison({"test": {"double": 20}}).splitlines()
+    assert lines[1].split() == ["test", "double", "20", "15", "-25.0%"]
+    assert lines[2].split() == ["test", "no_op", "-", "7", "new"]
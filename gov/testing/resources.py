@@ -6,6 +6,8 @@ from algosdk.future import transaction
 from algosdk import account
 
 from ..account import Account
+from ..ledger import LocalAlgodClient
+from ..operations import createGovernor, setupGovernor
 from ..util import PendingTxnResponse, waitForTransaction
 from .setup import getGenesisAccounts
 
@@ -117,3 +119,47 @@ def createDummyAsset(client: AlgodClient, total: int, account: Account = None) -
     response = waitForTransaction(client, signedTxn.get_txid())
     assert response.assetIndex is not None and response.assetIndex > 0
     return response.assetIndex
+
+
+def newAccount(client: LocalAlgodClient, amount: int = FUNDING_AMOUNT) -> Account:
+    """Create an account funded by a genesis account of a local ledger."""
+    a = Account(account.generate_account()[0])
+    payAccount(client, client.ledger.genesisAccounts[0], a.getAddress(), amount)
+    return a
+
+
+# an hour long cycle
+GOVERNOR_DURATIONS = dict(
+    stakeDurationSeconds=1200,
+    proposeDurationSeconds=600,
+    voteDurationSeconds=600,
+    executeDelaySeconds=600,
+    claimDurationSeconds=600,
+)
+
+
+def deployGovernor(
+    client: AlgodClient, creator: Account, govToken: int, **durations: int
+) -> int:
+    """Create and set up a governor of a token, starting its first cycle.
+
+    Args:
+        client: An algod client.
+        creator: The account creating and funding the governor.
+        govToken: The governance token ID.
+        durations: Period durations to use instead of GOVERNOR_DURATIONS.
+
+    Returns:
+        The governor app ID.
+    """
+    appID = createGovernor(
+        client=client,
+        creator=creator,
+        govTokenId=govToken,
+        proposeThreshold=5,
+        voteThreshold=1,
+        quorumThreshold=20,
+        **{**GOVERNOR_DURATIONS, **durations},
+    )
+    setupGovernor(client, appID, creator, govToken)
+    return appID
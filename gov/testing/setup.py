@@ -1,16 +1,36 @@
+import os
 from typing import Optional, List
 
 from algosdk.v2client.algod import AlgodClient
 from algosdk.kmd import KMDClient
 
 from ..account import Account
+from ..ledger import LocalAlgodClient, LocalLedger
+from ..transport import PooledAlgodClient
+
+# "local" runs the tests against an in-process LocalLedger, "sandbox" against
+# the sandbox
+NETWORK = os.environ.get("ALGO_GOV_NETWORK", "local")
 
 ALGOD_ADDRESS = "http://localhost:4001"
 ALGOD_TOKEN = "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
 
+localLedger: Optional[LocalLedger] = None
+
+
+def getLocalLedger() -> LocalLedger:
+    global localLedger
+
+    if localLedger is None:
+        localLedger = LocalLedger()
+
+    return localLedger
+
 
 def getAlgodClient() -> AlgodClient:
-    return AlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
+    if NETWORK == "local":
+        return LocalAlgodClient(getLocalLedger())
+    return PooledAlgodClient(ALGOD_TOKEN, ALGOD_ADDRESS)
 
 
 KMD_ADDRESS = "http://localhost:4002"
@@ -30,6 +50,9 @@ kmdAccounts: Optional[List[Account]] = None
 def getGenesisAccounts() -> List[Account]:
     global kmdAccounts
 
+    if NETWORK == "local":
+        return getLocalLedger().genesisAccounts
+
     if kmdAccounts is None:
         kmd = getKmdClient()
 
@@ -0,0 +1,109 @@
+import gc
+
+from algosdk import account, encoding
+from algosdk.future import transaction
+
+from ..account import Account
+from ..ledger import LocalAlgodClient
+from ..signing import TransactionSigner, signTransactions
+from ..util import waitForTransaction
+from .resources import payAccount
+
+SP = transaction.SuggestedParams(1000, 1, 1001, "A" * 43 + "=", flat_fee=True)
+
+
+def voteGroups(voters, numGroups):
+    groups = []
+    for i in range(numGroups):
+        voter = voters[i % len(voters)]
+        txns = [
+            transaction.ApplicationCallTxn(
+                voter.getAddress(),
+                SP,
+                index,
+                transaction.OnComplete.NoOpOC,
+                app_args=[b"\x05", (i % 2).to_bytes(8, "big")],
+            )
+            for index in (1, 2)
+        ]
+        transaction.assign_group_id(txns)
+        groups.append((voter, txns))
+    return groups
+
+
+def test_same_signatures_as_sdk():
+    voters = [Account(account.generate_account()[0]) for _ in range(3)]
+    groups = voteGroups(voters, 6)
+    txns = [txn for _, group in groups for txn in group]
+    signers = [voter for voter, group in groups for _ in group]
+
+    signedTxns = TransactionSigner(processes=1).signBatch(txns, signers)
+    assert [encoding.msgpack_encode(s) for s in signedTxns] == [
+        encoding.msgpack_encode(txn.sign(voter.getPrivateKey()))
+        for txn, voter in zip(txns, signers)
+    ]
+    # the group IDs are kept
+    assert signedTxns[0].transaction.group == signedTxns[1].transaction.group
+
+
+def test_rekeyed_sender():
+    sender, signer = (Account(account.generate_account()[0]) for _ in range(2))
+    txn = transaction.PaymentTxn(sender.getAddress(), SP, sender.getAddress(), 0)
+    signedTxn = signTransactions([txn], signer)[0]
+    assert signedTxn.authorizing_address == signer.getAddress()
+    assert encoding.msgpack_encode(signedTxn) == encoding.msgpack_encode(
+        txn.sign(signer.getPrivateKey())
+    )
+
+
+def test_pool_keeps_order():
+    voters = [Account(account.generate_account()[0]) for _ in range(4)]
+    txns = [txn for _, group in voteGroups(voters, 50) for txn in group]
+    signers = [voters[i // 2 % 4] for i in range(len(txns))]
+
+    with TransactionSigner(processes=2, chunkSize=16) as signer:
+        pooled = signer.signBatch(txns, signers)
+        assert signer._pool is not None
+    inline = TransactionSigner(processes=1).signBatch(txns, signers)
+
+    assert [s.get_txid() for s in pooled] == [txn.get_txid() for txn in txns]
+    assert [s.signature for s in pooled] == [s.signature for s in inline]
+    assert signer.signatures == len(txns)
+    assert signer.signaturesPerSecond > 0
+
+
+def test_keys_are_released():
+    signer = TransactionSigner(processes=1)
+    voters = [Account(account.generate_account()[0]) for _ in range(2)]
+    txns = [txn for _, group in voteGroups(voters, 2) for txn in group]
+    signer.signBatch(txns, [voters[0], voters[0], voters[1], voters[1]])
+    assert len(signer._keys) == 2
+
+    # the key goes with the account
+    del voters[0]
+    gc.collect()
+    assert len(signer._keys) == 1
+
+    signer.close()
+    assert len(signer._keys) == 0
+
+
+def test_ledger_accepts_signatures():
+    client = LocalAlgodClient()
+    sender = Account(account.generate_account()[0])
+    payAccount(client, client.ledger.genesisAccounts[0], sender.getAddress(), 10 ** 8)
+    txns = [
+        transaction.PaymentTxn(
+            sender.getAddress(),
+            client.suggested_params(),
+            sender.getAddress(),
+            0,
+            note=bytes([i]),
+        )
+        for i in range(2)
+    ]
+    transaction.assign_group_id(txns)
+
+    signedTxns = signTransactions(txns, sender)
+    client.send_transactions(signedTxns)
+    waitForTransaction(client, signedTxns[-1].get_txid())
@@ -0,0 +1,41 @@
+"""Regression snapshots of the contract programs as assembled by gov.assembler.
+
+gov/testing/snapshots holds the TEAL of each contract program next to the
+bytecode gov.assembler produced for it when the snapshot was taken. The TEAL is
+frozen with it, so the contracts can change without taking new snapshots.
+assembler_test checks that the assembler still produces the same bytes. That
+only catches changes to the assembler: whether its output matches algod's
+compile endpoint is checked by assembler_test.test_matches_algod, which needs
+a node (ALGO_GOV_NETWORK=sandbox). To snapshot the current contract programs:
+
+    python -m gov.testing.snapshot
+"""
+from pathlib import Path
+from typing import Tuple
+
+from ..artifacts import ARTIFACTS_DIR, PROGRAMS
+from ..assembler import assemble
+
+SNAPSHOTS_DIR = Path(__file__).resolve().parent / "snapshots"
+
+
+def load(name: str) -> Tuple[str, bytes]:
+    """Get the TEAL of a snapshotted program and the bytecode assembled from it."""
+    return (
+        (SNAPSHOTS_DIR / (name + ".teal")).read_text(),
+        (SNAPSHOTS_DIR / (name + ".bin")).read_bytes(),
+    )
+
+
+def take() -> None:
+    """Assemble the current contract programs and save them."""
+    SNAPSHOTS_DIR.mkdir(exist_ok=True)
+    for name in PROGRAMS:
+        teal = (ARTIFACTS_DIR / (name + ".teal")).read_text()
+        (SNAPSHOTS_DIR / (name + ".teal")).write_text(teal)
+        (SNAPSHOTS_DIR / (name + ".bin")).write_bytes(assemble(teal))
+
+
+if __name__ == "__main__":
+    take()
+    print("Saved", SNAPSHOTS_DIR)
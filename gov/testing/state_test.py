@@ -0,0 +1,139 @@
+from base64 import b64encode
+
+import pytest
+
+from ..state import GovernorState, ProposalState, VoterState, getGovernorState
+from ..contracts import keys
+from ..util import KEY_NAMES, decodeState, readableKey, readableState, stateKey
+from .stub import StubAlgod
+
+
+def uint(key, value):
+    return {"key": b64encode(key).decode(), "value": {"type": 2, "uint": value}}
+
+
+def byteValue(key, value):
+    return {
+        "key": b64encode(key).decode(),
+        "value": {"type": 1, "bytes": b64encode(value).decode()},
+    }
+
+
+GOVERNOR_STATE = [
+    byteValue(stateKey("creator"), b"\x01" * 32),
+    uint(stateKey("gov_token"), 7),
+    uint(stateKey("propose_threshold"), 1000),
+    uint(stateKey("num_registered_proposals"), 2),
+    uint(stateKey("max_num_proposals"), 5),
+    byteValue(stateKey("proposal_program_hash"), b"\x03" * 32),
+]
+
+
+def test_decode_all_fields():
+    state = GovernorState.decode(GOVERNOR_STATE)
+
+    assert state.creator == b"\x01" * 32
+    assert state.govToken == 7
+    assert state.proposeThreshold == 1000
+    assert state.numRegisteredProposals == 2
+    assert state.maxNumProposals == 5
+    assert state.proposalProgramHash == b"\x03" * 32
+    # absent from the state
+    assert state.startTime is None
+
+    assert state == GovernorState.fromState(decodeState(GOVERNOR_STATE))
+
+
+def test_decode_requested_fields_only():
+    state = GovernorState.decode(GOVERNOR_STATE, ["govToken"])
+
+    assert state.govToken == 7
+    assert state.creator is None
+    assert state.proposeThreshold is None
+
+    with pytest.raises(ValueError):
+        GovernorState.decode(GOVERNOR_STATE, ["gov_token"])
+
+
+def test_views_are_slotted():
+    state = VoterState.decode([uint(stateKey("address_voting_power"), 10)])
+
+    assert state.votingPower == 10
+    assert not hasattr(state, "__dict__")
+    with pytest.raises(AttributeError):
+        state.notAField = 1
+
+
+def test_voted_slots():
+    # voted on slots 0, 3 and 9 in cycle 2
+    voted = (2).to_bytes(8, "big") + bytes([0b10010000, 0b01000000])
+    state = VoterState.decode([byteValue(stateKey("address_voted"), voted)])
+
+    assert state.votedSlots(2) == {0, 3, 9}
+    # flags of an earlier cycle are stale
+    assert state.votedSlots(3) == set()
+    assert VoterState.decode([]).votedSlots(2) == set()
+
+
+def test_proposal_state():
+    state = ProposalState.decode(
+        [
+            uint(stateKey("governor_id"), 42),
+            byteValue(stateKey("target_id"), b"\x02" * 32),
+            uint(stateKey("registration_cycle"), 3),
+            uint(stateKey("registration_id"), 0),
+            uint(stateKey("for_votes"), 25),
+            uint(stateKey("against_votes"), 5),
+            uint(stateKey("can_execute"), 1),
+        ]
+    )
+
+    assert state.governorId == 42
+    assert state.targetId == b"\x02" * 32
+    assert (state.registrationCycle, state.registrationId) == (3, 0)
+    assert (state.forVotes, state.againstVotes, state.canExecute) == (25, 5, 1)
+
+    governor = GovernorState.fromState(
+        {stateKey("gov_cycle_id"): 3, stateKey("quorum_threshold"): 20}
+    )
+    assert state.canBeExecuted(42, governor)
+    # another governor, a past cycle, a higher quorum
+    assert not state.canBeExecuted(41, governor)
+    governor.govCycleId = 4
+    assert not state.canBeExecuted(42, governor)
+    governor.govCycleId, governor.quorumThreshold = 3, 31
+    assert not state.canBeExecuted(42, governor)
+    governor.quorumThreshold = 30
+    assert state.canBeExecuted(42, governor)
+    # a tie, an executed proposal
+    state.forVotes = 5
+    assert not state.canBeExecuted(42, governor)
+    state.forVotes, state.canExecute = 25, 0
+    assert not state.canBeExecuted(42, governor)
+
+
+def test_get_governor_state():
+    assert getGovernorState(StubAlgod(), 1, ["govToken"]).govToken == 7
+
+
+def test_readable_keys():
+    state = decodeState(GOVERNOR_STATE + [uint(b"\xff", 12)])
+    assert readableState(state) == {
+        "creator": b"\x01" * 32,
+        "gov_token": 7,
+        "propose_threshold": 1000,
+        "num_registered_proposals": 2,
+        "max_num_proposals": 5,
+        "proposal_program_hash": b"\x03" * 32,
+        "0xff": 12,
+    }
+
+    for name in ("gov_token", "for_votes", "can_execute", "0xff"):
+        assert readableKey(stateKey(name)) == name
+    with pytest.raises(ValueError):
+        stateKey("lunch")
+
+    # every key has a tag of its own
+    assert len(KEY_NAMES) == len(
+        [constant for constant in dir(keys) if constant.endswith("_KEY")]
+    )
@@ -0,0 +1,163 @@
+import json
+import socket
+import threading
+import time
+from base64 import b64encode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+import msgpack
+from algosdk.future import transaction
+
+from ..util import stateKey
+
+
+class StubAlgod:
+    """Local stand-in for algod that confirms transactions one round after they are sent."""
+
+    def __init__(self, blockTime: float = 0.01) -> None:
+        self.blockTime = blockTime
+        self.round = 1
+        self.sent: Dict[str, int] = dict()
+        # transactions that sit in the pool forever, with their pool error if any
+        self.stuck: Dict[str, str] = dict()
+        # msgpack-encoded blocks by round, rounds not in here are empty
+        self.blocks: Dict[int, bytes] = dict()
+
+        self.statusCalls = 0
+        self.statusAfterBlockCalls = 0
+        self.pendingCalls = 0
+        self.blockCalls = 0
+        self.appInfoCalls = 0
+
+    def status(self):
+        self.statusCalls += 1
+        return {"last-round": self.round}
+
+    def status_after_block(self, round):
+        self.statusAfterBlockCalls += 1
+        time.sleep(self.blockTime)
+        if self.round <= round:
+            self.round = round + 1
+        return {"last-round": self.round}
+
+    def suggested_params(self):
+        return transaction.SuggestedParams(
+            1000, self.round, self.round + 1000, b64encode(bytes(32)).decode()
+        )
+
+    def send_transaction(self, txn):
+        txID = txn.get_txid()
+        self.sent[txID] = self.round
+        return txID
+
+    def send_transactions(self, txns):
+        for txn in txns:
+            self.send_transaction(txn)
+        return txns[0].get_txid()
+
+    def pending_transaction_info(self, txID):
+        self.pendingCalls += 1
+        if txID in self.stuck:
+            return {"pool-error": self.stuck[txID], "txn": {}}
+        sentRound = self.sent[txID]
+        if self.round > sentRound:
+            return {"pool-error": "", "txn": {}, "confirmed-round": sentRound + 1}
+        return {"pool-error": "", "txn": {}}
+
+    def block_info(self, round, response_format="json"):
+        assert response_format == "msgpack"
+        self.blockCalls += 1
+        if round > self.round:
+            raise Exception("failed to retrieve information from the ledger")
+        block = self.blocks.get(round)
+        if block is None:
+            block = msgpack.packb({"block": {"rnd": round, "ts": round}})
+        return block
+
+    def application_info(self, appID):
+        self.appInfoCalls += 1
+        return {
+            "params": {
+                "global-state": [
+                    {
+                        "key": b64encode(stateKey("gov_token")).decode(),
+                        "value": {"type": 2, "uint": 7},
+                    }
+                ]
+            }
+        }
+
+
+class _StubAlgodHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server: StubAlgodServer = self.server
+        if self.path == "/v2/status":
+            self._reply(200, {"last-round": 1})
+        elif self.path == "/v2/transactions/params":
+            self._reply(
+                200,
+                {
+                    "consensus-version": "future",
+                    "fee": 0,
+                    "genesis-hash": b64encode(bytes(32)).decode(),
+                    "genesis-id": "stub-v1",
+                    "last-round": 1,
+                    "min-fee": 1000,
+                },
+            )
+        elif self.path == "/health":
+            self._reply(200, None)
+        else:
+            self._reply(404, {"message": "not found: " + self.path})
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.server.closeAfterResponse:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubAlgodServer(ThreadingHTTPServer):
+    """Local HTTP stand-in for algod that supports keep-alive connections.
+
+    Serves /v2/status and /v2/transactions/params and counts accepted connections.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, closeAfterResponse: bool = False) -> None:
+        super().__init__(("127.0.0.1", 0), _StubAlgodHandler)
+        self.closeAfterResponse = closeAfterResponse
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def address(self) -> str:
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+    def __enter__(self) -> "StubAlgodServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
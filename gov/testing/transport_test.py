@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from algosdk import error
+
+from ..transport import PooledAlgodClient
+from .stub import StubAlgodServer
+
+TOKEN = "a" * 64
+
+
+def test_connections_are_reused():
+    with StubAlgodServer() as server:
+        client = PooledAlgodClient(TOKEN, server.address, poolSize=2)
+        for _ in range(50):
+            assert client.status()["last-round"] == 1
+        params = client.suggested_params()
+        client.close()
+
+    assert params.min_fee == 1000
+    assert server.connections == 1
+    assert client.pool.metrics()["requests"] == 51
+    assert client.pool.reused == 50
+
+
+def test_pool_size_bounds_concurrent_connections():
+    with StubAlgodServer() as server:
+        client = PooledAlgodClient(TOKEN, server.address, poolSize=4)
+        with ThreadPoolExecutor(16) as executor:
+            list(executor.map(lambda _: client.status(), range(200)))
+        client.close()
+
+    assert server.connections <= 4
+    assert client.pool.connectionsOpened <= 4
+
+
+def test_server_closed_connections():
+    with StubAlgodServer(closeAfterResponse=True) as server:
+        client = PooledAlgodClient(TOKEN, server.address)
+        for _ in range(5):
+            client.status()
+
+    assert server.connections == 5
+    assert client.pool.reused == 0
+
+
+def test_errors_and_empty_responses():
+    with StubAlgodServer() as server:
+        client = PooledAlgodClient(TOKEN, server.address)
+        assert client.health() is None
+        with pytest.raises(error.AlgodHTTPError, match="not found") as e:
+            client.account_info("nobody")
+        assert e.value.code == 404
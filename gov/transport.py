@@ -0,0 +1,191 @@
+import http.client
+import json
+import queue
+import threading
+from typing import Any, Dict, Optional, Union
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+
+Connection = Union[http.client.HTTPConnection, http.client.HTTPSConnection]
+
+# errors that mean a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class ConnectionPool:
+    """A bounded pool of persistent HTTP connections to one host.
+
+    Connections are opened on demand up to `size` and handed back to the pool
+    after each request. Callers block while all connections are in use.
+    """
+
+    def __init__(self, address: str, size: int = 8, timeout: float = 30) -> None:
+        url = parse.urlsplit(address)
+        if url.scheme not in ("http", "https"):
+            raise ValueError("Unsupported algod address: {}".format(address))
+
+        self.scheme = url.scheme
+        self.host = url.hostname or "localhost"
+        self.port = url.port
+        self.basePath = url.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+
+        self.idle: "queue.LifoQueue[Connection]" = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+
+        self.requests = 0
+        self.connectionsOpened = 0
+        self.reconnects = 0
+
+    @property
+    def reused(self) -> int:
+        """Number of requests served on an already open connection."""
+        return self.requests - self.connectionsOpened
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "requests": self.requests,
+            "connectionsOpened": self.connectionsOpened,
+            "reused": self.reused,
+            "reconnects": self.reconnects,
+            "idle": self.idle.qsize(),
+        }
+
+    def _connect(self) -> Connection:
+        with self.lock:
+            self.connectionsOpened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+    ):
+        """Send a request and return (status, reason, body)."""
+        with self.slots:
+            with self.lock:
+                self.requests += 1
+            try:
+                conn, fresh = self.idle.get_nowait(), False
+            except queue.Empty:
+                conn, fresh = self._connect(), True
+
+            while True:
+                try:
+                    conn.request(method, self.basePath + path, body, headers)
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if fresh:
+                        raise
+                    # the server dropped an idle connection, retry once on a new one
+                    with self.lock:
+                        self.reconnects += 1
+                    conn, fresh = self._connect(), True
+                    continue
+                except BaseException:
+                    conn.close()
+                    raise
+
+                if resp.will_close:
+                    conn.close()
+                else:
+                    self.idle.put(conn)
+                return resp.status, resp.reason, data
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class PooledAlgodClient(AlgodClient):
+    """An AlgodClient that sends requests over pooled keep-alive connections.
+
+    It can be passed to every operation and gov.util reader in place of a plain
+    AlgodClient, which opens a new connection for each request.
+
+    Args:
+        algod_token: The algod API token.
+        algod_address: The algod address, e.g. "http://localhost:4001".
+        headers: Extra headers to send with every request.
+        poolSize: The maximum number of open connections.
+        timeout: The socket timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        poolSize: int = 8,
+        timeout: float = 30,
+    ) -> None:
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = ConnectionPool(algod_address, poolSize, timeout)
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+    ) -> Any:
+        header: Dict[str, str] = {}
+
+        if self.headers:
+            header.update(self.headers)
+
+        if headers:
+            header.update(headers)
+
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+
+        status, reason, body = self.pool.request(method, requrl, data, header)
+
+        if status >= 400:
+            message: Any = body.decode("utf-8", errors="replace") or reason
+            try:
+                message = json.loads(message)["message"]
+            except Exception:
+                pass
+            raise error.AlgodHTTPError(message, status)
+
+        if response_format == "json":
+            try:
+                return json.loads(body) if body else None
+            except Exception as e:
+                raise error.AlgodResponseError(
+                    "Failed to parse JSON response from algod"
+                ) from e
+        return body
+
+    def close(self) -> None:
+        self.pool.close()
@@ -1,12 +1,14 @@
-from typing import List, Tuple, Dict, Any, Optional, Union
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Optional, Set, Union
 from base64 import b64decode
 
 from algosdk.v2client.algod import AlgodClient
 from algosdk import encoding
 
-from pyteal import compileTeal, Mode, Expr
-
 from .account import Account
+from .contracts import keys
+
+if TYPE_CHECKING:
+    from pyteal import Expr
 
 
 class PendingTxnResponse:
@@ -31,6 +33,10 @@ class PendingTxnResponse:
 def waitForTransaction(
     client: AlgodClient, txID: str, timeout: int = 10
 ) -> PendingTxnResponse:
+    tracker = getattr(client, "confirmationTracker", None)
+    if tracker is not None:
+        return tracker.waitForTransaction(txID, timeout)
+
     lastStatus = client.status()
     lastRound = lastStatus["last-round"]
     startRound = lastRound
@@ -53,8 +59,14 @@ def waitForTransaction(
     )
 
 
-def fullyCompileContract(client: AlgodClient, contract: Expr) -> bytes:
+def fullyCompileContract(client: AlgodClient, contract: "Expr") -> bytes:
+    from pyteal import compileTeal, Mode
+
     teal = compileTeal(contract, mode=Mode.Application, version=5)
+    return fullyCompileTeal(client, teal)
+
+
+def fullyCompileTeal(client: AlgodClient, teal: str) -> bytes:
     response = client.compile(teal)
     return b64decode(response["result"])
 
@@ -82,6 +94,85 @@ def decodeState(stateArray: List[Any]) -> Dict[bytes, Union[int, bytes]]:
     return state
 
 
+def decodeStateDelta(
+    deltaArray: List[Any],
+) -> Dict[bytes, Optional[Union[int, bytes]]]:
+    """Decode a global or local state delta, mapping deleted keys to None."""
+    delta: Dict[bytes, Optional[Union[int, bytes]]] = dict()
+
+    for pair in deltaArray:
+        key = b64decode(pair["key"])
+
+        value = pair["value"]
+        action = value["action"]
+
+        if action == 2:
+            # set uint64
+            delta[key] = value.get("uint", 0)
+        elif action == 1:
+            # set byte array
+            delta[key] = b64decode(value.get("bytes", ""))
+        elif action == 3:
+            # delete
+            delta[key] = None
+        else:
+            raise Exception(f"Unexpected delta action: {action}")
+
+    return delta
+
+
+# readable names of the state keys, after their constants in gov.contracts.keys
+KEY_NAMES: Dict[bytes, str] = {
+    getattr(keys, constant).encode(): constant[: -len("_KEY")].lower()
+    for constant in dir(keys)
+    if constant.endswith("_KEY")
+}
+_KEYS_BY_NAME = {name: key for key, name in KEY_NAMES.items()}
+
+
+def readableKey(key: bytes) -> str:
+    """Name a state key of the governor or proposal contracts.
+
+    Unknown keys are named by their hex.
+    """
+    name = KEY_NAMES.get(key)
+    if name is not None:
+        return name
+    return "0x" + key.hex()
+
+
+def stateKey(name: str) -> bytes:
+    """Get the state key named by readableKey."""
+    key = _KEYS_BY_NAME.get(name)
+    if key is not None:
+        return key
+    if name.startswith("0x"):
+        return bytes.fromhex(name[2:])
+    raise ValueError("Unknown state key name: {}".format(name))
+
+
+def readableState(state: Dict[bytes, Any]) -> Dict[str, Any]:
+    """Rename the keys of a decoded state or state delta with readableKey."""
+    return {readableKey(key): value for key, value in state.items()}
+
+
+def decodeVotedSlots(voted: bytes, govCycleId: int) -> Set[int]:
+    """Decode the proposal slots an account voted on from its address_voted key.
+
+    The value is the cycle ID as 8 bytes followed by a bitmask of slots, where
+    slot 0 is the high bit of the first byte. Flags of another cycle are stale
+    and decode as no votes.
+    """
+    if int.from_bytes(voted[:8], "big") != govCycleId:
+        return set()
+    return {
+        i * 8 + bit
+        for i, byte in enumerate(voted[8:])
+        for bit in range(8)
+        if byte & (0x80 >> bit)
+    }
+
+
 def getAppGlobalState(
     client: AlgodClient, appID: int
 ) -> Dict[bytes, Union[int, bytes]]: